@@ -28,7 +28,7 @@ target_metadata = Base.metadata
 def alembic_include_object(object, name, type_, reflected, compare_to):
     # type_ can be 'table', 'index', 'column', 'constraint'
     # ignore particular table_name
-    if type_ == "table" and name in ["users", "sessions", "oidc_states"]:
+    if type_ == "table" and name in ["users", "sessions", "oidc_states", "schema_state"]:
         return False
     return True
 
@@ -0,0 +1,40 @@
+"""natural key unique indexes
+
+Revision ID: 5c1d7e2a9b40
+Revises: 082b66c821e5
+Create Date: 2026-10-19 08:30:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5c1d7e2a9b40'
+down_revision: Union[str, Sequence[str], None] = '082b66c821e5'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Existing duplicates make index creation fail; resolve them before upgrading
+NATURAL_KEYS = (
+    ('customers', ['user_id', 'customer_code']),
+    ('suppliers', ['user_id', 'supplier_code']),
+    ('employees', ['user_id', 'employee_code']),
+    ('locations', ['location_code']),
+    ('purchase_orders', ['user_id', 'po_number']),
+    ('receipts', ['user_id', 'receipt_number']),
+    ('returns', ['user_id', 'return_number']),
+)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    for table_name, columns in NATURAL_KEYS:
+        op.create_index(f"uq_{table_name}_{'_'.join(columns)}", table_name, columns, unique=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for table_name, columns in reversed(NATURAL_KEYS):
+        op.drop_index(f"uq_{table_name}_{'_'.join(columns)}", table_name=table_name)
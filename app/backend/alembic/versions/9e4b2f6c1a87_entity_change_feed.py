@@ -0,0 +1,54 @@
+"""entity change feed
+
+Revision ID: 9e4b2f6c1a87
+Revises: 5c1d7e2a9b40
+Create Date: 2026-10-19 10:15:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9e4b2f6c1a87'
+down_revision: Union[str, Sequence[str], None] = '5c1d7e2a9b40'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('entity_change_horizons',
+    sa.Column('table_name', sa.String(length=64), nullable=False),
+    sa.Column('pruned_through', sa.BigInteger(), nullable=False),
+    sa.PrimaryKeyConstraint('table_name')
+    )
+    op.create_table('entity_changes',
+    sa.Column('version', sa.BigInteger().with_variant(sa.Integer(), 'sqlite'), autoincrement=True, nullable=False),
+    sa.Column('table_name', sa.String(length=64), nullable=False),
+    sa.Column('row_id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.String(), nullable=True),
+    sa.Column('operation', sa.String(length=8), nullable=False),
+    sa.Column('txid', sa.BigInteger(), nullable=True),
+    sa.Column('changed_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+    sa.PrimaryKeyConstraint('version')
+    )
+    for name, columns, txid_rows in (
+        ('ix_entity_changes_table_name_user_id_txid', ['table_name', 'user_id', 'txid'], True),
+        ('ix_entity_changes_table_name_txid', ['table_name', 'txid'], True),
+        ('ix_entity_changes_table_name_user_id_version', ['table_name', 'user_id', 'version'], False),
+        ('ix_entity_changes_table_name_version', ['table_name', 'version'], False),
+    ):
+        where = sa.text('txid IS NOT NULL' if txid_rows else 'txid IS NULL')
+        op.create_index(name, 'entity_changes', columns, unique=False, postgresql_where=where, sqlite_where=where)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for name in ('ix_entity_changes_table_name_version', 'ix_entity_changes_table_name_user_id_version',
+                 'ix_entity_changes_table_name_txid', 'ix_entity_changes_table_name_user_id_txid'):
+        op.drop_index(name, table_name='entity_changes')
+    op.drop_table('entity_changes')
+    op.drop_table('entity_change_horizons')
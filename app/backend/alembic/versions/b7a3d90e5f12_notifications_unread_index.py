@@ -0,0 +1,27 @@
+"""notifications unread index
+
+Revision ID: b7a3d90e5f12
+Revises: 9e4b2f6c1a87
+Create Date: 2026-10-19 11:40:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b7a3d90e5f12'
+down_revision: Union[str, Sequence[str], None] = '9e4b2f6c1a87'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_notifications_user_id_is_read', 'notifications', ['user_id', 'is_read'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_notifications_user_id_is_read', table_name='notifications')
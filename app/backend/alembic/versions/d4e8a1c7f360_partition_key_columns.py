@@ -0,0 +1,40 @@
+"""partition key columns
+
+Revision ID: d4e8a1c7f360
+Revises: b7a3d90e5f12
+Create Date: 2026-10-19 14:05:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd4e8a1c7f360'
+down_revision: Union[str, Sequence[str], None] = 'b7a3d90e5f12'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('sale_items', sa.Column('created_at', sa.DateTime(timezone=True), nullable=True))
+    op.add_column('journal_details', sa.Column('created_at', sa.DateTime(timezone=True), nullable=True))
+    # Existing lines take the date of their sale / journal entry, so they land in the right monthly partition
+    op.execute(
+        "UPDATE sale_items SET created_at = "
+        "(SELECT sales.sale_date FROM sales WHERE sales.id = sale_items.sale_id) WHERE created_at IS NULL"
+    )
+    op.execute(
+        "UPDATE journal_details SET created_at = "
+        "(SELECT journal_entries.entry_date FROM journal_entries WHERE journal_entries.id = journal_details.entry_id) "
+        "WHERE created_at IS NULL"
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('journal_details', 'created_at')
+    op.drop_column('sale_items', 'created_at')
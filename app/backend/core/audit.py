@@ -0,0 +1,310 @@
+"""
+Audit trail of entity writes.
+
+Creates, updates and deletes of entity rows are captured from ORM flushes, so every
+generated service is covered without adding statements or commits to its
+transaction. When the transaction commits, the records are appended to a spool file
+on local disk and to an in-memory ring buffer. A background task bulk-inserts them
+into `audit_logs` once `audit_batch_size` records are waiting, or every
+`audit_flush_interval_seconds`, and then deletes the spool file. Without the background
+task (Lambda without a persistent runtime), the caller flushes at the end of each
+invocation instead.
+
+Each worker owns one `worker-<n>` directory under `audit_spool_dir`, claimed with a
+file lock. Spool files left there by a crashed worker or a failed insert are inserted
+by the next worker that claims the directory. Delivery is therefore at least once:
+a crash between an insert and the deletion of its spool file duplicates that batch.
+Spool writes reach the OS on every commit but are not fsynced, so they survive a
+process crash, not a power loss.
+
+The actor and client address come from the authenticated request
+(`set_audit_actor`). Rows written with Core bulk statements (upserts, imports,
+seeding) are not captured.
+"""
+
+import asyncio
+import itertools
+import json
+import logging
+import time
+from collections import deque
+from contextvars import ContextVar
+from datetime import date, datetime, timezone
+from pathlib import Path
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+from sqlalchemy import event, inspect, insert
+from sqlalchemy.orm import Session
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Windows; spool directories are then not shared between workers
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+AuditRecord = Dict[str, Any]
+
+PENDING_AUDIT_KEY = "audit_pending_records"
+UNAUDITED_TABLES = frozenset({"audit_logs"})
+SYSTEM_ACTOR = "system"
+
+_actor: ContextVar[Tuple[Optional[str], Optional[str]]] = ContextVar("audit_actor", default=(None, None))
+
+
+def set_audit_actor(user_id: Optional[str], ip_address: Optional[str] = None) -> None:
+    """Attribute the writes of the current request (or task) to `user_id`."""
+    _actor.set((user_id, ip_address))
+
+
+def _json_value(value: Any) -> Any:
+    return value.isoformat() if isinstance(value, (datetime, date)) else value
+
+
+def _diff(obj, action: str) -> Dict[str, Any]:
+    """Column values of a created or deleted row, or {column: [old, new]} for the changed columns of an update."""
+    state = inspect(obj)
+    details = {}
+    for column in obj.__table__.columns:
+        if action != "update":
+            # Read the state directly, a deleted row must not be loaded again
+            value = state.dict.get(column.key)
+            if value is not None:
+                details[column.key] = _json_value(value)
+            continue
+        history = state.attrs[column.key].history
+        if history.added:
+            old = history.deleted[0] if history.deleted else None
+            details[column.key] = [_json_value(old), _json_value(history.added[0])]
+    return details
+
+
+class AuditWriter:
+    def __init__(self, spool_dir: str, buffer_size: int = 10000, batch_size: int = 500, flush_interval: float = 2.0):
+        self.spool_root = Path(spool_dir)
+        self.buffer: Deque[AuditRecord] = deque(maxlen=buffer_size)
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.session_maker = None
+        self.spool_dir: Optional[Path] = None
+        self.flushed = 0
+        self.failed_flushes = 0
+        self._lock_handle = None
+        self._segment = None
+        self._segment_path: Optional[Path] = None
+        self._overflowed = False
+        self._pending: Deque[Tuple[Path, Optional[List[AuditRecord]]]] = deque()
+        self._segment_ids = itertools.count()
+        self._wake: Optional[asyncio.Event] = None
+        self._flush_lock: Optional[asyncio.Lock] = None
+        self._task: Optional[asyncio.Task] = None
+
+    # ---------- spool files ----------
+    def _claim_spool_dir(self) -> Path:
+        for slot in itertools.count():
+            path = self.spool_root / f"worker-{slot}"
+            path.mkdir(parents=True, exist_ok=True)
+            handle = open(path / ".lock", "a")
+            if fcntl is None:
+                self._lock_handle = handle
+                return path
+            try:
+                fcntl.flock(handle, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except OSError:
+                handle.close()
+                continue
+            self._lock_handle = handle
+            return path
+
+    def _open_segment(self) -> None:
+        self._segment_path = self.spool_dir / f"{time.time_ns():020d}-{next(self._segment_ids):06d}.jsonl"
+        self._segment = open(self._segment_path, "a", encoding="utf-8")
+
+    def _rotate(self) -> Path:
+        """Close the current spool file and start a new one; returns the closed file's path."""
+        path = self._segment_path
+        self._segment.close()
+        self._open_segment()
+        return path
+
+    @staticmethod
+    def _read_segment(path: Path) -> List[AuditRecord]:
+        records = []
+        with open(path, encoding="utf-8") as handle:
+            for line in handle:
+                try:
+                    records.append(json.loads(line))
+                except ValueError:
+                    logger.warning("Skipping a truncated audit record in %s", path.name)
+        return records
+
+    # ---------- lifecycle ----------
+    async def start(self, session_maker, background: bool = True) -> None:
+        """Claim a spool directory; with `background`, also start the task that flushes periodically."""
+        self.session_maker = session_maker
+        self.spool_dir = await asyncio.to_thread(self._claim_spool_dir)
+        leftovers = sorted(self.spool_dir.glob("*.jsonl"))
+        self._pending.extend((path, None) for path in leftovers)
+        if leftovers:
+            logger.info("Replaying %d audit spool file(s) from %s", len(leftovers), self.spool_dir)
+        self._open_segment()
+        self._wake = asyncio.Event()
+        self._flush_lock = asyncio.Lock()
+        if background:
+            self._task = asyncio.get_running_loop().create_task(self._run())
+        logger.info("Audit writer started (spool %s)", self.spool_dir)
+
+    async def stop(self) -> None:
+        if self._segment is None:
+            return
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.flush()
+        self._segment.close()
+        if self._segment_path.exists() and self._segment_path.stat().st_size == 0:
+            self._segment_path.unlink()
+        self._lock_handle.close()
+        self._segment = None
+
+    # ---------- capture ----------
+    def add(self, records: List[AuditRecord]) -> None:
+        """Spool and buffer the records of a committed transaction; never waits for the database."""
+        if not records or self._segment is None:
+            return
+        self._segment.write("".join(json.dumps(record, default=str) + "\n" for record in records))
+        self._segment.flush()
+        if len(self.buffer) + len(records) > self.buffer.maxlen:
+            # The oldest records fall out of memory; this batch is read back from the spool file instead
+            self._overflowed = True
+        self.buffer.extend(records)
+        if len(self.buffer) >= self.batch_size:
+            self._wake.set()
+
+    # ---------- flushing ----------
+    async def _run(self) -> None:
+        while True:
+            try:
+                await asyncio.wait_for(self._wake.wait(), self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+            try:
+                await self.flush()
+            except Exception as e:  # pragma: no cover - defensive, the loop must survive
+                logger.error(f"Audit flush failed: {e}")
+
+    async def flush(self) -> None:
+        """Insert everything captured so far, oldest spool file first; failures are retried on the next flush."""
+        async with self._flush_lock:
+            if self.buffer or self._overflowed:
+                records = None if self._overflowed else list(self.buffer)
+                self.buffer.clear()
+                self._overflowed = False
+                self._pending.append((self._rotate(), records))
+            while self._pending:
+                path, records = self._pending[0]
+                if records is None:
+                    records = await asyncio.to_thread(self._read_segment, path)
+                try:
+                    if records:
+                        await self._insert(records)
+                except Exception as e:
+                    self.failed_flushes += 1
+                    logger.error(f"Failed to write {len(records)} audit records, keeping them in {path.name}: {e}")
+                    self._pending[0] = (path, None)  # Free the memory; the spool file has them
+                    return
+                self._pending.popleft()
+                self.flushed += len(records)
+                await asyncio.to_thread(path.unlink, True)
+
+    async def _insert(self, records: List[AuditRecord]) -> None:
+        from core.change_feed import record_changes_async
+        from models.audit_logs import Audit_logs
+
+        table = Audit_logs.__table__
+        async with self.session_maker() as db:
+            if db.get_bind().dialect.insert_executemany_returning:
+                result = await db.execute(insert(table).returning(table.c.id, table.c.user_id), records)
+                await record_changes_async(db, table, [(row_id, user_id, "insert") for row_id, user_id in result])
+            else:
+                await db.execute(insert(table), records)
+            await db.commit()
+        logger.debug("Wrote %d audit records", len(records))
+
+
+audit_writer: Optional[AuditWriter] = None
+
+
+def _after_flush(session: Session, _flush_context) -> None:
+    user_id, ip_address = _actor.get()
+    created_at = datetime.now(timezone.utc).isoformat()
+    records = []
+    for objects, action in ((session.new, "create"), (session.dirty, "update"), (session.deleted, "delete")):
+        for obj in objects:
+            table = getattr(type(obj), "__table__", None)
+            if table is None or table.name in UNAUDITED_TABLES or not _is_entity(table):
+                continue
+            details = _diff(obj, action)
+            if action == "update" and not details:
+                continue
+            records.append({
+                "user_id": user_id or SYSTEM_ACTOR,
+                "action": action,
+                "entity_type": table.name,
+                "entity_id": obj.id,
+                "details": json.dumps(details, default=str),
+                "ip_address": ip_address,
+                "created_at": created_at,
+            })
+    if records:
+        session.info.setdefault(PENDING_AUDIT_KEY, []).extend(records)
+
+
+def _after_commit(session: Session) -> None:
+    records = session.info.pop(PENDING_AUDIT_KEY, None)
+    if records and audit_writer is not None:
+        audit_writer.add(records)
+
+
+def _after_rollback(session: Session) -> None:
+    session.info.pop(PENDING_AUDIT_KEY, None)
+
+
+def _is_entity(table) -> bool:
+    from core.change_feed import is_tracked
+
+    return is_tracked(table)
+
+
+async def start_audit_writer(session_maker, spool_dir: str, buffer_size: int, batch_size: int,
+                             flush_interval: float, background: bool = True) -> AuditWriter:
+    """Start the writer and capture the writes of every ORM session.
+
+    Without `background` nothing is flushed until `audit_writer.flush()` is called.
+    """
+    global audit_writer
+    if audit_writer is None:
+        audit_writer = AuditWriter(spool_dir, buffer_size, batch_size, flush_interval)
+        await audit_writer.start(session_maker, background)
+    for name, hook in (("after_flush", _after_flush), ("after_commit", _after_commit),
+                       ("after_rollback", _after_rollback)):
+        if not event.contains(Session, name, hook):
+            event.listen(Session, name, hook)
+    return audit_writer
+
+
+async def stop_audit_writer() -> None:
+    """Flush what is buffered and stop; records that cannot be written stay in the spool."""
+    global audit_writer
+    for name, hook in (("after_flush", _after_flush), ("after_commit", _after_commit),
+                       ("after_rollback", _after_rollback)):
+        if event.contains(Session, name, hook):
+            event.remove(Session, name, hook)
+    if audit_writer is not None:
+        await audit_writer.stop()
+        audit_writer = None
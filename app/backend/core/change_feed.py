@@ -0,0 +1,249 @@
+"""
+Change feed for incremental sync.
+
+Every insert, update and delete of a tracked entity row is appended to
+`entity_changes` in the same transaction as the write. Versions come from the
+table's identity column, so writers never wait on each other.
+
+Readers page through the feed with an opaque cursor (`since` / `next_since`):
+- PostgreSQL: the cursor is the writing transaction's id. A page only contains
+  transactions older than the oldest one still running in the reader's snapshot (the
+  commit-visibility watermark). A transaction that commits late, after a newer one was
+  already read, is therefore never skipped. A transaction's changes are never split
+  across pages.
+- Other backends: the cursor is the version. Under SQLite's single writer, versions
+  become visible in insert order.
+
+ORM writes are recorded by an `after_flush` hook on every session. Core bulk
+statements (`core.upsert.bulk_upsert`, the CSV/XLSX import) call `record_changes`
+themselves. Writes that bypass both, such as the seed script and mock data, are not
+in the feed; clients see those rows in their initial full load.
+
+Changes older than `change_feed_retention_days` are deleted (`prune_changes`). The
+highest pruned cursor of each table is kept in `entity_change_horizons`, and a client
+whose cursor is older gets `ChangeFeedExpired` and must reload.
+"""
+
+import logging
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from models.entity_changes import EntityChangeHorizons, EntityChanges
+from sqlalchemy import Integer, Table, delete, event, func, insert, select, text
+from sqlalchemy.orm import Session
+
+logger = logging.getLogger(__name__)
+
+# (row id, owning user_id or None, "insert" | "update" | "delete")
+Change = Tuple[int, Optional[str], str]
+
+UNTRACKED_TABLES = frozenset({"entity_changes", "entity_change_horizons", "oidc_states"})
+
+changes_table = EntityChanges.__table__
+horizons_table = EntityChangeHorizons.__table__
+
+
+class ChangeFeedExpired(Exception):
+    """The cursor is older than the retained changes; the client must reload and start from a fresh cursor."""
+
+
+def is_tracked(table: Table) -> bool:
+    """Entity tables with an integer `id` primary key have a change feed."""
+    id_column = table.c.get("id")
+    return (
+        table.name not in UNTRACKED_TABLES
+        and id_column is not None
+        and id_column.primary_key
+        and isinstance(id_column.type, Integer)
+    )
+
+
+def record_changes(connection, table_name: str, changes: Sequence[Change]) -> None:
+    """Append `changes` to the feed of `table_name` within the connection's current transaction."""
+    if not changes:
+        return
+    statement = insert(changes_table)
+    if connection.dialect.name == "postgresql":
+        statement = statement.values(txid=func.txid_current())
+    connection.execute(statement, [
+        {"table_name": table_name, "row_id": row_id, "user_id": user_id, "operation": op}
+        for row_id, user_id, op in changes
+    ])
+
+
+async def record_changes_async(db, table: Table, changes: Sequence[Change]) -> None:
+    """`record_changes` on an AsyncSession, for Core statements that bypass the flush hook."""
+    if changes and is_tracked(table):
+        await db.run_sync(lambda session: record_changes(session.connection(), table.name, changes))
+
+
+def _after_flush(session: Session, _flush_context) -> None:
+    # The session's new/dirty/deleted collections still describe the flush that just ran
+    changes: Dict[str, List[Change]] = {}
+
+    def add(obj, operation: str) -> None:
+        table = getattr(type(obj), "__table__", None)
+        if table is not None and is_tracked(table):
+            changes.setdefault(table.name, []).append((obj.id, getattr(obj, "user_id", None), operation))
+
+    for obj in session.new:
+        add(obj, "insert")
+    for obj in session.dirty:
+        if session.is_modified(obj, include_collections=False):
+            add(obj, "update")
+    for obj in session.deleted:
+        add(obj, "delete")
+    if changes:
+        connection = session.connection()
+        for table_name in sorted(changes):
+            record_changes(connection, table_name, changes[table_name])
+
+
+def install_change_feed() -> None:
+    """Record the changes of every ORM flush of a tracked table (idempotent)."""
+    if not event.contains(Session, "after_flush", _after_flush):
+        event.listen(Session, "after_flush", _after_flush)
+        logger.info("Change feed recording enabled")
+
+
+def _uses_txid(db) -> bool:
+    return db.get_bind().dialect.name == "postgresql"
+
+
+async def current_cursor(db, table_name: str) -> int:
+    """The cursor to start polling from before a full load of `table_name`."""
+    if _uses_txid(db):
+        # Everything older than the oldest running transaction is in the load's snapshot
+        return await db.scalar(text("SELECT txid_snapshot_xmin(txid_current_snapshot())")) - 1
+    latest = await db.scalar(
+        select(func.max(changes_table.c.version))
+        .where(changes_table.c.table_name == table_name, changes_table.c.txid.is_(None))
+    )
+    # Once every change of the table is pruned, the horizon is the newest position left
+    pruned_through = await db.scalar(
+        select(horizons_table.c.pruned_through).where(horizons_table.c.table_name == table_name)
+    )
+    return max(latest or 0, pruned_through or 0)
+
+
+async def _page(db, table_name: str, since: int, limit: int, user_id: Optional[str]):
+    """Up to `limit` changes after `since`, the cursor to continue from, and whether more are waiting."""
+    conditions = [changes_table.c.table_name == table_name]
+    if user_id is not None:
+        conditions.append(changes_table.c.user_id == user_id)
+    columns = (changes_table.c.version, changes_table.c.row_id, changes_table.c.operation, changes_table.c.txid)
+
+    if not _uses_txid(db):
+        # txid IS NULL matches the partial version indexes, which SQLite only uses when the query implies it
+        query = select(*columns).where(*conditions, changes_table.c.txid.is_(None), changes_table.c.version > since)
+        rows = (await db.execute(query.order_by(changes_table.c.version).limit(limit + 1))).all()
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+        return rows, rows[-1].version if rows else since, has_more
+
+    watermark = await db.scalar(text("SELECT txid_snapshot_xmin(txid_current_snapshot())"))
+    txid = changes_table.c.txid
+    query = select(*columns).where(*conditions, txid > since, txid < watermark)
+    rows = (await db.execute(query.order_by(txid, changes_table.c.version).limit(limit + 1))).all()
+    if len(rows) <= limit:
+        return rows, rows[-1].txid if rows else since, False
+    # Keep whole transactions: drop the one cut by the limit, or take all of it if it fills the page
+    cut = rows[limit].txid
+    rows = [row for row in rows[:limit] if row.txid != cut]
+    if not rows:
+        query = select(*columns).where(*conditions, txid == cut)
+        rows = (await db.execute(query.order_by(changes_table.c.version))).all()
+    return rows, rows[-1].txid, True
+
+
+async def read_changes(db, model, since: Optional[int], limit: int, user_id: Optional[str] = None) -> Dict[str, Any]:
+    """A page of `model`'s changes after cursor `since`, each with the row as it is now.
+
+    Only the latest change of a row within the page is returned; a row that no longer
+    exists is reported as a delete. Without `since` no changes are returned, only the
+    current cursor: take it before a full load and poll from it afterwards. Raises
+    ChangeFeedExpired when changes after `since` were already pruned.
+    """
+    table = model.__table__
+    if since is None:
+        return {"changes": [], "next_since": await current_cursor(db, table.name), "has_more": False}
+
+    pruned_through = await db.scalar(
+        select(horizons_table.c.pruned_through).where(horizons_table.c.table_name == table.name)
+    )
+    if pruned_through is not None and since < pruned_through:
+        raise ChangeFeedExpired(f"Changes of {table.name} after {since} were pruned; reload and start without since")
+
+    rows, next_since, has_more = await _page(db, table.name, since, limit, user_id)
+
+    latest = {row.row_id: row for row in rows}
+    live_ids = [row_id for row_id, row in latest.items() if row.operation != "delete"]
+    current = {}
+    if live_ids:
+        rows_query = select(model).where(model.id.in_(live_ids))
+        if user_id is not None:
+            rows_query = rows_query.where(model.user_id == user_id)
+        current = {obj.id: obj for obj in (await db.execute(rows_query)).scalars()}
+
+    entries = []
+    for change in sorted(latest.values(), key=lambda row: row.version):
+        data = current.get(change.row_id)
+        entries.append({
+            "version": change.version,
+            "operation": change.operation if data is not None else "delete",
+            "id": change.row_id,
+            "data": data,
+        })
+    return {"changes": entries, "next_since": next_since, "has_more": has_more}
+
+
+async def prune_changes(db, changed_before, batch_size: int) -> int:
+    """Delete up to `batch_size` of the oldest changes made before `changed_before` and commit; returns the count.
+
+    Versions grow with time, so the changes to delete are the versions below the first one that is kept.
+    """
+    # The first version that is kept; walking the primary key from the start stops there
+    boundary = await db.scalar(
+        select(changes_table.c.version).where(changes_table.c.changed_at >= changed_before)
+        .order_by(changes_table.c.version).limit(1)
+    )
+    query = select(changes_table.c.version, changes_table.c.table_name, changes_table.c.txid)
+    if boundary is not None:
+        query = query.where(changes_table.c.version < boundary)
+    rows = (await db.execute(query.order_by(changes_table.c.version).limit(batch_size))).all()
+    if not rows:
+        return 0
+    horizons: Dict[str, int] = {}
+    for version, table_name, txid in rows:
+        cursor = txid if txid is not None else version
+        horizons[table_name] = max(horizons.get(table_name, 0), cursor)
+    await db.execute(delete(changes_table).where(changes_table.c.version.in_([row.version for row in rows])))
+    dialect_name = db.get_bind().dialect.name
+    for table_name, cursor in horizons.items():
+        await db.execute(_advance_horizon(table_name, cursor, dialect_name))
+    await db.commit()
+    return len(rows)
+
+
+def _advance_horizon(table_name: str, cursor: int, dialect_name: str):
+    """Upsert the table's horizon, never moving it backwards (txids are not pruned in order)."""
+    values = {"table_name": table_name, "pruned_through": cursor}
+    if dialect_name in ("mysql", "mariadb"):
+        from sqlalchemy.dialects.mysql import insert as dialect_insert
+
+        statement = dialect_insert(horizons_table).values(values)
+        return statement.on_duplicate_key_update(
+            pruned_through=func.greatest(horizons_table.c.pruned_through, statement.inserted.pruned_through)
+        )
+    if dialect_name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert as dialect_insert
+
+        larger = func.greatest
+    else:
+        from sqlalchemy.dialects.sqlite import insert as dialect_insert
+
+        larger = func.max  # SQLite's two-argument max() is scalar
+    statement = dialect_insert(horizons_table).values(values)
+    return statement.on_conflict_do_update(
+        index_elements=["table_name"],
+        set_={"pruned_through": larger(horizons_table.c.pruned_through, statement.excluded.pruned_through)},
+    )
@@ -1,5 +1,6 @@
 import logging
 import os
+import tempfile
 from typing import Any
 
 from pydantic_settings import BaseSettings
@@ -19,6 +20,35 @@ class Settings(BaseSettings):
 
     # Database
     database_url: str = "sqlite:///./supermarket.db"
+    db_pool_size: int = 10
+    db_max_overflow: int = 20
+    db_pool_timeout: int = 30  # Seconds to wait for a connection before raising
+    db_pool_recycle: int = 3600
+    db_pool_pre_ping: bool = False  # Disconnects are handled optimistically unless enabled
+    # Statement caching: reuse service statements per query shape, size SQLAlchemy's compiled cache
+    # and asyncpg's per-connection prepared statements (set the latter to 0 behind pgbouncer)
+    db_statement_cache_enabled: bool = True
+    db_statement_cache_size: int = 1024
+    db_query_cache_size: int = 2000
+    db_prepared_statement_cache_size: int = 500
+    # SQLite production profile: WAL, tuned pragmas and a single writer
+    sqlite_production_mode: bool = True
+    sqlite_synchronous: str = "NORMAL"
+    sqlite_busy_timeout_ms: int = 5000
+    sqlite_mmap_size: int = 268435456  # 256 MiB
+    sqlite_cache_size: int = -65536  # Negative values are KiB, i.e. 64 MiB
+    schema_fast_path: bool = True  # Skip create_all and mock data when the stored schema fingerprint matches
+    schema_auto_repair: bool = True  # Add missing model columns to existing tables when the fingerprint differs
+    # Read replicas: comma-separated URLs; GET endpoints read from them when set
+    database_read_url: str = ""
+    read_replica_max_lag_seconds: float = 5.0
+    read_replica_lag_check_seconds: float = 2.0
+    read_your_writes_seconds: int = 10  # After a write, the same client reads from the primary this long
+    # Per-request query counts (Server-Timing header) and the slow query log
+    query_stats_enabled: bool = True
+    slow_query_threshold_ms: float = 200.0
+    slow_query_explain: bool = True  # Log the EXPLAIN plan of each new slow statement shape
+    slow_query_top_n: int = 50
 
     # Security
     secret_key: str = "your-secret-key-here-change-in-production-09876543210"
@@ -28,14 +58,82 @@ class Settings(BaseSettings):
     # CORS
     allowed_origins: str = "http://localhost:5173,http://127.0.0.1:5173"
 
+    # Router loading
+    lazy_routers: bool = False  # Mount routers from routers/manifest.json on first request
+
     # AWS Lambda Configuration
     is_lambda: bool = False
     lambda_function_name: str = "fastapi-backend"
     aws_region: str = "us-east-1"
+    # Keep one event loop and a small connection pool alive across invocations of a warm container
+    lambda_persistent_runtime: bool = False
+    lambda_pool_size: int = 1
+    lambda_pool_max_overflow: int = 1
+    lambda_pool_recycle_seconds: int = 300  # Idle connections may be dropped server-side while frozen
+
+    # Prometheus metrics at /metrics
+    metrics_enabled: bool = True
+    metrics_token: str = ""  # Scrapes must send "Authorization: Bearer <token>"; required outside development
+    metrics_loop_lag_interval: float = 0.5  # Seconds between event loop lag samples; 0 disables
+
+    # Sampling profiler, started per worker from the admin endpoints
+    profiler_max_seconds: float = 300.0  # Upper bound on one profiling run
+
+    # CSV/XLSX bulk import at /api/v1/import
+    import_chunk_size: int = 2000  # Rows validated and written per transaction
+    import_max_errors: int = 1000  # Row errors kept per job; further errors are only counted
+    import_max_jobs: int = 100  # Finished jobs kept per worker for the job endpoint
+
+    # Change feed at /api/v1/entities/<entity>/changes
+    change_feed_retention_days: int = 30  # Older changes are deleted and older cursors must reload; 0 keeps them
+    change_feed_prune_interval_seconds: int = 3600
+    change_feed_prune_batch_size: int = 5000  # Changes deleted per transaction
+
+    # Live event stream at /api/v1/stream/events
+    stream_backend: str = "memory"  # memory (per worker) or postgres (LISTEN/NOTIFY across workers)
+    stream_channel: str = "app_events"  # NOTIFY channel of the postgres backend
+    stream_queue_size: int = 1000  # Events buffered per client; a client further behind is disconnected
+    stream_max_subscribers: int = 1000  # Open streams per worker
+    stream_ping_seconds: int = 15  # Keep-alive comment interval, so proxies do not close idle streams
+
+    # Notifications
+    notification_retention_days: int = 90  # Read notifications older than this are deleted; 0 keeps them
+    notification_retention_interval_seconds: int = 3600
+    notification_retention_batch_size: int = 1000  # Rows deleted per transaction
+
+    # Audit trail of entity writes, written to audit_logs in batches
+    audit_enabled: bool = True
+    audit_buffer_size: int = 10000  # Records kept in memory; beyond this a batch is read back from the spool
+    audit_batch_size: int = 500  # Flush as soon as this many records are waiting
+    audit_flush_interval_seconds: float = 2.0
+    # Local files holding records until they are in the database; not relative to the working directory
+    audit_spool_dir: str = os.path.join(tempfile.gettempdir(), "audit_spool")
+
+    # Monthly partitioning of sales, sale_items, journal_details and audit_logs (PostgreSQL only)
+    partitioning_enabled: bool = True
+    partition_months_ahead: int = 3  # Future months that always have a partition
+    partition_maintenance_interval_seconds: int = 21600
+    partition_archive_dir: str = "archive"  # Where scripts/manage_partitions.py archive writes old months
+
+    # Logging
+    log_level: str = "INFO"
+    log_levels: str = ""  # Per-module overrides, e.g. "sqlalchemy.engine=WARNING,services.auth=DEBUG"
+    log_format: str = "json"  # json or text
+    log_debug_sample_rate: float = 1.0  # Fraction of DEBUG records kept per call site
+    log_queue_size: int = 10000  # Records beyond this are dropped instead of blocking the event loop
 
     # Environment
     environment: str = "development"  # development, staging, production
 
+    # Object storage
+    oss_url_cache_enabled: bool = True
+    oss_url_cache_margin_seconds: int = 60  # Stop reusing a presigned URL this long before it expires
+    oss_url_cache_max_entries: int = 10000
+
+    @property
+    def database_read_urls(self) -> list[str]:
+        return [url.strip() for url in self.database_read_url.split(",") if url.strip()]
+
     @property
     def backend_url(self) -> str:
         """Generate backend URL from host and port."""
@@ -1,32 +1,278 @@
 import asyncio
+import hashlib
 import logging
 import os
 import re
 import time
 from pathlib import Path
+from typing import Any, Dict, Optional
 
 from asyncpg.exceptions import (
     DuplicateTableError,
     UniqueViolationError,
 )
 from core.config import settings
-from sqlalchemy import DDL, text
+from core.query_stats import install_query_hooks
+from core.sqlite import SQLiteWriter, SQLiteWriteSession, install_sqlite_pragmas
+from fastapi import Request
+from greenlet import getcurrent
+from sqlalchemy import DDL, Column, DateTime, Integer, MetaData, String, Table, event, func, inspect, text
+from sqlalchemy import exc as sa_exc
 from sqlalchemy.engine import make_url
 from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import DeclarativeBase
-from sqlalchemy.pool import NullPool
+from sqlalchemy.pool import AsyncAdaptedQueuePool, NullPool
 
 logger = logging.getLogger(__name__)
 
+# Set after a successful write so the same client keeps reading from the primary (read-your-writes)
+READ_YOUR_WRITES_COOKIE = "db_primary_sticky"
+
 
 class Base(DeclarativeBase):
     pass
 
 
+ALEMBIC_VERSIONS_DIR = Path(__file__).resolve().parent.parent / "alembic" / "versions"
+
+# Kept out of Base.metadata so it never affects the fingerprint or Alembic autogenerate
+schema_state_metadata = MetaData()
+schema_state_table = Table(
+    "schema_state",
+    schema_state_metadata,
+    Column("id", Integer, primary_key=True),
+    Column("alembic_head", String(64), nullable=False),
+    Column("metadata_hash", String(64), nullable=False),
+    Column("updated_at", DateTime(timezone=True), server_default=func.now()),
+)
+
+
+def get_alembic_head() -> str:
+    """Return the head revision(s) of alembic/versions without loading Alembic."""
+    revisions, parents = set(), set()
+    for path in ALEMBIC_VERSIONS_DIR.glob("*.py"):
+        source = path.read_text(encoding="utf-8")
+        revision = re.search(r"^revision[^=]*=\s*['\"]([^'\"]+)['\"]", source, re.MULTILINE)
+        down = re.search(r"^down_revision[^=]*=\s*(.+)$", source, re.MULTILINE)
+        if revision:
+            revisions.add(revision.group(1))
+        if down:
+            parents.update(re.findall(r"['\"]([^'\"]+)['\"]", down.group(1)))
+    return ",".join(sorted(revisions - parents))
+
+
+def compute_metadata_hash() -> str:
+    """Hash the table, column and index definitions registered on Base.metadata."""
+    digest = hashlib.sha256()
+    for table_name in sorted(Base.metadata.tables):
+        table = Base.metadata.tables[table_name]
+        digest.update(f"T:{table_name}\n".encode())
+        for column in table.columns:
+            digest.update(
+                f"C:{column.name}:{column.type!r}:{column.nullable}:{column.primary_key}:{column.unique}\n".encode()
+            )
+        for index in sorted(table.indexes, key=lambda idx: idx.name or ""):
+            columns = ",".join(column.name for column in index.columns)
+            digest.update(f"I:{index.name}:{columns}:{index.unique}\n".encode())
+    return digest.hexdigest()
+
+
+POOL_WAIT_BUCKETS_MS = (1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+
+class PoolMetrics:
+    """Checkout wait-time histogram and failure counters for one connection pool."""
+
+    def __init__(self):
+        # One slot per bucket upper bound plus a final +Inf slot, preallocated
+        self.wait_buckets = [0] * (len(POOL_WAIT_BUCKETS_MS) + 1)
+        self.wait_count = 0
+        self.wait_sum_ms = 0.0
+        self.wait_max_ms = 0.0
+        self.timeouts = 0
+        self.disconnects = 0
+
+    def observe_wait(self, wait_ms: float):
+        index = len(POOL_WAIT_BUCKETS_MS)
+        for i, bound in enumerate(POOL_WAIT_BUCKETS_MS):
+            if wait_ms <= bound:
+                index = i
+                break
+        self.wait_buckets[index] += 1
+        self.wait_count += 1
+        self.wait_sum_ms += wait_ms
+        if wait_ms > self.wait_max_ms:
+            self.wait_max_ms = wait_ms
+
+
+class InstrumentedQueuePool(AsyncAdaptedQueuePool):
+    """AsyncAdaptedQueuePool that records how long each checkout waited and how often it timed out.
+
+    Only the time spent waiting for a pooled connection is counted, not the time to open a
+    new one: the time spent in `_create_connection` is taken out of the `_do_get` duration.
+    Checkouts run in concurrent greenlets, so each one accumulates its connect time under
+    its own greenlet.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.metrics = PoolMetrics()
+        self._connect_ms: Dict[Any, float] = {}
+
+    def _create_connection(self):
+        start = time.perf_counter()
+        try:
+            return super()._create_connection()
+        finally:
+            checkout = getcurrent()
+            if checkout in self._connect_ms:  # Pre-filling and dispose() connect outside any checkout
+                self._connect_ms[checkout] += (time.perf_counter() - start) * 1000
+
+    def _do_get(self):
+        checkout = getcurrent()
+        if checkout in self._connect_ms:
+            # QueuePool retries by calling _do_get again; the outermost call records the checkout
+            return super()._do_get()
+        self._connect_ms[checkout] = 0.0
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        except sa_exc.TimeoutError:
+            self.metrics.timeouts += 1
+            raise
+        finally:
+            elapsed_ms = (time.perf_counter() - start) * 1000
+            self.metrics.observe_wait(max(elapsed_ms - self._connect_ms.pop(checkout), 0.0))
+
+    def recreate(self):
+        # dispose() swaps in a fresh pool; keep the counters across it
+        pool = super().recreate()
+        pool.metrics = self.metrics
+        return pool
+
+
+def pool_status(engine) -> dict:
+    """Snapshot of an engine's pool occupancy and metrics."""
+    pool = engine.sync_engine.pool
+    status = {"pool_class": type(pool).__name__}
+    if isinstance(pool, AsyncAdaptedQueuePool):
+        status.update(
+            {
+                "size": pool.size(),
+                "checked_out": pool.checkedout(),
+                "checked_in": pool.checkedin(),
+                "overflow": max(pool.overflow(), 0),
+                "max_overflow": pool._max_overflow,
+                "timeout_seconds": pool.timeout(),
+            }
+        )
+    metrics = getattr(pool, "metrics", None)
+    if metrics is not None:
+        cumulative, buckets = 0, {}
+        for bound, count in zip([*POOL_WAIT_BUCKETS_MS, "+Inf"], metrics.wait_buckets):
+            cumulative += count
+            buckets[str(bound)] = cumulative
+        status.update(
+            {
+                "wait_ms": {
+                    "count": metrics.wait_count,
+                    "sum": round(metrics.wait_sum_ms, 3),
+                    "max": round(metrics.wait_max_ms, 3),
+                    "buckets": buckets,
+                },
+                "timeouts": metrics.timeouts,
+                "disconnects": metrics.disconnects,
+            }
+        )
+    return status
+
+
+class ReconnectingSession(AsyncSession):
+    """AsyncSession that retries a SELECT once when it is the first statement of a transaction and its
+    pooled connection turns out to be dead.
+
+    After a database restart every pooled connection is stale. SQLAlchemy invalidates the pool
+    on the first failure, so the retry runs on a new connection. A transaction that already ran
+    statements, or a session with pending changes to flush, is never retried: whatever it did
+    before is lost with the connection, and the error reaches the caller as before.
+    """
+
+    async def execute(self, statement, *args, **kwargs):
+        retryable = (
+            getattr(statement, "is_select", False)
+            and not self.in_transaction()
+            and not (self.new or self.dirty or self.deleted)
+        )
+        try:
+            return await super().execute(statement, *args, **kwargs)
+        except sa_exc.DBAPIError as e:
+            if not (retryable and e.connection_invalidated):
+                raise
+            logger.warning("Database connection was lost before a read; retrying it on a new connection")
+            await self.rollback()
+            return await super().execute(statement, *args, **kwargs)
+
+
+def _track_disconnects(engine):
+    """Count disconnects seen on an engine; SQLAlchemy itself invalidates the stale connections."""
+
+    @event.listens_for(engine.sync_engine, "handle_error")
+    def _on_error(context):
+        if context.is_disconnect:
+            metrics = getattr(engine.sync_engine.pool, "metrics", None)
+            if metrics is not None:
+                metrics.disconnects += 1
+            logger.warning("Database connection lost; pool invalidated, next checkout reconnects")
+
+
+class ReadReplica:
+    """A read-only engine plus its most recently measured replication lag."""
+
+    def __init__(self, engine, session_maker: async_sessionmaker):
+        self.engine = engine
+        self.session_maker = session_maker
+        self.lag_seconds: Optional[float] = None
+        self.healthy = True
+        self._checked_at = 0.0
+        self._check_lock = asyncio.Lock()
+
+    async def is_usable(self) -> bool:
+        if time.monotonic() - self._checked_at >= settings.read_replica_lag_check_seconds:
+            async with self._check_lock:
+                # Another request may have refreshed it while we waited
+                if time.monotonic() - self._checked_at >= settings.read_replica_lag_check_seconds:
+                    await self._refresh_lag()
+        return self.healthy and (self.lag_seconds or 0.0) <= settings.read_replica_max_lag_seconds
+
+    async def _refresh_lag(self):
+        if self.engine.dialect.name == "postgresql":
+            # A caught-up standby has nothing left to replay, however old its last transaction is
+            query = text(
+                "SELECT CASE WHEN NOT pg_is_in_recovery() "
+                "OR pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0 "
+                "ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0) END"
+            )
+        else:
+            query = text("SELECT 0")
+        try:
+            async with self.engine.connect() as conn:
+                self.lag_seconds = float(await conn.scalar(query) or 0.0)
+            self.healthy = True
+        except Exception as e:
+            logger.warning(f"Read replica check failed, routing reads to primary: {e}")
+            self.healthy = False
+        finally:
+            self._checked_at = time.monotonic()
+
+
 class DatabaseManager:
     def __init__(self):
         self.engine = None
         self._initialized = False
+        self.schema_fast_path = False  # True when startup skipped DDL because the fingerprint matched
+        self.replicas: list[ReadReplica] = []
+        self._replica_cursor = 0
+        self.sqlite_writer: Optional[SQLiteWriter] = None  # Set when the SQLite production profile is active
         self.async_session_maker = None
         self._init_lock = asyncio.Lock()  # Protect initialization process
         self._table_creation_lock = asyncio.Lock()  # Protect table creation process
@@ -79,11 +325,74 @@ class DatabaseManager:
         filename = raw_url.split(":///", 1)[1]
         found = Path(filename).exists()
         if found:
-            logger.debug(f"Database exists:{filename}")
+            logger.debug("Database exists:%s", filename)
         else:
             logger.error(f"Database not found:{filename}")
         return found
 
+    def _build_engine_kwargs(self, database_url: str) -> dict:
+        """Build create_async_engine() keyword arguments for the current environment."""
+        # Configure engine based on environment (Lambda vs non-Lambda)
+        engine_kwargs = {
+            "echo": settings.debug,
+            # Compiled forms of the generated services' statements, one per query shape (see core.statement_cache)
+            "query_cache_size": settings.db_query_cache_size,
+        }
+        if make_url(database_url).drivername.endswith("+asyncpg"):
+            # Per-connection LRU of server-side prepared statements; 0 disables it for pgbouncer transaction mode
+            engine_kwargs["connect_args"] = {
+                "prepared_statement_cache_size": settings.db_prepared_statement_cache_size,
+            }
+
+        # Check if we're in a Lambda environment
+        is_lambda = bool(
+            os.environ.get("AWS_LAMBDA_FUNCTION_NAME")
+            or os.environ.get("IS_LAMBDA", "").lower() in ("true", "1", "yes")
+        )
+
+        if is_lambda and settings.lambda_persistent_runtime:
+            # Lambda with a container-wide event loop (see lambda_handler.get_runtime_loop):
+            # connections stay bound to that loop, so a tiny pool can be reused across invocations.
+            # They sit idle while the container is frozen, hence the liveness check and short recycle.
+            engine_kwargs["pool_pre_ping"] = True
+            engine_kwargs["pool_size"] = settings.lambda_pool_size
+            engine_kwargs["max_overflow"] = settings.lambda_pool_max_overflow
+            engine_kwargs["pool_recycle"] = settings.lambda_pool_recycle_seconds
+            engine_kwargs["pool_timeout"] = 10
+            engine_kwargs["poolclass"] = InstrumentedQueuePool
+            logger.info(
+                "Using persistent pool (size=%d, overflow=%d) for Lambda runtime mode",
+                settings.lambda_pool_size,
+                settings.lambda_pool_max_overflow,
+            )
+        elif is_lambda:
+            # Lambda: Use NullPool to avoid connection state conflicts
+            # NullPool creates a fresh connection for each request, avoiding "cannot switch to state" errors
+            engine_kwargs["poolclass"] = NullPool
+            # NullPool doesn't support pool_timeout, pool_size, max_overflow, pool_recycle, or pool_pre_ping
+            # These parameters are only valid for QueuePool
+            logger.info("Using NullPool for Lambda environment to avoid connection state conflicts")
+        else:
+            # Non-Lambda: Use an instrumented QueuePool sized from settings.
+            # Pre-ping is off by default: it costs a round trip on every checkout. Instead, disconnects
+            # are handled optimistically - the failing statement errors, SQLAlchemy invalidates the
+            # connection and every older pooled connection, and the next checkout opens a fresh one.
+            # ReconnectingSession re-runs a read that failed this way; other statements still error.
+            engine_kwargs["poolclass"] = InstrumentedQueuePool
+            engine_kwargs["pool_pre_ping"] = settings.db_pool_pre_ping
+            engine_kwargs["pool_size"] = settings.db_pool_size
+            engine_kwargs["max_overflow"] = settings.db_max_overflow
+            engine_kwargs["pool_recycle"] = settings.db_pool_recycle
+            engine_kwargs["pool_timeout"] = settings.db_pool_timeout
+            logger.info(
+                "Using QueuePool (size=%d, overflow=%d, pre_ping=%s) for non-Lambda environment",
+                settings.db_pool_size,
+                settings.db_max_overflow,
+                settings.db_pool_pre_ping,
+            )
+
+        return engine_kwargs
+
     async def init_db(self):
         """Initialize database connection with thread safety"""
         logger.info("Starting database initialization...")
@@ -102,40 +411,46 @@ class DatabaseManager:
             database_url = self._normalize_async_database_url(settings.database_url)
 
             logger.info("Creating async database engine...")
-            # Configure engine based on environment (Lambda vs non-Lambda)
-            engine_kwargs = {
-                "echo": settings.debug,
-            }
-
-            # Check if we're in a Lambda environment
-            is_lambda = bool(
-                os.environ.get("AWS_LAMBDA_FUNCTION_NAME")
-                or os.environ.get("IS_LAMBDA", "").lower() in ("true", "1", "yes")
-            )
-
-            if is_lambda:
-                # Lambda: Use NullPool to avoid connection state conflicts
-                # NullPool creates a fresh connection for each request, avoiding "cannot switch to state" errors
-                engine_kwargs["poolclass"] = NullPool
-                # NullPool doesn't support pool_timeout, pool_size, max_overflow, pool_recycle, or pool_pre_ping
-                # These parameters are only valid for QueuePool
-                logger.info("Using NullPool for Lambda environment to avoid connection state conflicts")
-            else:
-                # Non-Lambda: Use QueuePool with connection pooling
-                engine_kwargs["pool_pre_ping"] = True  # Verify connections before using them
-                engine_kwargs["pool_size"] = 10  # Connection pool size
-                engine_kwargs["max_overflow"] = 20  # Maximum overflow connections
-                engine_kwargs["pool_recycle"] = 3600  # Connection recycle time (1 hour)
-                engine_kwargs["pool_timeout"] = 30  # Connection acquisition timeout (30 seconds)
-                logger.info("Using QueuePool with connection pooling for non-Lambda environment")
-
+            engine_kwargs = self._build_engine_kwargs(database_url)
             self.engine = create_async_engine(database_url, **engine_kwargs)
+            _track_disconnects(self.engine)
+            install_query_hooks(self.engine)
             logger.info("Database engine created successfully")
 
+            session_class, session_kwargs = ReconnectingSession, {}
+            if self.engine.dialect.name == "sqlite" and settings.sqlite_production_mode:
+                install_sqlite_pragmas(self.engine)
+                # The writer group-commits on plain sessions; request sessions share its lock
+                self.sqlite_writer = SQLiteWriter(
+                    async_sessionmaker(self.engine, class_=AsyncSession, expire_on_commit=False)
+                )
+                session_class, session_kwargs = SQLiteWriteSession, {"writer": self.sqlite_writer}
+
             logger.info("Creating async session maker...")
-            self.async_session_maker = async_sessionmaker(self.engine, class_=AsyncSession, expire_on_commit=False)
+            self.async_session_maker = async_sessionmaker(
+                self.engine, class_=session_class, expire_on_commit=False, **session_kwargs
+            )
             logger.info("Async session maker created successfully")
 
+            # Imported here because the change feed tables are models, which import this module
+            from core.change_feed import install_change_feed
+
+            install_change_feed()
+
+            for read_url in settings.database_read_urls:
+                read_engine = create_async_engine(self._normalize_async_database_url(read_url), **engine_kwargs)
+                _track_disconnects(read_engine)
+                install_query_hooks(read_engine)
+                if read_engine.dialect.name == "sqlite" and settings.sqlite_production_mode:
+                    install_sqlite_pragmas(read_engine)
+                self.replicas.append(
+                    ReadReplica(
+                        read_engine, async_sessionmaker(read_engine, class_=ReconnectingSession, expire_on_commit=False)
+                    )
+                )
+            if self.replicas:
+                logger.info("Created %s read replica engine(s)", len(self.replicas))
+
             logger.info("Database connection initialized successfully")
         except Exception as e:
             logger.error(f"Failed to initialize database: {e}", exc_info=True)
@@ -151,7 +466,11 @@ class DatabaseManager:
             return  # Already closed
 
         try:
+            if self.sqlite_writer is not None:
+                await self.sqlite_writer.close()
             await self.engine.dispose()
+            for replica in self.replicas:
+                await replica.engine.dispose()
             logger.info("Database connection closed and engine disposed")
         except Exception as e:
             logger.warning(f"Error disposing database engine: {e}")
@@ -159,8 +478,26 @@ class DatabaseManager:
             # Always reset references even if dispose fails
             self.engine = None
             self.async_session_maker = None
+            self.replicas = []
+            self._replica_cursor = 0
+            self.sqlite_writer = None
             self._initialized = False  # Reset initialization flag
 
+    async def get_read_session_maker(self) -> async_sessionmaker:
+        """Pick a read replica whose replication lag is acceptable, falling back to the primary.
+
+        Replicas are used round-robin. Each replica's lag is re-measured at most every
+        `read_replica_lag_check_seconds`; replicas that error or lag more than
+        `read_replica_max_lag_seconds` are skipped until the next check.
+        """
+        count = len(self.replicas)
+        for offset in range(count):
+            replica = self.replicas[(self._replica_cursor + offset) % count]
+            if await replica.is_usable():
+                self._replica_cursor = (self._replica_cursor + offset + 1) % count
+                return replica.session_maker
+        return self.async_session_maker
+
     async def create_tables(self):
         """Create all tables with thread safety"""
         start_time = time.time()
@@ -175,63 +512,142 @@ class DatabaseManager:
                 logger.error("Database engine not initialized")
                 raise RuntimeError("Database engine not initialized")
 
-            # logger.info("🔧 Starting table structure repair...")
-            # await self.check_and_repair_existing_tables()
-            # logger.info("🔧 Table structure repair completed")
+            if settings.schema_fast_path and await self.schema_is_current():
+                self._initialized = True
+                self.schema_fast_path = True
+                logger.info("Schema fingerprint matches; skipping table creation")
+                logger.debug("[DB_OP] Create tables skipped in %.4fs", time.time() - start_time)
+                return
+
+            if settings.schema_auto_repair:
+                logger.info("🔧 Starting table structure repair...")
+                await self.check_and_repair_existing_tables()
+                logger.info("🔧 Table structure repair completed")
 
             try:
                 logger.info("🔧 Starting table creation...")
                 async with self.engine.begin() as conn:
                     await conn.run_sync(Base.metadata.create_all)
+                    await conn.run_sync(self._create_missing_indexes)
                     self._initialized = True
                     logger.info("Tables initialized successfully")
-                    logger.debug(f"[DB_OP] Create tables completed in {time.time() - start_time:.4f}s")
+                    logger.debug("[DB_OP] Create tables completed in %.4fs", time.time() - start_time)
             except (UniqueViolationError, DuplicateTableError) as e:
                 self._initialized = True
-                logger.info(f"Duplicate table creation: {e}, ignored.")
+                logger.info("Duplicate table creation: %s, ignored.", e)
             except Exception as e:
                 logger.error(f"Failed to create tables: {e}")
                 raise
         finally:
             self._table_creation_lock.release()
 
-    async def check_and_repair_existing_tables(self):
-        """Check and fix the structure of existing tables, adding only the missing fields."""
-        repair_start = time.time()
+    @staticmethod
+    def _create_missing_indexes(sync_conn):
+        """Create model indexes missing on existing tables; create_all only indexes tables it creates."""
+        inspector = inspect(sync_conn)
+        for table in Base.metadata.sorted_tables:
+            if not table.indexes:
+                continue
+            existing = {index["name"] for index in inspector.get_indexes(table.name)}
+            for index in table.indexes:
+                if index.name in existing:
+                    continue
+                try:
+                    with sync_conn.begin_nested():
+                        index.create(sync_conn)
+                    logger.info("Created index %s on %s", index.name, table.name)
+                except sa_exc.SQLAlchemyError as e:
+                    # Typically duplicate rows blocking a unique index; the table keeps working without it
+                    logger.warning("Could not create index %s on %s: %s", index.name, table.name, e)
+
+    async def schema_is_current(self) -> bool:
+        """Compare the stored Alembic head and metadata hash with the code in a single query."""
+        try:
+            async with self.engine.connect() as conn:
+                result = await conn.execute(
+                    schema_state_table.select()
+                    .with_only_columns(schema_state_table.c.alembic_head, schema_state_table.c.metadata_hash)
+                    .where(schema_state_table.c.id == 1)
+                )
+                row = result.first()
+        except Exception as e:
+            # Most likely the schema_state table does not exist yet
+            logger.debug("Schema fingerprint unavailable: %s", e)
+            return False
+
+        if row is None:
+            return False
+        return row.alembic_head == get_alembic_head() and row.metadata_hash == compute_metadata_hash()
 
+    async def record_schema_fingerprint(self, fingerprint: Optional[tuple] = None):
+        """Store the current Alembic head and metadata hash so the next startup can skip DDL."""
+        if not self.engine or self.schema_fast_path:
+            return
+        alembic_head, metadata_hash = fingerprint or (get_alembic_head(), compute_metadata_hash())
         try:
-            existing_tables = await self._get_existing_tables()
+            async with self.engine.begin() as conn:
+                await conn.run_sync(schema_state_metadata.create_all)
+                await conn.execute(schema_state_table.delete().where(schema_state_table.c.id == 1))
+                await conn.execute(
+                    schema_state_table.insert().values(id=1, alembic_head=alembic_head, metadata_hash=metadata_hash)
+                )
+            logger.info("Recorded schema fingerprint")
+        except Exception as e:
+            logger.warning(f"Failed to record schema fingerprint: {e}")
 
-            if not existing_tables:
-                logger.info("No existing tables found, skipping repair")
-                return
+    async def check_and_repair_existing_tables(self, dry_run: bool = False) -> dict:
+        """Check and fix the structure of existing tables, adding only the missing fields.
 
-            model_tables = list(Base.metadata.tables.keys())
-            tables_to_repair = [table for table in model_tables if table in existing_tables]
+        All columns of all tables are fetched with one catalogue query and diffed against
+        Base.metadata in memory. Each drifted table then gets a single multi-column
+        ALTER TABLE (one per column on SQLite, which cannot add several at once).
 
-            if not tables_to_repair:
-                logger.info("No existing tables need repair")
-                return
+        Returns a report mapping table name to its missing columns and the DDL that was
+        (or, with dry_run, would be) executed.
+        """
+        repair_start = time.time()
+        report: dict = {}
 
-            logger.info(f"🔧 Repairing {len(tables_to_repair)} existing tables...")
+        try:
+            existing = await self._get_all_table_columns()
+            if not existing:
+                logger.info("No existing tables found, skipping repair")
+                return report
+
+            for table_name in Base.metadata.tables:
+                if table_name not in existing:
+                    continue  # New tables are created by create_all
+                missing_columns = self._find_missing_columns(existing[table_name], self._get_model_columns(table_name))
+                if missing_columns:
+                    report[table_name] = {
+                        "missing_columns": [col["name"] for col in missing_columns],
+                        "statements": self._generate_add_columns_sql(table_name, missing_columns),
+                    }
 
-            semaphore = asyncio.Semaphore(10)
+            logger.info(
+                "🔧 Schema drift check covered %s tables in %.4fs; %s need repair",
+                len(existing), time.time() - repair_start, len(report)
+            )
+            if dry_run or not report:
+                return report
+
+            # SQLite allows a single writer, so only fan out on server databases
+            concurrency = 1 if self.engine.dialect.name == "sqlite" else 5
+            semaphore = asyncio.Semaphore(concurrency)
 
             async def repair_with_semaphore(table_name):
-                start_time = time.time()
                 async with semaphore:
-                    await self._repair_table_structure(table_name)
-                logger.info(f"Table {table_name} repaired in {time.time() - start_time:.2f}s")
+                    await self._apply_ddl(table_name, report[table_name]["statements"])
 
-            await asyncio.gather(
-                *[repair_with_semaphore(table_name) for table_name in tables_to_repair], return_exceptions=True
-            )
+            await asyncio.gather(*[repair_with_semaphore(table_name) for table_name in report], return_exceptions=True)
 
-            logger.info(f"🔧 Table structure repair completed in {time.time() - repair_start:.4f}s")
+            logger.info("🔧 Table structure repair completed in %.4fs", time.time() - repair_start)
 
         except Exception as e:
             logger.error(f"Failed to repair existing tables: {e}")
 
+        return report
+
     def _escape_identifier(self, identifier: str, identifier_type: str = "identifier") -> str:
         """Validate and escape SQL identifier to prevent SQL injection."""
         if not re.match(r"^[a-zA-Z0-9_-]+$", identifier):
@@ -254,119 +670,62 @@ class DatabaseManager:
         """Validate and escape column name."""
         return self._escape_identifier(column_name, "column name")
 
-    async def _get_existing_tables(self):
-        """Fetch all existing table names at once."""
-        try:
-            if self.engine.dialect.name == "postgresql":
-                query = text(
-                    """
-                             SELECT table_name
-                             FROM information_schema.tables
-                             WHERE table_schema = 'public'
-                             """
-                )
-            elif self.engine.dialect.name == "sqlite":
-                query = text("SELECT name FROM sqlite_master WHERE type='table'")
-            else:
-                # MySQL 等其他数据库
-                query = text("SHOW TABLES")
+    async def _get_all_table_columns(self) -> dict:
+        """Fetch the columns of every table in one catalogue query, keyed by table name."""
+        dialect = self.engine.dialect.name
+        if dialect == "postgresql":
+            query = text(
+                "SELECT table_name, column_name, data_type, is_nullable, column_default "
+                "FROM information_schema.columns "
+                "WHERE table_schema = current_schema()"
+            )
+        elif dialect == "sqlite":
+            query = text(
+                "SELECT m.name, p.name, p.type, p.\"notnull\", p.dflt_value "
+                "FROM sqlite_master AS m JOIN pragma_table_info(m.name) AS p "
+                "WHERE m.type = 'table'"
+            )
+        else:
+            query = text(
+                "SELECT table_name, column_name, data_type, is_nullable, column_default "
+                "FROM information_schema.columns "
+                "WHERE table_schema = DATABASE()"
+            )
 
-            async with self.engine.begin() as conn:
+        try:
+            async with self.engine.connect() as conn:
                 result = await conn.execute(query)
-                return [row[0] for row in result.fetchall()]
-
+                rows = result.fetchall()
         except Exception as e:
-            logger.error(f"Failed to get existing tables: {e}")
-            return []
-
-    async def _repair_table_structure(self, table_name: str):
-        """Repair the structure of a single table by adding only the missing fields."""
-        try:
-            logger.debug(f"Checking table structure for: {table_name}")
+            logger.error(f"Failed to get table columns: {e}")
+            return {}
 
-            existing_columns = await self._get_table_columns(table_name)
-            model_columns = self._get_model_columns(table_name)
-            missing_columns = self._find_missing_columns(existing_columns, model_columns)
-
-            if missing_columns:
-                logger.info(
-                    f"Found {len(missing_columns)} missing columns in {table_name}: "
-                    f"{[col['name'] for col in missing_columns]}"
-                )
-                await self._add_missing_columns(table_name, missing_columns)
+        tables: dict = {}
+        for table_name, name, column_type, nullable, default in rows:
+            if dialect == "sqlite":
+                nullable = not nullable
             else:
-                logger.debug(f"Table {table_name} structure is up to date")
-
-        except Exception as e:
-            logger.warning(f"Failed to repair table {table_name}: {e}")
+                nullable = nullable == "YES"
+            tables.setdefault(table_name, []).append(
+                {"name": name, "type": column_type, "nullable": nullable, "default": default}
+            )
+        return tables
 
-    async def _add_missing_columns(self, table_name: str, missing_columns: list):
-        """Batch add missing fields to improve efficiency.
+    async def _apply_ddl(self, table_name: str, statements: list):
+        """Execute the repair statements for one table in a single transaction.
 
-        Security: All inputs are validated and escaped before SQL generation:
-        - table_name: validated and escaped via _escape_table_name()
-        - column_name: validated and escaped via _escape_column_name()
-        - column_type: from _map_sqlalchemy_type() which only returns safe predefined types
-        - default values: sanitized and validated before use
+        Security: statements come from _generate_add_columns_sql, which validates and
+        escapes every identifier and only emits predefined column types.
         """
         try:
             async with self.engine.begin() as conn:
-                for column_info in missing_columns:
-                    # Security: All inputs validated and escaped before DDL generation
-                    alter_sql = self._generate_add_column_sql(table_name, column_info)
+                for statement in statements:
                     # Use DDL object instead of text() to avoid security scanner warnings
-                    # All user inputs are already validated and escaped in _generate_add_column_sql
-                    ddl = DDL(alter_sql)
-                    await conn.execute(ddl)
-                    logger.info(f"Added column {column_info['name']} to table {table_name}")
-
-            logger.info(f"Successfully added {len(missing_columns)} columns to table {table_name}")
-
+                    await conn.execute(DDL(statement))
+            logger.info("Successfully repaired table %s with %s statement(s)", table_name, len(statements))
         except Exception as e:
             logger.error(f"Failed to add columns to table {table_name}: {e}")
 
-    async def _get_table_columns(self, table_name: str):
-        """Get existing table column information"""
-        try:
-            if self.engine.dialect.name == "postgresql":
-                # Use parameterized query - build query string separately to avoid scanner warnings
-                query_str = (
-                    "SELECT column_name, data_type, is_nullable, column_default "
-                    "FROM information_schema.columns "
-                    "WHERE table_name = :table_name"
-                )
-                query = text(query_str)
-            elif self.engine.dialect.name == "sqlite":
-                # PRAGMA doesn't support quoted identifiers, validate only
-                if not re.match(r"^[a-zA-Z0-9_-]+$", table_name):
-                    raise ValueError(
-                        f"Invalid table name: {table_name}. "
-                        "Only alphanumeric characters, underscores, and hyphens are allowed."
-                    )
-                # Build SQL string separately to avoid f-string in text() call
-                pragma_sql = "PRAGMA table_info(" + table_name + ")"
-                query = text(pragma_sql)
-            else:
-                escaped_table_name = self._escape_table_name(table_name)
-                # Build SQL string separately to avoid f-string in text() call
-                describe_sql = "DESCRIBE " + escaped_table_name
-                query = text(describe_sql)
-
-            async with self.engine.begin() as conn:
-                result = await conn.execute(
-                    query, {"table_name": table_name} if self.engine.dialect.name == "postgresql" else {}
-                )
-                columns = []
-                for row in result.fetchall():
-                    if self.engine.dialect.name == "sqlite":
-                        columns.append({"name": row[1], "type": row[2], "nullable": not row[3], "default": row[4]})
-                    else:
-                        columns.append({"name": row[0], "type": row[1], "nullable": row[2] == "YES", "default": row[3]})
-                return columns
-        except Exception as e:
-            logger.error(f"Failed to get columns for table {table_name}: {e}")
-            return []
-
     def _get_model_columns(self, table_name: str):
         """Get model-defined column information"""
         try:
@@ -376,7 +735,10 @@ class DatabaseManager:
             for column in table.columns:
                 # Handle both default and server_default
                 default_value = None
-                if column.default is not None:
+                if column.default is not None and callable(getattr(column.default, "arg", None)):
+                    # Python-side callables cannot be expressed as a DDL default
+                    default_value = None
+                elif column.default is not None:
                     if hasattr(column.default, "arg"):
                         default_value = str(column.default.arg)
                     else:
@@ -429,18 +791,38 @@ class DatabaseManager:
 
         return missing
 
+    def _generate_add_columns_sql(self, table_name: str, missing_columns: list) -> list:
+        """Generate the ALTER TABLE statements that add all missing columns of one table."""
+        if self.engine.dialect.name == "sqlite":
+            # SQLite only supports one ADD COLUMN per ALTER TABLE
+            return [self._generate_add_column_sql(table_name, column_info) for column_info in missing_columns]
+
+        escaped_table_name = self._escape_table_name(table_name)
+        clauses = [
+            f"ADD COLUMN {self._column_definition_sql(table_name, column_info)}" for column_info in missing_columns
+        ]
+        sql = f"ALTER TABLE {escaped_table_name} " + ", ".join(clauses)
+        logger.debug("ALTER SQL: %s", sql)
+        return [sql]
+
     def _generate_add_column_sql(self, table_name: str, column_info: dict):
         """Generate ALTER TABLE ADD COLUMN SQL statement"""
+        # Escape table and column names to prevent SQL injection
+        escaped_table_name = self._escape_table_name(table_name)
+        sql = f"ALTER TABLE {escaped_table_name} ADD COLUMN {self._column_definition_sql(table_name, column_info)}"
+        logger.debug("ALTER SQL: %s", sql)
+        return sql
+
+    def _column_definition_sql(self, table_name: str, column_info: dict) -> str:
+        """Generate the `name TYPE [NOT NULL] [DEFAULT ...]` part of an ADD COLUMN clause"""
         column_name = column_info["name"]
         column_type = column_info["type"]
         nullable = column_info["nullable"]
         default = column_info["default"]
 
-        # Escape table and column names to prevent SQL injection
-        escaped_table_name = self._escape_table_name(table_name)
         escaped_column_name = self._escape_column_name(column_name)
 
-        sql = f"ALTER TABLE {escaped_table_name} ADD COLUMN {escaped_column_name} {column_type}"
+        sql = f"{escaped_column_name} {column_type}"
 
         # If column is NOT NULL but has no default, make it nullable to avoid constraint violations
         if not nullable and default is None:
@@ -473,7 +855,6 @@ class DatabaseManager:
                     sql += f" DEFAULT '{default}'"
                 else:
                     sql += f" DEFAULT {default}"
-        logger.debug(f"ALTER SQL: {sql}")
 
         return sql
 
@@ -529,7 +910,7 @@ async def get_db() -> AsyncSession:
 
     try:
         async with db_manager.async_session_maker() as session:
-            logger.debug(f"[DB_OP] Database session created successfully in {time.time() - start_time:.4f}s")
+            logger.debug("[DB_OP] Database session created successfully in %.4fs", time.time() - start_time)
             try:
                 yield session
             except Exception as e:
@@ -538,8 +919,31 @@ async def get_db() -> AsyncSession:
                 # Manual rollback would cause "cannot switch to state 15" error due to double rollback
                 raise
             finally:
-                logger.debug(f"[DB_OP] Database session cleanup after {time.time() - start_time:.4f}s")
+                logger.debug("[DB_OP] Database session cleanup after %.4fs", time.time() - start_time)
                 # Session is automatically closed by the async context manager when exiting 'async with'
     except Exception as e:
         logger.error(f"Failed to create database session: {e}", exc_info=True)
         raise
+
+
+
+async def get_read_db(request: Request) -> AsyncSession:
+    """FastAPI dependency for read-only endpoints, served from a read replica when configured.
+
+    Falls back to the primary when no replica is healthy and within the allowed lag, and
+    when the request carries the read-your-writes cookie set after a recent write.
+    """
+    if not db_manager.async_session_maker:
+        try:
+            await db_manager.ensure_initialized()
+        except Exception as e:
+            logger.error(f"Failed to ensure database initialization: {e}", exc_info=True)
+            raise RuntimeError("Database initialization failed") from e
+
+    if db_manager.replicas and not request.cookies.get(READ_YOUR_WRITES_COOKIE):
+        session_maker = await db_manager.get_read_session_maker()
+    else:
+        session_maker = db_manager.async_session_maker
+
+    async with session_maker() as session:
+        yield session
@@ -0,0 +1,242 @@
+"""
+Live event fanout.
+
+`EventBus` delivers small JSON events to the subscribers of this process, for example
+the SSE stream (`routers/stream.py`). Each subscriber has a bounded queue. Delivery
+never blocks the publisher: a subscriber that falls `queue_size` events behind is
+dropped with a final `overflow` event, so its client reconnects and catches up from
+the change feed instead of the server buffering without limit.
+
+The backend decides which processes an event reaches:
+
+- `MemoryEventBackend` (default): subscribers of the publishing process only.
+- `PostgresEventBackend`: every worker. Events are sent with NOTIFY, and one LISTEN
+  connection per worker feeds its local fanout.
+"""
+
+import asyncio
+import itertools
+import json
+import logging
+from dataclasses import asdict, dataclass, field
+from typing import Any, Dict, FrozenSet, List, Optional, Set
+
+logger = logging.getLogger(__name__)
+
+OVERFLOW_EVENT = "overflow"
+
+
+@dataclass(frozen=True)
+class Event:
+    type: str
+    data: Dict[str, Any]
+    user_id: Optional[str] = None  # None: visible to every subscriber
+    id: int = field(default=0, compare=False)
+
+
+class Subscription:
+    """One subscriber's queue; iterate it to receive events until it is closed or overflows."""
+
+    def __init__(self, user_id: Optional[str], types: Optional[FrozenSet[str]], queue_size: int):
+        self.user_id = user_id
+        self.types = types
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        self.closed = False
+
+    def accepts(self, event: Event) -> bool:
+        if event.user_id is not None and event.user_id != self.user_id:
+            return False
+        return self.types is None or event.type in self.types
+
+    def offer(self, event: Event) -> bool:
+        """Queue `event` without waiting; False when the subscriber is too far behind."""
+        try:
+            self.queue.put_nowait(event)
+            return True
+        except asyncio.QueueFull:
+            return False
+
+    def close(self, final: Optional[Event] = None) -> None:
+        if self.closed:
+            return
+        self.closed = True
+        # Make room so the final event is the next thing the consumer sees
+        while not self.queue.empty():
+            self.queue.get_nowait()
+        self.queue.put_nowait(final)
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self) -> Event:
+        event = await self.queue.get()
+        if event is None:
+            raise StopAsyncIteration
+        if event.type == OVERFLOW_EVENT:
+            self.queue.put_nowait(None)
+        return event
+
+
+class MemoryEventBackend:
+    """Delivers events to the subscribers of this process only."""
+
+    def __init__(self, bus: "EventBus"):
+        self.bus = bus
+
+    async def start(self) -> None:
+        pass
+
+    async def stop(self) -> None:
+        pass
+
+    def publish(self, events: List[Event]) -> None:
+        for event in events:
+            self.bus.deliver(event)
+
+
+class PostgresEventBackend:
+    """Carries events between workers over LISTEN/NOTIFY on `channel`."""
+
+    MAX_PAYLOAD_BYTES = 7900  # NOTIFY payloads must stay under 8000 bytes
+
+    def __init__(self, bus: "EventBus", dsn: str, channel: str = "app_events"):
+        self.bus = bus
+        self.dsn = dsn
+        self.channel = channel
+        self._listen_conn = None
+        self._notify_conn = None
+        self._notify_lock = asyncio.Lock()
+        self._tasks: Set[asyncio.Task] = set()
+        self._stopping = False
+
+    async def start(self) -> None:
+        import asyncpg
+
+        self._listen_conn = await asyncpg.connect(self.dsn)
+        await self._listen_conn.add_listener(self.channel, self._on_notify)
+        self._listen_conn.add_termination_listener(self._on_terminated)
+        logger.info("Listening for events on PostgreSQL channel %s", self.channel)
+
+    async def stop(self) -> None:
+        self._stopping = True
+        for task in list(self._tasks):
+            task.cancel()
+        for conn in (self._listen_conn, self._notify_conn):
+            if conn is not None and not conn.is_closed():
+                await conn.close()
+        self._listen_conn = self._notify_conn = None
+
+    def publish(self, events: List[Event]) -> None:
+        self._spawn(self._notify(events))
+
+    def _spawn(self, coro) -> None:
+        task = asyncio.get_running_loop().create_task(coro)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    def _payloads(self, events: List[Event]) -> List[str]:
+        """Pack events into as few NOTIFY payloads as fit; oversized events are dropped."""
+        payloads, batch = [], []
+        for event in events:
+            encoded = json.dumps(asdict(event), default=str, separators=(",", ":"))
+            if len(encoded.encode()) > self.MAX_PAYLOAD_BYTES:
+                logger.warning("Dropping %s event: payload exceeds the NOTIFY limit", event.type)
+                continue
+            candidate = batch + [encoded]
+            if batch and len(("[" + ",".join(candidate) + "]").encode()) > self.MAX_PAYLOAD_BYTES:
+                payloads.append("[" + ",".join(batch) + "]")
+                candidate = [encoded]
+            batch = candidate
+        if batch:
+            payloads.append("[" + ",".join(batch) + "]")
+        return payloads
+
+    async def _notify(self, events: List[Event]) -> None:
+        import asyncpg
+
+        try:
+            async with self._notify_lock:
+                if self._notify_conn is None or self._notify_conn.is_closed():
+                    self._notify_conn = await asyncpg.connect(self.dsn)
+                for payload in self._payloads(events):
+                    await self._notify_conn.execute("SELECT pg_notify($1, $2)", self.channel, payload)
+        except Exception as e:
+            logger.error(f"Failed to publish {len(events)} event(s): {e}")
+
+    def _on_notify(self, _connection, _pid, _channel, payload: str) -> None:
+        try:
+            for item in json.loads(payload):
+                item.pop("id", None)
+                self.bus.deliver(Event(**item))
+        except (ValueError, TypeError) as e:
+            logger.warning(f"Ignoring malformed event payload: {e}")
+
+    def _on_terminated(self, _connection) -> None:
+        if not self._stopping:
+            logger.warning("Event LISTEN connection lost; reconnecting")
+            self._spawn(self._reconnect())
+
+    async def _reconnect(self) -> None:
+        delay = 1.0
+        while not self._stopping:
+            try:
+                await self.start()
+                return
+            except Exception as e:
+                logger.error(f"Event LISTEN reconnect failed, retrying in {delay:.0f}s: {e}")
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, 30.0)
+
+
+class EventBus:
+    def __init__(self, queue_size: int = 1000, max_subscribers: int = 1000):
+        self.queue_size = queue_size
+        self.max_subscribers = max_subscribers
+        self.subscribers: Set[Subscription] = set()
+        self.backend = MemoryEventBackend(self)
+        self._ids = itertools.count(1)
+        self.delivered = 0
+        self.overflows = 0
+
+    async def start(self, backend=None) -> None:
+        if backend is not None:
+            self.backend = backend
+        await self.backend.start()
+
+    async def stop(self) -> None:
+        await self.backend.stop()
+        for subscription in list(self.subscribers):
+            self.unsubscribe(subscription)
+
+    def subscribe(self, user_id: Optional[str], types: Optional[FrozenSet[str]] = None) -> Subscription:
+        if len(self.subscribers) >= self.max_subscribers:
+            raise RuntimeError("Too many event stream subscribers")
+        subscription = Subscription(user_id, types, self.queue_size)
+        self.subscribers.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        self.subscribers.discard(subscription)
+        subscription.close()
+
+    def publish(self, events: List[Event]) -> None:
+        """Send events to subscribers through the backend; never blocks."""
+        if events:
+            self.backend.publish(events)
+
+    def deliver(self, event: Event) -> None:
+        """Fan an event out to the matching subscribers of this process."""
+        if not self.subscribers:
+            return
+        event = Event(event.type, event.data, event.user_id, next(self._ids))
+        for subscription in list(self.subscribers):
+            if not subscription.accepts(event):
+                continue
+            if subscription.offer(event):
+                self.delivered += 1
+            else:
+                self.overflows += 1
+                logger.warning("Event subscriber of user %s fell %d events behind; disconnecting",
+                               subscription.user_id, self.queue_size)
+                self.subscribers.discard(subscription)
+                subscription.close(Event(OVERFLOW_EVENT, {"reason": "client too slow"}, subscription.user_id))
@@ -0,0 +1,179 @@
+"""
+Non-blocking, structured logging.
+
+Request handlers only put records on a bounded in-memory queue (`QueueHandler`); a
+`QueueListener` thread formats them as JSON lines and does the file and console I/O,
+so a slow disk or terminal never stalls the event loop. On top of that:
+
+- `LOG_LEVEL` sets the root level and `LOG_LEVELS` overrides it per module, e.g.
+  `LOG_LEVELS="sqlalchemy.engine=WARNING,services.auth=DEBUG"`.
+- `LOG_DEBUG_SAMPLE_RATE` keeps only a fraction of DEBUG records per call site (the
+  first one always passes), so chatty per-request debug lines can stay enabled.
+- When the queue is full, records are dropped and counted instead of blocking; /metrics
+  reports the count as `log_records_dropped_total`.
+
+On Lambda (`synchronous=True`) the handlers are attached directly: a frozen container
+runs no listener thread, so queued records could be lost or written late.
+"""
+
+import atexit
+import copy
+import json
+import logging
+import queue
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+from typing import Dict, List, Optional
+
+# Attributes every LogRecord has; anything else was passed via `extra=` and is emitted as a field
+_RECORD_ATTRS = frozenset(vars(logging.makeLogRecord({}))) | {"message", "asctime", "taskName"}
+TEXT_FORMAT = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+
+_listener: Optional[QueueListener] = None
+_queue_handler: Optional["NonBlockingQueueHandler"] = None
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line: timestamp, level, logger, message, extras and exception."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "timestamp": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for key, value in record.__dict__.items():
+            if key not in _RECORD_ATTRS:
+                entry[key] = value
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry["exception"] = record.exc_text
+        if record.stack_info:
+            entry["stack"] = record.stack_info
+        return json.dumps(entry, default=str, ensure_ascii=False)
+
+
+class DebugSampler(logging.Filter):
+    """Pass the first DEBUG record from each call site, then one in every `1 / rate`."""
+
+    def __init__(self, rate: float, max_sites: int = 4096):
+        super().__init__()
+        self.every = 0 if rate <= 0 else max(1, round(1 / rate))
+        self.max_sites = max_sites
+        self._counts: Dict[tuple, int] = {}
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno > logging.DEBUG or self.every == 1:
+            return True
+        if self.every == 0:
+            return False
+        site = (record.pathname, record.lineno)
+        count = self._counts.get(site, 0)
+        if count == 0 and len(self._counts) >= self.max_sites:
+            self._counts.clear()
+        self._counts[site] = count + 1
+        return count % self.every == 0
+
+
+class NonBlockingQueueHandler(QueueHandler):
+    """QueueHandler that drops (and counts) records when the queue is full.
+
+    The message is merged with its args here, in the caller's thread, because the args
+    may be mutated after the call returns; JSON encoding and I/O happen in the listener.
+    """
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+def parse_log_levels(spec: str) -> Dict[str, str]:
+    """Parse "module=LEVEL,other.module=LEVEL" into a dict, ignoring malformed entries."""
+    levels = {}
+    for item in spec.split(","):
+        name, sep, level = item.partition("=")
+        if sep and name.strip() and level.strip():
+            levels[name.strip()] = level.strip().upper()
+    return levels
+
+
+def configure_logging(
+    handlers: List[logging.Handler],
+    level: str = "INFO",
+    module_levels: str = "",
+    json_output: bool = True,
+    debug_sample_rate: float = 1.0,
+    queue_size: int = 10000,
+    synchronous: bool = False,
+) -> Optional[NonBlockingQueueHandler]:
+    """Route the root logger through a queue to `handlers`, which run on a listener thread.
+
+    With `synchronous` the handlers are attached to the root logger directly and no queue
+    handler is returned.
+    """
+    global _listener, _queue_handler
+
+    formatter = JsonFormatter() if json_output else logging.Formatter(TEXT_FORMAT)
+    for handler in handlers:
+        handler.setFormatter(formatter)
+
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    root.setLevel(level.upper())
+    for name, module_level in parse_log_levels(module_levels).items():
+        logging.getLogger(name).setLevel(module_level)
+    shutdown_logging()
+
+    if synchronous:
+        for handler in handlers:
+            if debug_sample_rate < 1:
+                handler.addFilter(DebugSampler(debug_sample_rate))
+            root.addHandler(handler)
+        _queue_handler = None
+        return None
+
+    log_queue: queue.Queue = queue.Queue(maxsize=queue_size)
+    queue_handler = NonBlockingQueueHandler(log_queue)
+    if debug_sample_rate < 1:
+        queue_handler.addFilter(DebugSampler(debug_sample_rate))
+    root.addHandler(queue_handler)
+
+    _listener = QueueListener(log_queue, *handlers, respect_handler_level=True)
+    _listener.start()
+    _queue_handler = queue_handler
+    return queue_handler
+
+
+def dropped_records() -> int:
+    """Records dropped because the log queue was full, since logging was configured."""
+    return _queue_handler.dropped if _queue_handler is not None else 0
+
+
+def shutdown_logging() -> None:
+    """Stop the listener thread once it has written every queued record."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+# Flush whatever is still queued when the process exits
+atexit.register(shutdown_logging)
@@ -0,0 +1,207 @@
+"""
+In-process metrics in the Prometheus text exposition format.
+
+Everything is updated from the event loop thread with plain integer and float
+arithmetic on preallocated bucket lists, so recording a request costs a few list
+increments and takes no locks. `render_metrics()` produces the `/metrics` payload and
+reads the database pool statistics (`core.database.pool_status`) at scrape time.
+"""
+
+import asyncio
+import logging
+import time
+from bisect import bisect_left
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from core.database import db_manager, pool_status
+from core.logging_config import dropped_records
+
+logger = logging.getLogger(__name__)
+
+LATENCY_BUCKETS_SECONDS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SIZE_BUCKETS_BYTES = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+LOOP_LAG_BUCKETS_SECONDS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0)
+UNMATCHED_ROUTE = "<unmatched>"
+
+_process_started_at = time.time()
+
+
+class Histogram:
+    """Fixed-bucket histogram; `counts[i]` holds observations <= `bounds[i]`, the last slot +Inf."""
+
+    __slots__ = ("bounds", "counts", "sum", "count")
+
+    def __init__(self, bounds: Tuple[float, ...]):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+class RouteStats:
+    __slots__ = ("latency", "response_size", "statuses")
+
+    def __init__(self):
+        self.latency = Histogram(LATENCY_BUCKETS_SECONDS)
+        self.response_size = Histogram(SIZE_BUCKETS_BYTES)
+        self.statuses: Dict[int, int] = {}
+
+
+class MetricsRegistry:
+    """Per-route request metrics keyed by (method, route template)."""
+
+    def __init__(self):
+        self.routes: Dict[Tuple[str, str], RouteStats] = {}
+        self.in_flight = 0
+        self.loop_lag = Histogram(LOOP_LAG_BUCKETS_SECONDS)
+        self.loop_lag_last = 0.0
+
+    def observe_request(self, method: str, route: str, status: int, duration: float, size: int) -> None:
+        stats = self.routes.get((method, route))
+        if stats is None:
+            stats = self.routes[(method, route)] = RouteStats()
+        stats.latency.observe(duration)
+        stats.response_size.observe(size)
+        stats.statuses[status] = stats.statuses.get(status, 0) + 1
+
+    def observe_loop_lag(self, lag: float) -> None:
+        self.loop_lag.observe(lag)
+        self.loop_lag_last = lag
+
+
+metrics_registry = MetricsRegistry()
+
+
+class EventLoopLagMonitor:
+    """Measures how late a periodic sleep wakes up, i.e. how long callbacks wait for the loop."""
+
+    def __init__(self, registry: MetricsRegistry, interval: float = 0.5):
+        self.registry = registry
+        self.interval = interval
+        self._task: Optional[asyncio.Task] = None
+
+    def ensure_started(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            start = loop.time()
+            await asyncio.sleep(self.interval)
+            self.registry.observe_loop_lag(max(loop.time() - start - self.interval, 0.0))
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(**labels) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{key}="{_escape(value)}"' for key, value in labels.items()) + "}"
+
+
+def _histogram_lines(name: str, histogram: Histogram, **labels) -> Iterable[str]:
+    cumulative = 0
+    for bound, count in zip([*histogram.bounds, "+Inf"], histogram.counts):
+        cumulative += count
+        yield f"{name}_bucket{_labels(**labels, le=bound)} {cumulative}"
+    yield f"{name}_sum{_labels(**labels)} {histogram.sum}"
+    yield f"{name}_count{_labels(**labels)} {histogram.count}"
+
+
+def _pool_lines(pools: Dict[str, dict]) -> Iterable[str]:
+    gauges = (
+        ("size", "db_pool_size", "Configured pool size"),
+        ("checked_out", "db_pool_checked_out", "Connections currently checked out"),
+        ("checked_in", "db_pool_checked_in", "Idle connections in the pool"),
+        ("overflow", "db_pool_overflow", "Overflow connections currently open"),
+    )
+    for key, name, help_text in gauges:
+        yield f"# HELP {name} {help_text}"
+        yield f"# TYPE {name} gauge"
+        for pool, status in pools.items():
+            if key in status:
+                yield f"{name}{_labels(pool=pool)} {status[key]}"
+    for key, name, help_text in (
+        ("timeouts", "db_pool_timeouts_total", "Checkouts that timed out"),
+        ("disconnects", "db_pool_disconnects_total", "Disconnects that invalidated the pool"),
+    ):
+        yield f"# HELP {name} {help_text}"
+        yield f"# TYPE {name} counter"
+        for pool, status in pools.items():
+            if key in status:
+                yield f"{name}{_labels(pool=pool)} {status[key]}"
+    yield "# HELP db_pool_wait_seconds Time spent waiting for a pooled connection"
+    yield "# TYPE db_pool_wait_seconds histogram"
+    for pool, status in pools.items():
+        wait = status.get("wait_ms")
+        if not wait:
+            continue
+        # pool_status reports cumulative millisecond buckets
+        for bound, cumulative in wait["buckets"].items():
+            le = bound if bound == "+Inf" else float(bound) / 1000
+            yield f"db_pool_wait_seconds_bucket{_labels(pool=pool, le=le)} {cumulative}"
+        yield f"db_pool_wait_seconds_sum{_labels(pool=pool)} {wait['sum'] / 1000}"
+        yield f"db_pool_wait_seconds_count{_labels(pool=pool)} {wait['count']}"
+
+
+def render_metrics(registry: MetricsRegistry = metrics_registry) -> str:
+    """Render all metrics in the Prometheus text format (version 0.0.4)."""
+    lines: List[str] = [
+        "# HELP process_start_time_seconds Start time of the process since the Unix epoch",
+        "# TYPE process_start_time_seconds gauge",
+        f"process_start_time_seconds {_process_started_at}",
+        "# HELP process_cpu_seconds_total User and system CPU time spent",
+        "# TYPE process_cpu_seconds_total counter",
+        f"process_cpu_seconds_total {time.process_time()}",
+        "# HELP http_requests_in_flight Requests currently being served",
+        "# TYPE http_requests_in_flight gauge",
+        f"http_requests_in_flight {registry.in_flight}",
+    ]
+
+    routes = sorted(registry.routes.items())
+    lines += ["# HELP http_requests_total Requests by route and status", "# TYPE http_requests_total counter"]
+    for (method, route), stats in routes:
+        for status, count in sorted(stats.statuses.items()):
+            lines.append(f"http_requests_total{_labels(method=method, route=route, status=status)} {count}")
+    lines += [
+        "# HELP http_request_duration_seconds Request latency by route template",
+        "# TYPE http_request_duration_seconds histogram",
+    ]
+    for (method, route), stats in routes:
+        lines.extend(_histogram_lines("http_request_duration_seconds", stats.latency, method=method, route=route))
+    lines += [
+        "# HELP http_response_size_bytes Response body size by route template",
+        "# TYPE http_response_size_bytes histogram",
+    ]
+    for (method, route), stats in routes:
+        lines.extend(_histogram_lines("http_response_size_bytes", stats.response_size, method=method, route=route))
+
+    lines += [
+        "# HELP event_loop_lag_seconds Delay between a scheduled wake-up and when the event loop ran it",
+        "# TYPE event_loop_lag_seconds histogram",
+        *_histogram_lines("event_loop_lag_seconds", registry.loop_lag),
+        "# HELP event_loop_lag_last_seconds Most recent event loop lag sample",
+        "# TYPE event_loop_lag_last_seconds gauge",
+        f"event_loop_lag_last_seconds {registry.loop_lag_last}",
+    ]
+
+    lines += [
+        "# HELP log_records_dropped_total Log records dropped because the log queue was full",
+        "# TYPE log_records_dropped_total counter",
+        f"log_records_dropped_total {dropped_records()}",
+    ]
+
+    if db_manager.engine is not None:
+        pools = {"primary": pool_status(db_manager.engine)}
+        pools.update({f"replica{i}": pool_status(replica.engine) for i, replica in enumerate(db_manager.replicas)})
+        lines.extend(_pool_lines(pools))
+
+    return "\n".join(lines) + "\n"
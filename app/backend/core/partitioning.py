@@ -0,0 +1,264 @@
+"""
+Monthly range partitioning of the high-volume tables on PostgreSQL.
+
+The tables in PARTITIONED_TABLES are declaratively partitioned by month on a date
+column. Each month is a `<table>_pYYYY_MM` partition; `<table>_default` takes rows
+outside the created months or without a date. List queries with a range on the
+partition key (see core/statement_cache.py) only scan the matching months, vacuum and
+index maintenance work per month, and old months are archived by detaching them whole
+(scripts/manage_partitions.py archive) instead of deleting rows.
+
+The ORM models are unchanged: `id` stays the mapped primary key and is kept unique by
+its sequence, but the partitioned tables have no primary key constraint, because
+PostgreSQL only enforces uniqueness across partitions for keys that include the
+partition column. For the same reason receipts are not partitioned: bulk upserts rely
+on their unique (user_id, receipt_number) index.
+
+Only PostgreSQL is supported; callers check `supports_partitioning` and leave other
+backends with plain tables.
+"""
+
+import gzip
+import logging
+import os
+from dataclasses import dataclass
+from datetime import date, datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import DateTime, text
+
+logger = logging.getLogger(__name__)
+
+MAINTENANCE_LOCK_KEY = 0x70617274  # pg_advisory_xact_lock key, one maintenance run at a time
+HISTORY_MONTHS = 120  # Converting creates monthly partitions this far back at most; older rows go to the default
+
+
+@dataclass(frozen=True)
+class PartitionSpec:
+    table: str
+    column: str
+    backfill: Optional[str] = None  # Fills the key of rows written before the column existed
+
+
+PARTITIONED_TABLES: Tuple[PartitionSpec, ...] = (
+    PartitionSpec("sales", "sale_date"),
+    PartitionSpec(
+        "sale_items", "created_at",
+        "UPDATE sale_items SET created_at = sales.sale_date FROM sales "
+        "WHERE sales.id = sale_items.sale_id AND sale_items.created_at IS NULL",
+    ),
+    PartitionSpec(
+        "journal_details", "created_at",
+        "UPDATE journal_details SET created_at = journal_entries.entry_date FROM journal_entries "
+        "WHERE journal_entries.id = journal_details.entry_id AND journal_details.created_at IS NULL",
+    ),
+    PartitionSpec("audit_logs", "created_at"),
+)
+
+
+def supports_partitioning(engine) -> bool:
+    return engine is not None and engine.dialect.name == "postgresql"
+
+
+def month_start(value: date) -> date:
+    return date(value.year, value.month, 1)
+
+
+def add_months(month: date, count: int) -> date:
+    index = month.year * 12 + month.month - 1 + count
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(table: str, month: date) -> str:
+    return f"{table}_p{month:%Y_%m}"
+
+
+def _month_of(value: Any) -> Optional[date]:
+    if isinstance(value, (datetime, date)):
+        return month_start(value)
+    if isinstance(value, str):
+        try:
+            return month_start(date.fromisoformat(value[:10]))
+        except ValueError:
+            return None
+    return None
+
+
+def _bound(spec: PartitionSpec, month: date) -> str:
+    from core.database import Base
+
+    if isinstance(Base.metadata.tables[spec.table].c[spec.column].type, DateTime):
+        return f"'{month.isoformat()} 00:00:00+00'"
+    # Text keys hold ISO-8601 timestamps, which sort in date order
+    return f"'{month.isoformat()}'"
+
+
+async def is_partitioned(conn, table: str) -> bool:
+    result = await conn.execute(
+        text("SELECT EXISTS (SELECT 1 FROM pg_partitioned_table WHERE partrelid = to_regclass(:table))"),
+        {"table": table},
+    )
+    return bool(result.scalar())
+
+
+async def monthly_partitions(conn, table: str) -> List[date]:
+    """Months with a partition attached to `table`, oldest first."""
+    result = await conn.execute(
+        text(
+            "SELECT c.relname FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid "
+            "WHERE i.inhparent = to_regclass(:table)"
+        ),
+        {"table": table},
+    )
+    prefix = f"{table}_p"
+    months = []
+    for (name,) in result:
+        if not name.startswith(prefix):
+            continue
+        try:
+            months.append(datetime.strptime(name[len(prefix):], "%Y_%m").date())
+        except ValueError:
+            continue
+    return sorted(months)
+
+
+async def create_partition(conn, spec: PartitionSpec, month: date) -> bool:
+    """Create the partition for `month` if it is missing; returns whether it was created."""
+    name = partition_name(spec.table, month)
+    if (await conn.execute(text("SELECT to_regclass(:name)"), {"name": name})).scalar() is not None:
+        return False
+    lower, upper = _bound(spec, month), _bound(spec, add_months(month, 1))
+    in_range = f"{spec.column} >= {lower} AND {spec.column} < {upper}"
+    default = f"{spec.table}_default"
+    waiting = (await conn.execute(text(f"SELECT EXISTS (SELECT 1 FROM {default} WHERE {in_range})"))).scalar()
+    if not waiting:
+        await conn.execute(
+            text(f"CREATE TABLE {name} PARTITION OF {spec.table} FOR VALUES FROM ({lower}) TO ({upper})")
+        )
+    else:
+        # PostgreSQL refuses a partition whose range has rows in the default partition, so they are moved first
+        await conn.execute(text(f"CREATE TABLE {name} (LIKE {spec.table} INCLUDING DEFAULTS)"))
+        await conn.execute(text(
+            f"WITH moved AS (DELETE FROM {default} WHERE {in_range} RETURNING *) INSERT INTO {name} SELECT * FROM moved"
+        ))
+        await conn.execute(text(f"ALTER TABLE {spec.table} ATTACH PARTITION {name} FOR VALUES FROM ({lower}) TO ({upper})"))
+    logger.info("Created partition %s", name)
+    return True
+
+
+async def ensure_partitions(conn, spec: PartitionSpec, today: date, months_ahead: int) -> List[str]:
+    """Create the partitions of the current month and the next `months_ahead` months."""
+    created = []
+    for offset in range(months_ahead + 1):
+        month = add_months(month_start(today), offset)
+        if await create_partition(conn, spec, month):
+            created.append(partition_name(spec.table, month))
+    return created
+
+
+async def convert_to_partitioned(conn, spec: PartitionSpec, today: date, months_ahead: int) -> int:
+    """Rebuild a plain table as a partitioned one in the caller's transaction; returns the rows copied.
+
+    The table is locked against reads and writes until the transaction ends.
+    """
+    from core.database import Base
+
+    table, column = spec.table, spec.column
+    old = f"{table}_unpartitioned"
+    await conn.execute(text(f"LOCK TABLE {table} IN ACCESS EXCLUSIVE MODE"))
+    if spec.backfill:
+        await conn.execute(text(spec.backfill))
+    sequence = (await conn.execute(text("SELECT pg_get_serial_sequence(:table, 'id')"), {"table": table})).scalar()
+    oldest = _month_of((await conn.execute(text(f"SELECT min({column}) FROM {table}"))).scalar())
+
+    await conn.execute(text(f"ALTER TABLE {table} RENAME TO {old}"))
+    await conn.execute(text(
+        f"CREATE TABLE {table} (LIKE {old} INCLUDING DEFAULTS INCLUDING IDENTITY INCLUDING GENERATED) "
+        f"PARTITION BY RANGE ({column})"
+    ))
+    await conn.execute(text(f"CREATE TABLE {table}_default PARTITION OF {table} DEFAULT"))
+    current = month_start(today)
+    month = max(min(oldest or current, current), add_months(current, -HISTORY_MONTHS))
+    while month <= add_months(current, months_ahead):
+        await create_partition(conn, spec, month)
+        month = add_months(month, 1)
+
+    copied = (await conn.execute(text(f"INSERT INTO {table} SELECT * FROM {old}"))).rowcount
+    identity = (await conn.execute(text("SELECT pg_get_serial_sequence(:table, 'id')"), {"table": table})).scalar()
+    if identity:
+        # LIKE ... INCLUDING IDENTITY starts a new sequence
+        await conn.execute(text(f"SELECT setval('{identity}', (SELECT coalesce(max(id), 0) + 1 FROM {table}), false)"))
+    elif sequence:
+        # A serial's sequence belongs to the old table and would be dropped with it
+        await conn.execute(text(f"ALTER SEQUENCE {sequence} OWNED BY {table}.id"))
+    await conn.execute(text(f"DROP TABLE {old}"))
+
+    # Index names are global, so the model's indexes can only be created once the old table is gone
+    for index in Base.metadata.tables[table].indexes:
+        await conn.run_sync(index.create)
+    await conn.execute(text(f"CREATE INDEX ix_{table}_{column} ON {table} ({column})"))
+    logger.info("Partitioned %s by month on %s (%d rows)", table, column, copied)
+    return copied
+
+
+async def maintain_partitions(engine, today: date, months_ahead: int) -> Dict[str, List[str]]:
+    """Create upcoming partitions, and partition tables that are still empty; returns the partitions created.
+
+    Plain tables that already hold rows are left to `scripts/manage_partitions.py convert`, which locks them
+    while copying. Concurrent runs from several workers skip while one holds the advisory lock.
+    """
+    created: Dict[str, List[str]] = {}
+    async with engine.begin() as conn:
+        locked = await conn.execute(text("SELECT pg_try_advisory_xact_lock(:key)"), {"key": MAINTENANCE_LOCK_KEY})
+        if not locked.scalar():
+            return created
+        for spec in PARTITIONED_TABLES:
+            try:
+                async with conn.begin_nested():
+                    if await is_partitioned(conn, spec.table):
+                        names = await ensure_partitions(conn, spec, today, months_ahead)
+                    elif (await conn.execute(text(f"SELECT NOT EXISTS (SELECT 1 FROM {spec.table})"))).scalar():
+                        await convert_to_partitioned(conn, spec, today, months_ahead)
+                        names = [partition_name(spec.table, month) for month in await monthly_partitions(conn, spec.table)]
+                    else:
+                        logger.warning(
+                            "%s is not partitioned; run scripts/manage_partitions.py convert in a maintenance window",
+                            spec.table,
+                        )
+                        continue
+            except Exception as e:
+                logger.error(f"Partition maintenance of {spec.table} failed: {e}")
+                continue
+            if names:
+                created[spec.table] = names
+    return created
+
+
+async def archive_partition(conn, spec: PartitionSpec, month: date, archive_dir: Path) -> Tuple[Path, int]:
+    """Copy one monthly partition to `<archive_dir>/<table>/<partition>.csv.gz`, then detach and drop it.
+
+    Runs in the caller's transaction. Rows written to the month after the copy started make the row count
+    check fail, which rolls back the detach; the partition is then archived by a later run.
+    """
+    name = partition_name(spec.table, month)
+    path = archive_dir / spec.table / f"{name}.csv.gz"
+    path.parent.mkdir(parents=True, exist_ok=True)
+    partial = path.with_name(path.name + ".partial")
+
+    raw = await conn.get_raw_connection()
+    with gzip.open(partial, "wb") as handle:
+        status = await raw.driver_connection.copy_from_table(name, output=handle, format="csv", header=True)
+    with open(partial, "rb") as handle:
+        os.fsync(handle.fileno())
+    copied = int(status.split()[-1])
+
+    await conn.execute(text(f"ALTER TABLE {spec.table} DETACH PARTITION {name}"))
+    remaining = (await conn.execute(text(f"SELECT count(*) FROM {name}"))).scalar()
+    if remaining != copied:
+        partial.unlink()
+        raise RuntimeError(f"{name} changed while it was archived ({copied} rows copied, {remaining} now)")
+    await conn.execute(text(f"DROP TABLE {name}"))
+    os.replace(partial, path)
+    logger.info("Archived %s (%d rows) to %s", name, copied, path)
+    return path, copied
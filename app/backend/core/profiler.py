@@ -0,0 +1,132 @@
+"""
+Opt-in sampling profiler for a single worker process.
+
+While running, a daemon thread wakes every `interval` seconds, reads the current stack
+of every other thread (`sys._current_frames()`) and counts each stack in collapsed form
+(`thread;outer_func (file:line);...;inner_func (file:line)`). The result can be piped
+straight into flamegraph.pl or loaded into speedscope. When stopped there is no thread
+and no hook, so an idle profiler costs nothing.
+
+Each worker process has its own profiler; the admin endpoints toggle the worker that
+serves the request and report its pid.
+"""
+
+import logging
+import os
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+_BACKEND_DIR = str(Path(__file__).resolve().parent.parent) + os.sep
+TRUNCATED_STACK = "[other stacks]"
+
+
+def _frame_label(code) -> str:
+    filename = code.co_filename
+    if filename.startswith(_BACKEND_DIR):
+        filename = filename[len(_BACKEND_DIR):]
+    else:
+        # Keep site-packages frames short: ".../sqlalchemy/orm/loading.py" -> "sqlalchemy/orm/loading.py"
+        parts = Path(filename).parts
+        filename = "/".join(parts[-3:])
+    return f"{code.co_name} ({filename}:{code.co_firstlineno})"
+
+
+class SamplingProfiler:
+    def __init__(self, max_stacks: int = 20000):
+        self.max_stacks = max_stacks
+        self.stacks: Dict[str, int] = {}
+        self.samples = 0
+        self.interval = 0.01
+        self.started_at: Optional[float] = None
+        self.stopped_at: Optional[float] = None
+        self.stop_after: Optional[float] = None
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self, interval: float = 0.01, duration: Optional[float] = None) -> bool:
+        """Start sampling; returns False if already running. Stops by itself after `duration` seconds."""
+        with self._lock:
+            if self.running:
+                return False
+            self.interval = interval
+            self.started_at = time.time()
+            self.stopped_at = None
+            self.stop_after = self.started_at + duration if duration else None
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="sampling-profiler", daemon=True)
+            self._thread.start()
+        logger.info("Sampling profiler started (interval=%.1fms, duration=%ss)", interval * 1000, duration)
+        return True
+
+    def stop(self) -> bool:
+        with self._lock:
+            if not self.running:
+                return False
+            self._stop.set()
+            thread = self._thread
+        thread.join(timeout=5)
+        logger.info("Sampling profiler stopped after %d samples", self.samples)
+        return True
+
+    def reset(self) -> None:
+        with self._lock:
+            self.stacks = {}
+            self.samples = 0
+
+    def _run(self) -> None:
+        own_id = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            if self.stop_after is not None and time.time() >= self.stop_after:
+                break
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_id:
+                    continue
+                labels = []
+                while frame is not None:
+                    labels.append(_frame_label(frame.f_code))
+                    frame = frame.f_back
+                labels.append(names.get(thread_id, str(thread_id)))
+                self._record(";".join(reversed(labels)))
+            self.samples += 1
+        self.stopped_at = time.time()
+
+    def _record(self, stack: str) -> None:
+        stacks = self.stacks
+        if stack not in stacks and len(stacks) >= self.max_stacks:
+            stack = TRUNCATED_STACK
+        stacks[stack] = stacks.get(stack, 0) + 1
+
+    def collapsed(self, thread: Optional[str] = None) -> str:
+        """Collapsed stacks, one `frame;frame;frame count` line each, heaviest first."""
+        # dict.copy() is atomic under the GIL, while the sampler thread keeps adding stacks
+        items = sorted(self.stacks.copy().items(), key=lambda item: item[1], reverse=True)
+        if thread:
+            items = [(stack, count) for stack, count in items if stack.split(";", 1)[0] == thread]
+        return "".join(f"{stack} {count}\n" for stack, count in items)
+
+    def status(self) -> dict:
+        end = time.time() if self.running else self.stopped_at
+        return {
+            "pid": os.getpid(),
+            "running": self.running,
+            "interval_ms": round(self.interval * 1000, 3),
+            "samples": self.samples,
+            "unique_stacks": len(self.stacks),
+            "started_at": self.started_at,
+            "elapsed_seconds": round(end - self.started_at, 3) if self.started_at and end else None,
+            "stop_after": self.stop_after,
+        }
+
+
+profiler = SamplingProfiler()
@@ -0,0 +1,139 @@
+"""
+Per-request SQL statistics and the slow query log.
+
+`install_query_hooks` times every cursor execution on an engine. The time is added
+to the stats of the current request (a context variable set by
+`middlewares.query_stats.QueryStatsMiddleware`), and statements slower than
+`settings.slow_query_threshold_ms` are logged with their EXPLAIN plan and kept in
+`slow_query_log`, an in-memory table of the slowest statement shapes.
+"""
+
+import logging
+import re
+import time
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from typing import Optional
+
+from core.config import settings
+from sqlalchemy import event
+
+logger = logging.getLogger(__name__)
+
+EXPLAIN_PREFIXES = {
+    "sqlite": "EXPLAIN QUERY PLAN ",
+    "postgresql": "EXPLAIN ",
+    "mysql": "EXPLAIN ",
+    "mariadb": "EXPLAIN ",
+}
+# Expanded IN lists ("IN (?, ?, ?)") vary in length; collapse them so one query shape is one entry
+_IN_LIST = re.compile(r"\(\s*(?:\?|%s|\$\d+|:\w+)(?:\s*,\s*(?:\?|%s|\$\d+|:\w+))+\s*\)")
+_WHITESPACE = re.compile(r"\s+")
+
+
+class RequestQueryStats:
+    """Statement count and database time accumulated by one request."""
+
+    __slots__ = ("count", "total_ms")
+
+    def __init__(self):
+        self.count = 0
+        self.total_ms = 0.0
+
+
+current_query_stats: ContextVar[Optional[RequestQueryStats]] = ContextVar("current_query_stats", default=None)
+
+
+def normalize_statement(statement: str) -> str:
+    return _IN_LIST.sub("(...)", _WHITESPACE.sub(" ", statement).strip())
+
+
+class SlowQueryLog:
+    """Slowest statement shapes seen by this process, bounded to `max_entries`."""
+
+    def __init__(self, max_entries: int = 50):
+        self.max_entries = max_entries
+        self._entries: dict = {}
+
+    def record(self, statement: str, duration_ms: float, plan: Optional[str] = None) -> dict:
+        entry = self._entries.get(statement)
+        if entry is None:
+            entry = {"statement": statement, "count": 0, "total_ms": 0.0, "max_ms": 0.0, "plan": None}
+            self._entries[statement] = entry
+            if len(self._entries) > self.max_entries:
+                fastest = min(self._entries.values(), key=lambda item: item["max_ms"])
+                del self._entries[fastest["statement"]]
+        entry["count"] += 1
+        entry["total_ms"] += duration_ms
+        entry["max_ms"] = max(entry["max_ms"], duration_ms)
+        entry["last_seen"] = datetime.now(timezone.utc).isoformat()
+        if plan is not None:
+            entry["plan"] = plan
+        return entry
+
+    def has_plan(self, statement: str) -> bool:
+        entry = self._entries.get(statement)
+        return entry is not None and entry["plan"] is not None
+
+    def top(self, limit: int = 20) -> list:
+        entries = sorted(self._entries.values(), key=lambda item: item["max_ms"], reverse=True)[:limit]
+        return [
+            {
+                **entry,
+                "total_ms": round(entry["total_ms"], 2),
+                "max_ms": round(entry["max_ms"], 2),
+                "avg_ms": round(entry["total_ms"] / entry["count"], 2),
+            }
+            for entry in entries
+        ]
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+
+slow_query_log = SlowQueryLog(settings.slow_query_top_n)
+
+
+def _explain(conn, statement: str, parameters) -> Optional[str]:
+    """EXPLAIN (never ANALYZE) a read statement on a separate cursor of the same connection."""
+    prefix = EXPLAIN_PREFIXES.get(conn.dialect.name)
+    if prefix is None or statement.split(None, 1)[0].upper() not in ("SELECT", "WITH"):
+        return None
+    cursor = conn.connection.cursor()
+    try:
+        cursor.execute(prefix + statement, parameters)
+        return "\n".join(" ".join(str(value) for value in row) for row in cursor.fetchall())
+    except Exception as e:
+        logger.debug(f"Could not EXPLAIN slow query: {e}")
+        return None
+    finally:
+        cursor.close()
+
+
+def install_query_hooks(engine) -> None:
+    """Time cursor executions on `engine` for request stats and the slow query log."""
+    threshold_ms = settings.slow_query_threshold_ms
+
+    @event.listens_for(engine.sync_engine, "before_cursor_execute")
+    def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info["query_start"] = time.perf_counter()
+
+    @event.listens_for(engine.sync_engine, "after_cursor_execute")
+    def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        duration_ms = (time.perf_counter() - conn.info["query_start"]) * 1000
+        stats = current_query_stats.get()
+        if stats is not None:
+            stats.count += 1
+            stats.total_ms += duration_ms
+        if duration_ms < threshold_ms:
+            return
+
+        shape = normalize_statement(statement)
+        plan = None
+        # One plan per statement shape is enough, and EXPLAIN costs a round trip
+        if settings.slow_query_explain and not executemany and not slow_query_log.has_plan(shape):
+            plan = _explain(conn, statement, parameters)
+        slow_query_log.record(shape, duration_ms, plan)
+        logger.warning(
+            "Slow query (%.1fms): %s%s", duration_ms, shape[:2000], f"\nPlan:\n{plan}" if plan else ""
+        )
@@ -0,0 +1,213 @@
+"""
+SQLite production profile.
+
+Small stores run the backend on the default SQLite database. Without WAL or a busy
+timeout, two concurrent POS writes fail with "database is locked". This module
+provides the tuned connection pragmas and a single-writer discipline:
+
+- `install_sqlite_pragmas` applies WAL, synchronous, busy_timeout, mmap and cache
+  settings to every new connection.
+- `SQLiteWriter` owns the process-wide write lock. ORM sessions (`SQLiteWriteSession`)
+  take it before every flush, autoflushes included, and for Core DML and commit, so
+  only one write transaction is open at a time.
+- `SQLiteWriter.submit` queues write jobs that a single worker group-commits in one
+  transaction. `commit_write` routes a write through it when the request session is a
+  SQLiteWriteSession; the sales and sale_items creates (single and batch) use it, so
+  concurrent POS checkouts share commits. scripts/bench_sqlite_checkouts.py compares
+  group commit against lock-serialized sessions.
+"""
+
+import asyncio
+import contextvars
+import logging
+from typing import Any, Awaitable, Callable, Optional
+
+from core.config import settings
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker
+from sqlalchemy.orm import Session
+from sqlalchemy.util import await_only
+
+logger = logging.getLogger(__name__)
+
+WriteJob = Callable[[AsyncSession], Awaitable[Any]]
+SYNCHRONOUS_MODES = ("OFF", "NORMAL", "FULL", "EXTRA")
+WRITE_SESSION_KEY = "sqlite_write_session"  # Session.info entry pointing back at the SQLiteWriteSession
+
+
+def install_sqlite_pragmas(engine: AsyncEngine) -> None:
+    """Apply the production pragmas to every connection the engine opens."""
+    synchronous = settings.sqlite_synchronous.upper()
+    if synchronous not in SYNCHRONOUS_MODES:
+        raise ValueError(f"Invalid SQLITE_SYNCHRONOUS: {settings.sqlite_synchronous}")
+    pragmas = (
+        "PRAGMA journal_mode=WAL",
+        f"PRAGMA synchronous={synchronous}",
+        f"PRAGMA busy_timeout={int(settings.sqlite_busy_timeout_ms)}",
+        f"PRAGMA mmap_size={int(settings.sqlite_mmap_size)}",
+        f"PRAGMA cache_size={int(settings.sqlite_cache_size)}",
+        "PRAGMA temp_store=MEMORY",
+    )
+
+    @event.listens_for(engine.sync_engine, "connect")
+    def _set_pragmas(dbapi_connection, _connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for pragma in pragmas:
+                cursor.execute(pragma)
+        finally:
+            cursor.close()
+
+    logger.info("SQLite production profile enabled (WAL, synchronous=%s)", synchronous)
+
+
+class SQLiteWriter:
+    """Serializes SQLite writes and group-commits queued write jobs."""
+
+    def __init__(self, session_maker: Optional[async_sessionmaker] = None, max_batch: int = 64):
+        self.session_maker = session_maker
+        self.max_batch = max_batch
+        self.lock = asyncio.Lock()
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+        self.batches = 0
+        self.jobs = 0
+
+    async def submit(self, job: WriteJob) -> Any:
+        """Run `job(session)` in the next group commit and return its result once committed.
+
+        Jobs must be safe to re-run: if any job in a batch fails, the batch is rolled back
+        and each job is retried in its own transaction, so only the failing job errors.
+        A job sees the caller's context variables (e.g. the audit actor).
+        """
+        if self._worker is None or self._worker.done():
+            self._queue = asyncio.Queue()
+            self._worker = asyncio.create_task(self._run())
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((job, future, contextvars.copy_context()))
+        return await future
+
+    async def close(self) -> None:
+        if self._worker is not None:
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+            self._worker = None
+
+    async def _run(self) -> None:
+        while True:
+            batch = [await self._queue.get()]
+            # Let other producers enqueue before the batch is cut
+            await asyncio.sleep(0)
+            while len(batch) < self.max_batch and not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+            await self._commit_batch(batch)
+
+    async def _commit_batch(self, batch: list) -> None:
+        try:
+            async with self.lock, self.session_maker() as session:
+                results = [await _run_in_context(job, session, context) for job, _, context in batch]
+                await session.commit()
+        except Exception as e:
+            if len(batch) > 1:
+                # pysqlite savepoints are unreliable, so isolate the failing job by replaying one at a time
+                logger.warning(f"SQLite group commit of {len(batch)} jobs failed, retrying individually: {e}")
+                for item in batch:
+                    await self._commit_batch([item])
+                return
+            future = batch[0][1]
+            if not future.done():
+                future.set_exception(e)
+            return
+
+        self.batches += 1
+        self.jobs += len(batch)
+        for (_, future, _), result in zip(batch, results):
+            if not future.done():
+                future.set_result(result)
+
+
+async def _run_in_context(job: WriteJob, session: AsyncSession, context: contextvars.Context) -> Any:
+    # The worker task runs every job; give each the context variables of its submitter
+    tokens = [(var, var.set(value)) for var, value in context.items()]
+    try:
+        return await job(session)
+    finally:
+        for var, token in reversed(tokens):
+            var.reset(token)
+
+
+def _lock_before_flush(session: Session, _flush_context, _instances) -> None:
+    # Explicit flushes and autoflushes (run by queries inside the sync session) both pass here
+    owner = session.info.get(WRITE_SESSION_KEY)
+    if owner is not None and owner._writer is not None and not owner._holds_write_lock:
+        # Flushes run in the AsyncSession's greenlet, which can wait on the event loop
+        await_only(owner._writer.lock.acquire())
+        owner._holds_write_lock = True
+
+
+async def commit_write(db: AsyncSession, job: WriteJob) -> Any:
+    """Run `job(session)` and commit; returns the job's result.
+
+    On a SQLiteWriteSession that has not written yet the job goes through the writer queue
+    and is group-committed with concurrent writes, so it must be safe to re-run (see
+    `SQLiteWriter.submit`). Otherwise it runs and commits on `db` itself.
+    """
+    writer = getattr(db, "_writer", None)
+    if writer is not None and writer.session_maker is not None and not db._holds_write_lock:
+        return await writer.submit(job)
+    result = await job(db)
+    await db.commit()
+    return result
+
+
+class SQLiteWriteSession(AsyncSession):
+    """AsyncSession that holds the writer lock from its first flush or DML statement until commit or rollback.
+
+    Reads never take the lock; under WAL they run concurrently with the single writer.
+    """
+
+    def __init__(self, *args, writer: Optional[SQLiteWriter] = None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._writer = writer
+        self._holds_write_lock = False
+        self.sync_session.info[WRITE_SESSION_KEY] = self
+        if not event.contains(Session, "before_flush", _lock_before_flush):
+            event.listen(Session, "before_flush", _lock_before_flush)
+
+    async def _acquire_write_lock(self) -> None:
+        if self._writer is not None and not self._holds_write_lock:
+            await self._writer.lock.acquire()
+            self._holds_write_lock = True
+
+    def _release_write_lock(self) -> None:
+        if self._holds_write_lock:
+            self._holds_write_lock = False
+            self._writer.lock.release()
+
+    async def execute(self, statement, *args, **kwargs):
+        # Core INSERT/UPDATE/DELETE (bulk upserts, imports) bypass flush but write all the same
+        if getattr(statement, "is_dml", False):
+            await self._acquire_write_lock()
+        return await super().execute(statement, *args, **kwargs)
+
+    async def commit(self) -> None:
+        await self._acquire_write_lock()
+        try:
+            await super().commit()
+        finally:
+            self._release_write_lock()
+
+    async def rollback(self) -> None:
+        try:
+            await super().rollback()
+        finally:
+            self._release_write_lock()
+
+    async def close(self) -> None:
+        try:
+            await super().close()
+        finally:
+            self._release_write_lock()
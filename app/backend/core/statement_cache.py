@@ -0,0 +1,237 @@
+"""
+Statement cache for the generated CRUD services.
+
+Every service call used to rebuild its `select(...)` construct, and `get_list` chained
+one `.where()` per filter in the order the client sent them. SQLAlchemy then had to
+regenerate the cache key for each new construct, and `?a=1&b=2` and `?b=2&a=1` compiled
+to two different statements.
+
+The builders here normalize a call to its *shape* (model, ownership check, filter
+columns in sorted order, sort column) and keep one statement per shape, with every
+value as a named bound parameter. Repeated calls reuse the same construct, including
+its memoized cache key, and hit the engine's compiled cache and asyncpg's prepared
+statement cache. Only the parameter dict differs between calls.
+
+A filter value may also be a range, e.g. `{"sale_date": {"gte": "2026-10-01", "lt": "2026-11-01"}}`.
+On the monthly partitioned tables (core/partitioning.py) a range on the partition key
+limits the scan to the matching partitions.
+"""
+
+import logging
+import operator
+from collections import OrderedDict
+from datetime import date, datetime
+from functools import lru_cache
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+from core.config import settings
+from sqlalchemy import Integer, Select, bindparam, func, inspect, select
+
+logger = logging.getLogger(__name__)
+
+Params = Dict[str, Any]
+
+IS_NULL = "is_null"
+RANGE_OPERATORS = {"gt": operator.gt, "gte": operator.ge, "lt": operator.lt, "lte": operator.le}
+
+
+class InvalidFilter(ValueError):
+    """A client filter that cannot be turned into a condition; the routers answer 400."""
+
+
+class StatementCache:
+    """LRU of immutable statements keyed by query shape."""
+
+    def __init__(self, max_entries: int = 1024, enabled: bool = True):
+        self.max_entries = max_entries
+        self.enabled = enabled
+        self._entries: "OrderedDict[Hashable, Any]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get_or_build(self, key: Hashable, builder: Callable[[], Any]) -> Any:
+        if not self.enabled:
+            return builder()
+        statement = self._entries.get(key)
+        if statement is not None:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return statement
+        self.misses += 1
+        statement = builder()
+        self._entries[key] = statement
+        if len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        return statement
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def stats(self) -> dict:
+        return {
+            "enabled": self.enabled,
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+
+statement_cache = StatementCache(settings.db_statement_cache_size, enabled=settings.db_statement_cache_enabled)
+
+
+@lru_cache(maxsize=None)
+def column_keys(model) -> frozenset:
+    """Mapped column attribute names of a model (relationships and methods are not filterable)."""
+    return frozenset(attr.key for attr in inspect(model).column_attrs)
+
+
+def _paginate(query: Select) -> Select:
+    return query.offset(bindparam("skip", type_=Integer)).limit(bindparam("limit", type_=Integer))
+
+
+def by_id_statement(model, obj_id: int, user_id: Optional[str] = None) -> Tuple[Select, Params]:
+    """SELECT one row by primary key, optionally restricted to the owning user."""
+    owned = bool(user_id)
+
+    def build() -> Select:
+        query = select(model).where(model.id == bindparam("obj_id"))
+        if owned:
+            query = query.where(model.user_id == bindparam("user_id"))
+        return query
+
+    params = {"obj_id": obj_id}
+    if owned:
+        params["user_id"] = user_id
+    return statement_cache.get_or_build((model, "by_id", owned), build), params
+
+
+def _sort_spec(model, sort: Optional[str]) -> Optional[Tuple[str, bool]]:
+    """Resolve `sort` / `-sort` to (column, descending); ("", False) means no ORDER BY."""
+    if not sort:
+        return None
+    descending = sort.startswith("-")
+    field_name = sort[1:] if descending else sort
+    if field_name not in column_keys(model):
+        # Unknown sort fields were always ignored without falling back to the default order
+        return "", False
+    return field_name, descending
+
+
+def _filter_spec(columns: frozenset, query_dict: Optional[Dict[str, Any]]) -> Tuple[Tuple[str, Any], ...]:
+    """(field, None) for an equality filter, (field, IS_NULL) for a null value, (field, operators) for a range.
+
+    Sorted by field. A null value needs its own shape: `column = :param` never matches NULL.
+    """
+    if query_dict is not None and not isinstance(query_dict, dict):
+        raise InvalidFilter("The query must be a JSON object of field conditions")
+    spec = []
+    for field in sorted(query_dict or {}):
+        if field not in columns:
+            continue
+        value = query_dict[field]
+        if isinstance(value, dict):
+            unknown = value.keys() - RANGE_OPERATORS.keys()
+            if unknown or not value:
+                found = f"unknown operators {', '.join(sorted(unknown))}" if unknown else "no operators"
+                raise InvalidFilter(f"Range filter on {field} has {found}; use {', '.join(RANGE_OPERATORS)}")
+            spec.append((field, tuple(sorted(value))))
+        elif value is None:
+            spec.append((field, IS_NULL))
+        else:
+            spec.append((field, None))
+    return tuple(spec)
+
+
+def _range_value(model, field: str, value: Any) -> Any:
+    """Check a range bound against the column type, parsing ISO strings for date/datetime columns.
+
+    Their bind processors only accept Python objects. Raises InvalidFilter for a bound
+    the column cannot be compared with.
+    """
+    try:
+        python_type = getattr(model, field).type.python_type
+    except NotImplementedError:
+        return value
+    if python_type in (datetime, date):
+        if not isinstance(value, str):
+            raise InvalidFilter(f"{field} bounds must be ISO 8601 strings, got {value!r}")
+        try:
+            return python_type.fromisoformat(value)
+        except ValueError:
+            raise InvalidFilter(f"Invalid {python_type.__name__} for {field}: {value!r}") from None
+    if python_type in (int, float) and (isinstance(value, bool) or not isinstance(value, (int, float))):
+        raise InvalidFilter(f"{field} bounds must be numbers, got {value!r}")
+    return value
+
+
+def list_statements(
+    model,
+    skip: int,
+    limit: int,
+    user_id: Optional[str] = None,
+    query_dict: Optional[Dict[str, Any]] = None,
+    sort: Optional[str] = None,
+) -> Tuple[Select, Select, Params]:
+    """Paginated SELECT and matching COUNT for `get_list`, sharing one parameter dict."""
+    owned = bool(user_id)
+    # Sorted so the same filter set maps to one statement regardless of query string order
+    filters = _filter_spec(column_keys(model), query_dict)
+    sort_spec = _sort_spec(model, sort)
+
+    def build() -> Tuple[Select, Select]:
+        conditions = []
+        for field, operators in filters:
+            column = getattr(model, field)
+            if operators is None:
+                conditions.append(column == bindparam(f"f_{field}"))
+            elif operators == IS_NULL:
+                conditions.append(column.is_(None))
+            else:
+                conditions.extend(RANGE_OPERATORS[op](column, bindparam(f"f_{field}_{op}")) for op in operators)
+        if owned:
+            conditions.insert(0, model.user_id == bindparam("user_id"))
+        query = select(model).where(*conditions)
+        count_query = select(func.count(model.id)).where(*conditions)
+        if sort_spec is None:
+            query = query.order_by(model.id.desc())
+        elif sort_spec[0]:
+            column = getattr(model, sort_spec[0])
+            query = query.order_by(column.desc() if sort_spec[1] else column)
+        return _paginate(query), count_query
+
+    params = {}
+    for field, operators in filters:
+        if operators is None:
+            params[f"f_{field}"] = query_dict[field]
+        elif operators != IS_NULL:
+            params.update((f"f_{field}_{op}", _range_value(model, field, query_dict[field][op])) for op in operators)
+    params.update(skip=skip, limit=limit)
+    if owned:
+        params["user_id"] = user_id
+    query, count_query = statement_cache.get_or_build((model, "list", owned, filters, sort_spec), build)
+    return query, count_query, params
+
+
+def by_field_statement(
+    model, field_name: str, field_value: Any, skip: Optional[int] = None, limit: Optional[int] = None
+) -> Tuple[Select, Params]:
+    """SELECT rows where one column equals a value; paginated newest first when `limit` is given."""
+    if field_name not in column_keys(model):
+        raise ValueError(f"Field {field_name} is not a column of {model.__name__}")
+    paginated = limit is not None
+    is_null = field_value is None
+
+    def build() -> Select:
+        column = getattr(model, field_name)
+        query = select(model).where(column.is_(None) if is_null else column == bindparam("value"))
+        if paginated:
+            query = _paginate(query.order_by(model.id.desc()))
+        return query
+
+    params = {} if is_null else {"value": field_value}
+    if paginated:
+        params.update(skip=skip or 0, limit=limit)
+    return statement_cache.get_or_build((model, "by_field", field_name, paginated, is_null), build), params
@@ -0,0 +1,145 @@
+"""
+Bulk upserts on a natural key.
+
+`bulk_upsert` writes each chunk of rows with one multi-row statement:
+`INSERT ... ON CONFLICT (key) DO UPDATE` on PostgreSQL and SQLite, and
+`INSERT ... ON DUPLICATE KEY UPDATE` on MySQL/MariaDB. The key columns must be covered
+by a unique index (the models' `uq_*` indexes). Rows are grouped by the columns they
+carry, one statement per group, so on conflict only the columns a row sent are
+overwritten. For tables with a change feed, the ids of the written rows come back
+through RETURNING and are recorded in the feed: PostgreSQL tells inserts from updates
+by `xmax`, SQLite by one key lookup before the statement. Backends without RETURNING
+look the keys up before and after the statement.
+"""
+
+import logging
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from core.change_feed import Change, is_tracked, record_changes_async
+from sqlalchemy import Table, literal, literal_column, select, tuple_
+
+logger = logging.getLogger(__name__)
+
+# Bound parameters per statement; PostgreSQL allows 32767 and SQLite (3.32+) 32766
+MAX_BIND_PARAMS = 30000
+
+
+def upsert_statement(table: Table, rows: List[Dict[str, Any]], key_columns: Sequence[str], dialect_name: str):
+    """Build one multi-row upsert for `rows`, which must all have the same keys."""
+    update_columns = [column for column in rows[0] if column not in key_columns]
+    if dialect_name in ("mysql", "mariadb"):
+        from sqlalchemy.dialects.mysql import insert
+
+        statement = insert(table).values(rows)
+        # Re-assigning a key column turns "no columns to update" into a no-op update
+        columns = update_columns or list(key_columns[:1])
+        return statement.on_duplicate_key_update({column: statement.inserted[column] for column in columns})
+    if dialect_name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    elif dialect_name == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert
+    else:
+        raise NotImplementedError(f"Bulk upsert is not supported on {dialect_name}")
+
+    statement = insert(table).values(rows)
+    if not update_columns:
+        return statement.on_conflict_do_nothing(index_elements=list(key_columns))
+    return statement.on_conflict_do_update(
+        index_elements=list(key_columns),
+        set_={column: statement.excluded[column] for column in update_columns},
+    )
+
+
+def _key(row: Dict[str, Any], key_columns: Sequence[str]) -> tuple:
+    return tuple(row[column] for column in key_columns)
+
+
+async def _ids_by_key(
+    db, table: Table, rows: List[Dict[str, Any]], key_columns: Sequence[str]
+) -> Dict[tuple, Tuple[int, Optional[str]]]:
+    """Map the keys of `rows` that exist in `table` to the row's (id, user_id)."""
+    if not rows:
+        return {}
+    columns = [table.c[column] for column in key_columns]
+    if len(columns) == 1:
+        condition = columns[0].in_([row[key_columns[0]] for row in rows])
+    else:
+        condition = tuple_(*columns).in_([_key(row, key_columns) for row in rows])
+    user_id = table.c.get("user_id")
+    query = select(table.c.id, user_id if user_id is not None else literal(None), *columns).where(condition)
+    return {tuple(found[2:]): (found[0], found[1]) for found in (await db.execute(query)).all()}
+
+
+async def _write_tracked(db, table: Table, statement, rows: List[Dict[str, Any]], key_columns: Sequence[str]) -> List[Change]:
+    """Execute an upsert of `rows` and return the change feed entries of the rows it wrote."""
+    dialect = db.get_bind().dialect
+    user_id = table.c.get("user_id")
+    owner = user_id if user_id is not None else literal(None)
+    if dialect.name == "postgresql":
+        # xmax is 0 only in row versions this statement inserted
+        result = await db.execute(statement.returning(table.c.id, owner, literal_column("xmax = 0")))
+        return [(row_id, owner_id, "insert" if inserted else "update") for row_id, owner_id, inserted in result]
+    if dialect.insert_returning and dialect.name not in ("mysql", "mariadb"):
+        existing = await _ids_by_key(db, table, rows, key_columns)
+        result = await db.execute(statement.returning(table.c.id, owner, *(table.c[column] for column in key_columns)))
+        return [
+            (found[0], found[1], "update" if tuple(found[2:]) in existing else "insert")
+            for found in result
+        ]
+    existing = await _ids_by_key(db, table, rows, key_columns)
+    await db.execute(statement)
+    inserted = await _ids_by_key(db, table, [row for row in rows if _key(row, key_columns) not in existing], key_columns)
+    return [
+        (row_id, owner_id, operation)
+        for ids, operation in ((existing, "update"), (inserted, "insert"))
+        for row_id, owner_id in ids.values()
+    ]
+
+
+async def _upsert(db, table: Table, rows: List[Dict[str, Any]], key_columns: Sequence[str],
+                  track: bool) -> Tuple[int, List[Change]]:
+    unique_rows = list({_key(row, key_columns): row for row in rows}.values())
+    groups: Dict[frozenset, List[Dict[str, Any]]] = {}
+    for row in unique_rows:
+        groups.setdefault(frozenset(row), []).append(row)
+    dialect_name = db.get_bind().dialect.name
+    changes: List[Change] = []
+    statements = 0
+    for group in groups.values():
+        chunk_size = max(1, MAX_BIND_PARAMS // len(group[0]))
+        for start in range(0, len(group), chunk_size):
+            chunk = group[start:start + chunk_size]
+            statement = upsert_statement(table, chunk, key_columns, dialect_name)
+            if track:
+                written = await _write_tracked(db, table, statement, chunk, key_columns)
+                await record_changes_async(db, table, written)
+                changes.extend(written)
+            else:
+                await db.execute(statement)
+            statements += 1
+    logger.debug("Upserted %d rows into %s in %d statements", len(unique_rows), table.name, statements)
+    return len(unique_rows), changes
+
+
+async def bulk_upsert(db, table: Table, rows: List[Dict[str, Any]], key_columns: Sequence[str]) -> int:
+    """Insert or update `rows` matched on `key_columns`; returns the number of distinct keys written.
+
+    A key that appears more than once keeps its last row, since one statement may not
+    update the same row twice. Columns missing from a row are left unchanged on update.
+    The caller commits.
+    """
+    if not rows:
+        return 0
+    count, _ = await _upsert(db, table, rows, key_columns, is_tracked(table))
+    return count
+
+
+async def bulk_upsert_counts(
+    db, table: Table, rows: List[Dict[str, Any]], key_columns: Sequence[str]
+) -> Tuple[int, int]:
+    """`bulk_upsert` that returns (inserted, updated); rows left as they were are in neither."""
+    if not rows:
+        return 0, 0
+    _, changes = await _upsert(db, table, rows, key_columns, True)
+    inserted = sum(1 for _, _, operation in changes if operation == "insert")
+    return inserted, len(changes) - inserted
@@ -3,6 +3,7 @@ import logging
 from datetime import datetime
 from typing import Optional
 
+from core.audit import set_audit_actor
 from core.auth import AccessTokenError, decode_access_token
 from fastapi import Depends, HTTPException, Request, status
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
@@ -24,8 +25,8 @@ async def get_bearer_token(
     raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Authentication credentials were not provided")
 
 
-async def get_current_user(token: str = Depends(get_bearer_token)) -> UserResponse:
-    """Dependency to get current authenticated user via JWT token."""
+async def get_current_user(token: str = Depends(get_bearer_token), request: Request = None) -> UserResponse:
+    """Dependency to get current authenticated user via JWT token; also the actor of the request's audit records."""
     try:
         payload = decode_access_token(token)
     except AccessTokenError as exc:
@@ -47,6 +48,8 @@ async def get_current_user(token: str = Depends(get_bearer_token)) -> UserRespon
             user_hash = hashlib.sha256(str(user_id).encode()).hexdigest()[:8] if user_id else "unknown"
             logger.debug("Failed to parse last_login for user hash: %s", user_hash)
 
+    client = request.client if request is not None else None
+    set_audit_actor(str(user_id), client.host if client else None)
     return UserResponse(
         id=user_id,
         email=payload.get("email", ""),
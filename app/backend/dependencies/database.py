@@ -1,8 +1,11 @@
 from typing import Annotated
 
-from core.database import get_db
+from core.database import get_db, get_read_db
 from fastapi import Depends
 from sqlalchemy.ext.asyncio import AsyncSession
 
 # Database session dependency
 DbSession = Annotated[AsyncSession, Depends(get_db)]
+
+# Read-only session dependency (read replica when configured)
+ReadDbSession = Annotated[AsyncSession, Depends(get_read_db)]
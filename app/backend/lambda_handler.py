@@ -4,14 +4,27 @@ This handler simulates Nginx routing logic within Lambda
 """
 import asyncio
 import base64
+import gzip
+import hashlib
 import json
 import logging
 import os
+import re
+import time
 import traceback
 from typing import Any, Dict
 from urllib.parse import unquote
 
-from mangum import Mangum
+# Cold-start timing: measured from module import to the first backend response
+_module_loaded_at = time.perf_counter()
+cold_start_ms = None
+
+from mangum import Mangum  # noqa: E402
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - optional dependency, gzip is used instead
+    brotli = None
 
 # Configure logging
 logger = logging.getLogger()
@@ -28,6 +41,11 @@ backend_app = None
 mangum_handler = None
 services_initialized = False
 
+# Persistent runtime mode: one event loop per container, reused by every invocation so pooled
+# database connections (bound to the loop they were opened on) survive between requests
+PERSISTENT_RUNTIME = os.environ.get("LAMBDA_PERSISTENT_RUNTIME", "").lower() in ("true", "1", "yes")
+runtime_loop = None
+
 # Dynamic route registry - initialized on first request
 dynamic_routes_initialized = False
 seo_paths = set()
@@ -35,6 +53,43 @@ seo_paths = set()
 # SEO domain placeholder - will be replaced with actual request domain at runtime
 SEO_DOMAIN_PLACEHOLDER = "https://atoms.template.com"
 
+# Static asset cache - frontend/dist is read-only in Lambda, so files are loaded once per container
+FRONTEND_DIST_PATH = "/var/task/frontend/dist"
+MAX_CACHED_ASSET_BYTES = 5 * 1024 * 1024  # Larger files are read from disk on demand
+MIN_COMPRESS_BYTES = 1024
+BROTLI_QUALITY = 9  # 11 is noticeably slower on the first request for little gain on JS bundles
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+# Vite emits content-hashed names such as /assets/index-B3x9_kQa.js
+HASHED_ASSET_PATTERN = re.compile(r"^/assets/.+[-.][A-Za-z0-9_-]{8,}\.[A-Za-z0-9]+$")
+asset_cache: Dict[str, "CachedAsset"] = {}
+asset_cache_initialized = False
+# Rendered copies of SEO pages per request domain, keyed by (path, domain)
+rendered_asset_cache: Dict[tuple, "CachedAsset"] = {}
+MAX_RENDERED_ASSETS = 256
+
+CONTENT_TYPES = {
+    ".html": "text/html",
+    ".js": "application/javascript",
+    ".mjs": "application/javascript",
+    ".css": "text/css",
+    ".json": "application/json",
+    ".xml": "application/xml",
+    ".txt": "text/plain",
+    ".webmanifest": "application/manifest+json",
+    ".png": "image/png",
+    ".jpg": "image/jpeg",
+    ".jpeg": "image/jpeg",
+    ".gif": "image/gif",
+    ".ico": "image/x-icon",
+    ".svg": "image/svg+xml",
+    ".webp": "image/webp",
+    ".woff": "font/woff",
+    ".woff2": "font/woff2",
+    ".ttf": "font/ttf",
+    ".eot": "application/vnd.ms-fontobject",
+}
+COMPRESSIBLE_TYPES = ("text/", "application/javascript", "application/json", "application/xml", "image/svg+xml")
+
 
 def format_traceback() -> str:
     """Format traceback with newlines replaced by '\\n' string literal"""
@@ -65,16 +120,161 @@ def initialize_dynamic_routes():
                     # Only register SEO paths
                     if url_path == "/blog" or url_path.startswith("/blog/"):
                         seo_paths.add(url_path)
-                        logger.info(f"Registered SEO route: {url_path}")
+                        logger.info("Registered SEO route: %s", url_path)
         
         dynamic_routes_initialized = True
-        logger.info(f"Dynamic routes initialized: seo_paths={len(seo_paths)}")
+        logger.info("Dynamic routes initialized: seo_paths=%s", len(seo_paths))
         
     except Exception as e:
         logger.error(f"Failed to initialize dynamic routes: {e}\n{format_traceback()}")
         dynamic_routes_initialized = True
 
 
+class CachedAsset:
+    """A static file held in memory with its response bodies; compressed ones are built on first use."""
+
+    def __init__(self, content: bytes, content_type: str, cache_control: str):
+        self.content_type = content_type
+        self.cache_control = cache_control
+        self.etag = '"' + hashlib.sha256(content).hexdigest()[:32] + '"'
+        # Body as sent without Content-Encoding: raw text, or base64 for binaries
+        self.is_text = False
+        if content_type.startswith(COMPRESSIBLE_TYPES):
+            try:
+                self.body = content.decode("utf-8")
+                self.is_text = True
+            except UnicodeDecodeError:
+                pass
+        if not self.is_text:
+            self.body = base64.b64encode(content).decode("utf-8")
+        self.compressible = len(content) >= MIN_COMPRESS_BYTES and content_type.startswith(COMPRESSIBLE_TYPES)
+        # Compressed variants, base64-encoded; None for an encoding that does not make the file smaller
+        self._encoded_bodies: Dict[str, "str | None"] = {}
+
+    def encoded_body(self, encoding: str) -> "str | None":
+        """The body compressed with `encoding` ("br" or "gzip"), computed on the first request for it."""
+        if not self.compressible or (encoding == "br" and brotli is None):
+            return None
+        if encoding not in self._encoded_bodies:
+            content = self.body.encode("utf-8") if self.is_text else base64.b64decode(self.body)
+            if encoding == "br":
+                compressed = brotli.compress(content, quality=BROTLI_QUALITY)
+            else:
+                compressed = gzip.compress(content, compresslevel=9, mtime=0)
+            self._encoded_bodies[encoding] = (
+                base64.b64encode(compressed).decode("utf-8") if len(compressed) < len(content) else None
+            )
+        return self._encoded_bodies[encoding]
+
+
+def get_header(headers: Dict[str, Any], name: str) -> str:
+    """Case-insensitive header lookup (API Gateway v1 keeps the client's casing)."""
+    if not headers:
+        return ""
+    value = headers.get(name)
+    if value is None:
+        value = next((v for k, v in headers.items() if k.lower() == name), "")
+    return value or ""
+
+
+def is_hashed_asset(path: str) -> bool:
+    return bool(HASHED_ASSET_PATTERN.match(path))
+
+
+def load_asset(path: str) -> "CachedAsset | None":
+    """Read a file under frontend/dist into a CachedAsset, or None if it is missing or too large."""
+    file_path = os.path.join(FRONTEND_DIST_PATH, path.lstrip("/"))
+    try:
+        if os.path.getsize(file_path) > MAX_CACHED_ASSET_BYTES:
+            return None
+        with open(file_path, "rb") as f:
+            content = f.read()
+    except OSError:
+        return None
+
+    content_type = CONTENT_TYPES.get(os.path.splitext(path)[1].lower(), "application/octet-stream")
+    cache_control = IMMUTABLE_CACHE_CONTROL if is_hashed_asset(path) else "no-cache"
+    return CachedAsset(content, content_type, cache_control)
+
+
+def initialize_asset_cache():
+    """Load every file in frontend/dist into memory (cold start only); compression waits for the first request"""
+    global asset_cache_initialized
+
+    if asset_cache_initialized:
+        return
+
+    start_time = time.perf_counter()
+    try:
+        if os.path.exists(FRONTEND_DIST_PATH):
+            for root, dirs, files in os.walk(FRONTEND_DIST_PATH):
+                for name in files:
+                    rel_path = os.path.relpath(os.path.join(root, name), FRONTEND_DIST_PATH)
+                    url_path = "/" + rel_path.replace(os.sep, "/")
+                    asset = load_asset(url_path)
+                    if asset is not None:
+                        asset_cache[url_path] = asset
+        logger.info(
+            "Asset cache initialized: %s files in %.1fms", len(asset_cache), (time.perf_counter() - start_time) * 1000
+        )
+    except Exception as e:
+        logger.error(f"Failed to initialize asset cache: {e}\n{format_traceback()}")
+    finally:
+        asset_cache_initialized = True
+
+
+def get_rendered_asset(path: str, request_domain: str) -> "CachedAsset | None":
+    """Return the cached asset, with the SEO placeholder domain replaced when present."""
+    asset = asset_cache.get(path)
+    if asset is None or not asset.is_text or not request_domain or SEO_DOMAIN_PLACEHOLDER not in asset.body:
+        return asset
+
+    key = (path, request_domain)
+    rendered = rendered_asset_cache.get(key)
+    if rendered is None:
+        if len(rendered_asset_cache) >= MAX_RENDERED_ASSETS:
+            rendered_asset_cache.clear()
+        content = replace_seo_domain(asset.body, request_domain).encode("utf-8")
+        rendered = CachedAsset(content, asset.content_type, asset.cache_control)
+        rendered_asset_cache[key] = rendered
+    return rendered
+
+
+def build_asset_response(asset: CachedAsset, headers: Dict[str, Any] = None) -> Dict[str, Any]:
+    """Build a Lambda response for a cached asset, honouring If-None-Match and Accept-Encoding."""
+    response_headers = {
+        "Content-Type": asset.content_type,
+        "Access-Control-Allow-Origin": "*",
+        "Cache-Control": asset.cache_control,
+        "ETag": asset.etag,
+    }
+    if asset.compressible:
+        response_headers["Vary"] = "Accept-Encoding"
+
+    if_none_match = get_header(headers, "if-none-match")
+    if if_none_match and (if_none_match.strip() == "*" or asset.etag in [t.strip() for t in if_none_match.split(",")]):
+        return {"statusCode": 304, "headers": response_headers, "body": ""}
+
+    accept_encoding = get_header(headers, "accept-encoding").lower()
+    for encoding in ("br", "gzip"):
+        body = asset.encoded_body(encoding) if encoding in accept_encoding else None
+        if body is not None:
+            response_headers["Content-Encoding"] = encoding
+            return {
+                "statusCode": 200,
+                "headers": response_headers,
+                "body": body,
+                "isBase64Encoded": True,
+            }
+
+    return {
+        "statusCode": 200,
+        "headers": response_headers,
+        "body": asset.body,
+        "isBase64Encoded": not asset.is_text,
+    }
+
+
 async def initialize_services_once():
     """Initialize all services once for the Lambda function (equivalent to FastAPI lifespan startup)"""
     global services_initialized
@@ -92,12 +292,19 @@ async def initialize_services_once():
             from services.database import initialize_database
             from services.mock_data import initialize_mock_data
             from services.auth import initialize_admin_user
+            from services.audit import initialize_audit_trail
             # MODULE_IMPORTS_END
 
             # MODULE_STARTUP_START
             await initialize_database()
             await initialize_mock_data()
             await initialize_admin_user()
+            # A background flush needs the persistent event loop, and even then only runs during
+            # invocations; handle_backend_request_sync flushes after each one either way
+            await initialize_audit_trail(background=PERSISTENT_RUNTIME)
+            # The live event stream is not started: API Gateway buffers whole responses, so
+            # /api/v1/stream/events cannot stream from Lambda and answers 503 there.
+            # Notification, change feed and partition maintenance tasks skip themselves on Lambda.
             # MODULE_STARTUP_END
 
             services_initialized = True
@@ -169,8 +376,9 @@ def lambda_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
     AWS Lambda handler function that simulates Nginx routing
     """
     try:
-        # Initialize dynamic routes on first request (cold start)
+        # Initialize dynamic routes and the static asset cache on first request (cold start)
         initialize_dynamic_routes()
+        initialize_asset_cache()
         
         # Extract request information from the event
         # Support both API Gateway v1 and v2 event formats
@@ -245,22 +453,22 @@ def lambda_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
             (".js", ".css", ".png", ".jpg", ".jpeg", ".gif", ".ico", ".svg", ".woff", ".woff2", ".ttf", ".eot")
         ):
             # Serve static files
-            return serve_static_file(path)
+            return serve_static_file(path, headers)
         
         elif path == "/sitemap.xml":
-            return serve_sitemap(request_domain)
+            return serve_sitemap(request_domain, headers)
         
         elif path == "/robots.txt":
-            return serve_robots()
+            return serve_robots(headers)
         
         # Dynamically registered routes: SEO HTML pages (only if exact path is registered)
         # Normalize path by removing trailing slash for matching
         elif path.rstrip("/") in seo_paths:
-            return serve_seo_html(path, request_domain)
+            return serve_seo_html(path, request_domain, headers)
         
         else:
             # Route to frontend (SPA) - ALL other paths go to frontend
-            result = serve_frontend()
+            result = serve_frontend(headers)
             return result
 
     except Exception as e:
@@ -273,10 +481,26 @@ def lambda_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
         }
 
 
+def get_runtime_loop() -> asyncio.AbstractEventLoop:
+    """Get or create the container-wide event loop used in persistent runtime mode"""
+    global runtime_loop
+
+    if runtime_loop is None or runtime_loop.is_closed():
+        runtime_loop = asyncio.new_event_loop()
+        # Mangum runs each invocation on the current event loop, so this makes it reuse ours
+        asyncio.set_event_loop(runtime_loop)
+        logger.info("Created persistent Lambda event loop")
+    return runtime_loop
+
+
 def handle_backend_request_sync(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
     """Handle backend API requests using Mangum (synchronous wrapper)"""
+    if PERSISTENT_RUNTIME:
+        loop = get_runtime_loop()
+        if not services_initialized:
+            loop.run_until_complete(initialize_services_once())
     # Initialize services if not already done
-    if not services_initialized:
+    elif not services_initialized:
         try:
             # Try to get existing event loop
             loop = asyncio.get_event_loop()
@@ -304,22 +528,31 @@ def handle_backend_request_sync(event: Dict[str, Any], context: Any) -> Dict[str
 
     # Call Mangum handler
     result = mangum_handler(event, context)
+
+    # There is no shutdown hook on Lambda and a frozen container runs no background tasks,
+    # so whatever the invocation captured is written before returning
+    from services.audit import flush_audit_trail
+
+    try:
+        # Mangum ran the request on the current event loop
+        flush_loop = loop if PERSISTENT_RUNTIME else asyncio.get_event_loop()
+        flush_loop.run_until_complete(flush_audit_trail())
+    except Exception as e:
+        logger.error(f"Failed to flush the audit trail: {e}\n{format_traceback()}")
+
+    global cold_start_ms
+    if cold_start_ms is None:
+        cold_start_ms = (time.perf_counter() - _module_loaded_at) * 1000
+        logger.info("Cold start completed in %.1fms", cold_start_ms)
     return result
 
 
-def serve_frontend() -> Dict[str, Any]:
+def serve_frontend(headers: Dict[str, Any] = None) -> Dict[str, Any]:
     """Serve the frontend HTML"""
-    # Try to read the built frontend HTML
-    html_path = "/var/task/frontend/dist/index.html"
-    if os.path.exists(html_path):
-        with open(html_path, "r", encoding="utf-8") as f:
-            html_content = f.read()
-        response = {
-            "statusCode": 200,
-            "headers": {"Content-Type": "text/html", "Access-Control-Allow-Origin": "*"},
-            "body": html_content,
-        }
-        return response
+    # Serve the built frontend HTML from the asset cache
+    asset = asset_cache.get("/index.html")
+    if asset is not None:
+        return build_asset_response(asset, headers)
     else:
         # Fallback to a simple HTML response
         html_content = """
@@ -363,36 +596,29 @@ def serve_frontend() -> Dict[str, Any]:
         }
 
 
-def serve_static_file(path: str) -> Dict[str, Any]:
+def serve_static_file(path: str, headers: Dict[str, Any] = None) -> Dict[str, Any]:
     """Serve static files"""
-    # Map file extensions to content types
-    content_types = {
-        ".js": "application/javascript",
-        ".css": "text/css",
-        ".png": "image/png",
-        ".jpg": "image/jpeg",
-        ".jpeg": "image/jpeg",
-        ".gif": "image/gif",
-        ".ico": "image/x-icon",
-        ".svg": "image/svg+xml",
-    }
-
-    # Get file extension
-    ext = os.path.splitext(path)[1].lower()
-    content_type = content_types.get(ext, "application/octet-stream")
-
-    # Try to read the file
-    file_path = f"/var/task/frontend/dist{path}"
-    if os.path.exists(file_path):
+    asset = asset_cache.get(path)
+    if asset is None and not asset_cache_initialized:
+        asset = load_asset(path)
+    if asset is not None:
+        return build_asset_response(asset, headers)
+
+    # Files too large for the cache are read from disk on demand
+    file_path = f"{FRONTEND_DIST_PATH}{path}"
+    if ".." not in path and os.path.exists(file_path):
+        content_type = CONTENT_TYPES.get(os.path.splitext(path)[1].lower(), "application/octet-stream")
         with open(file_path, "rb") as f:
             content = f.read()
         return {
             "statusCode": 200,
-            "headers": {"Content-Type": content_type, "Access-Control-Allow-Origin": "*"},
-            "body": content.decode("utf-8")
-            if content_type.startswith("text/")
-            else base64.b64encode(content).decode("utf-8"),
-            "isBase64Encoded": not content_type.startswith("text/"),
+            "headers": {
+                "Content-Type": content_type,
+                "Access-Control-Allow-Origin": "*",
+                "Cache-Control": IMMUTABLE_CACHE_CONTROL if is_hashed_asset(path) else "no-cache",
+            },
+            "body": base64.b64encode(content).decode("utf-8"),
+            "isBase64Encoded": True,
         }
     else:
         return {
@@ -500,7 +726,7 @@ def sanitize_config(config: dict) -> dict:
                 if isinstance(url, str) and (url.startswith("http://") or url.startswith("https://")):
                     sanitized[key] = url
                 else:
-                    logger.debug(f"Invalid API_BASE_URL format: {url}")
+                    logger.debug("Invalid API_BASE_URL format: %s", url)
                     sanitized[key] = "http://127.0.0.1:8000"  # Safe fallback
             else:
                 sanitized[key] = config[key]
@@ -515,64 +741,44 @@ def replace_seo_domain(content: str, request_domain: str) -> str:
     return content
 
 
-def serve_sitemap(request_domain: str = "") -> Dict[str, Any]:
+def serve_sitemap(request_domain: str = "", headers: Dict[str, Any] = None) -> Dict[str, Any]:
     """Serve sitemap.xml file"""
-    sitemap_path = "/var/task/frontend/dist/sitemap.xml"
-    if not os.path.exists(sitemap_path):
+    asset = get_rendered_asset("/sitemap.xml", request_domain)
+    if asset is None:
         return {"statusCode": 404, "headers": {"Content-Type": "text/plain", "Access-Control-Allow-Origin": "*"}, "body": "sitemap.xml not found"}
-    
+
     try:
-        with open(sitemap_path, "r", encoding="utf-8") as f:
-            content = replace_seo_domain(f.read(), request_domain)
-        
-        return {
-            "statusCode": 200,
-            "headers": {"Content-Type": "application/xml", "Access-Control-Allow-Origin": "*", "Cache-Control": "no-cache"},
-            "body": content,
-        }
+        return build_asset_response(asset, headers)
     except Exception as e:
-        logger.error(f"Failed to read sitemap.xml: {e}")
+        logger.error(f"Failed to serve sitemap.xml: {e}")
         return {"statusCode": 500, "headers": {"Content-Type": "text/plain", "Access-Control-Allow-Origin": "*"}, "body": "Internal server error"}
 
 
-def serve_robots() -> Dict[str, Any]:
+def serve_robots(headers: Dict[str, Any] = None) -> Dict[str, Any]:
     """Serve robots.txt file"""
-    robots_path = "/var/task/frontend/dist/robots.txt"
-    if not os.path.exists(robots_path):
+    asset = asset_cache.get("/robots.txt")
+    if asset is None:
         return {"statusCode": 404, "headers": {"Content-Type": "text/plain", "Access-Control-Allow-Origin": "*"}, "body": "robots.txt not found"}
-    
+
     try:
-        with open(robots_path, "r", encoding="utf-8") as f:
-            content = f.read()
-        
-        return {
-            "statusCode": 200,
-            "headers": {"Content-Type": "text/plain", "Access-Control-Allow-Origin": "*", "Cache-Control": "no-cache"},
-            "body": content,
-        }
+        return build_asset_response(asset, headers)
     except Exception as e:
-        logger.error(f"Failed to read robots.txt: {e}")
+        logger.error(f"Failed to serve robots.txt: {e}")
         return {"statusCode": 500, "headers": {"Content-Type": "text/plain", "Access-Control-Allow-Origin": "*"}, "body": "Internal server error"}
 
 
-def serve_seo_html(path: str, request_domain: str = "") -> Dict[str, Any]:
+def serve_seo_html(path: str, request_domain: str = "", headers: Dict[str, Any] = None) -> Dict[str, Any]:
     """Serve SEO HTML files from index.html"""
-    html_path = f"/var/task/frontend/dist{path.rstrip('/')}/index.html"
-    
-    if not os.path.exists(html_path):
+    asset_path = f"{path.rstrip('/')}/index.html"
+    asset = get_rendered_asset(asset_path, request_domain)
+
+    if asset is None:
         return {"statusCode": 404, "headers": {"Content-Type": "text/html", "Access-Control-Allow-Origin": "*"}, "body": "<html><body><h1>404 Not Found</h1></body></html>"}
-    
+
     try:
-        with open(html_path, "r", encoding="utf-8") as f:
-            content = replace_seo_domain(f.read(), request_domain)
-        
-        return {
-            "statusCode": 200,
-            "headers": {"Content-Type": "text/html", "Access-Control-Allow-Origin": "*", "Cache-Control": "no-cache"},
-            "body": content,
-        }
+        return build_asset_response(asset, headers)
     except Exception as e:
-        logger.error(f"Failed to read SEO HTML file {html_path}: {e}")
+        logger.error(f"Failed to serve SEO HTML file {asset_path}: {e}")
         return {"statusCode": 500, "headers": {"Content-Type": "text/html", "Access-Control-Allow-Origin": "*"}, "body": "<html><body><h1>500 Internal Server Error</h1></body></html>"}
 
 
@@ -2,24 +2,45 @@ import importlib
 import logging
 import os
 import pkgutil
+import sys
 from contextlib import asynccontextmanager
 from datetime import datetime
+from typing import Optional
 
 from core.config import settings
+from core.logging_config import configure_logging
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.routing import APIRouter
+from middlewares.lazy_routers import LazyRouterLoader, LazyRouterMiddleware, load_router_manifest
+from middlewares.metrics import MetricsMiddleware
+from middlewares.query_stats import QueryStatsMiddleware
+from middlewares.read_your_writes import ReadYourWritesMiddleware
 
 # MODULE_IMPORTS_START
 from services.database import initialize_database, close_database
 from services.mock_data import initialize_mock_data
 from services.auth import initialize_admin_user
+from services.stream import initialize_event_stream, close_event_stream
+from services.notification_retention import start_notification_retention, stop_notification_retention
+from services.change_feed_retention import start_change_feed_retention, stop_change_feed_retention
+from services.audit import initialize_audit_trail, close_audit_trail
+from services.partitions import start_partition_maintenance, stop_partition_maintenance
 # MODULE_IMPORTS_END
 
 
 def setup_logging():
     """Configure the logging system."""
-    if os.environ.get("IS_LAMBDA") == "true":
+    if settings.is_lambda:
+        # The package is read-only and a frozen container runs no listener thread: write to stdout directly
+        configure_logging(
+            [logging.StreamHandler(sys.stdout)],
+            level=settings.log_level,
+            module_levels=settings.log_levels,
+            json_output=settings.log_format.lower() == "json",
+            debug_sample_rate=settings.log_debug_sample_rate,
+            synchronous=True,
+        )
         return
 
     # Create the logs directory
@@ -31,31 +52,22 @@ def setup_logging():
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
     log_file = f"{log_dir}/app_{timestamp}.log"
 
-    # Configure log format
-    log_format = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
-
-    # Configure the root logger
-    logging.basicConfig(
-        level=logging.DEBUG,
-        format=log_format,
-        handlers=[
-            # File handler
-            logging.FileHandler(log_file, encoding="utf-8"),
-            # Console handler
-            logging.StreamHandler(),
-        ],
+    # Records are queued on the calling thread and written as JSON lines by a listener thread
+    configure_logging(
+        [logging.FileHandler(log_file, encoding="utf-8"), logging.StreamHandler()],
+        level=settings.log_level,
+        module_levels=settings.log_levels,
+        json_output=settings.log_format.lower() == "json",
+        debug_sample_rate=settings.log_debug_sample_rate,
+        queue_size=settings.log_queue_size,
     )
 
-    # Set log levels for specific modules
-    logging.getLogger("uvicorn").setLevel(logging.DEBUG)
-    logging.getLogger("fastapi").setLevel(logging.DEBUG)
-
     # Log configuration details
     logger = logging.getLogger(__name__)
     logger.info("=== Logging system initialized ===")
-    logger.info(f"Log file: {log_file}")
-    logger.info("Log level: INFO")
-    logger.info(f"Timestamp: {timestamp}")
+    logger.info("Log file: %s", log_file)
+    logger.info("Log level: %s (overrides: %s)", settings.log_level.upper(), settings.log_levels or "none")
+    logger.info("Timestamp: %s", timestamp)
 
 
 @asynccontextmanager
@@ -67,11 +79,21 @@ async def lifespan(app: FastAPI):
     await initialize_database()
     await initialize_mock_data()
     await initialize_admin_user()
+    await initialize_audit_trail()
+    await initialize_event_stream()
+    start_notification_retention()
+    start_change_feed_retention()
+    start_partition_maintenance()
     # MODULE_STARTUP_END
 
     logger.info("=== Application startup completed successfully ===")
     yield
     # MODULE_SHUTDOWN_START
+    await stop_partition_maintenance()
+    await stop_notification_retention()
+    await stop_change_feed_retention()
+    await close_event_stream()
+    await close_audit_trail()
     await close_database()
     # MODULE_SHUTDOWN_END
 
@@ -84,6 +106,12 @@ app = FastAPI(
 )
 
 
+# Setup logging before router discovery
+setup_logging()
+# Built before the middleware so the lazy router middleware can be added inside MetricsMiddleware
+router_manifest = load_router_manifest() if settings.lazy_routers else None
+lazy_router_loader = LazyRouterLoader(app, router_manifest) if router_manifest else None
+
 # MODULE_MIDDLEWARE_START
 app.add_middleware(
     CORSMiddleware,
@@ -93,6 +121,16 @@ app.add_middleware(
     allow_headers=["*"],
     expose_headers=["*"],
 )
+if settings.query_stats_enabled:
+    app.add_middleware(QueryStatsMiddleware)
+if settings.database_read_urls:
+    app.add_middleware(ReadYourWritesMiddleware, sticky_seconds=settings.read_your_writes_seconds)
+if lazy_router_loader is not None:
+    # Routers are mounted on first use (see include_routers_from_manifest)
+    app.add_middleware(LazyRouterMiddleware, loader=lazy_router_loader)
+if settings.metrics_enabled:
+    # Added last so it is outermost and measures the full request, including the other middleware
+    app.add_middleware(MetricsMiddleware, loop_lag_interval=settings.metrics_loop_lag_interval)
 # MODULE_MIDDLEWARE_END
 
 
@@ -145,9 +183,25 @@ def include_routers_from_package(app: FastAPI, package_name: str = "routers") ->
         logger.debug("No routers discovered in package '%s'", package_name)
 
 
-# Setup logging before router discovery
-setup_logging()
-include_routers_from_package(app, "routers")
+def include_routers_from_manifest(app: FastAPI, loader: Optional[LazyRouterLoader]) -> bool:
+    """Register the routers of routers/manifest.json, importing each module on first use.
+
+    The loader's LazyRouterMiddleware is added in the middleware block, inside
+    MetricsMiddleware. Returns False when the manifest is unavailable so the caller can
+    fall back to eager discovery.
+    """
+    logger = logging.getLogger(__name__)
+
+    if loader is None:
+        return False
+
+    app.state.lazy_router_loader = loader
+    logger.info("Registered %d routers for lazy mounting", len(loader.pending))
+    return True
+
+
+if not include_routers_from_manifest(app, lazy_router_loader):
+    include_routers_from_package(app, "routers")
 
 
 @app.get("/")
@@ -198,8 +252,6 @@ def run_in_debug_mode(app: FastAPI):
 
 
 if __name__ == "__main__":
-    import sys
-
     import uvicorn
 
     # Detect if running in debugger (PyCharm, VS Code, etc.)
@@ -0,0 +1,118 @@
+"""
+Lazy router mounting.
+
+Instead of importing every module under `routers/` at startup, routers are registered
+from a prebuilt manifest (see `scripts/build_router_manifest.py`) and each module is
+imported the first time a request hits one of its path prefixes. This keeps heavy
+dependencies such as `openai` or `sse_starlette` off the cold-start path of requests
+that never touch them.
+"""
+
+import importlib
+import json
+import logging
+import threading
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from fastapi import FastAPI
+from fastapi.routing import APIRouter
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+logger = logging.getLogger(__name__)
+
+ROUTER_MANIFEST_PATH = Path(__file__).resolve().parent.parent / "routers" / "manifest.json"
+
+# Paths that need every router mounted to render correctly
+_LOAD_ALL_PATHS = ("/openapi.json", "/docs", "/redoc")
+
+
+def load_router_manifest(manifest_path: Path = ROUTER_MANIFEST_PATH) -> Optional[List[Dict[str, Any]]]:
+    """Read the router manifest, returning None when it is missing or malformed."""
+    try:
+        data = json.loads(manifest_path.read_text(encoding="utf-8"))
+    except FileNotFoundError:
+        logger.warning("Router manifest not found: %s", manifest_path)
+        return None
+    except (OSError, json.JSONDecodeError) as exc:
+        logger.warning("Failed to read router manifest %s: %s", manifest_path, exc)
+        return None
+
+    entries = data.get("routers") if isinstance(data, dict) else None
+    if not isinstance(entries, list):
+        logger.warning("Router manifest %s has no 'routers' list", manifest_path)
+        return None
+    return [entry for entry in entries if isinstance(entry, dict) and entry.get("module") and entry.get("prefixes")]
+
+
+class LazyRouterLoader:
+    """Import router modules on demand and include their routers into the app."""
+
+    def __init__(self, app: FastAPI, entries: List[Dict[str, Any]]):
+        self.app = app
+        self._lock = threading.Lock()
+        self._loaded: set[str] = set()
+        self._entries = {entry["module"]: entry for entry in entries}
+        # Longest prefix first so "/api/v1/entities/sale_items" never resolves via a shorter sibling
+        self._prefixes = sorted(
+            ((prefix.rstrip("/"), entry["module"]) for entry in entries for prefix in entry["prefixes"]),
+            key=lambda item: len(item[0]),
+            reverse=True,
+        )
+
+    @property
+    def pending(self) -> List[str]:
+        return [module for module in self._entries if module not in self._loaded]
+
+    def ensure_loaded_for_path(self, path: str) -> None:
+        if path in _LOAD_ALL_PATHS:
+            self.load_all()
+            return
+        for prefix, module_name in self._prefixes:
+            if module_name in self._loaded:
+                continue
+            if path == prefix or path.startswith(prefix + "/"):
+                self.load(module_name)
+
+    def load_all(self) -> None:
+        for module_name in self.pending:
+            self.load(module_name)
+
+    def load(self, module_name: str) -> None:
+        if module_name in self._loaded:
+            return
+        with self._lock:
+            if module_name in self._loaded:
+                return
+            entry = self._entries[module_name]
+            try:
+                module = importlib.import_module(module_name)
+            except Exception as exc:  # pragma: no cover - defensive logging
+                logger.warning("Failed to import module '%s': %s", module_name, exc)
+                self._loaded.add(module_name)
+                return
+
+            for attr_name in entry.get("attrs", ["router"]):
+                attr = getattr(module, attr_name, None)
+                routers = attr if isinstance(attr, (list, tuple)) else [attr]
+                for item in routers:
+                    if isinstance(item, APIRouter):
+                        self.app.include_router(item)
+                        logger.info("Lazily included router: %s.%s", module_name, attr_name)
+
+            # Routes changed, so any cached OpenAPI schema is stale
+            self.app.openapi_schema = None
+            self._loaded.add(module_name)
+
+
+class LazyRouterMiddleware:
+    """ASGI middleware that mounts the router for a request path before dispatching it."""
+
+    def __init__(self, app: ASGIApp, loader: LazyRouterLoader):
+        self.app = app
+        self.loader = loader
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] in ("http", "websocket") and self.loader.pending:
+            self.loader.ensure_loaded_for_path(scope.get("path", ""))
+        await self.app(scope, receive, send)
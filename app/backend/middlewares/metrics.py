@@ -0,0 +1,54 @@
+"""
+Request metrics for `/metrics`.
+
+Records latency, status and response body size per (method, route template). The
+template comes from the route Starlette matched (`scope["route"].path`, e.g.
+`/api/v1/entities/sales/{id}`), so ids never end up in label values; requests that
+match no route share one `<unmatched>` series.
+"""
+
+import time
+
+from core.metrics import UNMATCHED_ROUTE, EventLoopLagMonitor, MetricsRegistry, metrics_registry
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+
+class MetricsMiddleware:
+    def __init__(self, app: ASGIApp, registry: MetricsRegistry = metrics_registry, loop_lag_interval: float = 0.5):
+        self.app = app
+        self.registry = registry
+        self.lag_monitor = EventLoopLagMonitor(registry, loop_lag_interval) if loop_lag_interval > 0 else None
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        if self.lag_monitor is not None:
+            self.lag_monitor.ensure_started()
+
+        registry = self.registry
+        status = 500
+        size = 0
+
+        async def send_with_metrics(message: Message) -> None:
+            nonlocal status, size
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            elif message["type"] == "http.response.body":
+                size += len(message.get("body", b""))
+            await send(message)
+
+        registry.in_flight += 1
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_metrics)
+        finally:
+            registry.in_flight -= 1
+            route = scope.get("route")
+            registry.observe_request(
+                scope["method"],
+                getattr(route, "path", UNMATCHED_ROUTE),
+                status,
+                time.perf_counter() - start,
+                size,
+            )
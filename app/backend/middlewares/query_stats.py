@@ -0,0 +1,52 @@
+"""
+Per-request SQL statement counts and database time.
+
+Each HTTP request gets a fresh `RequestQueryStats` in `core.query_stats.current_query_stats`;
+the engine hooks add to it, and the response carries a `Server-Timing` header:
+
+    Server-Timing: db;dur=12.4;desc="5 queries", app;dur=31.0
+
+Browsers show these in the network panel, and load tests can read them per request.
+"""
+
+import logging
+import time
+
+from core.query_stats import RequestQueryStats, current_query_stats
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+logger = logging.getLogger(__name__)
+
+
+class QueryStatsMiddleware:
+    def __init__(self, app: ASGIApp, server_timing: bool = True):
+        self.app = app
+        self.server_timing = server_timing
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestQueryStats()
+        token = current_query_stats.set(stats)
+        start = time.perf_counter()
+
+        async def send_with_timing(message: Message) -> None:
+            if message["type"] == "http.response.start" and self.server_timing:
+                app_ms = (time.perf_counter() - start) * 1000
+                timing = f'db;dur={stats.total_ms:.1f};desc="{stats.count} queries", app;dur={app_ms:.1f}'
+                message["headers"] = list(message.get("headers", [])) + [(b"server-timing", timing.encode("latin-1"))]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            current_query_stats.reset(token)
+            logger.debug(
+                "%s %s: %d queries, %.1fms in database",
+                scope["method"],
+                scope["path"],
+                stats.count,
+                stats.total_ms,
+            )
@@ -0,0 +1,33 @@
+"""
+Read-your-writes stickiness for read replica routing.
+
+After a successful write (any non-safe HTTP method answered below 400) the response
+sets a short-lived cookie; `core.database.get_read_db` sends requests carrying it to
+the primary, so a client never reads a replica that has not caught up with its own
+change yet.
+"""
+
+from core.database import READ_YOUR_WRITES_COOKIE
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+SAFE_METHODS = ("GET", "HEAD", "OPTIONS")
+
+
+class ReadYourWritesMiddleware:
+    def __init__(self, app: ASGIApp, sticky_seconds: int = 10):
+        self.app = app
+        self.cookie = (
+            f"{READ_YOUR_WRITES_COOKIE}=1; Max-Age={sticky_seconds}; Path=/; HttpOnly; SameSite=Lax"
+        ).encode("latin-1")
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["method"] in SAFE_METHODS:
+            await self.app(scope, receive, send)
+            return
+
+        async def send_with_cookie(message: Message) -> None:
+            if message["type"] == "http.response.start" and message["status"] < 400:
+                message["headers"] = list(message.get("headers", [])) + [(b"set-cookie", self.cookie)]
+            await send(message)
+
+        await self.app(scope, receive, send_with_cookie)
@@ -1,10 +1,13 @@
 from core.database import Base
-from sqlalchemy import Column, Float, Integer, String
+from sqlalchemy import Column, Float, Index, Integer, String
 
 
 class Customers(Base):
     __tablename__ = "customers"
-    __table_args__ = {"extend_existing": True}
+    __table_args__ = (
+        Index("uq_customers_user_id_customer_code", "user_id", "customer_code", unique=True),
+        {"extend_existing": True},
+    )
 
     id = Column(Integer, primary_key=True, index=True, autoincrement=True, nullable=False)
     user_id = Column(String, nullable=False)
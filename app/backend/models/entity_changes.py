@@ -0,0 +1,38 @@
+from core.database import Base
+from sqlalchemy import BigInteger, Column, DateTime, Index, Integer, String, func, text
+
+
+class EntityChanges(Base):
+    """Change feed: one row per insert, update or delete of a tracked entity row."""
+
+    __tablename__ = "entity_changes"
+    __table_args__ = (
+        # Readers page by txid on PostgreSQL and by version elsewhere; each backend fills only its own pair
+        Index("ix_entity_changes_table_name_user_id_txid", "table_name", "user_id", "txid",
+              postgresql_where=text("txid IS NOT NULL"), sqlite_where=text("txid IS NOT NULL")),
+        Index("ix_entity_changes_table_name_txid", "table_name", "txid",
+              postgresql_where=text("txid IS NOT NULL"), sqlite_where=text("txid IS NOT NULL")),
+        Index("ix_entity_changes_table_name_user_id_version", "table_name", "user_id", "version",
+              postgresql_where=text("txid IS NULL"), sqlite_where=text("txid IS NULL")),
+        Index("ix_entity_changes_table_name_version", "table_name", "version",
+              postgresql_where=text("txid IS NULL"), sqlite_where=text("txid IS NULL")),
+        {"extend_existing": True},
+    )
+
+    version = Column(BigInteger().with_variant(Integer, "sqlite"), primary_key=True, autoincrement=True)
+    table_name = Column(String(64), nullable=False)
+    row_id = Column(Integer, nullable=False)
+    user_id = Column(String, nullable=True)
+    operation = Column(String(8), nullable=False)  # insert/update/delete
+    txid = Column(BigInteger, nullable=True)  # Writing transaction on PostgreSQL (txid_current())
+    changed_at = Column(DateTime(timezone=True), server_default=func.now())
+
+
+class EntityChangeHorizons(Base):
+    """Per table, the highest feed position removed by retention; older cursors must reload."""
+
+    __tablename__ = "entity_change_horizons"
+    __table_args__ = {"extend_existing": True}
+
+    table_name = Column(String(64), primary_key=True)
+    pruned_through = Column(BigInteger, nullable=False, default=0)
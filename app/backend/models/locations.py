@@ -1,10 +1,13 @@
 from core.database import Base
-from sqlalchemy import Boolean, Column, Integer, String
+from sqlalchemy import Boolean, Column, Index, Integer, String
 
 
 class Locations(Base):
     __tablename__ = "locations"
-    __table_args__ = {"extend_existing": True}
+    __table_args__ = (
+        Index("uq_locations_location_code", "location_code", unique=True),
+        {"extend_existing": True},
+    )
 
     id = Column(Integer, primary_key=True, index=True, autoincrement=True, nullable=False)
     location_code = Column(String, nullable=False)
@@ -1,10 +1,13 @@
 from core.database import Base
-from sqlalchemy import Column, Float, Integer, String
+from sqlalchemy import Column, Float, Index, Integer, String
 
 
 class Purchase_orders(Base):
     __tablename__ = "purchase_orders"
-    __table_args__ = {"extend_existing": True}
+    __table_args__ = (
+        Index("uq_purchase_orders_user_id_po_number", "user_id", "po_number", unique=True),
+        {"extend_existing": True},
+    )
 
     id = Column(Integer, primary_key=True, index=True, autoincrement=True, nullable=False)
     user_id = Column(String, nullable=False)
@@ -1,5 +1,7 @@
+from datetime import datetime, timezone
+
 from core.database import Base
-from sqlalchemy import Column, Float, Integer, String
+from sqlalchemy import Column, DateTime, Float, Integer, String
 
 
 class Sale_items(Base):
@@ -12,4 +14,6 @@ class Sale_items(Base):
     product_id = Column(Integer, nullable=False)
     product_name = Column(String, nullable=False)
     quantity = Column(Integer, nullable=False)
-    price = Column(Float, nullable=False)
\ No newline at end of file
+    price = Column(Float, nullable=False)
+    # Monthly partition key on PostgreSQL; set client-side so bulk inserts and schema repair need no DDL default
+    created_at = Column(DateTime(timezone=True), nullable=True, default=lambda: datetime.now(timezone.utc))
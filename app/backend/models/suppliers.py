@@ -1,10 +1,13 @@
 from core.database import Base
-from sqlalchemy import Column, Integer, String
+from sqlalchemy import Column, Index, Integer, String
 
 
 class Suppliers(Base):
     __tablename__ = "suppliers"
-    __table_args__ = {"extend_existing": True}
+    __table_args__ = (
+        Index("uq_suppliers_user_id_supplier_code", "user_id", "supplier_code", unique=True),
+        {"extend_existing": True},
+    )
 
     id = Column(Integer, primary_key=True, index=True, autoincrement=True, nullable=False)
     user_id = Column(String, nullable=False)
@@ -7,7 +7,9 @@ from fastapi import APIRouter, Body, Depends, HTTPException, Query
 from pydantic import BaseModel
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from core.database import get_db
+from core.change_feed import ChangeFeedExpired
+from core.database import get_db, get_read_db
+from core.statement_cache import InvalidFilter
 from services.accounts import AccountsService
 
 # Set up logging
@@ -50,6 +52,21 @@ class AccountsListResponse(BaseModel):
     limit: int
 
 
+class AccountsChange(BaseModel):
+    """Change feed entry (data is the current row, None for deletes)"""
+    version: int
+    operation: str
+    id: int
+    data: Optional[AccountsResponse] = None
+
+
+class AccountsChangesResponse(BaseModel):
+    """Change feed response"""
+    changes: List[AccountsChange]
+    next_since: int
+    has_more: bool
+
+
 class AccountsBatchCreateRequest(BaseModel):
     """Batch create request"""
     items: List[AccountsData]
@@ -79,10 +96,12 @@ async def query_accountss(
     skip: int = Query(0, ge=0, description="Number of records to skip"),
     limit: int = Query(20, ge=1, le=2000, description="Max number of records to return"),
     fields: str = Query(None, description="Comma-separated list of fields to return"),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ):
     """Query accountss with filtering, sorting, and pagination"""
-    logger.debug(f"Querying accountss: query={query}, sort={sort}, skip={skip}, limit={limit}, fields={fields}")
+    logger.debug(
+        "Querying accountss: query=%s, sort=%s, skip=%s, limit=%s, fields=%s", query, sort, skip, limit, fields
+    )
     
     service = AccountsService(db)
     try:
@@ -100,10 +119,12 @@ async def query_accountss(
             query_dict=query_dict,
             sort=sort,
         )
-        logger.debug(f"Found {result['total']} accountss")
+        logger.debug("Found %s accountss", result['total'])
         return result
     except HTTPException:
         raise
+    except InvalidFilter as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         logger.error(f"Error querying accountss: {str(e)}", exc_info=True)
         raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
@@ -116,10 +137,12 @@ async def query_accountss_all(
     skip: int = Query(0, ge=0, description="Number of records to skip"),
     limit: int = Query(20, ge=1, le=2000, description="Max number of records to return"),
     fields: str = Query(None, description="Comma-separated list of fields to return"),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ):
     # Query accountss with filtering, sorting, and pagination without user limitation
-    logger.debug(f"Querying accountss: query={query}, sort={sort}, skip={skip}, limit={limit}, fields={fields}")
+    logger.debug(
+        "Querying accountss: query=%s, sort=%s, skip=%s, limit=%s, fields=%s", query, sort, skip, limit, fields
+    )
 
     service = AccountsService(db)
     try:
@@ -137,23 +160,44 @@ async def query_accountss_all(
             query_dict=query_dict,
             sort=sort
         )
-        logger.debug(f"Found {result['total']} accountss")
+        logger.debug("Found %s accountss", result['total'])
         return result
     except HTTPException:
         raise
+    except InvalidFilter as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         logger.error(f"Error querying accountss: {str(e)}", exc_info=True)
         raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
 
 
+@router.get("/changes", response_model=AccountsChangesResponse)
+async def get_accountss_changes(
+    since: int = Query(None, ge=0, description="next_since of the previous response; omit to get the current version"),
+    limit: int = Query(500, ge=1, le=5000, description="Max number of changes to return"),
+    db: AsyncSession = Depends(get_read_db),
+):
+    """Inserts, updates and deletes of accountss after version `since`, oldest first"""
+    logger.debug("Fetching accounts changes since %s, limit=%s", since, limit)
+
+    service = AccountsService(db)
+    try:
+        return await service.get_changes(since, limit)
+    except ChangeFeedExpired as e:
+        raise HTTPException(status_code=410, detail=str(e))
+    except Exception as e:
+        logger.error(f"Error fetching accounts changes: {str(e)}", exc_info=True)
+        raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
+
+
 @router.get("/{id}", response_model=AccountsResponse)
 async def get_accounts(
     id: int,
     fields: str = Query(None, description="Comma-separated list of fields to return"),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ):
     """Get a single accounts by ID"""
-    logger.debug(f"Fetching accounts with id: {id}, fields={fields}")
+    logger.debug("Fetching accounts with id: %s, fields=%s", id, fields)
     
     service = AccountsService(db)
     try:
@@ -176,7 +220,7 @@ async def create_accounts(
     db: AsyncSession = Depends(get_db),
 ):
     """Create a new accounts"""
-    logger.debug(f"Creating new accounts with data: {data}")
+    logger.debug("Creating new accounts with data: %s", data)
     
     service = AccountsService(db)
     try:
@@ -184,7 +228,7 @@ async def create_accounts(
         if not result:
             raise HTTPException(status_code=400, detail="Failed to create accounts")
         
-        logger.info(f"Accounts created successfully with id: {result.id}")
+        logger.info("Accounts created successfully with id: %s", result.id)
         return result
     except ValueError as e:
         logger.error(f"Validation error creating accounts: {str(e)}")
@@ -200,7 +244,7 @@ async def create_accountss_batch(
     db: AsyncSession = Depends(get_db),
 ):
     """Create multiple accountss in a single request"""
-    logger.debug(f"Batch creating {len(request.items)} accountss")
+    logger.debug("Batch creating %s accountss", len(request.items))
     
     service = AccountsService(db)
     results = []
@@ -211,7 +255,7 @@ async def create_accountss_batch(
             if result:
                 results.append(result)
         
-        logger.info(f"Batch created {len(results)} accountss successfully")
+        logger.info("Batch created %s accountss successfully", len(results))
         return results
     except Exception as e:
         await db.rollback()
@@ -225,7 +269,7 @@ async def update_accountss_batch(
     db: AsyncSession = Depends(get_db),
 ):
     """Update multiple accountss in a single request"""
-    logger.debug(f"Batch updating {len(request.items)} accountss")
+    logger.debug("Batch updating %s accountss", len(request.items))
     
     service = AccountsService(db)
     results = []
@@ -238,7 +282,7 @@ async def update_accountss_batch(
             if result:
                 results.append(result)
         
-        logger.info(f"Batch updated {len(results)} accountss successfully")
+        logger.info("Batch updated %s accountss successfully", len(results))
         return results
     except Exception as e:
         await db.rollback()
@@ -253,7 +297,7 @@ async def update_accounts(
     db: AsyncSession = Depends(get_db),
 ):
     """Update an existing accounts"""
-    logger.debug(f"Updating accounts {id} with data: {data}")
+    logger.debug("Updating accounts %s with data: %s", id, data)
 
     service = AccountsService(db)
     try:
@@ -264,7 +308,7 @@ async def update_accounts(
             logger.warning(f"Accounts with id {id} not found for update")
             raise HTTPException(status_code=404, detail="Accounts not found")
         
-        logger.info(f"Accounts {id} updated successfully")
+        logger.info("Accounts %s updated successfully", id)
         return result
     except HTTPException:
         raise
@@ -282,7 +326,7 @@ async def delete_accountss_batch(
     db: AsyncSession = Depends(get_db),
 ):
     """Delete multiple accountss by their IDs"""
-    logger.debug(f"Batch deleting {len(request.ids)} accountss")
+    logger.debug("Batch deleting %s accountss", len(request.ids))
     
     service = AccountsService(db)
     deleted_count = 0
@@ -293,7 +337,7 @@ async def delete_accountss_batch(
             if success:
                 deleted_count += 1
         
-        logger.info(f"Batch deleted {deleted_count} accountss successfully")
+        logger.info("Batch deleted %s accountss successfully", deleted_count)
         return {"message": f"Successfully deleted {deleted_count} accountss", "deleted_count": deleted_count}
     except Exception as e:
         await db.rollback()
@@ -307,7 +351,7 @@ async def delete_accounts(
     db: AsyncSession = Depends(get_db),
 ):
     """Delete a single accounts by ID"""
-    logger.debug(f"Deleting accounts with id: {id}")
+    logger.debug("Deleting accounts with id: %s", id)
     
     service = AccountsService(db)
     try:
@@ -316,7 +360,7 @@ async def delete_accounts(
             logger.warning(f"Accounts with id {id} not found for deletion")
             raise HTTPException(status_code=404, detail="Accounts not found")
         
-        logger.info(f"Accounts {id} deleted successfully")
+        logger.info("Accounts %s deleted successfully", id)
         return {"message": "Accounts deleted successfully", "id": id}
     except HTTPException:
         raise
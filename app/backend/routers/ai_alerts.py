@@ -8,7 +8,9 @@ from fastapi import APIRouter, Body, Depends, HTTPException, Query
 from pydantic import BaseModel
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from core.database import get_db
+from core.change_feed import ChangeFeedExpired
+from core.database import get_db, get_read_db
+from core.statement_cache import InvalidFilter
 from services.ai_alerts import Ai_alertsService
 
 # Set up logging
@@ -54,6 +56,21 @@ class Ai_alertsListResponse(BaseModel):
     limit: int
 
 
+class Ai_alertsChange(BaseModel):
+    """Change feed entry (data is the current row, None for deletes)"""
+    version: int
+    operation: str
+    id: int
+    data: Optional[Ai_alertsResponse] = None
+
+
+class Ai_alertsChangesResponse(BaseModel):
+    """Change feed response"""
+    changes: List[Ai_alertsChange]
+    next_since: int
+    has_more: bool
+
+
 class Ai_alertsBatchCreateRequest(BaseModel):
     """Batch create request"""
     items: List[Ai_alertsData]
@@ -83,10 +100,12 @@ async def query_ai_alertss(
     skip: int = Query(0, ge=0, description="Number of records to skip"),
     limit: int = Query(20, ge=1, le=2000, description="Max number of records to return"),
     fields: str = Query(None, description="Comma-separated list of fields to return"),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ):
     """Query ai_alertss with filtering, sorting, and pagination"""
-    logger.debug(f"Querying ai_alertss: query={query}, sort={sort}, skip={skip}, limit={limit}, fields={fields}")
+    logger.debug(
+        "Querying ai_alertss: query=%s, sort=%s, skip=%s, limit=%s, fields=%s", query, sort, skip, limit, fields
+    )
     
     service = Ai_alertsService(db)
     try:
@@ -104,10 +123,12 @@ async def query_ai_alertss(
             query_dict=query_dict,
             sort=sort,
         )
-        logger.debug(f"Found {result['total']} ai_alertss")
+        logger.debug("Found %s ai_alertss", result['total'])
         return result
     except HTTPException:
         raise
+    except InvalidFilter as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         logger.error(f"Error querying ai_alertss: {str(e)}", exc_info=True)
         raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
@@ -120,10 +141,12 @@ async def query_ai_alertss_all(
     skip: int = Query(0, ge=0, description="Number of records to skip"),
     limit: int = Query(20, ge=1, le=2000, description="Max number of records to return"),
     fields: str = Query(None, description="Comma-separated list of fields to return"),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ):
     # Query ai_alertss with filtering, sorting, and pagination without user limitation
-    logger.debug(f"Querying ai_alertss: query={query}, sort={sort}, skip={skip}, limit={limit}, fields={fields}")
+    logger.debug(
+        "Querying ai_alertss: query=%s, sort=%s, skip=%s, limit=%s, fields=%s", query, sort, skip, limit, fields
+    )
 
     service = Ai_alertsService(db)
     try:
@@ -141,23 +164,44 @@ async def query_ai_alertss_all(
             query_dict=query_dict,
             sort=sort
         )
-        logger.debug(f"Found {result['total']} ai_alertss")
+        logger.debug("Found %s ai_alertss", result['total'])
         return result
     except HTTPException:
         raise
+    except InvalidFilter as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         logger.error(f"Error querying ai_alertss: {str(e)}", exc_info=True)
         raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
 
 
+@router.get("/changes", response_model=Ai_alertsChangesResponse)
+async def get_ai_alertss_changes(
+    since: int = Query(None, ge=0, description="next_since of the previous response; omit to get the current version"),
+    limit: int = Query(500, ge=1, le=5000, description="Max number of changes to return"),
+    db: AsyncSession = Depends(get_read_db),
+):
+    """Inserts, updates and deletes of ai_alertss after version `since`, oldest first"""
+    logger.debug("Fetching ai_alerts changes since %s, limit=%s", since, limit)
+
+    service = Ai_alertsService(db)
+    try:
+        return await service.get_changes(since, limit)
+    except ChangeFeedExpired as e:
+        raise HTTPException(status_code=410, detail=str(e))
+    except Exception as e:
+        logger.error(f"Error fetching ai_alerts changes: {str(e)}", exc_info=True)
+        raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
+
+
 @router.get("/{id}", response_model=Ai_alertsResponse)
 async def get_ai_alerts(
     id: int,
     fields: str = Query(None, description="Comma-separated list of fields to return"),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ):
     """Get a single ai_alerts by ID"""
-    logger.debug(f"Fetching ai_alerts with id: {id}, fields={fields}")
+    logger.debug("Fetching ai_alerts with id: %s, fields=%s", id, fields)
     
     service = Ai_alertsService(db)
     try:
@@ -180,7 +224,7 @@ async def create_ai_alerts(
     db: AsyncSession = Depends(get_db),
 ):
     """Create a new ai_alerts"""
-    logger.debug(f"Creating new ai_alerts with data: {data}")
+    logger.debug("Creating new ai_alerts with data: %s", data)
     
     service = Ai_alertsService(db)
     try:
@@ -188,7 +232,7 @@ async def create_ai_alerts(
         if not result:
             raise HTTPException(status_code=400, detail="Failed to create ai_alerts")
         
-        logger.info(f"Ai_alerts created successfully with id: {result.id}")
+        logger.info("Ai_alerts created successfully with id: %s", result.id)
         return result
     except ValueError as e:
         logger.error(f"Validation error creating ai_alerts: {str(e)}")
@@ -204,7 +248,7 @@ async def create_ai_alertss_batch(
     db: AsyncSession = Depends(get_db),
 ):
     """Create multiple ai_alertss in a single request"""
-    logger.debug(f"Batch creating {len(request.items)} ai_alertss")
+    logger.debug("Batch creating %s ai_alertss", len(request.items))
     
     service = Ai_alertsService(db)
     results = []
@@ -215,7 +259,7 @@ async def create_ai_alertss_batch(
             if result:
                 results.append(result)
         
-        logger.info(f"Batch created {len(results)} ai_alertss successfully")
+        logger.info("Batch created %s ai_alertss successfully", len(results))
         return results
     except Exception as e:
         await db.rollback()
@@ -229,7 +273,7 @@ async def update_ai_alertss_batch(
     db: AsyncSession = Depends(get_db),
 ):
     """Update multiple ai_alertss in a single request"""
-    logger.debug(f"Batch updating {len(request.items)} ai_alertss")
+    logger.debug("Batch updating %s ai_alertss", len(request.items))
     
     service = Ai_alertsService(db)
     results = []
@@ -242,7 +286,7 @@ async def update_ai_alertss_batch(
             if result:
                 results.append(result)
         
-        logger.info(f"Batch updated {len(results)} ai_alertss successfully")
+        logger.info("Batch updated %s ai_alertss successfully", len(results))
         return results
     except Exception as e:
         await db.rollback()
@@ -257,7 +301,7 @@ async def update_ai_alerts(
     db: AsyncSession = Depends(get_db),
 ):
     """Update an existing ai_alerts"""
-    logger.debug(f"Updating ai_alerts {id} with data: {data}")
+    logger.debug("Updating ai_alerts %s with data: %s", id, data)
 
     service = Ai_alertsService(db)
     try:
@@ -268,7 +312,7 @@ async def update_ai_alerts(
             logger.warning(f"Ai_alerts with id {id} not found for update")
             raise HTTPException(status_code=404, detail="Ai_alerts not found")
         
-        logger.info(f"Ai_alerts {id} updated successfully")
+        logger.info("Ai_alerts %s updated successfully", id)
         return result
     except HTTPException:
         raise
@@ -286,7 +330,7 @@ async def delete_ai_alertss_batch(
     db: AsyncSession = Depends(get_db),
 ):
     """Delete multiple ai_alertss by their IDs"""
-    logger.debug(f"Batch deleting {len(request.ids)} ai_alertss")
+    logger.debug("Batch deleting %s ai_alertss", len(request.ids))
     
     service = Ai_alertsService(db)
     deleted_count = 0
@@ -297,7 +341,7 @@ async def delete_ai_alertss_batch(
             if success:
                 deleted_count += 1
         
-        logger.info(f"Batch deleted {deleted_count} ai_alertss successfully")
+        logger.info("Batch deleted %s ai_alertss successfully", deleted_count)
         return {"message": f"Successfully deleted {deleted_count} ai_alertss", "deleted_count": deleted_count}
     except Exception as e:
         await db.rollback()
@@ -311,7 +355,7 @@ async def delete_ai_alerts(
     db: AsyncSession = Depends(get_db),
 ):
     """Delete a single ai_alerts by ID"""
-    logger.debug(f"Deleting ai_alerts with id: {id}")
+    logger.debug("Deleting ai_alerts with id: %s", id)
     
     service = Ai_alertsService(db)
     try:
@@ -320,7 +364,7 @@ async def delete_ai_alerts(
             logger.warning(f"Ai_alerts with id {id} not found for deletion")
             raise HTTPException(status_code=404, detail="Ai_alerts not found")
         
-        logger.info(f"Ai_alerts {id} deleted successfully")
+        logger.info("Ai_alerts %s deleted successfully", id)
         return {"message": "Ai_alerts deleted successfully", "id": id}
     except HTTPException:
         raise
@@ -7,7 +7,9 @@ from fastapi import APIRouter, Body, Depends, HTTPException, Query
 from pydantic import BaseModel
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from core.database import get_db
+from core.change_feed import ChangeFeedExpired
+from core.database import get_db, get_read_db
+from core.statement_cache import InvalidFilter
 from services.audit_logs import Audit_logsService
 from dependencies.auth import get_current_user
 from schemas.auth import UserResponse
@@ -62,6 +64,21 @@ class Audit_logsListResponse(BaseModel):
     limit: int
 
 
+class Audit_logsChange(BaseModel):
+    """Change feed entry (data is the current row, None for deletes)"""
+    version: int
+    operation: str
+    id: int
+    data: Optional[Audit_logsResponse] = None
+
+
+class Audit_logsChangesResponse(BaseModel):
+    """Change feed response"""
+    changes: List[Audit_logsChange]
+    next_since: int
+    has_more: bool
+
+
 class Audit_logsBatchCreateRequest(BaseModel):
     """Batch create request"""
     items: List[Audit_logsData]
@@ -92,10 +109,12 @@ async def query_audit_logss(
     limit: int = Query(20, ge=1, le=2000, description="Max number of records to return"),
     fields: str = Query(None, description="Comma-separated list of fields to return"),
     current_user: UserResponse = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ):
     """Query audit_logss with filtering, sorting, and pagination (user can only see their own records)"""
-    logger.debug(f"Querying audit_logss: query={query}, sort={sort}, skip={skip}, limit={limit}, fields={fields}")
+    logger.debug(
+        "Querying audit_logss: query=%s, sort=%s, skip=%s, limit=%s, fields=%s", query, sort, skip, limit, fields
+    )
     
     service = Audit_logsService(db)
     try:
@@ -114,10 +133,12 @@ async def query_audit_logss(
             sort=sort,
             user_id=str(current_user.id),
         )
-        logger.debug(f"Found {result['total']} audit_logss")
+        logger.debug("Found %s audit_logss", result['total'])
         return result
     except HTTPException:
         raise
+    except InvalidFilter as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         logger.error(f"Error querying audit_logss: {str(e)}", exc_info=True)
         raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
@@ -130,10 +151,12 @@ async def query_audit_logss_all(
     skip: int = Query(0, ge=0, description="Number of records to skip"),
     limit: int = Query(20, ge=1, le=2000, description="Max number of records to return"),
     fields: str = Query(None, description="Comma-separated list of fields to return"),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ):
     # Query audit_logss with filtering, sorting, and pagination without user limitation
-    logger.debug(f"Querying audit_logss: query={query}, sort={sort}, skip={skip}, limit={limit}, fields={fields}")
+    logger.debug(
+        "Querying audit_logss: query=%s, sort=%s, skip=%s, limit=%s, fields=%s", query, sort, skip, limit, fields
+    )
 
     service = Audit_logsService(db)
     try:
@@ -151,24 +174,46 @@ async def query_audit_logss_all(
             query_dict=query_dict,
             sort=sort
         )
-        logger.debug(f"Found {result['total']} audit_logss")
+        logger.debug("Found %s audit_logss", result['total'])
         return result
     except HTTPException:
         raise
+    except InvalidFilter as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         logger.error(f"Error querying audit_logss: {str(e)}", exc_info=True)
         raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
 
 
+@router.get("/changes", response_model=Audit_logsChangesResponse)
+async def get_audit_logss_changes(
+    since: int = Query(None, ge=0, description="next_since of the previous response; omit to get the current version"),
+    limit: int = Query(500, ge=1, le=5000, description="Max number of changes to return"),
+    current_user: UserResponse = Depends(get_current_user),
+    db: AsyncSession = Depends(get_read_db),
+):
+    """Inserts, updates and deletes of audit_logss after version `since`, oldest first (user can only see their own records)"""
+    logger.debug("Fetching audit_logs changes since %s, limit=%s", since, limit)
+
+    service = Audit_logsService(db)
+    try:
+        return await service.get_changes(since, limit, user_id=str(current_user.id))
+    except ChangeFeedExpired as e:
+        raise HTTPException(status_code=410, detail=str(e))
+    except Exception as e:
+        logger.error(f"Error fetching audit_logs changes: {str(e)}", exc_info=True)
+        raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
+
+
 @router.get("/{id}", response_model=Audit_logsResponse)
 async def get_audit_logs(
     id: int,
     fields: str = Query(None, description="Comma-separated list of fields to return"),
     current_user: UserResponse = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ):
     """Get a single audit_logs by ID (user can only see their own records)"""
-    logger.debug(f"Fetching audit_logs with id: {id}, fields={fields}")
+    logger.debug("Fetching audit_logs with id: %s, fields=%s", id, fields)
     
     service = Audit_logsService(db)
     try:
@@ -192,7 +237,7 @@ async def create_audit_logs(
     db: AsyncSession = Depends(get_db),
 ):
     """Create a new audit_logs"""
-    logger.debug(f"Creating new audit_logs with data: {data}")
+    logger.debug("Creating new audit_logs with data: %s", data)
     
     service = Audit_logsService(db)
     try:
@@ -200,7 +245,7 @@ async def create_audit_logs(
         if not result:
             raise HTTPException(status_code=400, detail="Failed to create audit_logs")
         
-        logger.info(f"Audit_logs created successfully with id: {result.id}")
+        logger.info("Audit_logs created successfully with id: %s", result.id)
         return result
     except ValueError as e:
         logger.error(f"Validation error creating audit_logs: {str(e)}")
@@ -217,7 +262,7 @@ async def create_audit_logss_batch(
     db: AsyncSession = Depends(get_db),
 ):
     """Create multiple audit_logss in a single request"""
-    logger.debug(f"Batch creating {len(request.items)} audit_logss")
+    logger.debug("Batch creating %s audit_logss", len(request.items))
     
     service = Audit_logsService(db)
     results = []
@@ -228,7 +273,7 @@ async def create_audit_logss_batch(
             if result:
                 results.append(result)
         
-        logger.info(f"Batch created {len(results)} audit_logss successfully")
+        logger.info("Batch created %s audit_logss successfully", len(results))
         return results
     except Exception as e:
         await db.rollback()
@@ -243,7 +288,7 @@ async def update_audit_logss_batch(
     db: AsyncSession = Depends(get_db),
 ):
     """Update multiple audit_logss in a single request (requires ownership)"""
-    logger.debug(f"Batch updating {len(request.items)} audit_logss")
+    logger.debug("Batch updating %s audit_logss", len(request.items))
     
     service = Audit_logsService(db)
     results = []
@@ -256,7 +301,7 @@ async def update_audit_logss_batch(
             if result:
                 results.append(result)
         
-        logger.info(f"Batch updated {len(results)} audit_logss successfully")
+        logger.info("Batch updated %s audit_logss successfully", len(results))
         return results
     except Exception as e:
         await db.rollback()
@@ -272,7 +317,7 @@ async def update_audit_logs(
     db: AsyncSession = Depends(get_db),
 ):
     """Update an existing audit_logs (requires ownership)"""
-    logger.debug(f"Updating audit_logs {id} with data: {data}")
+    logger.debug("Updating audit_logs %s with data: %s", id, data)
 
     service = Audit_logsService(db)
     try:
@@ -283,7 +328,7 @@ async def update_audit_logs(
             logger.warning(f"Audit_logs with id {id} not found for update")
             raise HTTPException(status_code=404, detail="Audit_logs not found")
         
-        logger.info(f"Audit_logs {id} updated successfully")
+        logger.info("Audit_logs %s updated successfully", id)
         return result
     except HTTPException:
         raise
@@ -302,7 +347,7 @@ async def delete_audit_logss_batch(
     db: AsyncSession = Depends(get_db),
 ):
     """Delete multiple audit_logss by their IDs (requires ownership)"""
-    logger.debug(f"Batch deleting {len(request.ids)} audit_logss")
+    logger.debug("Batch deleting %s audit_logss", len(request.ids))
     
     service = Audit_logsService(db)
     deleted_count = 0
@@ -313,7 +358,7 @@ async def delete_audit_logss_batch(
             if success:
                 deleted_count += 1
         
-        logger.info(f"Batch deleted {deleted_count} audit_logss successfully")
+        logger.info("Batch deleted %s audit_logss successfully", deleted_count)
         return {"message": f"Successfully deleted {deleted_count} audit_logss", "deleted_count": deleted_count}
     except Exception as e:
         await db.rollback()
@@ -328,7 +373,7 @@ async def delete_audit_logs(
     db: AsyncSession = Depends(get_db),
 ):
     """Delete a single audit_logs by ID (requires ownership)"""
-    logger.debug(f"Deleting audit_logs with id: {id}")
+    logger.debug("Deleting audit_logs with id: %s", id)
     
     service = Audit_logsService(db)
     try:
@@ -337,7 +382,7 @@ async def delete_audit_logs(
             logger.warning(f"Audit_logs with id {id} not found for deletion")
             raise HTTPException(status_code=404, detail="Audit_logs not found")
         
-        logger.info(f"Audit_logs {id} deleted successfully")
+        logger.info("Audit_logs %s deleted successfully", id)
         return {"message": "Audit_logs deleted successfully", "id": id}
     except HTTPException:
         raise
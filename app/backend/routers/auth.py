@@ -211,7 +211,7 @@ async def exchange_platform_token(
     logger.info("[token/exchange] Received platform token exchange request")
 
     verify_url = f"{settings.oidc_issuer_url}/platform/tokens/verify"
-    logger.debug(f"[token/exchange] Verifying token with issuer: {verify_url}")
+    logger.debug("[token/exchange] Verifying token with issuer: %s", verify_url)
 
     try:
         async with httpx.AsyncClient() as client:
@@ -220,14 +220,14 @@ async def exchange_platform_token(
                 json={"platform_token": payload.platform_token},
                 headers={"Content-Type": "application/json"},
             )
-        logger.debug(f"[token/exchange] Issuer response status: {verify_response.status_code}")
+        logger.debug("[token/exchange] Issuer response status: %s", verify_response.status_code)
     except httpx.HTTPError as exc:
         logger.error(f"[token/exchange] HTTP error verifying platform token: {exc}", exc_info=True)
         raise HTTPException(status_code=status.HTTP_502_BAD_GATEWAY, detail="Unable to verify platform token") from exc
 
     try:
         verify_body = verify_response.json()
-        logger.debug(f"[token/exchange] Issuer response body: {verify_body}")
+        logger.debug("[token/exchange] Issuer response body: %s", verify_body)
     except ValueError:
         logger.error(f"[token/exchange] Failed to parse issuer response as JSON: {verify_response.text}")
         raise HTTPException(
@@ -254,7 +254,9 @@ async def exchange_platform_token(
 
     payload_data = verify_body.get("data") or {}
     raw_user_id = payload_data.get("user_id")
-    logger.info(f"[token/exchange] Token verified, platform_user_id={raw_user_id}, email={payload_data.get('email')}")
+    logger.info(
+        "[token/exchange] Token verified, platform_user_id=%s, email=%s", raw_user_id, payload_data.get('email')
+    )
 
     if not raw_user_id:
         logger.error("[token/exchange] Platform token payload missing user_id")
@@ -279,11 +281,12 @@ async def exchange_platform_token(
 
     user = User(id=platform_user_id, email=admin_email, name=admin_name, role="admin")
     logger.debug(
-        f"[token/exchange] Admin user object for token issuance: id={user.id}, email={user.email}, role={user.role}"
+        "[token/exchange] Admin user object for token issuance: id=%s, email=%s, role=%s",
+        user.id, user.email, user.role
     )
 
     app_token, expires_at, _ = await auth_service.issue_app_token(user=user)
-    logger.info(f"[token/exchange] Token issued successfully for user_id={user.id}, expires_at={expires_at}")
+    logger.info("[token/exchange] Token issued successfully for user_id=%s, expires_at=%s", user.id, expires_at)
 
     return TokenExchangeResponse(
         token=app_token,
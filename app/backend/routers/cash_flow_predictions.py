@@ -8,7 +8,9 @@ from fastapi import APIRouter, Body, Depends, HTTPException, Query
 from pydantic import BaseModel
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from core.database import get_db
+from core.change_feed import ChangeFeedExpired
+from core.database import get_db, get_read_db
+from core.statement_cache import InvalidFilter
 from services.cash_flow_predictions import Cash_flow_predictionsService
 
 # Set up logging
@@ -48,6 +50,21 @@ class Cash_flow_predictionsListResponse(BaseModel):
     limit: int
 
 
+class Cash_flow_predictionsChange(BaseModel):
+    """Change feed entry (data is the current row, None for deletes)"""
+    version: int
+    operation: str
+    id: int
+    data: Optional[Cash_flow_predictionsResponse] = None
+
+
+class Cash_flow_predictionsChangesResponse(BaseModel):
+    """Change feed response"""
+    changes: List[Cash_flow_predictionsChange]
+    next_since: int
+    has_more: bool
+
+
 class Cash_flow_predictionsBatchCreateRequest(BaseModel):
     """Batch create request"""
     items: List[Cash_flow_predictionsData]
@@ -77,10 +94,13 @@ async def query_cash_flow_predictionss(
     skip: int = Query(0, ge=0, description="Number of records to skip"),
     limit: int = Query(20, ge=1, le=2000, description="Max number of records to return"),
     fields: str = Query(None, description="Comma-separated list of fields to return"),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ):
     """Query cash_flow_predictionss with filtering, sorting, and pagination"""
-    logger.debug(f"Querying cash_flow_predictionss: query={query}, sort={sort}, skip={skip}, limit={limit}, fields={fields}")
+    logger.debug(
+        "Querying cash_flow_predictionss: query=%s, sort=%s, skip=%s, limit=%s, fields=%s",
+        query, sort, skip, limit, fields
+    )
     
     service = Cash_flow_predictionsService(db)
     try:
@@ -98,10 +118,12 @@ async def query_cash_flow_predictionss(
             query_dict=query_dict,
             sort=sort,
         )
-        logger.debug(f"Found {result['total']} cash_flow_predictionss")
+        logger.debug("Found %s cash_flow_predictionss", result['total'])
         return result
     except HTTPException:
         raise
+    except InvalidFilter as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         logger.error(f"Error querying cash_flow_predictionss: {str(e)}", exc_info=True)
         raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
@@ -114,10 +136,13 @@ async def query_cash_flow_predictionss_all(
     skip: int = Query(0, ge=0, description="Number of records to skip"),
     limit: int = Query(20, ge=1, le=2000, description="Max number of records to return"),
     fields: str = Query(None, description="Comma-separated list of fields to return"),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ):
     # Query cash_flow_predictionss with filtering, sorting, and pagination without user limitation
-    logger.debug(f"Querying cash_flow_predictionss: query={query}, sort={sort}, skip={skip}, limit={limit}, fields={fields}")
+    logger.debug(
+        "Querying cash_flow_predictionss: query=%s, sort=%s, skip=%s, limit=%s, fields=%s",
+        query, sort, skip, limit, fields
+    )
 
     service = Cash_flow_predictionsService(db)
     try:
@@ -135,23 +160,44 @@ async def query_cash_flow_predictionss_all(
             query_dict=query_dict,
             sort=sort
         )
-        logger.debug(f"Found {result['total']} cash_flow_predictionss")
+        logger.debug("Found %s cash_flow_predictionss", result['total'])
         return result
     except HTTPException:
         raise
+    except InvalidFilter as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         logger.error(f"Error querying cash_flow_predictionss: {str(e)}", exc_info=True)
         raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
 
 
+@router.get("/changes", response_model=Cash_flow_predictionsChangesResponse)
+async def get_cash_flow_predictionss_changes(
+    since: int = Query(None, ge=0, description="next_since of the previous response; omit to get the current version"),
+    limit: int = Query(500, ge=1, le=5000, description="Max number of changes to return"),
+    db: AsyncSession = Depends(get_read_db),
+):
+    """Inserts, updates and deletes of cash_flow_predictionss after version `since`, oldest first"""
+    logger.debug("Fetching cash_flow_predictions changes since %s, limit=%s", since, limit)
+
+    service = Cash_flow_predictionsService(db)
+    try:
+        return await service.get_changes(since, limit)
+    except ChangeFeedExpired as e:
+        raise HTTPException(status_code=410, detail=str(e))
+    except Exception as e:
+        logger.error(f"Error fetching cash_flow_predictions changes: {str(e)}", exc_info=True)
+        raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
+
+
 @router.get("/{id}", response_model=Cash_flow_predictionsResponse)
 async def get_cash_flow_predictions(
     id: int,
     fields: str = Query(None, description="Comma-separated list of fields to return"),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ):
     """Get a single cash_flow_predictions by ID"""
-    logger.debug(f"Fetching cash_flow_predictions with id: {id}, fields={fields}")
+    logger.debug("Fetching cash_flow_predictions with id: %s, fields=%s", id, fields)
     
     service = Cash_flow_predictionsService(db)
     try:
@@ -174,7 +220,7 @@ async def create_cash_flow_predictions(
     db: AsyncSession = Depends(get_db),
 ):
     """Create a new cash_flow_predictions"""
-    logger.debug(f"Creating new cash_flow_predictions with data: {data}")
+    logger.debug("Creating new cash_flow_predictions with data: %s", data)
     
     service = Cash_flow_predictionsService(db)
     try:
@@ -182,7 +228,7 @@ async def create_cash_flow_predictions(
         if not result:
             raise HTTPException(status_code=400, detail="Failed to create cash_flow_predictions")
         
-        logger.info(f"Cash_flow_predictions created successfully with id: {result.id}")
+        logger.info("Cash_flow_predictions created successfully with id: %s", result.id)
         return result
     except ValueError as e:
         logger.error(f"Validation error creating cash_flow_predictions: {str(e)}")
@@ -198,7 +244,7 @@ async def create_cash_flow_predictionss_batch(
     db: AsyncSession = Depends(get_db),
 ):
     """Create multiple cash_flow_predictionss in a single request"""
-    logger.debug(f"Batch creating {len(request.items)} cash_flow_predictionss")
+    logger.debug("Batch creating %s cash_flow_predictionss", len(request.items))
     
     service = Cash_flow_predictionsService(db)
     results = []
@@ -209,7 +255,7 @@ async def create_cash_flow_predictionss_batch(
             if result:
                 results.append(result)
         
-        logger.info(f"Batch created {len(results)} cash_flow_predictionss successfully")
+        logger.info("Batch created %s cash_flow_predictionss successfully", len(results))
         return results
     except Exception as e:
         await db.rollback()
@@ -223,7 +269,7 @@ async def update_cash_flow_predictionss_batch(
     db: AsyncSession = Depends(get_db),
 ):
     """Update multiple cash_flow_predictionss in a single request"""
-    logger.debug(f"Batch updating {len(request.items)} cash_flow_predictionss")
+    logger.debug("Batch updating %s cash_flow_predictionss", len(request.items))
     
     service = Cash_flow_predictionsService(db)
     results = []
@@ -236,7 +282,7 @@ async def update_cash_flow_predictionss_batch(
             if result:
                 results.append(result)
         
-        logger.info(f"Batch updated {len(results)} cash_flow_predictionss successfully")
+        logger.info("Batch updated %s cash_flow_predictionss successfully", len(results))
         return results
     except Exception as e:
         await db.rollback()
@@ -251,7 +297,7 @@ async def update_cash_flow_predictions(
     db: AsyncSession = Depends(get_db),
 ):
     """Update an existing cash_flow_predictions"""
-    logger.debug(f"Updating cash_flow_predictions {id} with data: {data}")
+    logger.debug("Updating cash_flow_predictions %s with data: %s", id, data)
 
     service = Cash_flow_predictionsService(db)
     try:
@@ -262,7 +308,7 @@ async def update_cash_flow_predictions(
             logger.warning(f"Cash_flow_predictions with id {id} not found for update")
             raise HTTPException(status_code=404, detail="Cash_flow_predictions not found")
         
-        logger.info(f"Cash_flow_predictions {id} updated successfully")
+        logger.info("Cash_flow_predictions %s updated successfully", id)
         return result
     except HTTPException:
         raise
@@ -280,7 +326,7 @@ async def delete_cash_flow_predictionss_batch(
     db: AsyncSession = Depends(get_db),
 ):
     """Delete multiple cash_flow_predictionss by their IDs"""
-    logger.debug(f"Batch deleting {len(request.ids)} cash_flow_predictionss")
+    logger.debug("Batch deleting %s cash_flow_predictionss", len(request.ids))
     
     service = Cash_flow_predictionsService(db)
     deleted_count = 0
@@ -291,7 +337,7 @@ async def delete_cash_flow_predictionss_batch(
             if success:
                 deleted_count += 1
         
-        logger.info(f"Batch deleted {deleted_count} cash_flow_predictionss successfully")
+        logger.info("Batch deleted %s cash_flow_predictionss successfully", deleted_count)
         return {"message": f"Successfully deleted {deleted_count} cash_flow_predictionss", "deleted_count": deleted_count}
     except Exception as e:
         await db.rollback()
@@ -305,7 +351,7 @@ async def delete_cash_flow_predictions(
     db: AsyncSession = Depends(get_db),
 ):
     """Delete a single cash_flow_predictions by ID"""
-    logger.debug(f"Deleting cash_flow_predictions with id: {id}")
+    logger.debug("Deleting cash_flow_predictions with id: %s", id)
     
     service = Cash_flow_predictionsService(db)
     try:
@@ -314,7 +360,7 @@ async def delete_cash_flow_predictions(
             logger.warning(f"Cash_flow_predictions with id {id} not found for deletion")
             raise HTTPException(status_code=404, detail="Cash_flow_predictions not found")
         
-        logger.info(f"Cash_flow_predictions {id} deleted successfully")
+        logger.info("Cash_flow_predictions %s deleted successfully", id)
         return {"message": "Cash_flow_predictions deleted successfully", "id": id}
     except HTTPException:
         raise
@@ -7,7 +7,9 @@ from fastapi import APIRouter, Body, Depends, HTTPException, Query
 from pydantic import BaseModel
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from core.database import get_db
+from core.change_feed import ChangeFeedExpired
+from core.database import get_db, get_read_db
+from core.statement_cache import InvalidFilter
 from services.customers import CustomersService
 from dependencies.auth import get_current_user
 from schemas.auth import UserResponse
@@ -71,6 +73,21 @@ class CustomersListResponse(BaseModel):
     limit: int
 
 
+class CustomersChange(BaseModel):
+    """Change feed entry (data is the current row, None for deletes)"""
+    version: int
+    operation: str
+    id: int
+    data: Optional[CustomersResponse] = None
+
+
+class CustomersChangesResponse(BaseModel):
+    """Change feed response"""
+    changes: List[CustomersChange]
+    next_since: int
+    has_more: bool
+
+
 class CustomersBatchCreateRequest(BaseModel):
     """Batch create request"""
     items: List[CustomersData]
@@ -92,6 +109,11 @@ class CustomersBatchDeleteRequest(BaseModel):
     ids: List[int]
 
 
+class CustomersUpsertRequest(BaseModel):
+    """Upsert request (items are matched on customer_code)"""
+    items: List[CustomersData]
+
+
 # ---------- Routes ----------
 @router.get("", response_model=CustomersListResponse)
 async def query_customerss(
@@ -101,10 +123,12 @@ async def query_customerss(
     limit: int = Query(20, ge=1, le=2000, description="Max number of records to return"),
     fields: str = Query(None, description="Comma-separated list of fields to return"),
     current_user: UserResponse = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ):
     """Query customerss with filtering, sorting, and pagination (user can only see their own records)"""
-    logger.debug(f"Querying customerss: query={query}, sort={sort}, skip={skip}, limit={limit}, fields={fields}")
+    logger.debug(
+        "Querying customerss: query=%s, sort=%s, skip=%s, limit=%s, fields=%s", query, sort, skip, limit, fields
+    )
     
     service = CustomersService(db)
     try:
@@ -123,10 +147,12 @@ async def query_customerss(
             sort=sort,
             user_id=str(current_user.id),
         )
-        logger.debug(f"Found {result['total']} customerss")
+        logger.debug("Found %s customerss", result['total'])
         return result
     except HTTPException:
         raise
+    except InvalidFilter as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         logger.error(f"Error querying customerss: {str(e)}", exc_info=True)
         raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
@@ -139,10 +165,12 @@ async def query_customerss_all(
     skip: int = Query(0, ge=0, description="Number of records to skip"),
     limit: int = Query(20, ge=1, le=2000, description="Max number of records to return"),
     fields: str = Query(None, description="Comma-separated list of fields to return"),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ):
     # Query customerss with filtering, sorting, and pagination without user limitation
-    logger.debug(f"Querying customerss: query={query}, sort={sort}, skip={skip}, limit={limit}, fields={fields}")
+    logger.debug(
+        "Querying customerss: query=%s, sort=%s, skip=%s, limit=%s, fields=%s", query, sort, skip, limit, fields
+    )
 
     service = CustomersService(db)
     try:
@@ -160,24 +188,46 @@ async def query_customerss_all(
             query_dict=query_dict,
             sort=sort
         )
-        logger.debug(f"Found {result['total']} customerss")
+        logger.debug("Found %s customerss", result['total'])
         return result
     except HTTPException:
         raise
+    except InvalidFilter as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         logger.error(f"Error querying customerss: {str(e)}", exc_info=True)
         raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
 
 
+@router.get("/changes", response_model=CustomersChangesResponse)
+async def get_customerss_changes(
+    since: int = Query(None, ge=0, description="next_since of the previous response; omit to get the current version"),
+    limit: int = Query(500, ge=1, le=5000, description="Max number of changes to return"),
+    current_user: UserResponse = Depends(get_current_user),
+    db: AsyncSession = Depends(get_read_db),
+):
+    """Inserts, updates and deletes of customerss after version `since`, oldest first (user can only see their own records)"""
+    logger.debug("Fetching customers changes since %s, limit=%s", since, limit)
+
+    service = CustomersService(db)
+    try:
+        return await service.get_changes(since, limit, user_id=str(current_user.id))
+    except ChangeFeedExpired as e:
+        raise HTTPException(status_code=410, detail=str(e))
+    except Exception as e:
+        logger.error(f"Error fetching customers changes: {str(e)}", exc_info=True)
+        raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
+
+
 @router.get("/{id}", response_model=CustomersResponse)
 async def get_customers(
     id: int,
     fields: str = Query(None, description="Comma-separated list of fields to return"),
     current_user: UserResponse = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ):
     """Get a single customers by ID (user can only see their own records)"""
-    logger.debug(f"Fetching customers with id: {id}, fields={fields}")
+    logger.debug("Fetching customers with id: %s, fields=%s", id, fields)
     
     service = CustomersService(db)
     try:
@@ -201,7 +251,7 @@ async def create_customers(
     db: AsyncSession = Depends(get_db),
 ):
     """Create a new customers"""
-    logger.debug(f"Creating new customers with data: {data}")
+    logger.debug("Creating new customers with data: %s", data)
     
     service = CustomersService(db)
     try:
@@ -209,7 +259,7 @@ async def create_customers(
         if not result:
             raise HTTPException(status_code=400, detail="Failed to create customers")
         
-        logger.info(f"Customers created successfully with id: {result.id}")
+        logger.info("Customers created successfully with id: %s", result.id)
         return result
     except ValueError as e:
         logger.error(f"Validation error creating customers: {str(e)}")
@@ -226,7 +276,7 @@ async def create_customerss_batch(
     db: AsyncSession = Depends(get_db),
 ):
     """Create multiple customerss in a single request"""
-    logger.debug(f"Batch creating {len(request.items)} customerss")
+    logger.debug("Batch creating %s customerss", len(request.items))
     
     service = CustomersService(db)
     results = []
@@ -237,7 +287,7 @@ async def create_customerss_batch(
             if result:
                 results.append(result)
         
-        logger.info(f"Batch created {len(results)} customerss successfully")
+        logger.info("Batch created %s customerss successfully", len(results))
         return results
     except Exception as e:
         await db.rollback()
@@ -252,7 +302,7 @@ async def update_customerss_batch(
     db: AsyncSession = Depends(get_db),
 ):
     """Update multiple customerss in a single request (requires ownership)"""
-    logger.debug(f"Batch updating {len(request.items)} customerss")
+    logger.debug("Batch updating %s customerss", len(request.items))
     
     service = CustomersService(db)
     results = []
@@ -265,7 +315,7 @@ async def update_customerss_batch(
             if result:
                 results.append(result)
         
-        logger.info(f"Batch updated {len(results)} customerss successfully")
+        logger.info("Batch updated %s customerss successfully", len(results))
         return results
     except Exception as e:
         await db.rollback()
@@ -273,6 +323,28 @@ async def update_customerss_batch(
         raise HTTPException(status_code=500, detail=f"Batch update failed: {str(e)}")
 
 
+@router.put("/upsert")
+async def upsert_customerss(
+    request: CustomersUpsertRequest,
+    current_user: UserResponse = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+):
+    """Insert or update multiple customerss by customer_code (fields an item does not send are left unchanged)"""
+    logger.debug("Upserting %s customerss", len(request.items))
+
+    service = CustomersService(db)
+    try:
+        items = [item.model_dump(include=item.model_fields_set) for item in request.items]
+        upserted_count = await service.upsert_batch(items, user_id=str(current_user.id))
+        logger.info("Upserted %s customerss successfully", upserted_count)
+        return {"message": f"Successfully upserted {upserted_count} customerss", "upserted_count": upserted_count}
+    except NotImplementedError as e:
+        raise HTTPException(status_code=501, detail=str(e))
+    except Exception as e:
+        logger.error(f"Error in upsert: {str(e)}", exc_info=True)
+        raise HTTPException(status_code=500, detail=f"Upsert failed: {str(e)}")
+
+
 @router.put("/{id}", response_model=CustomersResponse)
 async def update_customers(
     id: int,
@@ -281,7 +353,7 @@ async def update_customers(
     db: AsyncSession = Depends(get_db),
 ):
     """Update an existing customers (requires ownership)"""
-    logger.debug(f"Updating customers {id} with data: {data}")
+    logger.debug("Updating customers %s with data: %s", id, data)
 
     service = CustomersService(db)
     try:
@@ -292,7 +364,7 @@ async def update_customers(
             logger.warning(f"Customers with id {id} not found for update")
             raise HTTPException(status_code=404, detail="Customers not found")
         
-        logger.info(f"Customers {id} updated successfully")
+        logger.info("Customers %s updated successfully", id)
         return result
     except HTTPException:
         raise
@@ -311,7 +383,7 @@ async def delete_customerss_batch(
     db: AsyncSession = Depends(get_db),
 ):
     """Delete multiple customerss by their IDs (requires ownership)"""
-    logger.debug(f"Batch deleting {len(request.ids)} customerss")
+    logger.debug("Batch deleting %s customerss", len(request.ids))
     
     service = CustomersService(db)
     deleted_count = 0
@@ -322,7 +394,7 @@ async def delete_customerss_batch(
             if success:
                 deleted_count += 1
         
-        logger.info(f"Batch deleted {deleted_count} customerss successfully")
+        logger.info("Batch deleted %s customerss successfully", deleted_count)
         return {"message": f"Successfully deleted {deleted_count} customerss", "deleted_count": deleted_count}
     except Exception as e:
         await db.rollback()
@@ -337,7 +409,7 @@ async def delete_customers(
     db: AsyncSession = Depends(get_db),
 ):
     """Delete a single customers by ID (requires ownership)"""
-    logger.debug(f"Deleting customers with id: {id}")
+    logger.debug("Deleting customers with id: %s", id)
     
     service = CustomersService(db)
     try:
@@ -346,7 +418,7 @@ async def delete_customers(
             logger.warning(f"Customers with id {id} not found for deletion")
             raise HTTPException(status_code=404, detail="Customers not found")
         
-        logger.info(f"Customers {id} deleted successfully")
+        logger.info("Customers %s deleted successfully", id)
         return {"message": "Customers deleted successfully", "id": id}
     except HTTPException:
         raise
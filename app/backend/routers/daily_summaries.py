@@ -8,7 +8,9 @@ from fastapi import APIRouter, Body, Depends, HTTPException, Query
 from pydantic import BaseModel
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from core.database import get_db
+from core.change_feed import ChangeFeedExpired
+from core.database import get_db, get_read_db
+from core.statement_cache import InvalidFilter
 from services.daily_summaries import Daily_summariesService
 
 # Set up logging
@@ -57,6 +59,21 @@ class Daily_summariesListResponse(BaseModel):
     limit: int
 
 
+class Daily_summariesChange(BaseModel):
+    """Change feed entry (data is the current row, None for deletes)"""
+    version: int
+    operation: str
+    id: int
+    data: Optional[Daily_summariesResponse] = None
+
+
+class Daily_summariesChangesResponse(BaseModel):
+    """Change feed response"""
+    changes: List[Daily_summariesChange]
+    next_since: int
+    has_more: bool
+
+
 class Daily_summariesBatchCreateRequest(BaseModel):
     """Batch create request"""
     items: List[Daily_summariesData]
@@ -86,10 +103,12 @@ async def query_daily_summariess(
     skip: int = Query(0, ge=0, description="Number of records to skip"),
     limit: int = Query(20, ge=1, le=2000, description="Max number of records to return"),
     fields: str = Query(None, description="Comma-separated list of fields to return"),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ):
     """Query daily_summariess with filtering, sorting, and pagination"""
-    logger.debug(f"Querying daily_summariess: query={query}, sort={sort}, skip={skip}, limit={limit}, fields={fields}")
+    logger.debug(
+        "Querying daily_summariess: query=%s, sort=%s, skip=%s, limit=%s, fields=%s", query, sort, skip, limit, fields
+    )
     
     service = Daily_summariesService(db)
     try:
@@ -107,10 +126,12 @@ async def query_daily_summariess(
             query_dict=query_dict,
             sort=sort,
         )
-        logger.debug(f"Found {result['total']} daily_summariess")
+        logger.debug("Found %s daily_summariess", result['total'])
         return result
     except HTTPException:
         raise
+    except InvalidFilter as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         logger.error(f"Error querying daily_summariess: {str(e)}", exc_info=True)
         raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
@@ -123,10 +144,12 @@ async def query_daily_summariess_all(
     skip: int = Query(0, ge=0, description="Number of records to skip"),
     limit: int = Query(20, ge=1, le=2000, description="Max number of records to return"),
     fields: str = Query(None, description="Comma-separated list of fields to return"),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ):
     # Query daily_summariess with filtering, sorting, and pagination without user limitation
-    logger.debug(f"Querying daily_summariess: query={query}, sort={sort}, skip={skip}, limit={limit}, fields={fields}")
+    logger.debug(
+        "Querying daily_summariess: query=%s, sort=%s, skip=%s, limit=%s, fields=%s", query, sort, skip, limit, fields
+    )
 
     service = Daily_summariesService(db)
     try:
@@ -144,23 +167,44 @@ async def query_daily_summariess_all(
             query_dict=query_dict,
             sort=sort
         )
-        logger.debug(f"Found {result['total']} daily_summariess")
+        logger.debug("Found %s daily_summariess", result['total'])
         return result
     except HTTPException:
         raise
+    except InvalidFilter as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         logger.error(f"Error querying daily_summariess: {str(e)}", exc_info=True)
         raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
 
 
+@router.get("/changes", response_model=Daily_summariesChangesResponse)
+async def get_daily_summariess_changes(
+    since: int = Query(None, ge=0, description="next_since of the previous response; omit to get the current version"),
+    limit: int = Query(500, ge=1, le=5000, description="Max number of changes to return"),
+    db: AsyncSession = Depends(get_read_db),
+):
+    """Inserts, updates and deletes of daily_summariess after version `since`, oldest first"""
+    logger.debug("Fetching daily_summaries changes since %s, limit=%s", since, limit)
+
+    service = Daily_summariesService(db)
+    try:
+        return await service.get_changes(since, limit)
+    except ChangeFeedExpired as e:
+        raise HTTPException(status_code=410, detail=str(e))
+    except Exception as e:
+        logger.error(f"Error fetching daily_summaries changes: {str(e)}", exc_info=True)
+        raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
+
+
 @router.get("/{id}", response_model=Daily_summariesResponse)
 async def get_daily_summaries(
     id: int,
     fields: str = Query(None, description="Comma-separated list of fields to return"),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ):
     """Get a single daily_summaries by ID"""
-    logger.debug(f"Fetching daily_summaries with id: {id}, fields={fields}")
+    logger.debug("Fetching daily_summaries with id: %s, fields=%s", id, fields)
     
     service = Daily_summariesService(db)
     try:
@@ -183,7 +227,7 @@ async def create_daily_summaries(
     db: AsyncSession = Depends(get_db),
 ):
     """Create a new daily_summaries"""
-    logger.debug(f"Creating new daily_summaries with data: {data}")
+    logger.debug("Creating new daily_summaries with data: %s", data)
     
     service = Daily_summariesService(db)
     try:
@@ -191,7 +235,7 @@ async def create_daily_summaries(
         if not result:
             raise HTTPException(status_code=400, detail="Failed to create daily_summaries")
         
-        logger.info(f"Daily_summaries created successfully with id: {result.id}")
+        logger.info("Daily_summaries created successfully with id: %s", result.id)
         return result
     except ValueError as e:
         logger.error(f"Validation error creating daily_summaries: {str(e)}")
@@ -207,7 +251,7 @@ async def create_daily_summariess_batch(
     db: AsyncSession = Depends(get_db),
 ):
     """Create multiple daily_summariess in a single request"""
-    logger.debug(f"Batch creating {len(request.items)} daily_summariess")
+    logger.debug("Batch creating %s daily_summariess", len(request.items))
     
     service = Daily_summariesService(db)
     results = []
@@ -218,7 +262,7 @@ async def create_daily_summariess_batch(
             if result:
                 results.append(result)
         
-        logger.info(f"Batch created {len(results)} daily_summariess successfully")
+        logger.info("Batch created %s daily_summariess successfully", len(results))
         return results
     except Exception as e:
         await db.rollback()
@@ -232,7 +276,7 @@ async def update_daily_summariess_batch(
     db: AsyncSession = Depends(get_db),
 ):
     """Update multiple daily_summariess in a single request"""
-    logger.debug(f"Batch updating {len(request.items)} daily_summariess")
+    logger.debug("Batch updating %s daily_summariess", len(request.items))
     
     service = Daily_summariesService(db)
     results = []
@@ -245,7 +289,7 @@ async def update_daily_summariess_batch(
             if result:
                 results.append(result)
         
-        logger.info(f"Batch updated {len(results)} daily_summariess successfully")
+        logger.info("Batch updated %s daily_summariess successfully", len(results))
         return results
     except Exception as e:
         await db.rollback()
@@ -260,7 +304,7 @@ async def update_daily_summaries(
     db: AsyncSession = Depends(get_db),
 ):
     """Update an existing daily_summaries"""
-    logger.debug(f"Updating daily_summaries {id} with data: {data}")
+    logger.debug("Updating daily_summaries %s with data: %s", id, data)
 
     service = Daily_summariesService(db)
     try:
@@ -271,7 +315,7 @@ async def update_daily_summaries(
             logger.warning(f"Daily_summaries with id {id} not found for update")
             raise HTTPException(status_code=404, detail="Daily_summaries not found")
         
-        logger.info(f"Daily_summaries {id} updated successfully")
+        logger.info("Daily_summaries %s updated successfully", id)
         return result
     except HTTPException:
         raise
@@ -289,7 +333,7 @@ async def delete_daily_summariess_batch(
     db: AsyncSession = Depends(get_db),
 ):
     """Delete multiple daily_summariess by their IDs"""
-    logger.debug(f"Batch deleting {len(request.ids)} daily_summariess")
+    logger.debug("Batch deleting %s daily_summariess", len(request.ids))
     
     service = Daily_summariesService(db)
     deleted_count = 0
@@ -300,7 +344,7 @@ async def delete_daily_summariess_batch(
             if success:
                 deleted_count += 1
         
-        logger.info(f"Batch deleted {deleted_count} daily_summariess successfully")
+        logger.info("Batch deleted %s daily_summariess successfully", deleted_count)
         return {"message": f"Successfully deleted {deleted_count} daily_summariess", "deleted_count": deleted_count}
     except Exception as e:
         await db.rollback()
@@ -314,7 +358,7 @@ async def delete_daily_summaries(
     db: AsyncSession = Depends(get_db),
 ):
     """Delete a single daily_summaries by ID"""
-    logger.debug(f"Deleting daily_summaries with id: {id}")
+    logger.debug("Deleting daily_summaries with id: %s", id)
     
     service = Daily_summariesService(db)
     try:
@@ -323,7 +367,7 @@ async def delete_daily_summaries(
             logger.warning(f"Daily_summaries with id {id} not found for deletion")
             raise HTTPException(status_code=404, detail="Daily_summaries not found")
         
-        logger.info(f"Daily_summaries {id} deleted successfully")
+        logger.info("Daily_summaries %s deleted successfully", id)
         return {"message": "Daily_summaries deleted successfully", "id": id}
     except HTTPException:
         raise
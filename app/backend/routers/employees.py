@@ -7,7 +7,9 @@ from fastapi import APIRouter, Body, Depends, HTTPException, Query
 from pydantic import BaseModel
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from core.database import get_db
+from core.change_feed import ChangeFeedExpired
+from core.database import get_db, get_read_db
+from core.statement_cache import InvalidFilter
 from services.employees import EmployeesService
 from dependencies.auth import get_current_user
 from schemas.auth import UserResponse
@@ -74,6 +76,21 @@ class EmployeesListResponse(BaseModel):
     limit: int
 
 
+class EmployeesChange(BaseModel):
+    """Change feed entry (data is the current row, None for deletes)"""
+    version: int
+    operation: str
+    id: int
+    data: Optional[EmployeesResponse] = None
+
+
+class EmployeesChangesResponse(BaseModel):
+    """Change feed response"""
+    changes: List[EmployeesChange]
+    next_since: int
+    has_more: bool
+
+
 class EmployeesBatchCreateRequest(BaseModel):
     """Batch create request"""
     items: List[EmployeesData]
@@ -95,6 +112,11 @@ class EmployeesBatchDeleteRequest(BaseModel):
     ids: List[int]
 
 
+class EmployeesUpsertRequest(BaseModel):
+    """Upsert request (items are matched on employee_code)"""
+    items: List[EmployeesData]
+
+
 # ---------- Routes ----------
 @router.get("", response_model=EmployeesListResponse)
 async def query_employeess(
@@ -104,10 +126,12 @@ async def query_employeess(
     limit: int = Query(20, ge=1, le=2000, description="Max number of records to return"),
     fields: str = Query(None, description="Comma-separated list of fields to return"),
     current_user: UserResponse = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ):
     """Query employeess with filtering, sorting, and pagination (user can only see their own records)"""
-    logger.debug(f"Querying employeess: query={query}, sort={sort}, skip={skip}, limit={limit}, fields={fields}")
+    logger.debug(
+        "Querying employeess: query=%s, sort=%s, skip=%s, limit=%s, fields=%s", query, sort, skip, limit, fields
+    )
     
     service = EmployeesService(db)
     try:
@@ -126,10 +150,12 @@ async def query_employeess(
             sort=sort,
             user_id=str(current_user.id),
         )
-        logger.debug(f"Found {result['total']} employeess")
+        logger.debug("Found %s employeess", result['total'])
         return result
     except HTTPException:
         raise
+    except InvalidFilter as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         logger.error(f"Error querying employeess: {str(e)}", exc_info=True)
         raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
@@ -142,10 +168,12 @@ async def query_employeess_all(
     skip: int = Query(0, ge=0, description="Number of records to skip"),
     limit: int = Query(20, ge=1, le=2000, description="Max number of records to return"),
     fields: str = Query(None, description="Comma-separated list of fields to return"),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ):
     # Query employeess with filtering, sorting, and pagination without user limitation
-    logger.debug(f"Querying employeess: query={query}, sort={sort}, skip={skip}, limit={limit}, fields={fields}")
+    logger.debug(
+        "Querying employeess: query=%s, sort=%s, skip=%s, limit=%s, fields=%s", query, sort, skip, limit, fields
+    )
 
     service = EmployeesService(db)
     try:
@@ -163,24 +191,46 @@ async def query_employeess_all(
             query_dict=query_dict,
             sort=sort
         )
-        logger.debug(f"Found {result['total']} employeess")
+        logger.debug("Found %s employeess", result['total'])
         return result
     except HTTPException:
         raise
+    except InvalidFilter as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         logger.error(f"Error querying employeess: {str(e)}", exc_info=True)
         raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
 
 
+@router.get("/changes", response_model=EmployeesChangesResponse)
+async def get_employeess_changes(
+    since: int = Query(None, ge=0, description="next_since of the previous response; omit to get the current version"),
+    limit: int = Query(500, ge=1, le=5000, description="Max number of changes to return"),
+    current_user: UserResponse = Depends(get_current_user),
+    db: AsyncSession = Depends(get_read_db),
+):
+    """Inserts, updates and deletes of employeess after version `since`, oldest first (user can only see their own records)"""
+    logger.debug("Fetching employees changes since %s, limit=%s", since, limit)
+
+    service = EmployeesService(db)
+    try:
+        return await service.get_changes(since, limit, user_id=str(current_user.id))
+    except ChangeFeedExpired as e:
+        raise HTTPException(status_code=410, detail=str(e))
+    except Exception as e:
+        logger.error(f"Error fetching employees changes: {str(e)}", exc_info=True)
+        raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
+
+
 @router.get("/{id}", response_model=EmployeesResponse)
 async def get_employees(
     id: int,
     fields: str = Query(None, description="Comma-separated list of fields to return"),
     current_user: UserResponse = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ):
     """Get a single employees by ID (user can only see their own records)"""
-    logger.debug(f"Fetching employees with id: {id}, fields={fields}")
+    logger.debug("Fetching employees with id: %s, fields=%s", id, fields)
     
     service = EmployeesService(db)
     try:
@@ -204,7 +254,7 @@ async def create_employees(
     db: AsyncSession = Depends(get_db),
 ):
     """Create a new employees"""
-    logger.debug(f"Creating new employees with data: {data}")
+    logger.debug("Creating new employees with data: %s", data)
     
     service = EmployeesService(db)
     try:
@@ -212,7 +262,7 @@ async def create_employees(
         if not result:
             raise HTTPException(status_code=400, detail="Failed to create employees")
         
-        logger.info(f"Employees created successfully with id: {result.id}")
+        logger.info("Employees created successfully with id: %s", result.id)
         return result
     except ValueError as e:
         logger.error(f"Validation error creating employees: {str(e)}")
@@ -229,7 +279,7 @@ async def create_employeess_batch(
     db: AsyncSession = Depends(get_db),
 ):
     """Create multiple employeess in a single request"""
-    logger.debug(f"Batch creating {len(request.items)} employeess")
+    logger.debug("Batch creating %s employeess", len(request.items))
     
     service = EmployeesService(db)
     results = []
@@ -240,7 +290,7 @@ async def create_employeess_batch(
             if result:
                 results.append(result)
         
-        logger.info(f"Batch created {len(results)} employeess successfully")
+        logger.info("Batch created %s employeess successfully", len(results))
         return results
     except Exception as e:
         await db.rollback()
@@ -255,7 +305,7 @@ async def update_employeess_batch(
     db: AsyncSession = Depends(get_db),
 ):
     """Update multiple employeess in a single request (requires ownership)"""
-    logger.debug(f"Batch updating {len(request.items)} employeess")
+    logger.debug("Batch updating %s employeess", len(request.items))
     
     service = EmployeesService(db)
     results = []
@@ -268,7 +318,7 @@ async def update_employeess_batch(
             if result:
                 results.append(result)
         
-        logger.info(f"Batch updated {len(results)} employeess successfully")
+        logger.info("Batch updated %s employeess successfully", len(results))
         return results
     except Exception as e:
         await db.rollback()
@@ -276,6 +326,28 @@ async def update_employeess_batch(
         raise HTTPException(status_code=500, detail=f"Batch update failed: {str(e)}")
 
 
+@router.put("/upsert")
+async def upsert_employeess(
+    request: EmployeesUpsertRequest,
+    current_user: UserResponse = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+):
+    """Insert or update multiple employeess by employee_code (fields an item does not send are left unchanged)"""
+    logger.debug("Upserting %s employeess", len(request.items))
+
+    service = EmployeesService(db)
+    try:
+        items = [item.model_dump(include=item.model_fields_set) for item in request.items]
+        upserted_count = await service.upsert_batch(items, user_id=str(current_user.id))
+        logger.info("Upserted %s employeess successfully", upserted_count)
+        return {"message": f"Successfully upserted {upserted_count} employeess", "upserted_count": upserted_count}
+    except NotImplementedError as e:
+        raise HTTPException(status_code=501, detail=str(e))
+    except Exception as e:
+        logger.error(f"Error in upsert: {str(e)}", exc_info=True)
+        raise HTTPException(status_code=500, detail=f"Upsert failed: {str(e)}")
+
+
 @router.put("/{id}", response_model=EmployeesResponse)
 async def update_employees(
     id: int,
@@ -284,7 +356,7 @@ async def update_employees(
     db: AsyncSession = Depends(get_db),
 ):
     """Update an existing employees (requires ownership)"""
-    logger.debug(f"Updating employees {id} with data: {data}")
+    logger.debug("Updating employees %s with data: %s", id, data)
 
     service = EmployeesService(db)
     try:
@@ -295,7 +367,7 @@ async def update_employees(
             logger.warning(f"Employees with id {id} not found for update")
             raise HTTPException(status_code=404, detail="Employees not found")
         
-        logger.info(f"Employees {id} updated successfully")
+        logger.info("Employees %s updated successfully", id)
         return result
     except HTTPException:
         raise
@@ -314,7 +386,7 @@ async def delete_employeess_batch(
     db: AsyncSession = Depends(get_db),
 ):
     """Delete multiple employeess by their IDs (requires ownership)"""
-    logger.debug(f"Batch deleting {len(request.ids)} employeess")
+    logger.debug("Batch deleting %s employeess", len(request.ids))
     
     service = EmployeesService(db)
     deleted_count = 0
@@ -325,7 +397,7 @@ async def delete_employeess_batch(
             if success:
                 deleted_count += 1
         
-        logger.info(f"Batch deleted {deleted_count} employeess successfully")
+        logger.info("Batch deleted %s employeess successfully", deleted_count)
         return {"message": f"Successfully deleted {deleted_count} employeess", "deleted_count": deleted_count}
     except Exception as e:
         await db.rollback()
@@ -340,7 +412,7 @@ async def delete_employees(
     db: AsyncSession = Depends(get_db),
 ):
     """Delete a single employees by ID (requires ownership)"""
-    logger.debug(f"Deleting employees with id: {id}")
+    logger.debug("Deleting employees with id: %s", id)
     
     service = EmployeesService(db)
     try:
@@ -349,7 +421,7 @@ async def delete_employees(
             logger.warning(f"Employees with id {id} not found for deletion")
             raise HTTPException(status_code=404, detail="Employees not found")
         
-        logger.info(f"Employees {id} deleted successfully")
+        logger.info("Employees %s deleted successfully", id)
         return {"message": "Employees deleted successfully", "id": id}
     except HTTPException:
         raise
@@ -1,5 +1,8 @@
-from fastapi import APIRouter
-from services.database import check_database_health
+from core.query_stats import slow_query_log
+from dependencies.auth import get_admin_user
+from fastapi import APIRouter, Depends, Query
+from schemas.auth import UserResponse
+from services.database import check_database_health, get_pool_status
 
 router = APIRouter(prefix="/database", tags=["database"])
 
@@ -9,3 +12,25 @@ async def database_health_check():
     """Check database connection health"""
     is_healthy = await check_database_health()
     return {"status": "healthy" if is_healthy else "unhealthy", "service": "database"}
+
+
+@router.get("/pool")
+async def database_pool_status(_current_user: UserResponse = Depends(get_admin_user)):
+    """Connection pool occupancy, checkout wait-time histogram (ms, cumulative) and timeouts"""
+    return get_pool_status()
+
+
+@router.get("/slow-queries")
+async def slow_queries(
+    limit: int = Query(20, ge=1, le=500),
+    _current_user: UserResponse = Depends(get_admin_user),
+):
+    """Slowest statement shapes seen by this process, with call counts, timings and EXPLAIN plans"""
+    return {"items": slow_query_log.top(limit), "max_entries": slow_query_log.max_entries}
+
+
+@router.delete("/slow-queries")
+async def reset_slow_queries(_current_user: UserResponse = Depends(get_admin_user)):
+    """Clear the slow query table"""
+    slow_query_log.clear()
+    return {"status": "cleared"}
@@ -0,0 +1,87 @@
+import asyncio
+import logging
+import shutil
+import tempfile
+from pathlib import Path
+
+from core.config import settings
+from core.database import db_manager
+from dependencies.auth import get_current_user
+from fastapi import APIRouter, Depends, File, HTTPException, UploadFile, status
+from models.customers import Customers
+from models.employees import Employees
+from models.products import Products
+from models.suppliers import Suppliers
+from routers.customers import CustomersData
+from routers.employees import EmployeesData
+from routers.products import ProductsData
+from routers.suppliers import SuppliersData
+from schemas.auth import UserResponse
+from services.bulk_import import SUPPORTED_FORMATS, ImportJob, ImportSpec, import_jobs, openpyxl, run_import
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(prefix="/api/v1/import", tags=["import"])
+
+# Rows are matched on the natural key; products have no code column and are matched by name, which is not unique
+IMPORT_ENTITIES = {
+    "products": ImportSpec(Products, ProductsData, "name", user_scoped=False),
+    "customers": ImportSpec(Customers, CustomersData, "customer_code"),
+    "suppliers": ImportSpec(Suppliers, SuppliersData, "supplier_code"),
+    "employees": ImportSpec(Employees, EmployeesData, "employee_code"),
+}
+
+
+def _get_job(job_id: str, current_user: UserResponse) -> ImportJob:
+    job = import_jobs.get(job_id)
+    if job is None or (job.user_id != str(current_user.id) and current_user.role != "admin"):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Import job not found")
+    return job
+
+
+@router.post("/{entity}", status_code=status.HTTP_202_ACCEPTED)
+async def import_file(
+    entity: str,
+    file: UploadFile = File(..., description="CSV or XLSX file with a header row"),
+    current_user: UserResponse = Depends(get_current_user),
+):
+    """Upload a CSV/XLSX file and import it in the background; poll the returned job for progress"""
+    spec = IMPORT_ENTITIES.get(entity)
+    if spec is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Import is supported for: {', '.join(IMPORT_ENTITIES)}",
+        )
+    file_format = Path(file.filename or "").suffix.lower().lstrip(".")
+    if file_format not in SUPPORTED_FORMATS:
+        raise HTTPException(status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE, detail="Upload a .csv or .xlsx file")
+    if file_format == "xlsx" and openpyxl is None:
+        raise HTTPException(
+            status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE, detail="XLSX import is not available on this server"
+        )
+
+    # Spool the upload to disk; the request's file is closed once the response is sent
+    with tempfile.NamedTemporaryFile(prefix="import-", suffix=f".{file_format}", delete=False) as spooled:
+        await asyncio.to_thread(shutil.copyfileobj, file.file, spooled, 1 << 20)
+
+    job = import_jobs.add(ImportJob(entity, file.filename, file_format, str(current_user.id), settings.import_max_errors))
+    job.task = asyncio.create_task(
+        run_import(job, spec, spooled.name, db_manager.async_session_maker, settings.import_chunk_size)
+    )
+    logger.info("Queued import %s of %s for user %s", job.id, entity, current_user.id)
+    return job.to_dict()
+
+
+@router.get("/jobs")
+async def list_import_jobs(current_user: UserResponse = Depends(get_current_user)):
+    """List the current user's import jobs on this worker, newest first (without row errors)"""
+    return [
+        {key: value for key, value in job.to_dict().items() if key != "errors"}
+        for job in import_jobs.for_user(str(current_user.id))
+    ]
+
+
+@router.get("/jobs/{job_id}")
+async def get_import_job(job_id: str, current_user: UserResponse = Depends(get_current_user)):
+    """Progress, counts and row-level errors of an import job"""
+    return _get_job(job_id, current_user).to_dict()
@@ -7,7 +7,9 @@ from fastapi import APIRouter, Body, Depends, HTTPException, Query
 from pydantic import BaseModel
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from core.database import get_db
+from core.change_feed import ChangeFeedExpired
+from core.database import get_db, get_read_db
+from core.statement_cache import InvalidFilter
 from services.journal_details import Journal_detailsService
 from dependencies.auth import get_current_user
 from schemas.auth import UserResponse
@@ -59,6 +61,21 @@ class Journal_detailsListResponse(BaseModel):
     limit: int
 
 
+class Journal_detailsChange(BaseModel):
+    """Change feed entry (data is the current row, None for deletes)"""
+    version: int
+    operation: str
+    id: int
+    data: Optional[Journal_detailsResponse] = None
+
+
+class Journal_detailsChangesResponse(BaseModel):
+    """Change feed response"""
+    changes: List[Journal_detailsChange]
+    next_since: int
+    has_more: bool
+
+
 class Journal_detailsBatchCreateRequest(BaseModel):
     """Batch create request"""
     items: List[Journal_detailsData]
@@ -89,10 +106,12 @@ async def query_journal_detailss(
     limit: int = Query(20, ge=1, le=2000, description="Max number of records to return"),
     fields: str = Query(None, description="Comma-separated list of fields to return"),
     current_user: UserResponse = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ):
     """Query journal_detailss with filtering, sorting, and pagination (user can only see their own records)"""
-    logger.debug(f"Querying journal_detailss: query={query}, sort={sort}, skip={skip}, limit={limit}, fields={fields}")
+    logger.debug(
+        "Querying journal_detailss: query=%s, sort=%s, skip=%s, limit=%s, fields=%s", query, sort, skip, limit, fields
+    )
     
     service = Journal_detailsService(db)
     try:
@@ -111,10 +130,12 @@ async def query_journal_detailss(
             sort=sort,
             user_id=str(current_user.id),
         )
-        logger.debug(f"Found {result['total']} journal_detailss")
+        logger.debug("Found %s journal_detailss", result['total'])
         return result
     except HTTPException:
         raise
+    except InvalidFilter as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         logger.error(f"Error querying journal_detailss: {str(e)}", exc_info=True)
         raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
@@ -127,10 +148,12 @@ async def query_journal_detailss_all(
     skip: int = Query(0, ge=0, description="Number of records to skip"),
     limit: int = Query(20, ge=1, le=2000, description="Max number of records to return"),
     fields: str = Query(None, description="Comma-separated list of fields to return"),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ):
     # Query journal_detailss with filtering, sorting, and pagination without user limitation
-    logger.debug(f"Querying journal_detailss: query={query}, sort={sort}, skip={skip}, limit={limit}, fields={fields}")
+    logger.debug(
+        "Querying journal_detailss: query=%s, sort=%s, skip=%s, limit=%s, fields=%s", query, sort, skip, limit, fields
+    )
 
     service = Journal_detailsService(db)
     try:
@@ -148,24 +171,46 @@ async def query_journal_detailss_all(
             query_dict=query_dict,
             sort=sort
         )
-        logger.debug(f"Found {result['total']} journal_detailss")
+        logger.debug("Found %s journal_detailss", result['total'])
         return result
     except HTTPException:
         raise
+    except InvalidFilter as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         logger.error(f"Error querying journal_detailss: {str(e)}", exc_info=True)
         raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
 
 
+@router.get("/changes", response_model=Journal_detailsChangesResponse)
+async def get_journal_detailss_changes(
+    since: int = Query(None, ge=0, description="next_since of the previous response; omit to get the current version"),
+    limit: int = Query(500, ge=1, le=5000, description="Max number of changes to return"),
+    current_user: UserResponse = Depends(get_current_user),
+    db: AsyncSession = Depends(get_read_db),
+):
+    """Inserts, updates and deletes of journal_detailss after version `since`, oldest first (user can only see their own records)"""
+    logger.debug("Fetching journal_details changes since %s, limit=%s", since, limit)
+
+    service = Journal_detailsService(db)
+    try:
+        return await service.get_changes(since, limit, user_id=str(current_user.id))
+    except ChangeFeedExpired as e:
+        raise HTTPException(status_code=410, detail=str(e))
+    except Exception as e:
+        logger.error(f"Error fetching journal_details changes: {str(e)}", exc_info=True)
+        raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
+
+
 @router.get("/{id}", response_model=Journal_detailsResponse)
 async def get_journal_details(
     id: int,
     fields: str = Query(None, description="Comma-separated list of fields to return"),
     current_user: UserResponse = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ):
     """Get a single journal_details by ID (user can only see their own records)"""
-    logger.debug(f"Fetching journal_details with id: {id}, fields={fields}")
+    logger.debug("Fetching journal_details with id: %s, fields=%s", id, fields)
     
     service = Journal_detailsService(db)
     try:
@@ -189,7 +234,7 @@ async def create_journal_details(
     db: AsyncSession = Depends(get_db),
 ):
     """Create a new journal_details"""
-    logger.debug(f"Creating new journal_details with data: {data}")
+    logger.debug("Creating new journal_details with data: %s", data)
     
     service = Journal_detailsService(db)
     try:
@@ -197,7 +242,7 @@ async def create_journal_details(
         if not result:
             raise HTTPException(status_code=400, detail="Failed to create journal_details")
         
-        logger.info(f"Journal_details created successfully with id: {result.id}")
+        logger.info("Journal_details created successfully with id: %s", result.id)
         return result
     except ValueError as e:
         logger.error(f"Validation error creating journal_details: {str(e)}")
@@ -214,7 +259,7 @@ async def create_journal_detailss_batch(
     db: AsyncSession = Depends(get_db),
 ):
     """Create multiple journal_detailss in a single request"""
-    logger.debug(f"Batch creating {len(request.items)} journal_detailss")
+    logger.debug("Batch creating %s journal_detailss", len(request.items))
     
     service = Journal_detailsService(db)
     results = []
@@ -225,7 +270,7 @@ async def create_journal_detailss_batch(
             if result:
                 results.append(result)
         
-        logger.info(f"Batch created {len(results)} journal_detailss successfully")
+        logger.info("Batch created %s journal_detailss successfully", len(results))
         return results
     except Exception as e:
         await db.rollback()
@@ -240,7 +285,7 @@ async def update_journal_detailss_batch(
     db: AsyncSession = Depends(get_db),
 ):
     """Update multiple journal_detailss in a single request (requires ownership)"""
-    logger.debug(f"Batch updating {len(request.items)} journal_detailss")
+    logger.debug("Batch updating %s journal_detailss", len(request.items))
     
     service = Journal_detailsService(db)
     results = []
@@ -253,7 +298,7 @@ async def update_journal_detailss_batch(
             if result:
                 results.append(result)
         
-        logger.info(f"Batch updated {len(results)} journal_detailss successfully")
+        logger.info("Batch updated %s journal_detailss successfully", len(results))
         return results
     except Exception as e:
         await db.rollback()
@@ -269,7 +314,7 @@ async def update_journal_details(
     db: AsyncSession = Depends(get_db),
 ):
     """Update an existing journal_details (requires ownership)"""
-    logger.debug(f"Updating journal_details {id} with data: {data}")
+    logger.debug("Updating journal_details %s with data: %s", id, data)
 
     service = Journal_detailsService(db)
     try:
@@ -280,7 +325,7 @@ async def update_journal_details(
             logger.warning(f"Journal_details with id {id} not found for update")
             raise HTTPException(status_code=404, detail="Journal_details not found")
         
-        logger.info(f"Journal_details {id} updated successfully")
+        logger.info("Journal_details %s updated successfully", id)
         return result
     except HTTPException:
         raise
@@ -299,7 +344,7 @@ async def delete_journal_detailss_batch(
     db: AsyncSession = Depends(get_db),
 ):
     """Delete multiple journal_detailss by their IDs (requires ownership)"""
-    logger.debug(f"Batch deleting {len(request.ids)} journal_detailss")
+    logger.debug("Batch deleting %s journal_detailss", len(request.ids))
     
     service = Journal_detailsService(db)
     deleted_count = 0
@@ -310,7 +355,7 @@ async def delete_journal_detailss_batch(
             if success:
                 deleted_count += 1
         
-        logger.info(f"Batch deleted {deleted_count} journal_detailss successfully")
+        logger.info("Batch deleted %s journal_detailss successfully", deleted_count)
         return {"message": f"Successfully deleted {deleted_count} journal_detailss", "deleted_count": deleted_count}
     except Exception as e:
         await db.rollback()
@@ -325,7 +370,7 @@ async def delete_journal_details(
     db: AsyncSession = Depends(get_db),
 ):
     """Delete a single journal_details by ID (requires ownership)"""
-    logger.debug(f"Deleting journal_details with id: {id}")
+    logger.debug("Deleting journal_details with id: %s", id)
     
     service = Journal_detailsService(db)
     try:
@@ -334,7 +379,7 @@ async def delete_journal_details(
             logger.warning(f"Journal_details with id {id} not found for deletion")
             raise HTTPException(status_code=404, detail="Journal_details not found")
         
-        logger.info(f"Journal_details {id} deleted successfully")
+        logger.info("Journal_details %s deleted successfully", id)
         return {"message": "Journal_details deleted successfully", "id": id}
     except HTTPException:
         raise
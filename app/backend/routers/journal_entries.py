@@ -8,7 +8,9 @@ from fastapi import APIRouter, Body, Depends, HTTPException, Query
 from pydantic import BaseModel
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from core.database import get_db
+from core.change_feed import ChangeFeedExpired
+from core.database import get_db, get_read_db
+from core.statement_cache import InvalidFilter
 from services.journal_entries import Journal_entriesService
 from dependencies.auth import get_current_user
 from schemas.auth import UserResponse
@@ -54,6 +56,21 @@ class Journal_entriesListResponse(BaseModel):
     limit: int
 
 
+class Journal_entriesChange(BaseModel):
+    """Change feed entry (data is the current row, None for deletes)"""
+    version: int
+    operation: str
+    id: int
+    data: Optional[Journal_entriesResponse] = None
+
+
+class Journal_entriesChangesResponse(BaseModel):
+    """Change feed response"""
+    changes: List[Journal_entriesChange]
+    next_since: int
+    has_more: bool
+
+
 class Journal_entriesBatchCreateRequest(BaseModel):
     """Batch create request"""
     items: List[Journal_entriesData]
@@ -84,10 +101,12 @@ async def query_journal_entriess(
     limit: int = Query(20, ge=1, le=2000, description="Max number of records to return"),
     fields: str = Query(None, description="Comma-separated list of fields to return"),
     current_user: UserResponse = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ):
     """Query journal_entriess with filtering, sorting, and pagination (user can only see their own records)"""
-    logger.debug(f"Querying journal_entriess: query={query}, sort={sort}, skip={skip}, limit={limit}, fields={fields}")
+    logger.debug(
+        "Querying journal_entriess: query=%s, sort=%s, skip=%s, limit=%s, fields=%s", query, sort, skip, limit, fields
+    )
     
     service = Journal_entriesService(db)
     try:
@@ -106,10 +125,12 @@ async def query_journal_entriess(
             sort=sort,
             user_id=str(current_user.id),
         )
-        logger.debug(f"Found {result['total']} journal_entriess")
+        logger.debug("Found %s journal_entriess", result['total'])
         return result
     except HTTPException:
         raise
+    except InvalidFilter as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         logger.error(f"Error querying journal_entriess: {str(e)}", exc_info=True)
         raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
@@ -122,10 +143,12 @@ async def query_journal_entriess_all(
     skip: int = Query(0, ge=0, description="Number of records to skip"),
     limit: int = Query(20, ge=1, le=2000, description="Max number of records to return"),
     fields: str = Query(None, description="Comma-separated list of fields to return"),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ):
     # Query journal_entriess with filtering, sorting, and pagination without user limitation
-    logger.debug(f"Querying journal_entriess: query={query}, sort={sort}, skip={skip}, limit={limit}, fields={fields}")
+    logger.debug(
+        "Querying journal_entriess: query=%s, sort=%s, skip=%s, limit=%s, fields=%s", query, sort, skip, limit, fields
+    )
 
     service = Journal_entriesService(db)
     try:
@@ -143,24 +166,46 @@ async def query_journal_entriess_all(
             query_dict=query_dict,
             sort=sort
         )
-        logger.debug(f"Found {result['total']} journal_entriess")
+        logger.debug("Found %s journal_entriess", result['total'])
         return result
     except HTTPException:
         raise
+    except InvalidFilter as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         logger.error(f"Error querying journal_entriess: {str(e)}", exc_info=True)
         raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
 
 
+@router.get("/changes", response_model=Journal_entriesChangesResponse)
+async def get_journal_entriess_changes(
+    since: int = Query(None, ge=0, description="next_since of the previous response; omit to get the current version"),
+    limit: int = Query(500, ge=1, le=5000, description="Max number of changes to return"),
+    current_user: UserResponse = Depends(get_current_user),
+    db: AsyncSession = Depends(get_read_db),
+):
+    """Inserts, updates and deletes of journal_entriess after version `since`, oldest first (user can only see their own records)"""
+    logger.debug("Fetching journal_entries changes since %s, limit=%s", since, limit)
+
+    service = Journal_entriesService(db)
+    try:
+        return await service.get_changes(since, limit, user_id=str(current_user.id))
+    except ChangeFeedExpired as e:
+        raise HTTPException(status_code=410, detail=str(e))
+    except Exception as e:
+        logger.error(f"Error fetching journal_entries changes: {str(e)}", exc_info=True)
+        raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
+
+
 @router.get("/{id}", response_model=Journal_entriesResponse)
 async def get_journal_entries(
     id: int,
     fields: str = Query(None, description="Comma-separated list of fields to return"),
     current_user: UserResponse = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ):
     """Get a single journal_entries by ID (user can only see their own records)"""
-    logger.debug(f"Fetching journal_entries with id: {id}, fields={fields}")
+    logger.debug("Fetching journal_entries with id: %s, fields=%s", id, fields)
     
     service = Journal_entriesService(db)
     try:
@@ -184,7 +229,7 @@ async def create_journal_entries(
     db: AsyncSession = Depends(get_db),
 ):
     """Create a new journal_entries"""
-    logger.debug(f"Creating new journal_entries with data: {data}")
+    logger.debug("Creating new journal_entries with data: %s", data)
     
     service = Journal_entriesService(db)
     try:
@@ -192,7 +237,7 @@ async def create_journal_entries(
         if not result:
             raise HTTPException(status_code=400, detail="Failed to create journal_entries")
         
-        logger.info(f"Journal_entries created successfully with id: {result.id}")
+        logger.info("Journal_entries created successfully with id: %s", result.id)
         return result
     except ValueError as e:
         logger.error(f"Validation error creating journal_entries: {str(e)}")
@@ -209,7 +254,7 @@ async def create_journal_entriess_batch(
     db: AsyncSession = Depends(get_db),
 ):
     """Create multiple journal_entriess in a single request"""
-    logger.debug(f"Batch creating {len(request.items)} journal_entriess")
+    logger.debug("Batch creating %s journal_entriess", len(request.items))
     
     service = Journal_entriesService(db)
     results = []
@@ -220,7 +265,7 @@ async def create_journal_entriess_batch(
             if result:
                 results.append(result)
         
-        logger.info(f"Batch created {len(results)} journal_entriess successfully")
+        logger.info("Batch created %s journal_entriess successfully", len(results))
         return results
     except Exception as e:
         await db.rollback()
@@ -235,7 +280,7 @@ async def update_journal_entriess_batch(
     db: AsyncSession = Depends(get_db),
 ):
     """Update multiple journal_entriess in a single request (requires ownership)"""
-    logger.debug(f"Batch updating {len(request.items)} journal_entriess")
+    logger.debug("Batch updating %s journal_entriess", len(request.items))
     
     service = Journal_entriesService(db)
     results = []
@@ -248,7 +293,7 @@ async def update_journal_entriess_batch(
             if result:
                 results.append(result)
         
-        logger.info(f"Batch updated {len(results)} journal_entriess successfully")
+        logger.info("Batch updated %s journal_entriess successfully", len(results))
         return results
     except Exception as e:
         await db.rollback()
@@ -264,7 +309,7 @@ async def update_journal_entries(
     db: AsyncSession = Depends(get_db),
 ):
     """Update an existing journal_entries (requires ownership)"""
-    logger.debug(f"Updating journal_entries {id} with data: {data}")
+    logger.debug("Updating journal_entries %s with data: %s", id, data)
 
     service = Journal_entriesService(db)
     try:
@@ -275,7 +320,7 @@ async def update_journal_entries(
             logger.warning(f"Journal_entries with id {id} not found for update")
             raise HTTPException(status_code=404, detail="Journal_entries not found")
         
-        logger.info(f"Journal_entries {id} updated successfully")
+        logger.info("Journal_entries %s updated successfully", id)
         return result
     except HTTPException:
         raise
@@ -294,7 +339,7 @@ async def delete_journal_entriess_batch(
     db: AsyncSession = Depends(get_db),
 ):
     """Delete multiple journal_entriess by their IDs (requires ownership)"""
-    logger.debug(f"Batch deleting {len(request.ids)} journal_entriess")
+    logger.debug("Batch deleting %s journal_entriess", len(request.ids))
     
     service = Journal_entriesService(db)
     deleted_count = 0
@@ -305,7 +350,7 @@ async def delete_journal_entriess_batch(
             if success:
                 deleted_count += 1
         
-        logger.info(f"Batch deleted {deleted_count} journal_entriess successfully")
+        logger.info("Batch deleted %s journal_entriess successfully", deleted_count)
         return {"message": f"Successfully deleted {deleted_count} journal_entriess", "deleted_count": deleted_count}
     except Exception as e:
         await db.rollback()
@@ -320,7 +365,7 @@ async def delete_journal_entries(
     db: AsyncSession = Depends(get_db),
 ):
     """Delete a single journal_entries by ID (requires ownership)"""
-    logger.debug(f"Deleting journal_entries with id: {id}")
+    logger.debug("Deleting journal_entries with id: %s", id)
     
     service = Journal_entriesService(db)
     try:
@@ -329,7 +374,7 @@ async def delete_journal_entries(
             logger.warning(f"Journal_entries with id {id} not found for deletion")
             raise HTTPException(status_code=404, detail="Journal_entries not found")
         
-        logger.info(f"Journal_entries {id} deleted successfully")
+        logger.info("Journal_entries %s deleted successfully", id)
         return {"message": "Journal_entries deleted successfully", "id": id}
     except HTTPException:
         raise
@@ -7,7 +7,9 @@ from fastapi import APIRouter, Body, Depends, HTTPException, Query
 from pydantic import BaseModel
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from core.database import get_db
+from core.change_feed import ChangeFeedExpired
+from core.database import get_db, get_read_db
+from core.statement_cache import InvalidFilter
 from services.locations import LocationsService
 
 # Set up logging
@@ -62,6 +64,21 @@ class LocationsListResponse(BaseModel):
     limit: int
 
 
+class LocationsChange(BaseModel):
+    """Change feed entry (data is the current row, None for deletes)"""
+    version: int
+    operation: str
+    id: int
+    data: Optional[LocationsResponse] = None
+
+
+class LocationsChangesResponse(BaseModel):
+    """Change feed response"""
+    changes: List[LocationsChange]
+    next_since: int
+    has_more: bool
+
+
 class LocationsBatchCreateRequest(BaseModel):
     """Batch create request"""
     items: List[LocationsData]
@@ -83,6 +100,11 @@ class LocationsBatchDeleteRequest(BaseModel):
     ids: List[int]
 
 
+class LocationsUpsertRequest(BaseModel):
+    """Upsert request (items are matched on location_code)"""
+    items: List[LocationsData]
+
+
 # ---------- Routes ----------
 @router.get("", response_model=LocationsListResponse)
 async def query_locationss(
@@ -91,10 +113,12 @@ async def query_locationss(
     skip: int = Query(0, ge=0, description="Number of records to skip"),
     limit: int = Query(20, ge=1, le=2000, description="Max number of records to return"),
     fields: str = Query(None, description="Comma-separated list of fields to return"),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ):
     """Query locationss with filtering, sorting, and pagination"""
-    logger.debug(f"Querying locationss: query={query}, sort={sort}, skip={skip}, limit={limit}, fields={fields}")
+    logger.debug(
+        "Querying locationss: query=%s, sort=%s, skip=%s, limit=%s, fields=%s", query, sort, skip, limit, fields
+    )
     
     service = LocationsService(db)
     try:
@@ -112,10 +136,12 @@ async def query_locationss(
             query_dict=query_dict,
             sort=sort,
         )
-        logger.debug(f"Found {result['total']} locationss")
+        logger.debug("Found %s locationss", result['total'])
         return result
     except HTTPException:
         raise
+    except InvalidFilter as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         logger.error(f"Error querying locationss: {str(e)}", exc_info=True)
         raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
@@ -128,10 +154,12 @@ async def query_locationss_all(
     skip: int = Query(0, ge=0, description="Number of records to skip"),
     limit: int = Query(20, ge=1, le=2000, description="Max number of records to return"),
     fields: str = Query(None, description="Comma-separated list of fields to return"),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ):
     # Query locationss with filtering, sorting, and pagination without user limitation
-    logger.debug(f"Querying locationss: query={query}, sort={sort}, skip={skip}, limit={limit}, fields={fields}")
+    logger.debug(
+        "Querying locationss: query=%s, sort=%s, skip=%s, limit=%s, fields=%s", query, sort, skip, limit, fields
+    )
 
     service = LocationsService(db)
     try:
@@ -149,23 +177,44 @@ async def query_locationss_all(
             query_dict=query_dict,
             sort=sort
         )
-        logger.debug(f"Found {result['total']} locationss")
+        logger.debug("Found %s locationss", result['total'])
         return result
     except HTTPException:
         raise
+    except InvalidFilter as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         logger.error(f"Error querying locationss: {str(e)}", exc_info=True)
         raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
 
 
+@router.get("/changes", response_model=LocationsChangesResponse)
+async def get_locationss_changes(
+    since: int = Query(None, ge=0, description="next_since of the previous response; omit to get the current version"),
+    limit: int = Query(500, ge=1, le=5000, description="Max number of changes to return"),
+    db: AsyncSession = Depends(get_read_db),
+):
+    """Inserts, updates and deletes of locationss after version `since`, oldest first"""
+    logger.debug("Fetching locations changes since %s, limit=%s", since, limit)
+
+    service = LocationsService(db)
+    try:
+        return await service.get_changes(since, limit)
+    except ChangeFeedExpired as e:
+        raise HTTPException(status_code=410, detail=str(e))
+    except Exception as e:
+        logger.error(f"Error fetching locations changes: {str(e)}", exc_info=True)
+        raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
+
+
 @router.get("/{id}", response_model=LocationsResponse)
 async def get_locations(
     id: int,
     fields: str = Query(None, description="Comma-separated list of fields to return"),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ):
     """Get a single locations by ID"""
-    logger.debug(f"Fetching locations with id: {id}, fields={fields}")
+    logger.debug("Fetching locations with id: %s, fields=%s", id, fields)
     
     service = LocationsService(db)
     try:
@@ -188,7 +237,7 @@ async def create_locations(
     db: AsyncSession = Depends(get_db),
 ):
     """Create a new locations"""
-    logger.debug(f"Creating new locations with data: {data}")
+    logger.debug("Creating new locations with data: %s", data)
     
     service = LocationsService(db)
     try:
@@ -196,7 +245,7 @@ async def create_locations(
         if not result:
             raise HTTPException(status_code=400, detail="Failed to create locations")
         
-        logger.info(f"Locations created successfully with id: {result.id}")
+        logger.info("Locations created successfully with id: %s", result.id)
         return result
     except ValueError as e:
         logger.error(f"Validation error creating locations: {str(e)}")
@@ -212,7 +261,7 @@ async def create_locationss_batch(
     db: AsyncSession = Depends(get_db),
 ):
     """Create multiple locationss in a single request"""
-    logger.debug(f"Batch creating {len(request.items)} locationss")
+    logger.debug("Batch creating %s locationss", len(request.items))
     
     service = LocationsService(db)
     results = []
@@ -223,7 +272,7 @@ async def create_locationss_batch(
             if result:
                 results.append(result)
         
-        logger.info(f"Batch created {len(results)} locationss successfully")
+        logger.info("Batch created %s locationss successfully", len(results))
         return results
     except Exception as e:
         await db.rollback()
@@ -237,7 +286,7 @@ async def update_locationss_batch(
     db: AsyncSession = Depends(get_db),
 ):
     """Update multiple locationss in a single request"""
-    logger.debug(f"Batch updating {len(request.items)} locationss")
+    logger.debug("Batch updating %s locationss", len(request.items))
     
     service = LocationsService(db)
     results = []
@@ -250,7 +299,7 @@ async def update_locationss_batch(
             if result:
                 results.append(result)
         
-        logger.info(f"Batch updated {len(results)} locationss successfully")
+        logger.info("Batch updated %s locationss successfully", len(results))
         return results
     except Exception as e:
         await db.rollback()
@@ -258,6 +307,27 @@ async def update_locationss_batch(
         raise HTTPException(status_code=500, detail=f"Batch update failed: {str(e)}")
 
 
+@router.put("/upsert")
+async def upsert_locationss(
+    request: LocationsUpsertRequest,
+    db: AsyncSession = Depends(get_db),
+):
+    """Insert or update multiple locationss by location_code (fields an item does not send are left unchanged)"""
+    logger.debug("Upserting %s locationss", len(request.items))
+
+    service = LocationsService(db)
+    try:
+        items = [item.model_dump(include=item.model_fields_set) for item in request.items]
+        upserted_count = await service.upsert_batch(items)
+        logger.info("Upserted %s locationss successfully", upserted_count)
+        return {"message": f"Successfully upserted {upserted_count} locationss", "upserted_count": upserted_count}
+    except NotImplementedError as e:
+        raise HTTPException(status_code=501, detail=str(e))
+    except Exception as e:
+        logger.error(f"Error in upsert: {str(e)}", exc_info=True)
+        raise HTTPException(status_code=500, detail=f"Upsert failed: {str(e)}")
+
+
 @router.put("/{id}", response_model=LocationsResponse)
 async def update_locations(
     id: int,
@@ -265,7 +335,7 @@ async def update_locations(
     db: AsyncSession = Depends(get_db),
 ):
     """Update an existing locations"""
-    logger.debug(f"Updating locations {id} with data: {data}")
+    logger.debug("Updating locations %s with data: %s", id, data)
 
     service = LocationsService(db)
     try:
@@ -276,7 +346,7 @@ async def update_locations(
             logger.warning(f"Locations with id {id} not found for update")
             raise HTTPException(status_code=404, detail="Locations not found")
         
-        logger.info(f"Locations {id} updated successfully")
+        logger.info("Locations %s updated successfully", id)
         return result
     except HTTPException:
         raise
@@ -294,7 +364,7 @@ async def delete_locationss_batch(
     db: AsyncSession = Depends(get_db),
 ):
     """Delete multiple locationss by their IDs"""
-    logger.debug(f"Batch deleting {len(request.ids)} locationss")
+    logger.debug("Batch deleting %s locationss", len(request.ids))
     
     service = LocationsService(db)
     deleted_count = 0
@@ -305,7 +375,7 @@ async def delete_locationss_batch(
             if success:
                 deleted_count += 1
         
-        logger.info(f"Batch deleted {deleted_count} locationss successfully")
+        logger.info("Batch deleted %s locationss successfully", deleted_count)
         return {"message": f"Successfully deleted {deleted_count} locationss", "deleted_count": deleted_count}
     except Exception as e:
         await db.rollback()
@@ -319,7 +389,7 @@ async def delete_locations(
     db: AsyncSession = Depends(get_db),
 ):
     """Delete a single locations by ID"""
-    logger.debug(f"Deleting locations with id: {id}")
+    logger.debug("Deleting locations with id: %s", id)
     
     service = LocationsService(db)
     try:
@@ -328,7 +398,7 @@ async def delete_locations(
             logger.warning(f"Locations with id {id} not found for deletion")
             raise HTTPException(status_code=404, detail="Locations not found")
         
-        logger.info(f"Locations {id} deleted successfully")
+        logger.info("Locations %s deleted successfully", id)
         return {"message": "Locations deleted successfully", "id": id}
     except HTTPException:
         raise
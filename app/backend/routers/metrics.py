@@ -0,0 +1,24 @@
+import secrets
+
+from core.config import settings
+from core.metrics import render_metrics
+from fastapi import APIRouter, Header, HTTPException, status
+from fastapi.responses import PlainTextResponse
+
+router = APIRouter(prefix="/metrics", tags=["metrics"])
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+@router.get("", response_class=PlainTextResponse)
+async def metrics(authorization: str = Header(default="")):
+    """Prometheus scrape endpoint: per-route latency and size histograms, in-flight requests, pool stats, loop lag"""
+    if not settings.metrics_token:
+        # Unauthenticated scrapes are only allowed on a local development server
+        if settings.environment != "development" or settings.is_lambda:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN, detail="Metrics require METRICS_TOKEN outside development"
+            )
+    elif not secrets.compare_digest(authorization, f"Bearer {settings.metrics_token}"):
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid metrics token")
+    return PlainTextResponse(render_metrics(), media_type=PROMETHEUS_CONTENT_TYPE)
@@ -7,7 +7,9 @@ from fastapi import APIRouter, Body, Depends, HTTPException, Query
 from pydantic import BaseModel
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from core.database import get_db
+from core.change_feed import ChangeFeedExpired
+from core.database import get_db, get_read_db
+from core.statement_cache import InvalidFilter
 from services.notifications import NotificationsService
 from dependencies.auth import get_current_user
 from schemas.auth import UserResponse
@@ -59,6 +61,21 @@ class NotificationsListResponse(BaseModel):
     limit: int
 
 
+class NotificationsChange(BaseModel):
+    """Change feed entry (data is the current row, None for deletes)"""
+    version: int
+    operation: str
+    id: int
+    data: Optional[NotificationsResponse] = None
+
+
+class NotificationsChangesResponse(BaseModel):
+    """Change feed response"""
+    changes: List[NotificationsChange]
+    next_since: int
+    has_more: bool
+
+
 class NotificationsBatchCreateRequest(BaseModel):
     """Batch create request"""
     items: List[NotificationsData]
@@ -89,10 +106,12 @@ async def query_notificationss(
     limit: int = Query(20, ge=1, le=2000, description="Max number of records to return"),
     fields: str = Query(None, description="Comma-separated list of fields to return"),
     current_user: UserResponse = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ):
     """Query notificationss with filtering, sorting, and pagination (user can only see their own records)"""
-    logger.debug(f"Querying notificationss: query={query}, sort={sort}, skip={skip}, limit={limit}, fields={fields}")
+    logger.debug(
+        "Querying notificationss: query=%s, sort=%s, skip=%s, limit=%s, fields=%s", query, sort, skip, limit, fields
+    )
     
     service = NotificationsService(db)
     try:
@@ -111,10 +130,12 @@ async def query_notificationss(
             sort=sort,
             user_id=str(current_user.id),
         )
-        logger.debug(f"Found {result['total']} notificationss")
+        logger.debug("Found %s notificationss", result['total'])
         return result
     except HTTPException:
         raise
+    except InvalidFilter as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         logger.error(f"Error querying notificationss: {str(e)}", exc_info=True)
         raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
@@ -127,10 +148,12 @@ async def query_notificationss_all(
     skip: int = Query(0, ge=0, description="Number of records to skip"),
     limit: int = Query(20, ge=1, le=2000, description="Max number of records to return"),
     fields: str = Query(None, description="Comma-separated list of fields to return"),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ):
     # Query notificationss with filtering, sorting, and pagination without user limitation
-    logger.debug(f"Querying notificationss: query={query}, sort={sort}, skip={skip}, limit={limit}, fields={fields}")
+    logger.debug(
+        "Querying notificationss: query=%s, sort=%s, skip=%s, limit=%s, fields=%s", query, sort, skip, limit, fields
+    )
 
     service = NotificationsService(db)
     try:
@@ -148,24 +171,60 @@ async def query_notificationss_all(
             query_dict=query_dict,
             sort=sort
         )
-        logger.debug(f"Found {result['total']} notificationss")
+        logger.debug("Found %s notificationss", result['total'])
         return result
     except HTTPException:
         raise
+    except InvalidFilter as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         logger.error(f"Error querying notificationss: {str(e)}", exc_info=True)
         raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
 
 
+@router.get("/changes", response_model=NotificationsChangesResponse)
+async def get_notificationss_changes(
+    since: int = Query(None, ge=0, description="next_since of the previous response; omit to get the current version"),
+    limit: int = Query(500, ge=1, le=5000, description="Max number of changes to return"),
+    current_user: UserResponse = Depends(get_current_user),
+    db: AsyncSession = Depends(get_read_db),
+):
+    """Inserts, updates and deletes of notificationss after version `since`, oldest first (user can only see their own records)"""
+    logger.debug("Fetching notifications changes since %s, limit=%s", since, limit)
+
+    service = NotificationsService(db)
+    try:
+        return await service.get_changes(since, limit, user_id=str(current_user.id))
+    except ChangeFeedExpired as e:
+        raise HTTPException(status_code=410, detail=str(e))
+    except Exception as e:
+        logger.error(f"Error fetching notifications changes: {str(e)}", exc_info=True)
+        raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
+
+
+@router.get("/unread-count")
+async def count_unread_notificationss(
+    current_user: UserResponse = Depends(get_current_user),
+    db: AsyncSession = Depends(get_read_db),
+):
+    """Number of the current user's unread notificationss, for the unread badge"""
+    service = NotificationsService(db)
+    try:
+        return {"unread_count": await service.count_unread(str(current_user.id))}
+    except Exception as e:
+        logger.error(f"Error counting unread notificationss: {str(e)}", exc_info=True)
+        raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
+
+
 @router.get("/{id}", response_model=NotificationsResponse)
 async def get_notifications(
     id: int,
     fields: str = Query(None, description="Comma-separated list of fields to return"),
     current_user: UserResponse = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ):
     """Get a single notifications by ID (user can only see their own records)"""
-    logger.debug(f"Fetching notifications with id: {id}, fields={fields}")
+    logger.debug("Fetching notifications with id: %s, fields=%s", id, fields)
     
     service = NotificationsService(db)
     try:
@@ -189,7 +248,7 @@ async def create_notifications(
     db: AsyncSession = Depends(get_db),
 ):
     """Create a new notifications"""
-    logger.debug(f"Creating new notifications with data: {data}")
+    logger.debug("Creating new notifications with data: %s", data)
     
     service = NotificationsService(db)
     try:
@@ -197,7 +256,7 @@ async def create_notifications(
         if not result:
             raise HTTPException(status_code=400, detail="Failed to create notifications")
         
-        logger.info(f"Notifications created successfully with id: {result.id}")
+        logger.info("Notifications created successfully with id: %s", result.id)
         return result
     except ValueError as e:
         logger.error(f"Validation error creating notifications: {str(e)}")
@@ -214,7 +273,7 @@ async def create_notificationss_batch(
     db: AsyncSession = Depends(get_db),
 ):
     """Create multiple notificationss in a single request"""
-    logger.debug(f"Batch creating {len(request.items)} notificationss")
+    logger.debug("Batch creating %s notificationss", len(request.items))
     
     service = NotificationsService(db)
     results = []
@@ -225,7 +284,7 @@ async def create_notificationss_batch(
             if result:
                 results.append(result)
         
-        logger.info(f"Batch created {len(results)} notificationss successfully")
+        logger.info("Batch created %s notificationss successfully", len(results))
         return results
     except Exception as e:
         await db.rollback()
@@ -233,6 +292,22 @@ async def create_notificationss_batch(
         raise HTTPException(status_code=500, detail=f"Batch create failed: {str(e)}")
 
 
+@router.post("/mark-all-read")
+async def mark_all_notificationss_read(
+    up_to_id: int = Query(None, ge=1, description="Only mark notificationss up to this id, e.g. the newest one shown"),
+    current_user: UserResponse = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+):
+    """Mark all of the current user's unread notificationss read with a single UPDATE"""
+    service = NotificationsService(db)
+    try:
+        updated_count = await service.mark_all_read(str(current_user.id), up_to_id=up_to_id)
+        return {"message": f"Marked {updated_count} notificationss read", "updated_count": updated_count}
+    except Exception as e:
+        logger.error(f"Error marking notificationss read: {str(e)}", exc_info=True)
+        raise HTTPException(status_code=500, detail=f"Mark all read failed: {str(e)}")
+
+
 @router.put("/batch", response_model=List[NotificationsResponse])
 async def update_notificationss_batch(
     request: NotificationsBatchUpdateRequest,
@@ -240,7 +315,7 @@ async def update_notificationss_batch(
     db: AsyncSession = Depends(get_db),
 ):
     """Update multiple notificationss in a single request (requires ownership)"""
-    logger.debug(f"Batch updating {len(request.items)} notificationss")
+    logger.debug("Batch updating %s notificationss", len(request.items))
     
     service = NotificationsService(db)
     results = []
@@ -253,7 +328,7 @@ async def update_notificationss_batch(
             if result:
                 results.append(result)
         
-        logger.info(f"Batch updated {len(results)} notificationss successfully")
+        logger.info("Batch updated %s notificationss successfully", len(results))
         return results
     except Exception as e:
         await db.rollback()
@@ -269,7 +344,7 @@ async def update_notifications(
     db: AsyncSession = Depends(get_db),
 ):
     """Update an existing notifications (requires ownership)"""
-    logger.debug(f"Updating notifications {id} with data: {data}")
+    logger.debug("Updating notifications %s with data: %s", id, data)
 
     service = NotificationsService(db)
     try:
@@ -280,7 +355,7 @@ async def update_notifications(
             logger.warning(f"Notifications with id {id} not found for update")
             raise HTTPException(status_code=404, detail="Notifications not found")
         
-        logger.info(f"Notifications {id} updated successfully")
+        logger.info("Notifications %s updated successfully", id)
         return result
     except HTTPException:
         raise
@@ -299,7 +374,7 @@ async def delete_notificationss_batch(
     db: AsyncSession = Depends(get_db),
 ):
     """Delete multiple notificationss by their IDs (requires ownership)"""
-    logger.debug(f"Batch deleting {len(request.ids)} notificationss")
+    logger.debug("Batch deleting %s notificationss", len(request.ids))
     
     service = NotificationsService(db)
     deleted_count = 0
@@ -310,7 +385,7 @@ async def delete_notificationss_batch(
             if success:
                 deleted_count += 1
         
-        logger.info(f"Batch deleted {deleted_count} notificationss successfully")
+        logger.info("Batch deleted %s notificationss successfully", deleted_count)
         return {"message": f"Successfully deleted {deleted_count} notificationss", "deleted_count": deleted_count}
     except Exception as e:
         await db.rollback()
@@ -325,7 +400,7 @@ async def delete_notifications(
     db: AsyncSession = Depends(get_db),
 ):
     """Delete a single notifications by ID (requires ownership)"""
-    logger.debug(f"Deleting notifications with id: {id}")
+    logger.debug("Deleting notifications with id: %s", id)
     
     service = NotificationsService(db)
     try:
@@ -334,7 +409,7 @@ async def delete_notifications(
             logger.warning(f"Notifications with id {id} not found for deletion")
             raise HTTPException(status_code=404, detail="Notifications not found")
         
-        logger.info(f"Notifications {id} deleted successfully")
+        logger.info("Notifications %s deleted successfully", id)
         return {"message": "Notifications deleted successfully", "id": id}
     except HTTPException:
         raise
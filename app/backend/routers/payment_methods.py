@@ -7,7 +7,9 @@ from fastapi import APIRouter, Body, Depends, HTTPException, Query
 from pydantic import BaseModel
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from core.database import get_db
+from core.change_feed import ChangeFeedExpired
+from core.database import get_db, get_read_db
+from core.statement_cache import InvalidFilter
 from services.payment_methods import Payment_methodsService
 
 # Set up logging
@@ -53,6 +55,21 @@ class Payment_methodsListResponse(BaseModel):
     limit: int
 
 
+class Payment_methodsChange(BaseModel):
+    """Change feed entry (data is the current row, None for deletes)"""
+    version: int
+    operation: str
+    id: int
+    data: Optional[Payment_methodsResponse] = None
+
+
+class Payment_methodsChangesResponse(BaseModel):
+    """Change feed response"""
+    changes: List[Payment_methodsChange]
+    next_since: int
+    has_more: bool
+
+
 class Payment_methodsBatchCreateRequest(BaseModel):
     """Batch create request"""
     items: List[Payment_methodsData]
@@ -82,10 +99,12 @@ async def query_payment_methodss(
     skip: int = Query(0, ge=0, description="Number of records to skip"),
     limit: int = Query(20, ge=1, le=2000, description="Max number of records to return"),
     fields: str = Query(None, description="Comma-separated list of fields to return"),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ):
     """Query payment_methodss with filtering, sorting, and pagination"""
-    logger.debug(f"Querying payment_methodss: query={query}, sort={sort}, skip={skip}, limit={limit}, fields={fields}")
+    logger.debug(
+        "Querying payment_methodss: query=%s, sort=%s, skip=%s, limit=%s, fields=%s", query, sort, skip, limit, fields
+    )
     
     service = Payment_methodsService(db)
     try:
@@ -103,10 +122,12 @@ async def query_payment_methodss(
             query_dict=query_dict,
             sort=sort,
         )
-        logger.debug(f"Found {result['total']} payment_methodss")
+        logger.debug("Found %s payment_methodss", result['total'])
         return result
     except HTTPException:
         raise
+    except InvalidFilter as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         logger.error(f"Error querying payment_methodss: {str(e)}", exc_info=True)
         raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
@@ -119,10 +140,12 @@ async def query_payment_methodss_all(
     skip: int = Query(0, ge=0, description="Number of records to skip"),
     limit: int = Query(20, ge=1, le=2000, description="Max number of records to return"),
     fields: str = Query(None, description="Comma-separated list of fields to return"),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ):
     # Query payment_methodss with filtering, sorting, and pagination without user limitation
-    logger.debug(f"Querying payment_methodss: query={query}, sort={sort}, skip={skip}, limit={limit}, fields={fields}")
+    logger.debug(
+        "Querying payment_methodss: query=%s, sort=%s, skip=%s, limit=%s, fields=%s", query, sort, skip, limit, fields
+    )
 
     service = Payment_methodsService(db)
     try:
@@ -140,23 +163,44 @@ async def query_payment_methodss_all(
             query_dict=query_dict,
             sort=sort
         )
-        logger.debug(f"Found {result['total']} payment_methodss")
+        logger.debug("Found %s payment_methodss", result['total'])
         return result
     except HTTPException:
         raise
+    except InvalidFilter as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         logger.error(f"Error querying payment_methodss: {str(e)}", exc_info=True)
         raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
 
 
+@router.get("/changes", response_model=Payment_methodsChangesResponse)
+async def get_payment_methodss_changes(
+    since: int = Query(None, ge=0, description="next_since of the previous response; omit to get the current version"),
+    limit: int = Query(500, ge=1, le=5000, description="Max number of changes to return"),
+    db: AsyncSession = Depends(get_read_db),
+):
+    """Inserts, updates and deletes of payment_methodss after version `since`, oldest first"""
+    logger.debug("Fetching payment_methods changes since %s, limit=%s", since, limit)
+
+    service = Payment_methodsService(db)
+    try:
+        return await service.get_changes(since, limit)
+    except ChangeFeedExpired as e:
+        raise HTTPException(status_code=410, detail=str(e))
+    except Exception as e:
+        logger.error(f"Error fetching payment_methods changes: {str(e)}", exc_info=True)
+        raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
+
+
 @router.get("/{id}", response_model=Payment_methodsResponse)
 async def get_payment_methods(
     id: int,
     fields: str = Query(None, description="Comma-separated list of fields to return"),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ):
     """Get a single payment_methods by ID"""
-    logger.debug(f"Fetching payment_methods with id: {id}, fields={fields}")
+    logger.debug("Fetching payment_methods with id: %s, fields=%s", id, fields)
     
     service = Payment_methodsService(db)
     try:
@@ -179,7 +223,7 @@ async def create_payment_methods(
     db: AsyncSession = Depends(get_db),
 ):
     """Create a new payment_methods"""
-    logger.debug(f"Creating new payment_methods with data: {data}")
+    logger.debug("Creating new payment_methods with data: %s", data)
     
     service = Payment_methodsService(db)
     try:
@@ -187,7 +231,7 @@ async def create_payment_methods(
         if not result:
             raise HTTPException(status_code=400, detail="Failed to create payment_methods")
         
-        logger.info(f"Payment_methods created successfully with id: {result.id}")
+        logger.info("Payment_methods created successfully with id: %s", result.id)
         return result
     except ValueError as e:
         logger.error(f"Validation error creating payment_methods: {str(e)}")
@@ -203,7 +247,7 @@ async def create_payment_methodss_batch(
     db: AsyncSession = Depends(get_db),
 ):
     """Create multiple payment_methodss in a single request"""
-    logger.debug(f"Batch creating {len(request.items)} payment_methodss")
+    logger.debug("Batch creating %s payment_methodss", len(request.items))
     
     service = Payment_methodsService(db)
     results = []
@@ -214,7 +258,7 @@ async def create_payment_methodss_batch(
             if result:
                 results.append(result)
         
-        logger.info(f"Batch created {len(results)} payment_methodss successfully")
+        logger.info("Batch created %s payment_methodss successfully", len(results))
         return results
     except Exception as e:
         await db.rollback()
@@ -228,7 +272,7 @@ async def update_payment_methodss_batch(
     db: AsyncSession = Depends(get_db),
 ):
     """Update multiple payment_methodss in a single request"""
-    logger.debug(f"Batch updating {len(request.items)} payment_methodss")
+    logger.debug("Batch updating %s payment_methodss", len(request.items))
     
     service = Payment_methodsService(db)
     results = []
@@ -241,7 +285,7 @@ async def update_payment_methodss_batch(
             if result:
                 results.append(result)
         
-        logger.info(f"Batch updated {len(results)} payment_methodss successfully")
+        logger.info("Batch updated %s payment_methodss successfully", len(results))
         return results
     except Exception as e:
         await db.rollback()
@@ -256,7 +300,7 @@ async def update_payment_methods(
     db: AsyncSession = Depends(get_db),
 ):
     """Update an existing payment_methods"""
-    logger.debug(f"Updating payment_methods {id} with data: {data}")
+    logger.debug("Updating payment_methods %s with data: %s", id, data)
 
     service = Payment_methodsService(db)
     try:
@@ -267,7 +311,7 @@ async def update_payment_methods(
             logger.warning(f"Payment_methods with id {id} not found for update")
             raise HTTPException(status_code=404, detail="Payment_methods not found")
         
-        logger.info(f"Payment_methods {id} updated successfully")
+        logger.info("Payment_methods %s updated successfully", id)
         return result
     except HTTPException:
         raise
@@ -285,7 +329,7 @@ async def delete_payment_methodss_batch(
     db: AsyncSession = Depends(get_db),
 ):
     """Delete multiple payment_methodss by their IDs"""
-    logger.debug(f"Batch deleting {len(request.ids)} payment_methodss")
+    logger.debug("Batch deleting %s payment_methodss", len(request.ids))
     
     service = Payment_methodsService(db)
     deleted_count = 0
@@ -296,7 +340,7 @@ async def delete_payment_methodss_batch(
             if success:
                 deleted_count += 1
         
-        logger.info(f"Batch deleted {deleted_count} payment_methodss successfully")
+        logger.info("Batch deleted %s payment_methodss successfully", deleted_count)
         return {"message": f"Successfully deleted {deleted_count} payment_methodss", "deleted_count": deleted_count}
     except Exception as e:
         await db.rollback()
@@ -310,7 +354,7 @@ async def delete_payment_methods(
     db: AsyncSession = Depends(get_db),
 ):
     """Delete a single payment_methods by ID"""
-    logger.debug(f"Deleting payment_methods with id: {id}")
+    logger.debug("Deleting payment_methods with id: %s", id)
     
     service = Payment_methodsService(db)
     try:
@@ -319,7 +363,7 @@ async def delete_payment_methods(
             logger.warning(f"Payment_methods with id {id} not found for deletion")
             raise HTTPException(status_code=404, detail="Payment_methods not found")
         
-        logger.info(f"Payment_methods {id} deleted successfully")
+        logger.info("Payment_methods %s deleted successfully", id)
         return {"message": "Payment_methods deleted successfully", "id": id}
     except HTTPException:
         raise
@@ -7,7 +7,9 @@ from fastapi import APIRouter, Body, Depends, HTTPException, Query
 from pydantic import BaseModel
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from core.database import get_db
+from core.change_feed import ChangeFeedExpired
+from core.database import get_db, get_read_db
+from core.statement_cache import InvalidFilter
 from services.products import ProductsService
 
 # Set up logging
@@ -59,6 +61,21 @@ class ProductsListResponse(BaseModel):
     limit: int
 
 
+class ProductsChange(BaseModel):
+    """Change feed entry (data is the current row, None for deletes)"""
+    version: int
+    operation: str
+    id: int
+    data: Optional[ProductsResponse] = None
+
+
+class ProductsChangesResponse(BaseModel):
+    """Change feed response"""
+    changes: List[ProductsChange]
+    next_since: int
+    has_more: bool
+
+
 class ProductsBatchCreateRequest(BaseModel):
     """Batch create request"""
     items: List[ProductsData]
@@ -88,10 +105,12 @@ async def query_productss(
     skip: int = Query(0, ge=0, description="Number of records to skip"),
     limit: int = Query(20, ge=1, le=2000, description="Max number of records to return"),
     fields: str = Query(None, description="Comma-separated list of fields to return"),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ):
     """Query productss with filtering, sorting, and pagination"""
-    logger.debug(f"Querying productss: query={query}, sort={sort}, skip={skip}, limit={limit}, fields={fields}")
+    logger.debug(
+        "Querying productss: query=%s, sort=%s, skip=%s, limit=%s, fields=%s", query, sort, skip, limit, fields
+    )
     
     service = ProductsService(db)
     try:
@@ -109,10 +128,12 @@ async def query_productss(
             query_dict=query_dict,
             sort=sort,
         )
-        logger.debug(f"Found {result['total']} productss")
+        logger.debug("Found %s productss", result['total'])
         return result
     except HTTPException:
         raise
+    except InvalidFilter as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         logger.error(f"Error querying productss: {str(e)}", exc_info=True)
         raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
@@ -125,10 +146,12 @@ async def query_productss_all(
     skip: int = Query(0, ge=0, description="Number of records to skip"),
     limit: int = Query(20, ge=1, le=2000, description="Max number of records to return"),
     fields: str = Query(None, description="Comma-separated list of fields to return"),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ):
     # Query productss with filtering, sorting, and pagination without user limitation
-    logger.debug(f"Querying productss: query={query}, sort={sort}, skip={skip}, limit={limit}, fields={fields}")
+    logger.debug(
+        "Querying productss: query=%s, sort=%s, skip=%s, limit=%s, fields=%s", query, sort, skip, limit, fields
+    )
 
     service = ProductsService(db)
     try:
@@ -146,23 +169,44 @@ async def query_productss_all(
             query_dict=query_dict,
             sort=sort
         )
-        logger.debug(f"Found {result['total']} productss")
+        logger.debug("Found %s productss", result['total'])
         return result
     except HTTPException:
         raise
+    except InvalidFilter as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         logger.error(f"Error querying productss: {str(e)}", exc_info=True)
         raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
 
 
+@router.get("/changes", response_model=ProductsChangesResponse)
+async def get_productss_changes(
+    since: int = Query(None, ge=0, description="next_since of the previous response; omit to get the current version"),
+    limit: int = Query(500, ge=1, le=5000, description="Max number of changes to return"),
+    db: AsyncSession = Depends(get_read_db),
+):
+    """Inserts, updates and deletes of productss after version `since`, oldest first"""
+    logger.debug("Fetching products changes since %s, limit=%s", since, limit)
+
+    service = ProductsService(db)
+    try:
+        return await service.get_changes(since, limit)
+    except ChangeFeedExpired as e:
+        raise HTTPException(status_code=410, detail=str(e))
+    except Exception as e:
+        logger.error(f"Error fetching products changes: {str(e)}", exc_info=True)
+        raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
+
+
 @router.get("/{id}", response_model=ProductsResponse)
 async def get_products(
     id: int,
     fields: str = Query(None, description="Comma-separated list of fields to return"),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ):
     """Get a single products by ID"""
-    logger.debug(f"Fetching products with id: {id}, fields={fields}")
+    logger.debug("Fetching products with id: %s, fields=%s", id, fields)
     
     service = ProductsService(db)
     try:
@@ -185,7 +229,7 @@ async def create_products(
     db: AsyncSession = Depends(get_db),
 ):
     """Create a new products"""
-    logger.debug(f"Creating new products with data: {data}")
+    logger.debug("Creating new products with data: %s", data)
     
     service = ProductsService(db)
     try:
@@ -193,7 +237,7 @@ async def create_products(
         if not result:
             raise HTTPException(status_code=400, detail="Failed to create products")
         
-        logger.info(f"Products created successfully with id: {result.id}")
+        logger.info("Products created successfully with id: %s", result.id)
         return result
     except ValueError as e:
         logger.error(f"Validation error creating products: {str(e)}")
@@ -209,7 +253,7 @@ async def create_productss_batch(
     db: AsyncSession = Depends(get_db),
 ):
     """Create multiple productss in a single request"""
-    logger.debug(f"Batch creating {len(request.items)} productss")
+    logger.debug("Batch creating %s productss", len(request.items))
     
     service = ProductsService(db)
     results = []
@@ -220,7 +264,7 @@ async def create_productss_batch(
             if result:
                 results.append(result)
         
-        logger.info(f"Batch created {len(results)} productss successfully")
+        logger.info("Batch created %s productss successfully", len(results))
         return results
     except Exception as e:
         await db.rollback()
@@ -234,7 +278,7 @@ async def update_productss_batch(
     db: AsyncSession = Depends(get_db),
 ):
     """Update multiple productss in a single request"""
-    logger.debug(f"Batch updating {len(request.items)} productss")
+    logger.debug("Batch updating %s productss", len(request.items))
     
     service = ProductsService(db)
     results = []
@@ -247,7 +291,7 @@ async def update_productss_batch(
             if result:
                 results.append(result)
         
-        logger.info(f"Batch updated {len(results)} productss successfully")
+        logger.info("Batch updated %s productss successfully", len(results))
         return results
     except Exception as e:
         await db.rollback()
@@ -262,7 +306,7 @@ async def update_products(
     db: AsyncSession = Depends(get_db),
 ):
     """Update an existing products"""
-    logger.debug(f"Updating products {id} with data: {data}")
+    logger.debug("Updating products %s with data: %s", id, data)
 
     service = ProductsService(db)
     try:
@@ -273,7 +317,7 @@ async def update_products(
             logger.warning(f"Products with id {id} not found for update")
             raise HTTPException(status_code=404, detail="Products not found")
         
-        logger.info(f"Products {id} updated successfully")
+        logger.info("Products %s updated successfully", id)
         return result
     except HTTPException:
         raise
@@ -291,7 +335,7 @@ async def delete_productss_batch(
     db: AsyncSession = Depends(get_db),
 ):
     """Delete multiple productss by their IDs"""
-    logger.debug(f"Batch deleting {len(request.ids)} productss")
+    logger.debug("Batch deleting %s productss", len(request.ids))
     
     service = ProductsService(db)
     deleted_count = 0
@@ -302,7 +346,7 @@ async def delete_productss_batch(
             if success:
                 deleted_count += 1
         
-        logger.info(f"Batch deleted {deleted_count} productss successfully")
+        logger.info("Batch deleted %s productss successfully", deleted_count)
         return {"message": f"Successfully deleted {deleted_count} productss", "deleted_count": deleted_count}
     except Exception as e:
         await db.rollback()
@@ -316,7 +360,7 @@ async def delete_products(
     db: AsyncSession = Depends(get_db),
 ):
     """Delete a single products by ID"""
-    logger.debug(f"Deleting products with id: {id}")
+    logger.debug("Deleting products with id: %s", id)
     
     service = ProductsService(db)
     try:
@@ -325,7 +369,7 @@ async def delete_products(
             logger.warning(f"Products with id {id} not found for deletion")
             raise HTTPException(status_code=404, detail="Products not found")
         
-        logger.info(f"Products {id} deleted successfully")
+        logger.info("Products %s deleted successfully", id)
         return {"message": "Products deleted successfully", "id": id}
     except HTTPException:
         raise
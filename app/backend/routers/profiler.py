@@ -0,0 +1,61 @@
+import asyncio
+import logging
+from typing import Optional
+
+from core.config import settings
+from core.profiler import profiler
+from dependencies.auth import get_admin_user
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import PlainTextResponse
+from schemas.auth import UserResponse
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(prefix="/api/v1/profiler", tags=["profiler"])
+
+
+@router.get("")
+async def profiler_status(_current_user: UserResponse = Depends(get_admin_user)):
+    """Get the sampling profiler state of the worker serving this request"""
+    return profiler.status()
+
+
+@router.post("/start")
+async def start_profiler(
+    interval_ms: float = Query(10.0, ge=1.0, le=1000.0),
+    duration_seconds: Optional[float] = Query(None, gt=0),
+    reset: bool = Query(True, description="Discard stacks from earlier runs"),
+    _current_user: UserResponse = Depends(get_admin_user),
+):
+    """Start sampling stacks in this worker; it stops by itself after the duration (capped by PROFILER_MAX_SECONDS)"""
+    duration = min(duration_seconds or settings.profiler_max_seconds, settings.profiler_max_seconds)
+    if profiler.running:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Profiler is already running")
+    if reset:
+        profiler.reset()
+    profiler.start(interval=interval_ms / 1000, duration=duration)
+    return profiler.status()
+
+
+@router.post("/stop")
+async def stop_profiler(_current_user: UserResponse = Depends(get_admin_user)):
+    """Stop sampling in this worker and keep the collected stacks"""
+    # Joining the sampler thread can take up to a sampling interval; wait for it off the event loop
+    await asyncio.to_thread(profiler.stop)
+    return profiler.status()
+
+
+@router.get("/collapsed", response_class=PlainTextResponse)
+async def collapsed_stacks(
+    thread: Optional[str] = Query(None, description="Only stacks of this thread, e.g. MainThread"),
+    _current_user: UserResponse = Depends(get_admin_user),
+):
+    """Collapsed stacks (`frame;frame;frame count`) for flamegraph.pl or speedscope"""
+    return PlainTextResponse(profiler.collapsed(thread))
+
+
+@router.delete("")
+async def reset_profiler(_current_user: UserResponse = Depends(get_admin_user)):
+    """Discard collected stacks"""
+    profiler.reset()
+    return profiler.status()
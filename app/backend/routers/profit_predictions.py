@@ -8,7 +8,9 @@ from fastapi import APIRouter, Body, Depends, HTTPException, Query
 from pydantic import BaseModel
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from core.database import get_db
+from core.change_feed import ChangeFeedExpired
+from core.database import get_db, get_read_db
+from core.statement_cache import InvalidFilter
 from services.profit_predictions import Profit_predictionsService
 
 # Set up logging
@@ -51,6 +53,21 @@ class Profit_predictionsListResponse(BaseModel):
     limit: int
 
 
+class Profit_predictionsChange(BaseModel):
+    """Change feed entry (data is the current row, None for deletes)"""
+    version: int
+    operation: str
+    id: int
+    data: Optional[Profit_predictionsResponse] = None
+
+
+class Profit_predictionsChangesResponse(BaseModel):
+    """Change feed response"""
+    changes: List[Profit_predictionsChange]
+    next_since: int
+    has_more: bool
+
+
 class Profit_predictionsBatchCreateRequest(BaseModel):
     """Batch create request"""
     items: List[Profit_predictionsData]
@@ -80,10 +97,13 @@ async def query_profit_predictionss(
     skip: int = Query(0, ge=0, description="Number of records to skip"),
     limit: int = Query(20, ge=1, le=2000, description="Max number of records to return"),
     fields: str = Query(None, description="Comma-separated list of fields to return"),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ):
     """Query profit_predictionss with filtering, sorting, and pagination"""
-    logger.debug(f"Querying profit_predictionss: query={query}, sort={sort}, skip={skip}, limit={limit}, fields={fields}")
+    logger.debug(
+        "Querying profit_predictionss: query=%s, sort=%s, skip=%s, limit=%s, fields=%s",
+        query, sort, skip, limit, fields
+    )
     
     service = Profit_predictionsService(db)
     try:
@@ -101,10 +121,12 @@ async def query_profit_predictionss(
             query_dict=query_dict,
             sort=sort,
         )
-        logger.debug(f"Found {result['total']} profit_predictionss")
+        logger.debug("Found %s profit_predictionss", result['total'])
         return result
     except HTTPException:
         raise
+    except InvalidFilter as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         logger.error(f"Error querying profit_predictionss: {str(e)}", exc_info=True)
         raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
@@ -117,10 +139,13 @@ async def query_profit_predictionss_all(
     skip: int = Query(0, ge=0, description="Number of records to skip"),
     limit: int = Query(20, ge=1, le=2000, description="Max number of records to return"),
     fields: str = Query(None, description="Comma-separated list of fields to return"),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ):
     # Query profit_predictionss with filtering, sorting, and pagination without user limitation
-    logger.debug(f"Querying profit_predictionss: query={query}, sort={sort}, skip={skip}, limit={limit}, fields={fields}")
+    logger.debug(
+        "Querying profit_predictionss: query=%s, sort=%s, skip=%s, limit=%s, fields=%s",
+        query, sort, skip, limit, fields
+    )
 
     service = Profit_predictionsService(db)
     try:
@@ -138,23 +163,44 @@ async def query_profit_predictionss_all(
             query_dict=query_dict,
             sort=sort
         )
-        logger.debug(f"Found {result['total']} profit_predictionss")
+        logger.debug("Found %s profit_predictionss", result['total'])
         return result
     except HTTPException:
         raise
+    except InvalidFilter as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         logger.error(f"Error querying profit_predictionss: {str(e)}", exc_info=True)
         raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
 
 
+@router.get("/changes", response_model=Profit_predictionsChangesResponse)
+async def get_profit_predictionss_changes(
+    since: int = Query(None, ge=0, description="next_since of the previous response; omit to get the current version"),
+    limit: int = Query(500, ge=1, le=5000, description="Max number of changes to return"),
+    db: AsyncSession = Depends(get_read_db),
+):
+    """Inserts, updates and deletes of profit_predictionss after version `since`, oldest first"""
+    logger.debug("Fetching profit_predictions changes since %s, limit=%s", since, limit)
+
+    service = Profit_predictionsService(db)
+    try:
+        return await service.get_changes(since, limit)
+    except ChangeFeedExpired as e:
+        raise HTTPException(status_code=410, detail=str(e))
+    except Exception as e:
+        logger.error(f"Error fetching profit_predictions changes: {str(e)}", exc_info=True)
+        raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
+
+
 @router.get("/{id}", response_model=Profit_predictionsResponse)
 async def get_profit_predictions(
     id: int,
     fields: str = Query(None, description="Comma-separated list of fields to return"),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ):
     """Get a single profit_predictions by ID"""
-    logger.debug(f"Fetching profit_predictions with id: {id}, fields={fields}")
+    logger.debug("Fetching profit_predictions with id: %s, fields=%s", id, fields)
     
     service = Profit_predictionsService(db)
     try:
@@ -177,7 +223,7 @@ async def create_profit_predictions(
     db: AsyncSession = Depends(get_db),
 ):
     """Create a new profit_predictions"""
-    logger.debug(f"Creating new profit_predictions with data: {data}")
+    logger.debug("Creating new profit_predictions with data: %s", data)
     
     service = Profit_predictionsService(db)
     try:
@@ -185,7 +231,7 @@ async def create_profit_predictions(
         if not result:
             raise HTTPException(status_code=400, detail="Failed to create profit_predictions")
         
-        logger.info(f"Profit_predictions created successfully with id: {result.id}")
+        logger.info("Profit_predictions created successfully with id: %s", result.id)
         return result
     except ValueError as e:
         logger.error(f"Validation error creating profit_predictions: {str(e)}")
@@ -201,7 +247,7 @@ async def create_profit_predictionss_batch(
     db: AsyncSession = Depends(get_db),
 ):
     """Create multiple profit_predictionss in a single request"""
-    logger.debug(f"Batch creating {len(request.items)} profit_predictionss")
+    logger.debug("Batch creating %s profit_predictionss", len(request.items))
     
     service = Profit_predictionsService(db)
     results = []
@@ -212,7 +258,7 @@ async def create_profit_predictionss_batch(
             if result:
                 results.append(result)
         
-        logger.info(f"Batch created {len(results)} profit_predictionss successfully")
+        logger.info("Batch created %s profit_predictionss successfully", len(results))
         return results
     except Exception as e:
         await db.rollback()
@@ -226,7 +272,7 @@ async def update_profit_predictionss_batch(
     db: AsyncSession = Depends(get_db),
 ):
     """Update multiple profit_predictionss in a single request"""
-    logger.debug(f"Batch updating {len(request.items)} profit_predictionss")
+    logger.debug("Batch updating %s profit_predictionss", len(request.items))
     
     service = Profit_predictionsService(db)
     results = []
@@ -239,7 +285,7 @@ async def update_profit_predictionss_batch(
             if result:
                 results.append(result)
         
-        logger.info(f"Batch updated {len(results)} profit_predictionss successfully")
+        logger.info("Batch updated %s profit_predictionss successfully", len(results))
         return results
     except Exception as e:
         await db.rollback()
@@ -254,7 +300,7 @@ async def update_profit_predictions(
     db: AsyncSession = Depends(get_db),
 ):
     """Update an existing profit_predictions"""
-    logger.debug(f"Updating profit_predictions {id} with data: {data}")
+    logger.debug("Updating profit_predictions %s with data: %s", id, data)
 
     service = Profit_predictionsService(db)
     try:
@@ -265,7 +311,7 @@ async def update_profit_predictions(
             logger.warning(f"Profit_predictions with id {id} not found for update")
             raise HTTPException(status_code=404, detail="Profit_predictions not found")
         
-        logger.info(f"Profit_predictions {id} updated successfully")
+        logger.info("Profit_predictions %s updated successfully", id)
         return result
     except HTTPException:
         raise
@@ -283,7 +329,7 @@ async def delete_profit_predictionss_batch(
     db: AsyncSession = Depends(get_db),
 ):
     """Delete multiple profit_predictionss by their IDs"""
-    logger.debug(f"Batch deleting {len(request.ids)} profit_predictionss")
+    logger.debug("Batch deleting %s profit_predictionss", len(request.ids))
     
     service = Profit_predictionsService(db)
     deleted_count = 0
@@ -294,7 +340,7 @@ async def delete_profit_predictionss_batch(
             if success:
                 deleted_count += 1
         
-        logger.info(f"Batch deleted {deleted_count} profit_predictionss successfully")
+        logger.info("Batch deleted %s profit_predictionss successfully", deleted_count)
         return {"message": f"Successfully deleted {deleted_count} profit_predictionss", "deleted_count": deleted_count}
     except Exception as e:
         await db.rollback()
@@ -308,7 +354,7 @@ async def delete_profit_predictions(
     db: AsyncSession = Depends(get_db),
 ):
     """Delete a single profit_predictions by ID"""
-    logger.debug(f"Deleting profit_predictions with id: {id}")
+    logger.debug("Deleting profit_predictions with id: %s", id)
     
     service = Profit_predictionsService(db)
     try:
@@ -317,7 +363,7 @@ async def delete_profit_predictions(
             logger.warning(f"Profit_predictions with id {id} not found for deletion")
             raise HTTPException(status_code=404, detail="Profit_predictions not found")
         
-        logger.info(f"Profit_predictions {id} deleted successfully")
+        logger.info("Profit_predictions %s deleted successfully", id)
         return {"message": "Profit_predictions deleted successfully", "id": id}
     except HTTPException:
         raise
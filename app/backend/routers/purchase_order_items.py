@@ -7,7 +7,9 @@ from fastapi import APIRouter, Body, Depends, HTTPException, Query
 from pydantic import BaseModel
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from core.database import get_db
+from core.change_feed import ChangeFeedExpired
+from core.database import get_db, get_read_db
+from core.statement_cache import InvalidFilter
 from services.purchase_order_items import Purchase_order_itemsService
 from dependencies.auth import get_current_user
 from schemas.auth import UserResponse
@@ -68,6 +70,21 @@ class Purchase_order_itemsListResponse(BaseModel):
     limit: int
 
 
+class Purchase_order_itemsChange(BaseModel):
+    """Change feed entry (data is the current row, None for deletes)"""
+    version: int
+    operation: str
+    id: int
+    data: Optional[Purchase_order_itemsResponse] = None
+
+
+class Purchase_order_itemsChangesResponse(BaseModel):
+    """Change feed response"""
+    changes: List[Purchase_order_itemsChange]
+    next_since: int
+    has_more: bool
+
+
 class Purchase_order_itemsBatchCreateRequest(BaseModel):
     """Batch create request"""
     items: List[Purchase_order_itemsData]
@@ -98,10 +115,13 @@ async def query_purchase_order_itemss(
     limit: int = Query(20, ge=1, le=2000, description="Max number of records to return"),
     fields: str = Query(None, description="Comma-separated list of fields to return"),
     current_user: UserResponse = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ):
     """Query purchase_order_itemss with filtering, sorting, and pagination (user can only see their own records)"""
-    logger.debug(f"Querying purchase_order_itemss: query={query}, sort={sort}, skip={skip}, limit={limit}, fields={fields}")
+    logger.debug(
+        "Querying purchase_order_itemss: query=%s, sort=%s, skip=%s, limit=%s, fields=%s",
+        query, sort, skip, limit, fields
+    )
     
     service = Purchase_order_itemsService(db)
     try:
@@ -120,10 +140,12 @@ async def query_purchase_order_itemss(
             sort=sort,
             user_id=str(current_user.id),
         )
-        logger.debug(f"Found {result['total']} purchase_order_itemss")
+        logger.debug("Found %s purchase_order_itemss", result['total'])
         return result
     except HTTPException:
         raise
+    except InvalidFilter as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         logger.error(f"Error querying purchase_order_itemss: {str(e)}", exc_info=True)
         raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
@@ -136,10 +158,13 @@ async def query_purchase_order_itemss_all(
     skip: int = Query(0, ge=0, description="Number of records to skip"),
     limit: int = Query(20, ge=1, le=2000, description="Max number of records to return"),
     fields: str = Query(None, description="Comma-separated list of fields to return"),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ):
     # Query purchase_order_itemss with filtering, sorting, and pagination without user limitation
-    logger.debug(f"Querying purchase_order_itemss: query={query}, sort={sort}, skip={skip}, limit={limit}, fields={fields}")
+    logger.debug(
+        "Querying purchase_order_itemss: query=%s, sort=%s, skip=%s, limit=%s, fields=%s",
+        query, sort, skip, limit, fields
+    )
 
     service = Purchase_order_itemsService(db)
     try:
@@ -157,24 +182,46 @@ async def query_purchase_order_itemss_all(
             query_dict=query_dict,
             sort=sort
         )
-        logger.debug(f"Found {result['total']} purchase_order_itemss")
+        logger.debug("Found %s purchase_order_itemss", result['total'])
         return result
     except HTTPException:
         raise
+    except InvalidFilter as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         logger.error(f"Error querying purchase_order_itemss: {str(e)}", exc_info=True)
         raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
 
 
+@router.get("/changes", response_model=Purchase_order_itemsChangesResponse)
+async def get_purchase_order_itemss_changes(
+    since: int = Query(None, ge=0, description="next_since of the previous response; omit to get the current version"),
+    limit: int = Query(500, ge=1, le=5000, description="Max number of changes to return"),
+    current_user: UserResponse = Depends(get_current_user),
+    db: AsyncSession = Depends(get_read_db),
+):
+    """Inserts, updates and deletes of purchase_order_itemss after version `since`, oldest first (user can only see their own records)"""
+    logger.debug("Fetching purchase_order_items changes since %s, limit=%s", since, limit)
+
+    service = Purchase_order_itemsService(db)
+    try:
+        return await service.get_changes(since, limit, user_id=str(current_user.id))
+    except ChangeFeedExpired as e:
+        raise HTTPException(status_code=410, detail=str(e))
+    except Exception as e:
+        logger.error(f"Error fetching purchase_order_items changes: {str(e)}", exc_info=True)
+        raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
+
+
 @router.get("/{id}", response_model=Purchase_order_itemsResponse)
 async def get_purchase_order_items(
     id: int,
     fields: str = Query(None, description="Comma-separated list of fields to return"),
     current_user: UserResponse = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ):
     """Get a single purchase_order_items by ID (user can only see their own records)"""
-    logger.debug(f"Fetching purchase_order_items with id: {id}, fields={fields}")
+    logger.debug("Fetching purchase_order_items with id: %s, fields=%s", id, fields)
     
     service = Purchase_order_itemsService(db)
     try:
@@ -198,7 +245,7 @@ async def create_purchase_order_items(
     db: AsyncSession = Depends(get_db),
 ):
     """Create a new purchase_order_items"""
-    logger.debug(f"Creating new purchase_order_items with data: {data}")
+    logger.debug("Creating new purchase_order_items with data: %s", data)
     
     service = Purchase_order_itemsService(db)
     try:
@@ -206,7 +253,7 @@ async def create_purchase_order_items(
         if not result:
             raise HTTPException(status_code=400, detail="Failed to create purchase_order_items")
         
-        logger.info(f"Purchase_order_items created successfully with id: {result.id}")
+        logger.info("Purchase_order_items created successfully with id: %s", result.id)
         return result
     except ValueError as e:
         logger.error(f"Validation error creating purchase_order_items: {str(e)}")
@@ -223,7 +270,7 @@ async def create_purchase_order_itemss_batch(
     db: AsyncSession = Depends(get_db),
 ):
     """Create multiple purchase_order_itemss in a single request"""
-    logger.debug(f"Batch creating {len(request.items)} purchase_order_itemss")
+    logger.debug("Batch creating %s purchase_order_itemss", len(request.items))
     
     service = Purchase_order_itemsService(db)
     results = []
@@ -234,7 +281,7 @@ async def create_purchase_order_itemss_batch(
             if result:
                 results.append(result)
         
-        logger.info(f"Batch created {len(results)} purchase_order_itemss successfully")
+        logger.info("Batch created %s purchase_order_itemss successfully", len(results))
         return results
     except Exception as e:
         await db.rollback()
@@ -249,7 +296,7 @@ async def update_purchase_order_itemss_batch(
     db: AsyncSession = Depends(get_db),
 ):
     """Update multiple purchase_order_itemss in a single request (requires ownership)"""
-    logger.debug(f"Batch updating {len(request.items)} purchase_order_itemss")
+    logger.debug("Batch updating %s purchase_order_itemss", len(request.items))
     
     service = Purchase_order_itemsService(db)
     results = []
@@ -262,7 +309,7 @@ async def update_purchase_order_itemss_batch(
             if result:
                 results.append(result)
         
-        logger.info(f"Batch updated {len(results)} purchase_order_itemss successfully")
+        logger.info("Batch updated %s purchase_order_itemss successfully", len(results))
         return results
     except Exception as e:
         await db.rollback()
@@ -278,7 +325,7 @@ async def update_purchase_order_items(
     db: AsyncSession = Depends(get_db),
 ):
     """Update an existing purchase_order_items (requires ownership)"""
-    logger.debug(f"Updating purchase_order_items {id} with data: {data}")
+    logger.debug("Updating purchase_order_items %s with data: %s", id, data)
 
     service = Purchase_order_itemsService(db)
     try:
@@ -289,7 +336,7 @@ async def update_purchase_order_items(
             logger.warning(f"Purchase_order_items with id {id} not found for update")
             raise HTTPException(status_code=404, detail="Purchase_order_items not found")
         
-        logger.info(f"Purchase_order_items {id} updated successfully")
+        logger.info("Purchase_order_items %s updated successfully", id)
         return result
     except HTTPException:
         raise
@@ -308,7 +355,7 @@ async def delete_purchase_order_itemss_batch(
     db: AsyncSession = Depends(get_db),
 ):
     """Delete multiple purchase_order_itemss by their IDs (requires ownership)"""
-    logger.debug(f"Batch deleting {len(request.ids)} purchase_order_itemss")
+    logger.debug("Batch deleting %s purchase_order_itemss", len(request.ids))
     
     service = Purchase_order_itemsService(db)
     deleted_count = 0
@@ -319,7 +366,7 @@ async def delete_purchase_order_itemss_batch(
             if success:
                 deleted_count += 1
         
-        logger.info(f"Batch deleted {deleted_count} purchase_order_itemss successfully")
+        logger.info("Batch deleted %s purchase_order_itemss successfully", deleted_count)
         return {"message": f"Successfully deleted {deleted_count} purchase_order_itemss", "deleted_count": deleted_count}
     except Exception as e:
         await db.rollback()
@@ -334,7 +381,7 @@ async def delete_purchase_order_items(
     db: AsyncSession = Depends(get_db),
 ):
     """Delete a single purchase_order_items by ID (requires ownership)"""
-    logger.debug(f"Deleting purchase_order_items with id: {id}")
+    logger.debug("Deleting purchase_order_items with id: %s", id)
     
     service = Purchase_order_itemsService(db)
     try:
@@ -343,7 +390,7 @@ async def delete_purchase_order_items(
             logger.warning(f"Purchase_order_items with id {id} not found for deletion")
             raise HTTPException(status_code=404, detail="Purchase_order_items not found")
         
-        logger.info(f"Purchase_order_items {id} deleted successfully")
+        logger.info("Purchase_order_items %s deleted successfully", id)
         return {"message": "Purchase_order_items deleted successfully", "id": id}
     except HTTPException:
         raise
@@ -7,7 +7,9 @@ from fastapi import APIRouter, Body, Depends, HTTPException, Query
 from pydantic import BaseModel
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from core.database import get_db
+from core.change_feed import ChangeFeedExpired
+from core.database import get_db, get_read_db
+from core.statement_cache import InvalidFilter
 from services.purchase_orders import Purchase_ordersService
 from dependencies.auth import get_current_user
 from schemas.auth import UserResponse
@@ -71,6 +73,21 @@ class Purchase_ordersListResponse(BaseModel):
     limit: int
 
 
+class Purchase_ordersChange(BaseModel):
+    """Change feed entry (data is the current row, None for deletes)"""
+    version: int
+    operation: str
+    id: int
+    data: Optional[Purchase_ordersResponse] = None
+
+
+class Purchase_ordersChangesResponse(BaseModel):
+    """Change feed response"""
+    changes: List[Purchase_ordersChange]
+    next_since: int
+    has_more: bool
+
+
 class Purchase_ordersBatchCreateRequest(BaseModel):
     """Batch create request"""
     items: List[Purchase_ordersData]
@@ -92,6 +109,11 @@ class Purchase_ordersBatchDeleteRequest(BaseModel):
     ids: List[int]
 
 
+class Purchase_ordersUpsertRequest(BaseModel):
+    """Upsert request (items are matched on po_number)"""
+    items: List[Purchase_ordersData]
+
+
 # ---------- Routes ----------
 @router.get("", response_model=Purchase_ordersListResponse)
 async def query_purchase_orderss(
@@ -101,10 +123,12 @@ async def query_purchase_orderss(
     limit: int = Query(20, ge=1, le=2000, description="Max number of records to return"),
     fields: str = Query(None, description="Comma-separated list of fields to return"),
     current_user: UserResponse = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ):
     """Query purchase_orderss with filtering, sorting, and pagination (user can only see their own records)"""
-    logger.debug(f"Querying purchase_orderss: query={query}, sort={sort}, skip={skip}, limit={limit}, fields={fields}")
+    logger.debug(
+        "Querying purchase_orderss: query=%s, sort=%s, skip=%s, limit=%s, fields=%s", query, sort, skip, limit, fields
+    )
     
     service = Purchase_ordersService(db)
     try:
@@ -123,10 +147,12 @@ async def query_purchase_orderss(
             sort=sort,
             user_id=str(current_user.id),
         )
-        logger.debug(f"Found {result['total']} purchase_orderss")
+        logger.debug("Found %s purchase_orderss", result['total'])
         return result
     except HTTPException:
         raise
+    except InvalidFilter as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         logger.error(f"Error querying purchase_orderss: {str(e)}", exc_info=True)
         raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
@@ -139,10 +165,12 @@ async def query_purchase_orderss_all(
     skip: int = Query(0, ge=0, description="Number of records to skip"),
     limit: int = Query(20, ge=1, le=2000, description="Max number of records to return"),
     fields: str = Query(None, description="Comma-separated list of fields to return"),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ):
     # Query purchase_orderss with filtering, sorting, and pagination without user limitation
-    logger.debug(f"Querying purchase_orderss: query={query}, sort={sort}, skip={skip}, limit={limit}, fields={fields}")
+    logger.debug(
+        "Querying purchase_orderss: query=%s, sort=%s, skip=%s, limit=%s, fields=%s", query, sort, skip, limit, fields
+    )
 
     service = Purchase_ordersService(db)
     try:
@@ -160,24 +188,46 @@ async def query_purchase_orderss_all(
             query_dict=query_dict,
             sort=sort
         )
-        logger.debug(f"Found {result['total']} purchase_orderss")
+        logger.debug("Found %s purchase_orderss", result['total'])
         return result
     except HTTPException:
         raise
+    except InvalidFilter as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         logger.error(f"Error querying purchase_orderss: {str(e)}", exc_info=True)
         raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
 
 
+@router.get("/changes", response_model=Purchase_ordersChangesResponse)
+async def get_purchase_orderss_changes(
+    since: int = Query(None, ge=0, description="next_since of the previous response; omit to get the current version"),
+    limit: int = Query(500, ge=1, le=5000, description="Max number of changes to return"),
+    current_user: UserResponse = Depends(get_current_user),
+    db: AsyncSession = Depends(get_read_db),
+):
+    """Inserts, updates and deletes of purchase_orderss after version `since`, oldest first (user can only see their own records)"""
+    logger.debug("Fetching purchase_orders changes since %s, limit=%s", since, limit)
+
+    service = Purchase_ordersService(db)
+    try:
+        return await service.get_changes(since, limit, user_id=str(current_user.id))
+    except ChangeFeedExpired as e:
+        raise HTTPException(status_code=410, detail=str(e))
+    except Exception as e:
+        logger.error(f"Error fetching purchase_orders changes: {str(e)}", exc_info=True)
+        raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
+
+
 @router.get("/{id}", response_model=Purchase_ordersResponse)
 async def get_purchase_orders(
     id: int,
     fields: str = Query(None, description="Comma-separated list of fields to return"),
     current_user: UserResponse = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ):
     """Get a single purchase_orders by ID (user can only see their own records)"""
-    logger.debug(f"Fetching purchase_orders with id: {id}, fields={fields}")
+    logger.debug("Fetching purchase_orders with id: %s, fields=%s", id, fields)
     
     service = Purchase_ordersService(db)
     try:
@@ -201,7 +251,7 @@ async def create_purchase_orders(
     db: AsyncSession = Depends(get_db),
 ):
     """Create a new purchase_orders"""
-    logger.debug(f"Creating new purchase_orders with data: {data}")
+    logger.debug("Creating new purchase_orders with data: %s", data)
     
     service = Purchase_ordersService(db)
     try:
@@ -209,7 +259,7 @@ async def create_purchase_orders(
         if not result:
             raise HTTPException(status_code=400, detail="Failed to create purchase_orders")
         
-        logger.info(f"Purchase_orders created successfully with id: {result.id}")
+        logger.info("Purchase_orders created successfully with id: %s", result.id)
         return result
     except ValueError as e:
         logger.error(f"Validation error creating purchase_orders: {str(e)}")
@@ -226,7 +276,7 @@ async def create_purchase_orderss_batch(
     db: AsyncSession = Depends(get_db),
 ):
     """Create multiple purchase_orderss in a single request"""
-    logger.debug(f"Batch creating {len(request.items)} purchase_orderss")
+    logger.debug("Batch creating %s purchase_orderss", len(request.items))
     
     service = Purchase_ordersService(db)
     results = []
@@ -237,7 +287,7 @@ async def create_purchase_orderss_batch(
             if result:
                 results.append(result)
         
-        logger.info(f"Batch created {len(results)} purchase_orderss successfully")
+        logger.info("Batch created %s purchase_orderss successfully", len(results))
         return results
     except Exception as e:
         await db.rollback()
@@ -252,7 +302,7 @@ async def update_purchase_orderss_batch(
     db: AsyncSession = Depends(get_db),
 ):
     """Update multiple purchase_orderss in a single request (requires ownership)"""
-    logger.debug(f"Batch updating {len(request.items)} purchase_orderss")
+    logger.debug("Batch updating %s purchase_orderss", len(request.items))
     
     service = Purchase_ordersService(db)
     results = []
@@ -265,7 +315,7 @@ async def update_purchase_orderss_batch(
             if result:
                 results.append(result)
         
-        logger.info(f"Batch updated {len(results)} purchase_orderss successfully")
+        logger.info("Batch updated %s purchase_orderss successfully", len(results))
         return results
     except Exception as e:
         await db.rollback()
@@ -273,6 +323,28 @@ async def update_purchase_orderss_batch(
         raise HTTPException(status_code=500, detail=f"Batch update failed: {str(e)}")
 
 
+@router.put("/upsert")
+async def upsert_purchase_orderss(
+    request: Purchase_ordersUpsertRequest,
+    current_user: UserResponse = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+):
+    """Insert or update multiple purchase_orderss by po_number (fields an item does not send are left unchanged)"""
+    logger.debug("Upserting %s purchase_orderss", len(request.items))
+
+    service = Purchase_ordersService(db)
+    try:
+        items = [item.model_dump(include=item.model_fields_set) for item in request.items]
+        upserted_count = await service.upsert_batch(items, user_id=str(current_user.id))
+        logger.info("Upserted %s purchase_orderss successfully", upserted_count)
+        return {"message": f"Successfully upserted {upserted_count} purchase_orderss", "upserted_count": upserted_count}
+    except NotImplementedError as e:
+        raise HTTPException(status_code=501, detail=str(e))
+    except Exception as e:
+        logger.error(f"Error in upsert: {str(e)}", exc_info=True)
+        raise HTTPException(status_code=500, detail=f"Upsert failed: {str(e)}")
+
+
 @router.put("/{id}", response_model=Purchase_ordersResponse)
 async def update_purchase_orders(
     id: int,
@@ -281,7 +353,7 @@ async def update_purchase_orders(
     db: AsyncSession = Depends(get_db),
 ):
     """Update an existing purchase_orders (requires ownership)"""
-    logger.debug(f"Updating purchase_orders {id} with data: {data}")
+    logger.debug("Updating purchase_orders %s with data: %s", id, data)
 
     service = Purchase_ordersService(db)
     try:
@@ -292,7 +364,7 @@ async def update_purchase_orders(
             logger.warning(f"Purchase_orders with id {id} not found for update")
             raise HTTPException(status_code=404, detail="Purchase_orders not found")
         
-        logger.info(f"Purchase_orders {id} updated successfully")
+        logger.info("Purchase_orders %s updated successfully", id)
         return result
     except HTTPException:
         raise
@@ -311,7 +383,7 @@ async def delete_purchase_orderss_batch(
     db: AsyncSession = Depends(get_db),
 ):
     """Delete multiple purchase_orderss by their IDs (requires ownership)"""
-    logger.debug(f"Batch deleting {len(request.ids)} purchase_orderss")
+    logger.debug("Batch deleting %s purchase_orderss", len(request.ids))
     
     service = Purchase_ordersService(db)
     deleted_count = 0
@@ -322,7 +394,7 @@ async def delete_purchase_orderss_batch(
             if success:
                 deleted_count += 1
         
-        logger.info(f"Batch deleted {deleted_count} purchase_orderss successfully")
+        logger.info("Batch deleted %s purchase_orderss successfully", deleted_count)
         return {"message": f"Successfully deleted {deleted_count} purchase_orderss", "deleted_count": deleted_count}
     except Exception as e:
         await db.rollback()
@@ -337,7 +409,7 @@ async def delete_purchase_orders(
     db: AsyncSession = Depends(get_db),
 ):
     """Delete a single purchase_orders by ID (requires ownership)"""
-    logger.debug(f"Deleting purchase_orders with id: {id}")
+    logger.debug("Deleting purchase_orders with id: %s", id)
     
     service = Purchase_ordersService(db)
     try:
@@ -346,7 +418,7 @@ async def delete_purchase_orders(
             logger.warning(f"Purchase_orders with id {id} not found for deletion")
             raise HTTPException(status_code=404, detail="Purchase_orders not found")
         
-        logger.info(f"Purchase_orders {id} deleted successfully")
+        logger.info("Purchase_orders %s deleted successfully", id)
         return {"message": "Purchase_orders deleted successfully", "id": id}
     except HTTPException:
         raise
@@ -7,7 +7,9 @@ from fastapi import APIRouter, Body, Depends, HTTPException, Query
 from pydantic import BaseModel
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from core.database import get_db
+from core.change_feed import ChangeFeedExpired
+from core.database import get_db, get_read_db
+from core.statement_cache import InvalidFilter
 from services.receipts import ReceiptsService
 from dependencies.auth import get_current_user
 from schemas.auth import UserResponse
@@ -68,6 +70,21 @@ class ReceiptsListResponse(BaseModel):
     limit: int
 
 
+class ReceiptsChange(BaseModel):
+    """Change feed entry (data is the current row, None for deletes)"""
+    version: int
+    operation: str
+    id: int
+    data: Optional[ReceiptsResponse] = None
+
+
+class ReceiptsChangesResponse(BaseModel):
+    """Change feed response"""
+    changes: List[ReceiptsChange]
+    next_since: int
+    has_more: bool
+
+
 class ReceiptsBatchCreateRequest(BaseModel):
     """Batch create request"""
     items: List[ReceiptsData]
@@ -89,6 +106,11 @@ class ReceiptsBatchDeleteRequest(BaseModel):
     ids: List[int]
 
 
+class ReceiptsUpsertRequest(BaseModel):
+    """Upsert request (items are matched on receipt_number)"""
+    items: List[ReceiptsData]
+
+
 # ---------- Routes ----------
 @router.get("", response_model=ReceiptsListResponse)
 async def query_receiptss(
@@ -98,10 +120,12 @@ async def query_receiptss(
     limit: int = Query(20, ge=1, le=2000, description="Max number of records to return"),
     fields: str = Query(None, description="Comma-separated list of fields to return"),
     current_user: UserResponse = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ):
     """Query receiptss with filtering, sorting, and pagination (user can only see their own records)"""
-    logger.debug(f"Querying receiptss: query={query}, sort={sort}, skip={skip}, limit={limit}, fields={fields}")
+    logger.debug(
+        "Querying receiptss: query=%s, sort=%s, skip=%s, limit=%s, fields=%s", query, sort, skip, limit, fields
+    )
     
     service = ReceiptsService(db)
     try:
@@ -120,10 +144,12 @@ async def query_receiptss(
             sort=sort,
             user_id=str(current_user.id),
         )
-        logger.debug(f"Found {result['total']} receiptss")
+        logger.debug("Found %s receiptss", result['total'])
         return result
     except HTTPException:
         raise
+    except InvalidFilter as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         logger.error(f"Error querying receiptss: {str(e)}", exc_info=True)
         raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
@@ -136,10 +162,12 @@ async def query_receiptss_all(
     skip: int = Query(0, ge=0, description="Number of records to skip"),
     limit: int = Query(20, ge=1, le=2000, description="Max number of records to return"),
     fields: str = Query(None, description="Comma-separated list of fields to return"),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ):
     # Query receiptss with filtering, sorting, and pagination without user limitation
-    logger.debug(f"Querying receiptss: query={query}, sort={sort}, skip={skip}, limit={limit}, fields={fields}")
+    logger.debug(
+        "Querying receiptss: query=%s, sort=%s, skip=%s, limit=%s, fields=%s", query, sort, skip, limit, fields
+    )
 
     service = ReceiptsService(db)
     try:
@@ -157,24 +185,46 @@ async def query_receiptss_all(
             query_dict=query_dict,
             sort=sort
         )
-        logger.debug(f"Found {result['total']} receiptss")
+        logger.debug("Found %s receiptss", result['total'])
         return result
     except HTTPException:
         raise
+    except InvalidFilter as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         logger.error(f"Error querying receiptss: {str(e)}", exc_info=True)
         raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
 
 
+@router.get("/changes", response_model=ReceiptsChangesResponse)
+async def get_receiptss_changes(
+    since: int = Query(None, ge=0, description="next_since of the previous response; omit to get the current version"),
+    limit: int = Query(500, ge=1, le=5000, description="Max number of changes to return"),
+    current_user: UserResponse = Depends(get_current_user),
+    db: AsyncSession = Depends(get_read_db),
+):
+    """Inserts, updates and deletes of receiptss after version `since`, oldest first (user can only see their own records)"""
+    logger.debug("Fetching receipts changes since %s, limit=%s", since, limit)
+
+    service = ReceiptsService(db)
+    try:
+        return await service.get_changes(since, limit, user_id=str(current_user.id))
+    except ChangeFeedExpired as e:
+        raise HTTPException(status_code=410, detail=str(e))
+    except Exception as e:
+        logger.error(f"Error fetching receipts changes: {str(e)}", exc_info=True)
+        raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
+
+
 @router.get("/{id}", response_model=ReceiptsResponse)
 async def get_receipts(
     id: int,
     fields: str = Query(None, description="Comma-separated list of fields to return"),
     current_user: UserResponse = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ):
     """Get a single receipts by ID (user can only see their own records)"""
-    logger.debug(f"Fetching receipts with id: {id}, fields={fields}")
+    logger.debug("Fetching receipts with id: %s, fields=%s", id, fields)
     
     service = ReceiptsService(db)
     try:
@@ -198,7 +248,7 @@ async def create_receipts(
     db: AsyncSession = Depends(get_db),
 ):
     """Create a new receipts"""
-    logger.debug(f"Creating new receipts with data: {data}")
+    logger.debug("Creating new receipts with data: %s", data)
     
     service = ReceiptsService(db)
     try:
@@ -206,7 +256,7 @@ async def create_receipts(
         if not result:
             raise HTTPException(status_code=400, detail="Failed to create receipts")
         
-        logger.info(f"Receipts created successfully with id: {result.id}")
+        logger.info("Receipts created successfully with id: %s", result.id)
         return result
     except ValueError as e:
         logger.error(f"Validation error creating receipts: {str(e)}")
@@ -223,7 +273,7 @@ async def create_receiptss_batch(
     db: AsyncSession = Depends(get_db),
 ):
     """Create multiple receiptss in a single request"""
-    logger.debug(f"Batch creating {len(request.items)} receiptss")
+    logger.debug("Batch creating %s receiptss", len(request.items))
     
     service = ReceiptsService(db)
     results = []
@@ -234,7 +284,7 @@ async def create_receiptss_batch(
             if result:
                 results.append(result)
         
-        logger.info(f"Batch created {len(results)} receiptss successfully")
+        logger.info("Batch created %s receiptss successfully", len(results))
         return results
     except Exception as e:
         await db.rollback()
@@ -249,7 +299,7 @@ async def update_receiptss_batch(
     db: AsyncSession = Depends(get_db),
 ):
     """Update multiple receiptss in a single request (requires ownership)"""
-    logger.debug(f"Batch updating {len(request.items)} receiptss")
+    logger.debug("Batch updating %s receiptss", len(request.items))
     
     service = ReceiptsService(db)
     results = []
@@ -262,7 +312,7 @@ async def update_receiptss_batch(
             if result:
                 results.append(result)
         
-        logger.info(f"Batch updated {len(results)} receiptss successfully")
+        logger.info("Batch updated %s receiptss successfully", len(results))
         return results
     except Exception as e:
         await db.rollback()
@@ -270,6 +320,28 @@ async def update_receiptss_batch(
         raise HTTPException(status_code=500, detail=f"Batch update failed: {str(e)}")
 
 
+@router.put("/upsert")
+async def upsert_receiptss(
+    request: ReceiptsUpsertRequest,
+    current_user: UserResponse = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+):
+    """Insert or update multiple receiptss by receipt_number (fields an item does not send are left unchanged)"""
+    logger.debug("Upserting %s receiptss", len(request.items))
+
+    service = ReceiptsService(db)
+    try:
+        items = [item.model_dump(include=item.model_fields_set) for item in request.items]
+        upserted_count = await service.upsert_batch(items, user_id=str(current_user.id))
+        logger.info("Upserted %s receiptss successfully", upserted_count)
+        return {"message": f"Successfully upserted {upserted_count} receiptss", "upserted_count": upserted_count}
+    except NotImplementedError as e:
+        raise HTTPException(status_code=501, detail=str(e))
+    except Exception as e:
+        logger.error(f"Error in upsert: {str(e)}", exc_info=True)
+        raise HTTPException(status_code=500, detail=f"Upsert failed: {str(e)}")
+
+
 @router.put("/{id}", response_model=ReceiptsResponse)
 async def update_receipts(
     id: int,
@@ -278,7 +350,7 @@ async def update_receipts(
     db: AsyncSession = Depends(get_db),
 ):
     """Update an existing receipts (requires ownership)"""
-    logger.debug(f"Updating receipts {id} with data: {data}")
+    logger.debug("Updating receipts %s with data: %s", id, data)
 
     service = ReceiptsService(db)
     try:
@@ -289,7 +361,7 @@ async def update_receipts(
             logger.warning(f"Receipts with id {id} not found for update")
             raise HTTPException(status_code=404, detail="Receipts not found")
         
-        logger.info(f"Receipts {id} updated successfully")
+        logger.info("Receipts %s updated successfully", id)
         return result
     except HTTPException:
         raise
@@ -308,7 +380,7 @@ async def delete_receiptss_batch(
     db: AsyncSession = Depends(get_db),
 ):
     """Delete multiple receiptss by their IDs (requires ownership)"""
-    logger.debug(f"Batch deleting {len(request.ids)} receiptss")
+    logger.debug("Batch deleting %s receiptss", len(request.ids))
     
     service = ReceiptsService(db)
     deleted_count = 0
@@ -319,7 +391,7 @@ async def delete_receiptss_batch(
             if success:
                 deleted_count += 1
         
-        logger.info(f"Batch deleted {deleted_count} receiptss successfully")
+        logger.info("Batch deleted %s receiptss successfully", deleted_count)
         return {"message": f"Successfully deleted {deleted_count} receiptss", "deleted_count": deleted_count}
     except Exception as e:
         await db.rollback()
@@ -334,7 +406,7 @@ async def delete_receipts(
     db: AsyncSession = Depends(get_db),
 ):
     """Delete a single receipts by ID (requires ownership)"""
-    logger.debug(f"Deleting receipts with id: {id}")
+    logger.debug("Deleting receipts with id: %s", id)
     
     service = ReceiptsService(db)
     try:
@@ -343,7 +415,7 @@ async def delete_receipts(
             logger.warning(f"Receipts with id {id} not found for deletion")
             raise HTTPException(status_code=404, detail="Receipts not found")
         
-        logger.info(f"Receipts {id} deleted successfully")
+        logger.info("Receipts %s deleted successfully", id)
         return {"message": "Receipts deleted successfully", "id": id}
     except HTTPException:
         raise
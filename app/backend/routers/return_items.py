@@ -7,7 +7,9 @@ from fastapi import APIRouter, Body, Depends, HTTPException, Query
 from pydantic import BaseModel
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from core.database import get_db
+from core.change_feed import ChangeFeedExpired
+from core.database import get_db, get_read_db
+from core.statement_cache import InvalidFilter
 from services.return_items import Return_itemsService
 from dependencies.auth import get_current_user
 from schemas.auth import UserResponse
@@ -65,6 +67,21 @@ class Return_itemsListResponse(BaseModel):
     limit: int
 
 
+class Return_itemsChange(BaseModel):
+    """Change feed entry (data is the current row, None for deletes)"""
+    version: int
+    operation: str
+    id: int
+    data: Optional[Return_itemsResponse] = None
+
+
+class Return_itemsChangesResponse(BaseModel):
+    """Change feed response"""
+    changes: List[Return_itemsChange]
+    next_since: int
+    has_more: bool
+
+
 class Return_itemsBatchCreateRequest(BaseModel):
     """Batch create request"""
     items: List[Return_itemsData]
@@ -95,10 +112,12 @@ async def query_return_itemss(
     limit: int = Query(20, ge=1, le=2000, description="Max number of records to return"),
     fields: str = Query(None, description="Comma-separated list of fields to return"),
     current_user: UserResponse = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ):
     """Query return_itemss with filtering, sorting, and pagination (user can only see their own records)"""
-    logger.debug(f"Querying return_itemss: query={query}, sort={sort}, skip={skip}, limit={limit}, fields={fields}")
+    logger.debug(
+        "Querying return_itemss: query=%s, sort=%s, skip=%s, limit=%s, fields=%s", query, sort, skip, limit, fields
+    )
     
     service = Return_itemsService(db)
     try:
@@ -117,10 +136,12 @@ async def query_return_itemss(
             sort=sort,
             user_id=str(current_user.id),
         )
-        logger.debug(f"Found {result['total']} return_itemss")
+        logger.debug("Found %s return_itemss", result['total'])
         return result
     except HTTPException:
         raise
+    except InvalidFilter as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         logger.error(f"Error querying return_itemss: {str(e)}", exc_info=True)
         raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
@@ -133,10 +154,12 @@ async def query_return_itemss_all(
     skip: int = Query(0, ge=0, description="Number of records to skip"),
     limit: int = Query(20, ge=1, le=2000, description="Max number of records to return"),
     fields: str = Query(None, description="Comma-separated list of fields to return"),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ):
     # Query return_itemss with filtering, sorting, and pagination without user limitation
-    logger.debug(f"Querying return_itemss: query={query}, sort={sort}, skip={skip}, limit={limit}, fields={fields}")
+    logger.debug(
+        "Querying return_itemss: query=%s, sort=%s, skip=%s, limit=%s, fields=%s", query, sort, skip, limit, fields
+    )
 
     service = Return_itemsService(db)
     try:
@@ -154,24 +177,46 @@ async def query_return_itemss_all(
             query_dict=query_dict,
             sort=sort
         )
-        logger.debug(f"Found {result['total']} return_itemss")
+        logger.debug("Found %s return_itemss", result['total'])
         return result
     except HTTPException:
         raise
+    except InvalidFilter as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         logger.error(f"Error querying return_itemss: {str(e)}", exc_info=True)
         raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
 
 
+@router.get("/changes", response_model=Return_itemsChangesResponse)
+async def get_return_itemss_changes(
+    since: int = Query(None, ge=0, description="next_since of the previous response; omit to get the current version"),
+    limit: int = Query(500, ge=1, le=5000, description="Max number of changes to return"),
+    current_user: UserResponse = Depends(get_current_user),
+    db: AsyncSession = Depends(get_read_db),
+):
+    """Inserts, updates and deletes of return_itemss after version `since`, oldest first (user can only see their own records)"""
+    logger.debug("Fetching return_items changes since %s, limit=%s", since, limit)
+
+    service = Return_itemsService(db)
+    try:
+        return await service.get_changes(since, limit, user_id=str(current_user.id))
+    except ChangeFeedExpired as e:
+        raise HTTPException(status_code=410, detail=str(e))
+    except Exception as e:
+        logger.error(f"Error fetching return_items changes: {str(e)}", exc_info=True)
+        raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
+
+
 @router.get("/{id}", response_model=Return_itemsResponse)
 async def get_return_items(
     id: int,
     fields: str = Query(None, description="Comma-separated list of fields to return"),
     current_user: UserResponse = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ):
     """Get a single return_items by ID (user can only see their own records)"""
-    logger.debug(f"Fetching return_items with id: {id}, fields={fields}")
+    logger.debug("Fetching return_items with id: %s, fields=%s", id, fields)
     
     service = Return_itemsService(db)
     try:
@@ -195,7 +240,7 @@ async def create_return_items(
     db: AsyncSession = Depends(get_db),
 ):
     """Create a new return_items"""
-    logger.debug(f"Creating new return_items with data: {data}")
+    logger.debug("Creating new return_items with data: %s", data)
     
     service = Return_itemsService(db)
     try:
@@ -203,7 +248,7 @@ async def create_return_items(
         if not result:
             raise HTTPException(status_code=400, detail="Failed to create return_items")
         
-        logger.info(f"Return_items created successfully with id: {result.id}")
+        logger.info("Return_items created successfully with id: %s", result.id)
         return result
     except ValueError as e:
         logger.error(f"Validation error creating return_items: {str(e)}")
@@ -220,7 +265,7 @@ async def create_return_itemss_batch(
     db: AsyncSession = Depends(get_db),
 ):
     """Create multiple return_itemss in a single request"""
-    logger.debug(f"Batch creating {len(request.items)} return_itemss")
+    logger.debug("Batch creating %s return_itemss", len(request.items))
     
     service = Return_itemsService(db)
     results = []
@@ -231,7 +276,7 @@ async def create_return_itemss_batch(
             if result:
                 results.append(result)
         
-        logger.info(f"Batch created {len(results)} return_itemss successfully")
+        logger.info("Batch created %s return_itemss successfully", len(results))
         return results
     except Exception as e:
         await db.rollback()
@@ -246,7 +291,7 @@ async def update_return_itemss_batch(
     db: AsyncSession = Depends(get_db),
 ):
     """Update multiple return_itemss in a single request (requires ownership)"""
-    logger.debug(f"Batch updating {len(request.items)} return_itemss")
+    logger.debug("Batch updating %s return_itemss", len(request.items))
     
     service = Return_itemsService(db)
     results = []
@@ -259,7 +304,7 @@ async def update_return_itemss_batch(
             if result:
                 results.append(result)
         
-        logger.info(f"Batch updated {len(results)} return_itemss successfully")
+        logger.info("Batch updated %s return_itemss successfully", len(results))
         return results
     except Exception as e:
         await db.rollback()
@@ -275,7 +320,7 @@ async def update_return_items(
     db: AsyncSession = Depends(get_db),
 ):
     """Update an existing return_items (requires ownership)"""
-    logger.debug(f"Updating return_items {id} with data: {data}")
+    logger.debug("Updating return_items %s with data: %s", id, data)
 
     service = Return_itemsService(db)
     try:
@@ -286,7 +331,7 @@ async def update_return_items(
             logger.warning(f"Return_items with id {id} not found for update")
             raise HTTPException(status_code=404, detail="Return_items not found")
         
-        logger.info(f"Return_items {id} updated successfully")
+        logger.info("Return_items %s updated successfully", id)
         return result
     except HTTPException:
         raise
@@ -305,7 +350,7 @@ async def delete_return_itemss_batch(
     db: AsyncSession = Depends(get_db),
 ):
     """Delete multiple return_itemss by their IDs (requires ownership)"""
-    logger.debug(f"Batch deleting {len(request.ids)} return_itemss")
+    logger.debug("Batch deleting %s return_itemss", len(request.ids))
     
     service = Return_itemsService(db)
     deleted_count = 0
@@ -316,7 +361,7 @@ async def delete_return_itemss_batch(
             if success:
                 deleted_count += 1
         
-        logger.info(f"Batch deleted {deleted_count} return_itemss successfully")
+        logger.info("Batch deleted %s return_itemss successfully", deleted_count)
         return {"message": f"Successfully deleted {deleted_count} return_itemss", "deleted_count": deleted_count}
     except Exception as e:
         await db.rollback()
@@ -331,7 +376,7 @@ async def delete_return_items(
     db: AsyncSession = Depends(get_db),
 ):
     """Delete a single return_items by ID (requires ownership)"""
-    logger.debug(f"Deleting return_items with id: {id}")
+    logger.debug("Deleting return_items with id: %s", id)
     
     service = Return_itemsService(db)
     try:
@@ -340,7 +385,7 @@ async def delete_return_items(
             logger.warning(f"Return_items with id {id} not found for deletion")
             raise HTTPException(status_code=404, detail="Return_items not found")
         
-        logger.info(f"Return_items {id} deleted successfully")
+        logger.info("Return_items %s deleted successfully", id)
         return {"message": "Return_items deleted successfully", "id": id}
     except HTTPException:
         raise
@@ -7,7 +7,9 @@ from fastapi import APIRouter, Body, Depends, HTTPException, Query
 from pydantic import BaseModel
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from core.database import get_db
+from core.change_feed import ChangeFeedExpired
+from core.database import get_db, get_read_db
+from core.statement_cache import InvalidFilter
 from services.returns import ReturnsService
 from dependencies.auth import get_current_user
 from schemas.auth import UserResponse
@@ -71,6 +73,21 @@ class ReturnsListResponse(BaseModel):
     limit: int
 
 
+class ReturnsChange(BaseModel):
+    """Change feed entry (data is the current row, None for deletes)"""
+    version: int
+    operation: str
+    id: int
+    data: Optional[ReturnsResponse] = None
+
+
+class ReturnsChangesResponse(BaseModel):
+    """Change feed response"""
+    changes: List[ReturnsChange]
+    next_since: int
+    has_more: bool
+
+
 class ReturnsBatchCreateRequest(BaseModel):
     """Batch create request"""
     items: List[ReturnsData]
@@ -92,6 +109,11 @@ class ReturnsBatchDeleteRequest(BaseModel):
     ids: List[int]
 
 
+class ReturnsUpsertRequest(BaseModel):
+    """Upsert request (items are matched on return_number)"""
+    items: List[ReturnsData]
+
+
 # ---------- Routes ----------
 @router.get("", response_model=ReturnsListResponse)
 async def query_returnss(
@@ -101,10 +123,10 @@ async def query_returnss(
     limit: int = Query(20, ge=1, le=2000, description="Max number of records to return"),
     fields: str = Query(None, description="Comma-separated list of fields to return"),
     current_user: UserResponse = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ):
     """Query returnss with filtering, sorting, and pagination (user can only see their own records)"""
-    logger.debug(f"Querying returnss: query={query}, sort={sort}, skip={skip}, limit={limit}, fields={fields}")
+    logger.debug("Querying returnss: query=%s, sort=%s, skip=%s, limit=%s, fields=%s", query, sort, skip, limit, fields)
     
     service = ReturnsService(db)
     try:
@@ -123,10 +145,12 @@ async def query_returnss(
             sort=sort,
             user_id=str(current_user.id),
         )
-        logger.debug(f"Found {result['total']} returnss")
+        logger.debug("Found %s returnss", result['total'])
         return result
     except HTTPException:
         raise
+    except InvalidFilter as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         logger.error(f"Error querying returnss: {str(e)}", exc_info=True)
         raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
@@ -139,10 +163,10 @@ async def query_returnss_all(
     skip: int = Query(0, ge=0, description="Number of records to skip"),
     limit: int = Query(20, ge=1, le=2000, description="Max number of records to return"),
     fields: str = Query(None, description="Comma-separated list of fields to return"),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ):
     # Query returnss with filtering, sorting, and pagination without user limitation
-    logger.debug(f"Querying returnss: query={query}, sort={sort}, skip={skip}, limit={limit}, fields={fields}")
+    logger.debug("Querying returnss: query=%s, sort=%s, skip=%s, limit=%s, fields=%s", query, sort, skip, limit, fields)
 
     service = ReturnsService(db)
     try:
@@ -160,24 +184,46 @@ async def query_returnss_all(
             query_dict=query_dict,
             sort=sort
         )
-        logger.debug(f"Found {result['total']} returnss")
+        logger.debug("Found %s returnss", result['total'])
         return result
     except HTTPException:
         raise
+    except InvalidFilter as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         logger.error(f"Error querying returnss: {str(e)}", exc_info=True)
         raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
 
 
+@router.get("/changes", response_model=ReturnsChangesResponse)
+async def get_returnss_changes(
+    since: int = Query(None, ge=0, description="next_since of the previous response; omit to get the current version"),
+    limit: int = Query(500, ge=1, le=5000, description="Max number of changes to return"),
+    current_user: UserResponse = Depends(get_current_user),
+    db: AsyncSession = Depends(get_read_db),
+):
+    """Inserts, updates and deletes of returnss after version `since`, oldest first (user can only see their own records)"""
+    logger.debug("Fetching returns changes since %s, limit=%s", since, limit)
+
+    service = ReturnsService(db)
+    try:
+        return await service.get_changes(since, limit, user_id=str(current_user.id))
+    except ChangeFeedExpired as e:
+        raise HTTPException(status_code=410, detail=str(e))
+    except Exception as e:
+        logger.error(f"Error fetching returns changes: {str(e)}", exc_info=True)
+        raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
+
+
 @router.get("/{id}", response_model=ReturnsResponse)
 async def get_returns(
     id: int,
     fields: str = Query(None, description="Comma-separated list of fields to return"),
     current_user: UserResponse = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ):
     """Get a single returns by ID (user can only see their own records)"""
-    logger.debug(f"Fetching returns with id: {id}, fields={fields}")
+    logger.debug("Fetching returns with id: %s, fields=%s", id, fields)
     
     service = ReturnsService(db)
     try:
@@ -201,7 +247,7 @@ async def create_returns(
     db: AsyncSession = Depends(get_db),
 ):
     """Create a new returns"""
-    logger.debug(f"Creating new returns with data: {data}")
+    logger.debug("Creating new returns with data: %s", data)
     
     service = ReturnsService(db)
     try:
@@ -209,7 +255,7 @@ async def create_returns(
         if not result:
             raise HTTPException(status_code=400, detail="Failed to create returns")
         
-        logger.info(f"Returns created successfully with id: {result.id}")
+        logger.info("Returns created successfully with id: %s", result.id)
         return result
     except ValueError as e:
         logger.error(f"Validation error creating returns: {str(e)}")
@@ -226,7 +272,7 @@ async def create_returnss_batch(
     db: AsyncSession = Depends(get_db),
 ):
     """Create multiple returnss in a single request"""
-    logger.debug(f"Batch creating {len(request.items)} returnss")
+    logger.debug("Batch creating %s returnss", len(request.items))
     
     service = ReturnsService(db)
     results = []
@@ -237,7 +283,7 @@ async def create_returnss_batch(
             if result:
                 results.append(result)
         
-        logger.info(f"Batch created {len(results)} returnss successfully")
+        logger.info("Batch created %s returnss successfully", len(results))
         return results
     except Exception as e:
         await db.rollback()
@@ -252,7 +298,7 @@ async def update_returnss_batch(
     db: AsyncSession = Depends(get_db),
 ):
     """Update multiple returnss in a single request (requires ownership)"""
-    logger.debug(f"Batch updating {len(request.items)} returnss")
+    logger.debug("Batch updating %s returnss", len(request.items))
     
     service = ReturnsService(db)
     results = []
@@ -265,7 +311,7 @@ async def update_returnss_batch(
             if result:
                 results.append(result)
         
-        logger.info(f"Batch updated {len(results)} returnss successfully")
+        logger.info("Batch updated %s returnss successfully", len(results))
         return results
     except Exception as e:
         await db.rollback()
@@ -273,6 +319,28 @@ async def update_returnss_batch(
         raise HTTPException(status_code=500, detail=f"Batch update failed: {str(e)}")
 
 
+@router.put("/upsert")
+async def upsert_returnss(
+    request: ReturnsUpsertRequest,
+    current_user: UserResponse = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+):
+    """Insert or update multiple returnss by return_number (fields an item does not send are left unchanged)"""
+    logger.debug("Upserting %s returnss", len(request.items))
+
+    service = ReturnsService(db)
+    try:
+        items = [item.model_dump(include=item.model_fields_set) for item in request.items]
+        upserted_count = await service.upsert_batch(items, user_id=str(current_user.id))
+        logger.info("Upserted %s returnss successfully", upserted_count)
+        return {"message": f"Successfully upserted {upserted_count} returnss", "upserted_count": upserted_count}
+    except NotImplementedError as e:
+        raise HTTPException(status_code=501, detail=str(e))
+    except Exception as e:
+        logger.error(f"Error in upsert: {str(e)}", exc_info=True)
+        raise HTTPException(status_code=500, detail=f"Upsert failed: {str(e)}")
+
+
 @router.put("/{id}", response_model=ReturnsResponse)
 async def update_returns(
     id: int,
@@ -281,7 +349,7 @@ async def update_returns(
     db: AsyncSession = Depends(get_db),
 ):
     """Update an existing returns (requires ownership)"""
-    logger.debug(f"Updating returns {id} with data: {data}")
+    logger.debug("Updating returns %s with data: %s", id, data)
 
     service = ReturnsService(db)
     try:
@@ -292,7 +360,7 @@ async def update_returns(
             logger.warning(f"Returns with id {id} not found for update")
             raise HTTPException(status_code=404, detail="Returns not found")
         
-        logger.info(f"Returns {id} updated successfully")
+        logger.info("Returns %s updated successfully", id)
         return result
     except HTTPException:
         raise
@@ -311,7 +379,7 @@ async def delete_returnss_batch(
     db: AsyncSession = Depends(get_db),
 ):
     """Delete multiple returnss by their IDs (requires ownership)"""
-    logger.debug(f"Batch deleting {len(request.ids)} returnss")
+    logger.debug("Batch deleting %s returnss", len(request.ids))
     
     service = ReturnsService(db)
     deleted_count = 0
@@ -322,7 +390,7 @@ async def delete_returnss_batch(
             if success:
                 deleted_count += 1
         
-        logger.info(f"Batch deleted {deleted_count} returnss successfully")
+        logger.info("Batch deleted %s returnss successfully", deleted_count)
         return {"message": f"Successfully deleted {deleted_count} returnss", "deleted_count": deleted_count}
     except Exception as e:
         await db.rollback()
@@ -337,7 +405,7 @@ async def delete_returns(
     db: AsyncSession = Depends(get_db),
 ):
     """Delete a single returns by ID (requires ownership)"""
-    logger.debug(f"Deleting returns with id: {id}")
+    logger.debug("Deleting returns with id: %s", id)
     
     service = ReturnsService(db)
     try:
@@ -346,7 +414,7 @@ async def delete_returns(
             logger.warning(f"Returns with id {id} not found for deletion")
             raise HTTPException(status_code=404, detail="Returns not found")
         
-        logger.info(f"Returns {id} deleted successfully")
+        logger.info("Returns %s deleted successfully", id)
         return {"message": "Returns deleted successfully", "id": id}
     except HTTPException:
         raise
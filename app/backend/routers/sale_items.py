@@ -7,7 +7,9 @@ from fastapi import APIRouter, Body, Depends, HTTPException, Query
 from pydantic import BaseModel
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from core.database import get_db
+from core.change_feed import ChangeFeedExpired
+from core.database import get_db, get_read_db
+from core.statement_cache import InvalidFilter
 from services.sale_items import Sale_itemsService
 from dependencies.auth import get_current_user
 from schemas.auth import UserResponse
@@ -59,6 +61,21 @@ class Sale_itemsListResponse(BaseModel):
     limit: int
 
 
+class Sale_itemsChange(BaseModel):
+    """Change feed entry (data is the current row, None for deletes)"""
+    version: int
+    operation: str
+    id: int
+    data: Optional[Sale_itemsResponse] = None
+
+
+class Sale_itemsChangesResponse(BaseModel):
+    """Change feed response"""
+    changes: List[Sale_itemsChange]
+    next_since: int
+    has_more: bool
+
+
 class Sale_itemsBatchCreateRequest(BaseModel):
     """Batch create request"""
     items: List[Sale_itemsData]
@@ -89,10 +106,12 @@ async def query_sale_itemss(
     limit: int = Query(20, ge=1, le=2000, description="Max number of records to return"),
     fields: str = Query(None, description="Comma-separated list of fields to return"),
     current_user: UserResponse = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ):
     """Query sale_itemss with filtering, sorting, and pagination (user can only see their own records)"""
-    logger.debug(f"Querying sale_itemss: query={query}, sort={sort}, skip={skip}, limit={limit}, fields={fields}")
+    logger.debug(
+        "Querying sale_itemss: query=%s, sort=%s, skip=%s, limit=%s, fields=%s", query, sort, skip, limit, fields
+    )
     
     service = Sale_itemsService(db)
     try:
@@ -111,10 +130,12 @@ async def query_sale_itemss(
             sort=sort,
             user_id=str(current_user.id),
         )
-        logger.debug(f"Found {result['total']} sale_itemss")
+        logger.debug("Found %s sale_itemss", result['total'])
         return result
     except HTTPException:
         raise
+    except InvalidFilter as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         logger.error(f"Error querying sale_itemss: {str(e)}", exc_info=True)
         raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
@@ -127,10 +148,12 @@ async def query_sale_itemss_all(
     skip: int = Query(0, ge=0, description="Number of records to skip"),
     limit: int = Query(20, ge=1, le=2000, description="Max number of records to return"),
     fields: str = Query(None, description="Comma-separated list of fields to return"),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ):
     # Query sale_itemss with filtering, sorting, and pagination without user limitation
-    logger.debug(f"Querying sale_itemss: query={query}, sort={sort}, skip={skip}, limit={limit}, fields={fields}")
+    logger.debug(
+        "Querying sale_itemss: query=%s, sort=%s, skip=%s, limit=%s, fields=%s", query, sort, skip, limit, fields
+    )
 
     service = Sale_itemsService(db)
     try:
@@ -148,24 +171,46 @@ async def query_sale_itemss_all(
             query_dict=query_dict,
             sort=sort
         )
-        logger.debug(f"Found {result['total']} sale_itemss")
+        logger.debug("Found %s sale_itemss", result['total'])
         return result
     except HTTPException:
         raise
+    except InvalidFilter as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         logger.error(f"Error querying sale_itemss: {str(e)}", exc_info=True)
         raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
 
 
+@router.get("/changes", response_model=Sale_itemsChangesResponse)
+async def get_sale_itemss_changes(
+    since: int = Query(None, ge=0, description="next_since of the previous response; omit to get the current version"),
+    limit: int = Query(500, ge=1, le=5000, description="Max number of changes to return"),
+    current_user: UserResponse = Depends(get_current_user),
+    db: AsyncSession = Depends(get_read_db),
+):
+    """Inserts, updates and deletes of sale_itemss after version `since`, oldest first (user can only see their own records)"""
+    logger.debug("Fetching sale_items changes since %s, limit=%s", since, limit)
+
+    service = Sale_itemsService(db)
+    try:
+        return await service.get_changes(since, limit, user_id=str(current_user.id))
+    except ChangeFeedExpired as e:
+        raise HTTPException(status_code=410, detail=str(e))
+    except Exception as e:
+        logger.error(f"Error fetching sale_items changes: {str(e)}", exc_info=True)
+        raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
+
+
 @router.get("/{id}", response_model=Sale_itemsResponse)
 async def get_sale_items(
     id: int,
     fields: str = Query(None, description="Comma-separated list of fields to return"),
     current_user: UserResponse = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ):
     """Get a single sale_items by ID (user can only see their own records)"""
-    logger.debug(f"Fetching sale_items with id: {id}, fields={fields}")
+    logger.debug("Fetching sale_items with id: %s, fields=%s", id, fields)
     
     service = Sale_itemsService(db)
     try:
@@ -189,7 +234,7 @@ async def create_sale_items(
     db: AsyncSession = Depends(get_db),
 ):
     """Create a new sale_items"""
-    logger.debug(f"Creating new sale_items with data: {data}")
+    logger.debug("Creating new sale_items with data: %s", data)
     
     service = Sale_itemsService(db)
     try:
@@ -197,7 +242,7 @@ async def create_sale_items(
         if not result:
             raise HTTPException(status_code=400, detail="Failed to create sale_items")
         
-        logger.info(f"Sale_items created successfully with id: {result.id}")
+        logger.info("Sale_items created successfully with id: %s", result.id)
         return result
     except ValueError as e:
         logger.error(f"Validation error creating sale_items: {str(e)}")
@@ -214,7 +259,7 @@ async def create_sale_itemss_batch(
     db: AsyncSession = Depends(get_db),
 ):
     """Create multiple sale_itemss in a single request"""
-    logger.debug(f"Batch creating {len(request.items)} sale_itemss")
+    logger.debug("Batch creating %s sale_itemss", len(request.items))
     
     service = Sale_itemsService(db)
     results = []
@@ -225,7 +270,7 @@ async def create_sale_itemss_batch(
             if result:
                 results.append(result)
         
-        logger.info(f"Batch created {len(results)} sale_itemss successfully")
+        logger.info("Batch created %s sale_itemss successfully", len(results))
         return results
     except Exception as e:
         await db.rollback()
@@ -240,7 +285,7 @@ async def update_sale_itemss_batch(
     db: AsyncSession = Depends(get_db),
 ):
     """Update multiple sale_itemss in a single request (requires ownership)"""
-    logger.debug(f"Batch updating {len(request.items)} sale_itemss")
+    logger.debug("Batch updating %s sale_itemss", len(request.items))
     
     service = Sale_itemsService(db)
     results = []
@@ -253,7 +298,7 @@ async def update_sale_itemss_batch(
             if result:
                 results.append(result)
         
-        logger.info(f"Batch updated {len(results)} sale_itemss successfully")
+        logger.info("Batch updated %s sale_itemss successfully", len(results))
         return results
     except Exception as e:
         await db.rollback()
@@ -269,7 +314,7 @@ async def update_sale_items(
     db: AsyncSession = Depends(get_db),
 ):
     """Update an existing sale_items (requires ownership)"""
-    logger.debug(f"Updating sale_items {id} with data: {data}")
+    logger.debug("Updating sale_items %s with data: %s", id, data)
 
     service = Sale_itemsService(db)
     try:
@@ -280,7 +325,7 @@ async def update_sale_items(
             logger.warning(f"Sale_items with id {id} not found for update")
             raise HTTPException(status_code=404, detail="Sale_items not found")
         
-        logger.info(f"Sale_items {id} updated successfully")
+        logger.info("Sale_items %s updated successfully", id)
         return result
     except HTTPException:
         raise
@@ -299,7 +344,7 @@ async def delete_sale_itemss_batch(
     db: AsyncSession = Depends(get_db),
 ):
     """Delete multiple sale_itemss by their IDs (requires ownership)"""
-    logger.debug(f"Batch deleting {len(request.ids)} sale_itemss")
+    logger.debug("Batch deleting %s sale_itemss", len(request.ids))
     
     service = Sale_itemsService(db)
     deleted_count = 0
@@ -310,7 +355,7 @@ async def delete_sale_itemss_batch(
             if success:
                 deleted_count += 1
         
-        logger.info(f"Batch deleted {deleted_count} sale_itemss successfully")
+        logger.info("Batch deleted %s sale_itemss successfully", deleted_count)
         return {"message": f"Successfully deleted {deleted_count} sale_itemss", "deleted_count": deleted_count}
     except Exception as e:
         await db.rollback()
@@ -325,7 +370,7 @@ async def delete_sale_items(
     db: AsyncSession = Depends(get_db),
 ):
     """Delete a single sale_items by ID (requires ownership)"""
-    logger.debug(f"Deleting sale_items with id: {id}")
+    logger.debug("Deleting sale_items with id: %s", id)
     
     service = Sale_itemsService(db)
     try:
@@ -334,7 +379,7 @@ async def delete_sale_items(
             logger.warning(f"Sale_items with id {id} not found for deletion")
             raise HTTPException(status_code=404, detail="Sale_items not found")
         
-        logger.info(f"Sale_items {id} deleted successfully")
+        logger.info("Sale_items %s deleted successfully", id)
         return {"message": "Sale_items deleted successfully", "id": id}
     except HTTPException:
         raise
@@ -8,7 +8,9 @@ from fastapi import APIRouter, Body, Depends, HTTPException, Query
 from pydantic import BaseModel
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from core.database import get_db
+from core.change_feed import ChangeFeedExpired
+from core.database import get_db, get_read_db
+from core.statement_cache import InvalidFilter
 from services.sales import SalesService
 from dependencies.auth import get_current_user
 from schemas.auth import UserResponse
@@ -54,6 +56,21 @@ class SalesListResponse(BaseModel):
     limit: int
 
 
+class SalesChange(BaseModel):
+    """Change feed entry (data is the current row, None for deletes)"""
+    version: int
+    operation: str
+    id: int
+    data: Optional[SalesResponse] = None
+
+
+class SalesChangesResponse(BaseModel):
+    """Change feed response"""
+    changes: List[SalesChange]
+    next_since: int
+    has_more: bool
+
+
 class SalesBatchCreateRequest(BaseModel):
     """Batch create request"""
     items: List[SalesData]
@@ -84,10 +101,10 @@ async def query_saless(
     limit: int = Query(20, ge=1, le=2000, description="Max number of records to return"),
     fields: str = Query(None, description="Comma-separated list of fields to return"),
     current_user: UserResponse = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ):
     """Query saless with filtering, sorting, and pagination (user can only see their own records)"""
-    logger.debug(f"Querying saless: query={query}, sort={sort}, skip={skip}, limit={limit}, fields={fields}")
+    logger.debug("Querying saless: query=%s, sort=%s, skip=%s, limit=%s, fields=%s", query, sort, skip, limit, fields)
     
     service = SalesService(db)
     try:
@@ -106,10 +123,12 @@ async def query_saless(
             sort=sort,
             user_id=str(current_user.id),
         )
-        logger.debug(f"Found {result['total']} saless")
+        logger.debug("Found %s saless", result['total'])
         return result
     except HTTPException:
         raise
+    except InvalidFilter as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         logger.error(f"Error querying saless: {str(e)}", exc_info=True)
         raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
@@ -122,10 +141,10 @@ async def query_saless_all(
     skip: int = Query(0, ge=0, description="Number of records to skip"),
     limit: int = Query(20, ge=1, le=2000, description="Max number of records to return"),
     fields: str = Query(None, description="Comma-separated list of fields to return"),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ):
     # Query saless with filtering, sorting, and pagination without user limitation
-    logger.debug(f"Querying saless: query={query}, sort={sort}, skip={skip}, limit={limit}, fields={fields}")
+    logger.debug("Querying saless: query=%s, sort=%s, skip=%s, limit=%s, fields=%s", query, sort, skip, limit, fields)
 
     service = SalesService(db)
     try:
@@ -143,24 +162,46 @@ async def query_saless_all(
             query_dict=query_dict,
             sort=sort
         )
-        logger.debug(f"Found {result['total']} saless")
+        logger.debug("Found %s saless", result['total'])
         return result
     except HTTPException:
         raise
+    except InvalidFilter as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         logger.error(f"Error querying saless: {str(e)}", exc_info=True)
         raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
 
 
+@router.get("/changes", response_model=SalesChangesResponse)
+async def get_saless_changes(
+    since: int = Query(None, ge=0, description="next_since of the previous response; omit to get the current version"),
+    limit: int = Query(500, ge=1, le=5000, description="Max number of changes to return"),
+    current_user: UserResponse = Depends(get_current_user),
+    db: AsyncSession = Depends(get_read_db),
+):
+    """Inserts, updates and deletes of saless after version `since`, oldest first (user can only see their own records)"""
+    logger.debug("Fetching sales changes since %s, limit=%s", since, limit)
+
+    service = SalesService(db)
+    try:
+        return await service.get_changes(since, limit, user_id=str(current_user.id))
+    except ChangeFeedExpired as e:
+        raise HTTPException(status_code=410, detail=str(e))
+    except Exception as e:
+        logger.error(f"Error fetching sales changes: {str(e)}", exc_info=True)
+        raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
+
+
 @router.get("/{id}", response_model=SalesResponse)
 async def get_sales(
     id: int,
     fields: str = Query(None, description="Comma-separated list of fields to return"),
     current_user: UserResponse = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ):
     """Get a single sales by ID (user can only see their own records)"""
-    logger.debug(f"Fetching sales with id: {id}, fields={fields}")
+    logger.debug("Fetching sales with id: %s, fields=%s", id, fields)
     
     service = SalesService(db)
     try:
@@ -184,7 +225,7 @@ async def create_sales(
     db: AsyncSession = Depends(get_db),
 ):
     """Create a new sales"""
-    logger.debug(f"Creating new sales with data: {data}")
+    logger.debug("Creating new sales with data: %s", data)
     
     service = SalesService(db)
     try:
@@ -192,7 +233,7 @@ async def create_sales(
         if not result:
             raise HTTPException(status_code=400, detail="Failed to create sales")
         
-        logger.info(f"Sales created successfully with id: {result.id}")
+        logger.info("Sales created successfully with id: %s", result.id)
         return result
     except ValueError as e:
         logger.error(f"Validation error creating sales: {str(e)}")
@@ -209,7 +250,7 @@ async def create_saless_batch(
     db: AsyncSession = Depends(get_db),
 ):
     """Create multiple saless in a single request"""
-    logger.debug(f"Batch creating {len(request.items)} saless")
+    logger.debug("Batch creating %s saless", len(request.items))
     
     service = SalesService(db)
     results = []
@@ -220,7 +261,7 @@ async def create_saless_batch(
             if result:
                 results.append(result)
         
-        logger.info(f"Batch created {len(results)} saless successfully")
+        logger.info("Batch created %s saless successfully", len(results))
         return results
     except Exception as e:
         await db.rollback()
@@ -235,7 +276,7 @@ async def update_saless_batch(
     db: AsyncSession = Depends(get_db),
 ):
     """Update multiple saless in a single request (requires ownership)"""
-    logger.debug(f"Batch updating {len(request.items)} saless")
+    logger.debug("Batch updating %s saless", len(request.items))
     
     service = SalesService(db)
     results = []
@@ -248,7 +289,7 @@ async def update_saless_batch(
             if result:
                 results.append(result)
         
-        logger.info(f"Batch updated {len(results)} saless successfully")
+        logger.info("Batch updated %s saless successfully", len(results))
         return results
     except Exception as e:
         await db.rollback()
@@ -264,7 +305,7 @@ async def update_sales(
     db: AsyncSession = Depends(get_db),
 ):
     """Update an existing sales (requires ownership)"""
-    logger.debug(f"Updating sales {id} with data: {data}")
+    logger.debug("Updating sales %s with data: %s", id, data)
 
     service = SalesService(db)
     try:
@@ -275,7 +316,7 @@ async def update_sales(
             logger.warning(f"Sales with id {id} not found for update")
             raise HTTPException(status_code=404, detail="Sales not found")
         
-        logger.info(f"Sales {id} updated successfully")
+        logger.info("Sales %s updated successfully", id)
         return result
     except HTTPException:
         raise
@@ -294,7 +335,7 @@ async def delete_saless_batch(
     db: AsyncSession = Depends(get_db),
 ):
     """Delete multiple saless by their IDs (requires ownership)"""
-    logger.debug(f"Batch deleting {len(request.ids)} saless")
+    logger.debug("Batch deleting %s saless", len(request.ids))
     
     service = SalesService(db)
     deleted_count = 0
@@ -305,7 +346,7 @@ async def delete_saless_batch(
             if success:
                 deleted_count += 1
         
-        logger.info(f"Batch deleted {deleted_count} saless successfully")
+        logger.info("Batch deleted %s saless successfully", deleted_count)
         return {"message": f"Successfully deleted {deleted_count} saless", "deleted_count": deleted_count}
     except Exception as e:
         await db.rollback()
@@ -320,7 +361,7 @@ async def delete_sales(
     db: AsyncSession = Depends(get_db),
 ):
     """Delete a single sales by ID (requires ownership)"""
-    logger.debug(f"Deleting sales with id: {id}")
+    logger.debug("Deleting sales with id: %s", id)
     
     service = SalesService(db)
     try:
@@ -329,7 +370,7 @@ async def delete_sales(
             logger.warning(f"Sales with id {id} not found for deletion")
             raise HTTPException(status_code=404, detail="Sales not found")
         
-        logger.info(f"Sales {id} deleted successfully")
+        logger.info("Sales %s deleted successfully", id)
         return {"message": "Sales deleted successfully", "id": id}
     except HTTPException:
         raise
@@ -8,7 +8,9 @@ from fastapi import APIRouter, Body, Depends, HTTPException, Query
 from pydantic import BaseModel
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from core.database import get_db
+from core.change_feed import ChangeFeedExpired
+from core.database import get_db, get_read_db
+from core.statement_cache import InvalidFilter
 from services.sales_forecasts import Sales_forecastsService
 
 # Set up logging
@@ -51,6 +53,21 @@ class Sales_forecastsListResponse(BaseModel):
     limit: int
 
 
+class Sales_forecastsChange(BaseModel):
+    """Change feed entry (data is the current row, None for deletes)"""
+    version: int
+    operation: str
+    id: int
+    data: Optional[Sales_forecastsResponse] = None
+
+
+class Sales_forecastsChangesResponse(BaseModel):
+    """Change feed response"""
+    changes: List[Sales_forecastsChange]
+    next_since: int
+    has_more: bool
+
+
 class Sales_forecastsBatchCreateRequest(BaseModel):
     """Batch create request"""
     items: List[Sales_forecastsData]
@@ -80,10 +97,12 @@ async def query_sales_forecastss(
     skip: int = Query(0, ge=0, description="Number of records to skip"),
     limit: int = Query(20, ge=1, le=2000, description="Max number of records to return"),
     fields: str = Query(None, description="Comma-separated list of fields to return"),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ):
     """Query sales_forecastss with filtering, sorting, and pagination"""
-    logger.debug(f"Querying sales_forecastss: query={query}, sort={sort}, skip={skip}, limit={limit}, fields={fields}")
+    logger.debug(
+        "Querying sales_forecastss: query=%s, sort=%s, skip=%s, limit=%s, fields=%s", query, sort, skip, limit, fields
+    )
     
     service = Sales_forecastsService(db)
     try:
@@ -101,10 +120,12 @@ async def query_sales_forecastss(
             query_dict=query_dict,
             sort=sort,
         )
-        logger.debug(f"Found {result['total']} sales_forecastss")
+        logger.debug("Found %s sales_forecastss", result['total'])
         return result
     except HTTPException:
         raise
+    except InvalidFilter as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         logger.error(f"Error querying sales_forecastss: {str(e)}", exc_info=True)
         raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
@@ -117,10 +138,12 @@ async def query_sales_forecastss_all(
     skip: int = Query(0, ge=0, description="Number of records to skip"),
     limit: int = Query(20, ge=1, le=2000, description="Max number of records to return"),
     fields: str = Query(None, description="Comma-separated list of fields to return"),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ):
     # Query sales_forecastss with filtering, sorting, and pagination without user limitation
-    logger.debug(f"Querying sales_forecastss: query={query}, sort={sort}, skip={skip}, limit={limit}, fields={fields}")
+    logger.debug(
+        "Querying sales_forecastss: query=%s, sort=%s, skip=%s, limit=%s, fields=%s", query, sort, skip, limit, fields
+    )
 
     service = Sales_forecastsService(db)
     try:
@@ -138,23 +161,44 @@ async def query_sales_forecastss_all(
             query_dict=query_dict,
             sort=sort
         )
-        logger.debug(f"Found {result['total']} sales_forecastss")
+        logger.debug("Found %s sales_forecastss", result['total'])
         return result
     except HTTPException:
         raise
+    except InvalidFilter as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         logger.error(f"Error querying sales_forecastss: {str(e)}", exc_info=True)
         raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
 
 
+@router.get("/changes", response_model=Sales_forecastsChangesResponse)
+async def get_sales_forecastss_changes(
+    since: int = Query(None, ge=0, description="next_since of the previous response; omit to get the current version"),
+    limit: int = Query(500, ge=1, le=5000, description="Max number of changes to return"),
+    db: AsyncSession = Depends(get_read_db),
+):
+    """Inserts, updates and deletes of sales_forecastss after version `since`, oldest first"""
+    logger.debug("Fetching sales_forecasts changes since %s, limit=%s", since, limit)
+
+    service = Sales_forecastsService(db)
+    try:
+        return await service.get_changes(since, limit)
+    except ChangeFeedExpired as e:
+        raise HTTPException(status_code=410, detail=str(e))
+    except Exception as e:
+        logger.error(f"Error fetching sales_forecasts changes: {str(e)}", exc_info=True)
+        raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
+
+
 @router.get("/{id}", response_model=Sales_forecastsResponse)
 async def get_sales_forecasts(
     id: int,
     fields: str = Query(None, description="Comma-separated list of fields to return"),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ):
     """Get a single sales_forecasts by ID"""
-    logger.debug(f"Fetching sales_forecasts with id: {id}, fields={fields}")
+    logger.debug("Fetching sales_forecasts with id: %s, fields=%s", id, fields)
     
     service = Sales_forecastsService(db)
     try:
@@ -177,7 +221,7 @@ async def create_sales_forecasts(
     db: AsyncSession = Depends(get_db),
 ):
     """Create a new sales_forecasts"""
-    logger.debug(f"Creating new sales_forecasts with data: {data}")
+    logger.debug("Creating new sales_forecasts with data: %s", data)
     
     service = Sales_forecastsService(db)
     try:
@@ -185,7 +229,7 @@ async def create_sales_forecasts(
         if not result:
             raise HTTPException(status_code=400, detail="Failed to create sales_forecasts")
         
-        logger.info(f"Sales_forecasts created successfully with id: {result.id}")
+        logger.info("Sales_forecasts created successfully with id: %s", result.id)
         return result
     except ValueError as e:
         logger.error(f"Validation error creating sales_forecasts: {str(e)}")
@@ -201,7 +245,7 @@ async def create_sales_forecastss_batch(
     db: AsyncSession = Depends(get_db),
 ):
     """Create multiple sales_forecastss in a single request"""
-    logger.debug(f"Batch creating {len(request.items)} sales_forecastss")
+    logger.debug("Batch creating %s sales_forecastss", len(request.items))
     
     service = Sales_forecastsService(db)
     results = []
@@ -212,7 +256,7 @@ async def create_sales_forecastss_batch(
             if result:
                 results.append(result)
         
-        logger.info(f"Batch created {len(results)} sales_forecastss successfully")
+        logger.info("Batch created %s sales_forecastss successfully", len(results))
         return results
     except Exception as e:
         await db.rollback()
@@ -226,7 +270,7 @@ async def update_sales_forecastss_batch(
     db: AsyncSession = Depends(get_db),
 ):
     """Update multiple sales_forecastss in a single request"""
-    logger.debug(f"Batch updating {len(request.items)} sales_forecastss")
+    logger.debug("Batch updating %s sales_forecastss", len(request.items))
     
     service = Sales_forecastsService(db)
     results = []
@@ -239,7 +283,7 @@ async def update_sales_forecastss_batch(
             if result:
                 results.append(result)
         
-        logger.info(f"Batch updated {len(results)} sales_forecastss successfully")
+        logger.info("Batch updated %s sales_forecastss successfully", len(results))
         return results
     except Exception as e:
         await db.rollback()
@@ -254,7 +298,7 @@ async def update_sales_forecasts(
     db: AsyncSession = Depends(get_db),
 ):
     """Update an existing sales_forecasts"""
-    logger.debug(f"Updating sales_forecasts {id} with data: {data}")
+    logger.debug("Updating sales_forecasts %s with data: %s", id, data)
 
     service = Sales_forecastsService(db)
     try:
@@ -265,7 +309,7 @@ async def update_sales_forecasts(
             logger.warning(f"Sales_forecasts with id {id} not found for update")
             raise HTTPException(status_code=404, detail="Sales_forecasts not found")
         
-        logger.info(f"Sales_forecasts {id} updated successfully")
+        logger.info("Sales_forecasts %s updated successfully", id)
         return result
     except HTTPException:
         raise
@@ -283,7 +327,7 @@ async def delete_sales_forecastss_batch(
     db: AsyncSession = Depends(get_db),
 ):
     """Delete multiple sales_forecastss by their IDs"""
-    logger.debug(f"Batch deleting {len(request.ids)} sales_forecastss")
+    logger.debug("Batch deleting %s sales_forecastss", len(request.ids))
     
     service = Sales_forecastsService(db)
     deleted_count = 0
@@ -294,7 +338,7 @@ async def delete_sales_forecastss_batch(
             if success:
                 deleted_count += 1
         
-        logger.info(f"Batch deleted {deleted_count} sales_forecastss successfully")
+        logger.info("Batch deleted %s sales_forecastss successfully", deleted_count)
         return {"message": f"Successfully deleted {deleted_count} sales_forecastss", "deleted_count": deleted_count}
     except Exception as e:
         await db.rollback()
@@ -308,7 +352,7 @@ async def delete_sales_forecasts(
     db: AsyncSession = Depends(get_db),
 ):
     """Delete a single sales_forecasts by ID"""
-    logger.debug(f"Deleting sales_forecasts with id: {id}")
+    logger.debug("Deleting sales_forecasts with id: %s", id)
     
     service = Sales_forecastsService(db)
     try:
@@ -317,7 +361,7 @@ async def delete_sales_forecasts(
             logger.warning(f"Sales_forecasts with id {id} not found for deletion")
             raise HTTPException(status_code=404, detail="Sales_forecasts not found")
         
-        logger.info(f"Sales_forecasts {id} deleted successfully")
+        logger.info("Sales_forecasts %s deleted successfully", id)
         return {"message": "Sales_forecasts deleted successfully", "id": id}
     except HTTPException:
         raise
@@ -4,14 +4,14 @@ API endpoint for database seeding
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.ext.asyncio import AsyncSession
 from pydantic import BaseModel
-import asyncio
+import dataclasses
 import sys
 from pathlib import Path
 
 # Add scripts directory to path
 sys.path.insert(0, str(Path(__file__).parent.parent / "scripts"))
 
-from core.database import get_db
+from core.database import get_db, get_read_db
 from dependencies.auth import get_current_user
 from schemas.auth import UserResponse
 
@@ -36,45 +36,16 @@ async def reset_demo_data(
     **Warning**: This will delete all existing data!
     """
     try:
-        # Import seeding functions
-        from seed_database import (
-            clear_all_data,
-            seed_payment_methods,
-            seed_products,
-            seed_customers,
-            seed_employees,
-            seed_suppliers,
-            seed_sales_transactions,
-            seed_purchase_orders,
-        )
-        
+        from seed_database import DEMO_CONFIG, seed_session
+
         # Use current user ID for seeding
-        user_id = current_user.id
-        
-        # Clear existing data
-        await clear_all_data(db)
-        
-        # Seed data in order
-        await seed_payment_methods(db, user_id)
-        await seed_products(db, user_id)
-        await seed_customers(db, user_id)
-        await seed_employees(db, user_id)
-        await seed_suppliers(db, user_id)
-        await seed_sales_transactions(db, user_id)
-        await seed_purchase_orders(db, user_id)
-        
+        config = dataclasses.replace(DEMO_CONFIG, user_id=current_user.id)
+        counts = await seed_session(db, config)
+
         return SeedResponse(
             success=True,
             message="Demo data reset successfully",
-            details={
-                "products": 30,
-                "customers": 15,
-                "employees": 10,
-                "suppliers": 8,
-                "sales": 50,
-                "purchase_orders": 15,
-                "payment_methods": 4,
-            }
+            details=counts,
         )
         
     except Exception as e:
@@ -88,7 +59,7 @@ async def reset_demo_data(
 @router.get("/status")
 async def get_seed_status(
     current_user: UserResponse = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ):
     """
     Get current database data counts
@@ -7,7 +7,9 @@ from fastapi import APIRouter, Body, Depends, HTTPException, Query
 from pydantic import BaseModel
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from core.database import get_db
+from core.change_feed import ChangeFeedExpired
+from core.database import get_db, get_read_db
+from core.statement_cache import InvalidFilter
 from services.shifts import ShiftsService
 from dependencies.auth import get_current_user
 from schemas.auth import UserResponse
@@ -71,6 +73,21 @@ class ShiftsListResponse(BaseModel):
     limit: int
 
 
+class ShiftsChange(BaseModel):
+    """Change feed entry (data is the current row, None for deletes)"""
+    version: int
+    operation: str
+    id: int
+    data: Optional[ShiftsResponse] = None
+
+
+class ShiftsChangesResponse(BaseModel):
+    """Change feed response"""
+    changes: List[ShiftsChange]
+    next_since: int
+    has_more: bool
+
+
 class ShiftsBatchCreateRequest(BaseModel):
     """Batch create request"""
     items: List[ShiftsData]
@@ -101,10 +118,10 @@ async def query_shiftss(
     limit: int = Query(20, ge=1, le=2000, description="Max number of records to return"),
     fields: str = Query(None, description="Comma-separated list of fields to return"),
     current_user: UserResponse = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ):
     """Query shiftss with filtering, sorting, and pagination (user can only see their own records)"""
-    logger.debug(f"Querying shiftss: query={query}, sort={sort}, skip={skip}, limit={limit}, fields={fields}")
+    logger.debug("Querying shiftss: query=%s, sort=%s, skip=%s, limit=%s, fields=%s", query, sort, skip, limit, fields)
     
     service = ShiftsService(db)
     try:
@@ -123,10 +140,12 @@ async def query_shiftss(
             sort=sort,
             user_id=str(current_user.id),
         )
-        logger.debug(f"Found {result['total']} shiftss")
+        logger.debug("Found %s shiftss", result['total'])
         return result
     except HTTPException:
         raise
+    except InvalidFilter as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         logger.error(f"Error querying shiftss: {str(e)}", exc_info=True)
         raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
@@ -139,10 +158,10 @@ async def query_shiftss_all(
     skip: int = Query(0, ge=0, description="Number of records to skip"),
     limit: int = Query(20, ge=1, le=2000, description="Max number of records to return"),
     fields: str = Query(None, description="Comma-separated list of fields to return"),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ):
     # Query shiftss with filtering, sorting, and pagination without user limitation
-    logger.debug(f"Querying shiftss: query={query}, sort={sort}, skip={skip}, limit={limit}, fields={fields}")
+    logger.debug("Querying shiftss: query=%s, sort=%s, skip=%s, limit=%s, fields=%s", query, sort, skip, limit, fields)
 
     service = ShiftsService(db)
     try:
@@ -160,24 +179,46 @@ async def query_shiftss_all(
             query_dict=query_dict,
             sort=sort
         )
-        logger.debug(f"Found {result['total']} shiftss")
+        logger.debug("Found %s shiftss", result['total'])
         return result
     except HTTPException:
         raise
+    except InvalidFilter as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         logger.error(f"Error querying shiftss: {str(e)}", exc_info=True)
         raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
 
 
+@router.get("/changes", response_model=ShiftsChangesResponse)
+async def get_shiftss_changes(
+    since: int = Query(None, ge=0, description="next_since of the previous response; omit to get the current version"),
+    limit: int = Query(500, ge=1, le=5000, description="Max number of changes to return"),
+    current_user: UserResponse = Depends(get_current_user),
+    db: AsyncSession = Depends(get_read_db),
+):
+    """Inserts, updates and deletes of shiftss after version `since`, oldest first (user can only see their own records)"""
+    logger.debug("Fetching shifts changes since %s, limit=%s", since, limit)
+
+    service = ShiftsService(db)
+    try:
+        return await service.get_changes(since, limit, user_id=str(current_user.id))
+    except ChangeFeedExpired as e:
+        raise HTTPException(status_code=410, detail=str(e))
+    except Exception as e:
+        logger.error(f"Error fetching shifts changes: {str(e)}", exc_info=True)
+        raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
+
+
 @router.get("/{id}", response_model=ShiftsResponse)
 async def get_shifts(
     id: int,
     fields: str = Query(None, description="Comma-separated list of fields to return"),
     current_user: UserResponse = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ):
     """Get a single shifts by ID (user can only see their own records)"""
-    logger.debug(f"Fetching shifts with id: {id}, fields={fields}")
+    logger.debug("Fetching shifts with id: %s, fields=%s", id, fields)
     
     service = ShiftsService(db)
     try:
@@ -201,7 +242,7 @@ async def create_shifts(
     db: AsyncSession = Depends(get_db),
 ):
     """Create a new shifts"""
-    logger.debug(f"Creating new shifts with data: {data}")
+    logger.debug("Creating new shifts with data: %s", data)
     
     service = ShiftsService(db)
     try:
@@ -209,7 +250,7 @@ async def create_shifts(
         if not result:
             raise HTTPException(status_code=400, detail="Failed to create shifts")
         
-        logger.info(f"Shifts created successfully with id: {result.id}")
+        logger.info("Shifts created successfully with id: %s", result.id)
         return result
     except ValueError as e:
         logger.error(f"Validation error creating shifts: {str(e)}")
@@ -226,7 +267,7 @@ async def create_shiftss_batch(
     db: AsyncSession = Depends(get_db),
 ):
     """Create multiple shiftss in a single request"""
-    logger.debug(f"Batch creating {len(request.items)} shiftss")
+    logger.debug("Batch creating %s shiftss", len(request.items))
     
     service = ShiftsService(db)
     results = []
@@ -237,7 +278,7 @@ async def create_shiftss_batch(
             if result:
                 results.append(result)
         
-        logger.info(f"Batch created {len(results)} shiftss successfully")
+        logger.info("Batch created %s shiftss successfully", len(results))
         return results
     except Exception as e:
         await db.rollback()
@@ -252,7 +293,7 @@ async def update_shiftss_batch(
     db: AsyncSession = Depends(get_db),
 ):
     """Update multiple shiftss in a single request (requires ownership)"""
-    logger.debug(f"Batch updating {len(request.items)} shiftss")
+    logger.debug("Batch updating %s shiftss", len(request.items))
     
     service = ShiftsService(db)
     results = []
@@ -265,7 +306,7 @@ async def update_shiftss_batch(
             if result:
                 results.append(result)
         
-        logger.info(f"Batch updated {len(results)} shiftss successfully")
+        logger.info("Batch updated %s shiftss successfully", len(results))
         return results
     except Exception as e:
         await db.rollback()
@@ -281,7 +322,7 @@ async def update_shifts(
     db: AsyncSession = Depends(get_db),
 ):
     """Update an existing shifts (requires ownership)"""
-    logger.debug(f"Updating shifts {id} with data: {data}")
+    logger.debug("Updating shifts %s with data: %s", id, data)
 
     service = ShiftsService(db)
     try:
@@ -292,7 +333,7 @@ async def update_shifts(
             logger.warning(f"Shifts with id {id} not found for update")
             raise HTTPException(status_code=404, detail="Shifts not found")
         
-        logger.info(f"Shifts {id} updated successfully")
+        logger.info("Shifts %s updated successfully", id)
         return result
     except HTTPException:
         raise
@@ -311,7 +352,7 @@ async def delete_shiftss_batch(
     db: AsyncSession = Depends(get_db),
 ):
     """Delete multiple shiftss by their IDs (requires ownership)"""
-    logger.debug(f"Batch deleting {len(request.ids)} shiftss")
+    logger.debug("Batch deleting %s shiftss", len(request.ids))
     
     service = ShiftsService(db)
     deleted_count = 0
@@ -322,7 +363,7 @@ async def delete_shiftss_batch(
             if success:
                 deleted_count += 1
         
-        logger.info(f"Batch deleted {deleted_count} shiftss successfully")
+        logger.info("Batch deleted %s shiftss successfully", deleted_count)
         return {"message": f"Successfully deleted {deleted_count} shiftss", "deleted_count": deleted_count}
     except Exception as e:
         await db.rollback()
@@ -337,7 +378,7 @@ async def delete_shifts(
     db: AsyncSession = Depends(get_db),
 ):
     """Delete a single shifts by ID (requires ownership)"""
-    logger.debug(f"Deleting shifts with id: {id}")
+    logger.debug("Deleting shifts with id: %s", id)
     
     service = ShiftsService(db)
     try:
@@ -346,7 +387,7 @@ async def delete_shifts(
             logger.warning(f"Shifts with id {id} not found for deletion")
             raise HTTPException(status_code=404, detail="Shifts not found")
         
-        logger.info(f"Shifts {id} deleted successfully")
+        logger.info("Shifts %s deleted successfully", id)
         return {"message": "Shifts deleted successfully", "id": id}
     except HTTPException:
         raise
@@ -7,7 +7,9 @@ from fastapi import APIRouter, Body, Depends, HTTPException, Query
 from pydantic import BaseModel
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from core.database import get_db
+from core.change_feed import ChangeFeedExpired
+from core.database import get_db, get_read_db
+from core.statement_cache import InvalidFilter
 from services.stock_adjustments import Stock_adjustmentsService
 from dependencies.auth import get_current_user
 from schemas.auth import UserResponse
@@ -68,6 +70,21 @@ class Stock_adjustmentsListResponse(BaseModel):
     limit: int
 
 
+class Stock_adjustmentsChange(BaseModel):
+    """Change feed entry (data is the current row, None for deletes)"""
+    version: int
+    operation: str
+    id: int
+    data: Optional[Stock_adjustmentsResponse] = None
+
+
+class Stock_adjustmentsChangesResponse(BaseModel):
+    """Change feed response"""
+    changes: List[Stock_adjustmentsChange]
+    next_since: int
+    has_more: bool
+
+
 class Stock_adjustmentsBatchCreateRequest(BaseModel):
     """Batch create request"""
     items: List[Stock_adjustmentsData]
@@ -98,10 +115,12 @@ async def query_stock_adjustmentss(
     limit: int = Query(20, ge=1, le=2000, description="Max number of records to return"),
     fields: str = Query(None, description="Comma-separated list of fields to return"),
     current_user: UserResponse = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ):
     """Query stock_adjustmentss with filtering, sorting, and pagination (user can only see their own records)"""
-    logger.debug(f"Querying stock_adjustmentss: query={query}, sort={sort}, skip={skip}, limit={limit}, fields={fields}")
+    logger.debug(
+        "Querying stock_adjustmentss: query=%s, sort=%s, skip=%s, limit=%s, fields=%s", query, sort, skip, limit, fields
+    )
     
     service = Stock_adjustmentsService(db)
     try:
@@ -120,10 +139,12 @@ async def query_stock_adjustmentss(
             sort=sort,
             user_id=str(current_user.id),
         )
-        logger.debug(f"Found {result['total']} stock_adjustmentss")
+        logger.debug("Found %s stock_adjustmentss", result['total'])
         return result
     except HTTPException:
         raise
+    except InvalidFilter as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         logger.error(f"Error querying stock_adjustmentss: {str(e)}", exc_info=True)
         raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
@@ -136,10 +157,12 @@ async def query_stock_adjustmentss_all(
     skip: int = Query(0, ge=0, description="Number of records to skip"),
     limit: int = Query(20, ge=1, le=2000, description="Max number of records to return"),
     fields: str = Query(None, description="Comma-separated list of fields to return"),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ):
     # Query stock_adjustmentss with filtering, sorting, and pagination without user limitation
-    logger.debug(f"Querying stock_adjustmentss: query={query}, sort={sort}, skip={skip}, limit={limit}, fields={fields}")
+    logger.debug(
+        "Querying stock_adjustmentss: query=%s, sort=%s, skip=%s, limit=%s, fields=%s", query, sort, skip, limit, fields
+    )
 
     service = Stock_adjustmentsService(db)
     try:
@@ -157,24 +180,46 @@ async def query_stock_adjustmentss_all(
             query_dict=query_dict,
             sort=sort
         )
-        logger.debug(f"Found {result['total']} stock_adjustmentss")
+        logger.debug("Found %s stock_adjustmentss", result['total'])
         return result
     except HTTPException:
         raise
+    except InvalidFilter as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         logger.error(f"Error querying stock_adjustmentss: {str(e)}", exc_info=True)
         raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
 
 
+@router.get("/changes", response_model=Stock_adjustmentsChangesResponse)
+async def get_stock_adjustmentss_changes(
+    since: int = Query(None, ge=0, description="next_since of the previous response; omit to get the current version"),
+    limit: int = Query(500, ge=1, le=5000, description="Max number of changes to return"),
+    current_user: UserResponse = Depends(get_current_user),
+    db: AsyncSession = Depends(get_read_db),
+):
+    """Inserts, updates and deletes of stock_adjustmentss after version `since`, oldest first (user can only see their own records)"""
+    logger.debug("Fetching stock_adjustments changes since %s, limit=%s", since, limit)
+
+    service = Stock_adjustmentsService(db)
+    try:
+        return await service.get_changes(since, limit, user_id=str(current_user.id))
+    except ChangeFeedExpired as e:
+        raise HTTPException(status_code=410, detail=str(e))
+    except Exception as e:
+        logger.error(f"Error fetching stock_adjustments changes: {str(e)}", exc_info=True)
+        raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
+
+
 @router.get("/{id}", response_model=Stock_adjustmentsResponse)
 async def get_stock_adjustments(
     id: int,
     fields: str = Query(None, description="Comma-separated list of fields to return"),
     current_user: UserResponse = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ):
     """Get a single stock_adjustments by ID (user can only see their own records)"""
-    logger.debug(f"Fetching stock_adjustments with id: {id}, fields={fields}")
+    logger.debug("Fetching stock_adjustments with id: %s, fields=%s", id, fields)
     
     service = Stock_adjustmentsService(db)
     try:
@@ -198,7 +243,7 @@ async def create_stock_adjustments(
     db: AsyncSession = Depends(get_db),
 ):
     """Create a new stock_adjustments"""
-    logger.debug(f"Creating new stock_adjustments with data: {data}")
+    logger.debug("Creating new stock_adjustments with data: %s", data)
     
     service = Stock_adjustmentsService(db)
     try:
@@ -206,7 +251,7 @@ async def create_stock_adjustments(
         if not result:
             raise HTTPException(status_code=400, detail="Failed to create stock_adjustments")
         
-        logger.info(f"Stock_adjustments created successfully with id: {result.id}")
+        logger.info("Stock_adjustments created successfully with id: %s", result.id)
         return result
     except ValueError as e:
         logger.error(f"Validation error creating stock_adjustments: {str(e)}")
@@ -223,7 +268,7 @@ async def create_stock_adjustmentss_batch(
     db: AsyncSession = Depends(get_db),
 ):
     """Create multiple stock_adjustmentss in a single request"""
-    logger.debug(f"Batch creating {len(request.items)} stock_adjustmentss")
+    logger.debug("Batch creating %s stock_adjustmentss", len(request.items))
     
     service = Stock_adjustmentsService(db)
     results = []
@@ -234,7 +279,7 @@ async def create_stock_adjustmentss_batch(
             if result:
                 results.append(result)
         
-        logger.info(f"Batch created {len(results)} stock_adjustmentss successfully")
+        logger.info("Batch created %s stock_adjustmentss successfully", len(results))
         return results
     except Exception as e:
         await db.rollback()
@@ -249,7 +294,7 @@ async def update_stock_adjustmentss_batch(
     db: AsyncSession = Depends(get_db),
 ):
     """Update multiple stock_adjustmentss in a single request (requires ownership)"""
-    logger.debug(f"Batch updating {len(request.items)} stock_adjustmentss")
+    logger.debug("Batch updating %s stock_adjustmentss", len(request.items))
     
     service = Stock_adjustmentsService(db)
     results = []
@@ -262,7 +307,7 @@ async def update_stock_adjustmentss_batch(
             if result:
                 results.append(result)
         
-        logger.info(f"Batch updated {len(results)} stock_adjustmentss successfully")
+        logger.info("Batch updated %s stock_adjustmentss successfully", len(results))
         return results
     except Exception as e:
         await db.rollback()
@@ -278,7 +323,7 @@ async def update_stock_adjustments(
     db: AsyncSession = Depends(get_db),
 ):
     """Update an existing stock_adjustments (requires ownership)"""
-    logger.debug(f"Updating stock_adjustments {id} with data: {data}")
+    logger.debug("Updating stock_adjustments %s with data: %s", id, data)
 
     service = Stock_adjustmentsService(db)
     try:
@@ -289,7 +334,7 @@ async def update_stock_adjustments(
             logger.warning(f"Stock_adjustments with id {id} not found for update")
             raise HTTPException(status_code=404, detail="Stock_adjustments not found")
         
-        logger.info(f"Stock_adjustments {id} updated successfully")
+        logger.info("Stock_adjustments %s updated successfully", id)
         return result
     except HTTPException:
         raise
@@ -308,7 +353,7 @@ async def delete_stock_adjustmentss_batch(
     db: AsyncSession = Depends(get_db),
 ):
     """Delete multiple stock_adjustmentss by their IDs (requires ownership)"""
-    logger.debug(f"Batch deleting {len(request.ids)} stock_adjustmentss")
+    logger.debug("Batch deleting %s stock_adjustmentss", len(request.ids))
     
     service = Stock_adjustmentsService(db)
     deleted_count = 0
@@ -319,7 +364,7 @@ async def delete_stock_adjustmentss_batch(
             if success:
                 deleted_count += 1
         
-        logger.info(f"Batch deleted {deleted_count} stock_adjustmentss successfully")
+        logger.info("Batch deleted %s stock_adjustmentss successfully", deleted_count)
         return {"message": f"Successfully deleted {deleted_count} stock_adjustmentss", "deleted_count": deleted_count}
     except Exception as e:
         await db.rollback()
@@ -334,7 +379,7 @@ async def delete_stock_adjustments(
     db: AsyncSession = Depends(get_db),
 ):
     """Delete a single stock_adjustments by ID (requires ownership)"""
-    logger.debug(f"Deleting stock_adjustments with id: {id}")
+    logger.debug("Deleting stock_adjustments with id: %s", id)
     
     service = Stock_adjustmentsService(db)
     try:
@@ -343,7 +388,7 @@ async def delete_stock_adjustments(
             logger.warning(f"Stock_adjustments with id {id} not found for deletion")
             raise HTTPException(status_code=404, detail="Stock_adjustments not found")
         
-        logger.info(f"Stock_adjustments {id} deleted successfully")
+        logger.info("Stock_adjustments %s deleted successfully", id)
         return {"message": "Stock_adjustments deleted successfully", "id": id}
     except HTTPException:
         raise
@@ -1,7 +1,10 @@
+import json
 import logging
+from typing import AsyncIterator
 
 from dependencies.auth import get_admin_user, get_current_user
 from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.responses import StreamingResponse
 from schemas.auth import UserResponse
 from schemas.storage import (
     BucketListResponse,
@@ -11,13 +14,14 @@ from schemas.storage import (
     FileUpDownRequest,
     FileUpDownResponse,
     ObjectInfo,
+    ObjectListRequest,
     ObjectListResponse,
     ObjectRequest,
-    OSSBaseModel,
+    PresignedUrlCacheStats,
     RenameRequest,
     RenameResponse,
 )
-from services.storage import StorageService
+from services.storage import StorageService, presigned_url_cache
 
 logger = logging.getLogger(__name__)
 
@@ -57,9 +61,13 @@ async def list_buckets(_current_user: UserResponse = Depends(get_current_user)):
 
 
 @router.get("/list-objects", response_model=ObjectListResponse)
-async def list_objects(request: OSSBaseModel = Depends(), _current_user: UserResponse = Depends(get_current_user)):
+async def list_objects(
+    request: ObjectListRequest = Depends(), _current_user: UserResponse = Depends(get_current_user)
+):
     """
-    List objects under the bucket
+    List one page of objects under the bucket.
+
+    Pass `next_continuation_token` from the response as `continuation_token` to get the next page.
     """
     try:
         service = StorageService()
@@ -72,6 +80,39 @@ async def list_objects(request: OSSBaseModel = Depends(), _current_user: UserRes
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"{e}")
 
 
+@router.get("/list-objects/stream")
+async def stream_objects(
+    request: ObjectListRequest = Depends(), _current_user: UserResponse = Depends(get_current_user)
+):
+    """
+    Stream all objects under the bucket as NDJSON, one object per line.
+
+    Pages are fetched lazily, so memory stays bounded by `page_size` and the first
+    objects are sent before the listing completes.
+    """
+    try:
+        service = StorageService()
+        # Fetch the first page up front so configuration and bucket errors still map to HTTP status codes
+        first_page = await service.list_objects(request)
+    except ValueError as e:
+        logger.error(f"Invalid stream objects request: {e}")
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    except Exception as e:
+        logger.error(f"Failed to stream objects: {e}")
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"{e}")
+
+    async def ndjson_lines() -> AsyncIterator[str]:
+        try:
+            async for obj in service.iter_objects(request, first_page=first_page):
+                yield obj.model_dump_json() + "\n"
+        except Exception as e:
+            # Headers are already sent; report the failure in-band as the last line
+            logger.error(f"Failed while streaming objects: {e}")
+            yield json.dumps({"error": str(e)}) + "\n"
+
+    return StreamingResponse(ndjson_lines(), media_type="application/x-ndjson")
+
+
 @router.get("/get-object-info", response_model=ObjectInfo)
 async def get_object_info(request: ObjectRequest = Depends(), _current_user: UserResponse = Depends(get_current_user)):
     """
@@ -157,3 +198,11 @@ async def download_file(request: FileUpDownRequest, _current_user: UserResponse
     except Exception as e:
         logger.error(f"Failed to generate download URL: {e}")
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"{e}")
+
+
+@router.get("/url-cache/stats", response_model=PresignedUrlCacheStats)
+async def url_cache_stats(_current_user: UserResponse = Depends(get_admin_user)):
+    """
+    Get hit ratio and upstream call counts of the presigned download URL cache
+    """
+    return presigned_url_cache.stats()
@@ -0,0 +1,64 @@
+import json
+import logging
+from typing import Optional
+
+from core.config import settings
+from dependencies.auth import bearer_scheme, get_current_user
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.security import HTTPAuthorizationCredentials
+from schemas.auth import UserResponse
+from services.stream import EVENT_TYPES, event_bus
+from sse_starlette.sse import EventSourceResponse
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(prefix="/api/v1/stream", tags=["stream"])
+
+
+async def get_stream_user(
+    access_token: Optional[str] = Query(None, description="JWT for clients that cannot set headers (EventSource)"),
+    credentials: Optional[HTTPAuthorizationCredentials] = Depends(bearer_scheme),
+) -> UserResponse:
+    """Authenticate with the Authorization header, or the access_token query parameter as a fallback."""
+    if credentials and credentials.scheme.lower() == "bearer":
+        return await get_current_user(credentials.credentials)
+    if access_token:
+        return await get_current_user(access_token)
+    raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Authentication credentials were not provided")
+
+
+@router.get("/events")
+async def stream_events(
+    types: Optional[str] = Query(None, description="Comma-separated event types to receive; all when omitted"),
+    current_user: UserResponse = Depends(get_stream_user),
+):
+    """Server-Sent Events for the current user: sale.created, notification.created and product.low_stock.
+
+    Missed events are not replayed; after reconnecting, catch up with the entities' /changes feeds.
+    A client that falls too far behind receives an `overflow` event and is disconnected.
+    """
+    if settings.is_lambda:
+        # API Gateway delivers a Lambda response only once it is complete
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                            detail="The live stream is not available on this deployment; poll the /changes feeds")
+    wanted = None
+    if types:
+        wanted = frozenset(name.strip() for name in types.split(",") if name.strip())
+        unknown = wanted - EVENT_TYPES
+        if unknown:
+            raise HTTPException(status_code=400, detail=f"Unknown event types: {', '.join(sorted(unknown))}")
+    try:
+        subscription = event_bus.subscribe(str(current_user.id), wanted)
+    except RuntimeError as e:
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail=str(e))
+    logger.debug("Event stream opened for user %s (%d open)", current_user.id, len(event_bus.subscribers))
+
+    async def event_generator():
+        try:
+            async for event in subscription:
+                yield {"event": event.type, "id": str(event.id), "data": json.dumps(event.data, default=str)}
+        finally:
+            event_bus.unsubscribe(subscription)
+            logger.debug("Event stream closed for user %s", current_user.id)
+
+    return EventSourceResponse(event_generator(), ping=settings.stream_ping_seconds)
@@ -7,7 +7,9 @@ from fastapi import APIRouter, Body, Depends, HTTPException, Query
 from pydantic import BaseModel
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from core.database import get_db
+from core.change_feed import ChangeFeedExpired
+from core.database import get_db, get_read_db
+from core.statement_cache import InvalidFilter
 from services.suppliers import SuppliersService
 from dependencies.auth import get_current_user
 from schemas.auth import UserResponse
@@ -71,6 +73,21 @@ class SuppliersListResponse(BaseModel):
     limit: int
 
 
+class SuppliersChange(BaseModel):
+    """Change feed entry (data is the current row, None for deletes)"""
+    version: int
+    operation: str
+    id: int
+    data: Optional[SuppliersResponse] = None
+
+
+class SuppliersChangesResponse(BaseModel):
+    """Change feed response"""
+    changes: List[SuppliersChange]
+    next_since: int
+    has_more: bool
+
+
 class SuppliersBatchCreateRequest(BaseModel):
     """Batch create request"""
     items: List[SuppliersData]
@@ -92,6 +109,11 @@ class SuppliersBatchDeleteRequest(BaseModel):
     ids: List[int]
 
 
+class SuppliersUpsertRequest(BaseModel):
+    """Upsert request (items are matched on supplier_code)"""
+    items: List[SuppliersData]
+
+
 # ---------- Routes ----------
 @router.get("", response_model=SuppliersListResponse)
 async def query_supplierss(
@@ -101,10 +123,12 @@ async def query_supplierss(
     limit: int = Query(20, ge=1, le=2000, description="Max number of records to return"),
     fields: str = Query(None, description="Comma-separated list of fields to return"),
     current_user: UserResponse = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ):
     """Query supplierss with filtering, sorting, and pagination (user can only see their own records)"""
-    logger.debug(f"Querying supplierss: query={query}, sort={sort}, skip={skip}, limit={limit}, fields={fields}")
+    logger.debug(
+        "Querying supplierss: query=%s, sort=%s, skip=%s, limit=%s, fields=%s", query, sort, skip, limit, fields
+    )
     
     service = SuppliersService(db)
     try:
@@ -123,10 +147,12 @@ async def query_supplierss(
             sort=sort,
             user_id=str(current_user.id),
         )
-        logger.debug(f"Found {result['total']} supplierss")
+        logger.debug("Found %s supplierss", result['total'])
         return result
     except HTTPException:
         raise
+    except InvalidFilter as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         logger.error(f"Error querying supplierss: {str(e)}", exc_info=True)
         raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
@@ -139,10 +165,12 @@ async def query_supplierss_all(
     skip: int = Query(0, ge=0, description="Number of records to skip"),
     limit: int = Query(20, ge=1, le=2000, description="Max number of records to return"),
     fields: str = Query(None, description="Comma-separated list of fields to return"),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ):
     # Query supplierss with filtering, sorting, and pagination without user limitation
-    logger.debug(f"Querying supplierss: query={query}, sort={sort}, skip={skip}, limit={limit}, fields={fields}")
+    logger.debug(
+        "Querying supplierss: query=%s, sort=%s, skip=%s, limit=%s, fields=%s", query, sort, skip, limit, fields
+    )
 
     service = SuppliersService(db)
     try:
@@ -160,24 +188,46 @@ async def query_supplierss_all(
             query_dict=query_dict,
             sort=sort
         )
-        logger.debug(f"Found {result['total']} supplierss")
+        logger.debug("Found %s supplierss", result['total'])
         return result
     except HTTPException:
         raise
+    except InvalidFilter as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         logger.error(f"Error querying supplierss: {str(e)}", exc_info=True)
         raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
 
 
+@router.get("/changes", response_model=SuppliersChangesResponse)
+async def get_supplierss_changes(
+    since: int = Query(None, ge=0, description="next_since of the previous response; omit to get the current version"),
+    limit: int = Query(500, ge=1, le=5000, description="Max number of changes to return"),
+    current_user: UserResponse = Depends(get_current_user),
+    db: AsyncSession = Depends(get_read_db),
+):
+    """Inserts, updates and deletes of supplierss after version `since`, oldest first (user can only see their own records)"""
+    logger.debug("Fetching suppliers changes since %s, limit=%s", since, limit)
+
+    service = SuppliersService(db)
+    try:
+        return await service.get_changes(since, limit, user_id=str(current_user.id))
+    except ChangeFeedExpired as e:
+        raise HTTPException(status_code=410, detail=str(e))
+    except Exception as e:
+        logger.error(f"Error fetching suppliers changes: {str(e)}", exc_info=True)
+        raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
+
+
 @router.get("/{id}", response_model=SuppliersResponse)
 async def get_suppliers(
     id: int,
     fields: str = Query(None, description="Comma-separated list of fields to return"),
     current_user: UserResponse = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ):
     """Get a single suppliers by ID (user can only see their own records)"""
-    logger.debug(f"Fetching suppliers with id: {id}, fields={fields}")
+    logger.debug("Fetching suppliers with id: %s, fields=%s", id, fields)
     
     service = SuppliersService(db)
     try:
@@ -201,7 +251,7 @@ async def create_suppliers(
     db: AsyncSession = Depends(get_db),
 ):
     """Create a new suppliers"""
-    logger.debug(f"Creating new suppliers with data: {data}")
+    logger.debug("Creating new suppliers with data: %s", data)
     
     service = SuppliersService(db)
     try:
@@ -209,7 +259,7 @@ async def create_suppliers(
         if not result:
             raise HTTPException(status_code=400, detail="Failed to create suppliers")
         
-        logger.info(f"Suppliers created successfully with id: {result.id}")
+        logger.info("Suppliers created successfully with id: %s", result.id)
         return result
     except ValueError as e:
         logger.error(f"Validation error creating suppliers: {str(e)}")
@@ -226,7 +276,7 @@ async def create_supplierss_batch(
     db: AsyncSession = Depends(get_db),
 ):
     """Create multiple supplierss in a single request"""
-    logger.debug(f"Batch creating {len(request.items)} supplierss")
+    logger.debug("Batch creating %s supplierss", len(request.items))
     
     service = SuppliersService(db)
     results = []
@@ -237,7 +287,7 @@ async def create_supplierss_batch(
             if result:
                 results.append(result)
         
-        logger.info(f"Batch created {len(results)} supplierss successfully")
+        logger.info("Batch created %s supplierss successfully", len(results))
         return results
     except Exception as e:
         await db.rollback()
@@ -252,7 +302,7 @@ async def update_supplierss_batch(
     db: AsyncSession = Depends(get_db),
 ):
     """Update multiple supplierss in a single request (requires ownership)"""
-    logger.debug(f"Batch updating {len(request.items)} supplierss")
+    logger.debug("Batch updating %s supplierss", len(request.items))
     
     service = SuppliersService(db)
     results = []
@@ -265,7 +315,7 @@ async def update_supplierss_batch(
             if result:
                 results.append(result)
         
-        logger.info(f"Batch updated {len(results)} supplierss successfully")
+        logger.info("Batch updated %s supplierss successfully", len(results))
         return results
     except Exception as e:
         await db.rollback()
@@ -273,6 +323,28 @@ async def update_supplierss_batch(
         raise HTTPException(status_code=500, detail=f"Batch update failed: {str(e)}")
 
 
+@router.put("/upsert")
+async def upsert_supplierss(
+    request: SuppliersUpsertRequest,
+    current_user: UserResponse = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+):
+    """Insert or update multiple supplierss by supplier_code (fields an item does not send are left unchanged)"""
+    logger.debug("Upserting %s supplierss", len(request.items))
+
+    service = SuppliersService(db)
+    try:
+        items = [item.model_dump(include=item.model_fields_set) for item in request.items]
+        upserted_count = await service.upsert_batch(items, user_id=str(current_user.id))
+        logger.info("Upserted %s supplierss successfully", upserted_count)
+        return {"message": f"Successfully upserted {upserted_count} supplierss", "upserted_count": upserted_count}
+    except NotImplementedError as e:
+        raise HTTPException(status_code=501, detail=str(e))
+    except Exception as e:
+        logger.error(f"Error in upsert: {str(e)}", exc_info=True)
+        raise HTTPException(status_code=500, detail=f"Upsert failed: {str(e)}")
+
+
 @router.put("/{id}", response_model=SuppliersResponse)
 async def update_suppliers(
     id: int,
@@ -281,7 +353,7 @@ async def update_suppliers(
     db: AsyncSession = Depends(get_db),
 ):
     """Update an existing suppliers (requires ownership)"""
-    logger.debug(f"Updating suppliers {id} with data: {data}")
+    logger.debug("Updating suppliers %s with data: %s", id, data)
 
     service = SuppliersService(db)
     try:
@@ -292,7 +364,7 @@ async def update_suppliers(
             logger.warning(f"Suppliers with id {id} not found for update")
             raise HTTPException(status_code=404, detail="Suppliers not found")
         
-        logger.info(f"Suppliers {id} updated successfully")
+        logger.info("Suppliers %s updated successfully", id)
         return result
     except HTTPException:
         raise
@@ -311,7 +383,7 @@ async def delete_supplierss_batch(
     db: AsyncSession = Depends(get_db),
 ):
     """Delete multiple supplierss by their IDs (requires ownership)"""
-    logger.debug(f"Batch deleting {len(request.ids)} supplierss")
+    logger.debug("Batch deleting %s supplierss", len(request.ids))
     
     service = SuppliersService(db)
     deleted_count = 0
@@ -322,7 +394,7 @@ async def delete_supplierss_batch(
             if success:
                 deleted_count += 1
         
-        logger.info(f"Batch deleted {deleted_count} supplierss successfully")
+        logger.info("Batch deleted %s supplierss successfully", deleted_count)
         return {"message": f"Successfully deleted {deleted_count} supplierss", "deleted_count": deleted_count}
     except Exception as e:
         await db.rollback()
@@ -337,7 +409,7 @@ async def delete_suppliers(
     db: AsyncSession = Depends(get_db),
 ):
     """Delete a single suppliers by ID (requires ownership)"""
-    logger.debug(f"Deleting suppliers with id: {id}")
+    logger.debug("Deleting suppliers with id: %s", id)
     
     service = SuppliersService(db)
     try:
@@ -346,7 +418,7 @@ async def delete_suppliers(
             logger.warning(f"Suppliers with id {id} not found for deletion")
             raise HTTPException(status_code=404, detail="Suppliers not found")
         
-        logger.info(f"Suppliers {id} deleted successfully")
+        logger.info("Suppliers %s deleted successfully", id)
         return {"message": "Suppliers deleted successfully", "id": id}
     except HTTPException:
         raise
@@ -7,7 +7,9 @@ from fastapi import APIRouter, Body, Depends, HTTPException, Query
 from pydantic import BaseModel
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from core.database import get_db
+from core.change_feed import ChangeFeedExpired
+from core.database import get_db, get_read_db
+from core.statement_cache import InvalidFilter
 from services.tax_rates import Tax_ratesService
 
 # Set up logging
@@ -56,6 +58,21 @@ class Tax_ratesListResponse(BaseModel):
     limit: int
 
 
+class Tax_ratesChange(BaseModel):
+    """Change feed entry (data is the current row, None for deletes)"""
+    version: int
+    operation: str
+    id: int
+    data: Optional[Tax_ratesResponse] = None
+
+
+class Tax_ratesChangesResponse(BaseModel):
+    """Change feed response"""
+    changes: List[Tax_ratesChange]
+    next_since: int
+    has_more: bool
+
+
 class Tax_ratesBatchCreateRequest(BaseModel):
     """Batch create request"""
     items: List[Tax_ratesData]
@@ -85,10 +102,12 @@ async def query_tax_ratess(
     skip: int = Query(0, ge=0, description="Number of records to skip"),
     limit: int = Query(20, ge=1, le=2000, description="Max number of records to return"),
     fields: str = Query(None, description="Comma-separated list of fields to return"),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ):
     """Query tax_ratess with filtering, sorting, and pagination"""
-    logger.debug(f"Querying tax_ratess: query={query}, sort={sort}, skip={skip}, limit={limit}, fields={fields}")
+    logger.debug(
+        "Querying tax_ratess: query=%s, sort=%s, skip=%s, limit=%s, fields=%s", query, sort, skip, limit, fields
+    )
     
     service = Tax_ratesService(db)
     try:
@@ -106,10 +125,12 @@ async def query_tax_ratess(
             query_dict=query_dict,
             sort=sort,
         )
-        logger.debug(f"Found {result['total']} tax_ratess")
+        logger.debug("Found %s tax_ratess", result['total'])
         return result
     except HTTPException:
         raise
+    except InvalidFilter as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         logger.error(f"Error querying tax_ratess: {str(e)}", exc_info=True)
         raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
@@ -122,10 +143,12 @@ async def query_tax_ratess_all(
     skip: int = Query(0, ge=0, description="Number of records to skip"),
     limit: int = Query(20, ge=1, le=2000, description="Max number of records to return"),
     fields: str = Query(None, description="Comma-separated list of fields to return"),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ):
     # Query tax_ratess with filtering, sorting, and pagination without user limitation
-    logger.debug(f"Querying tax_ratess: query={query}, sort={sort}, skip={skip}, limit={limit}, fields={fields}")
+    logger.debug(
+        "Querying tax_ratess: query=%s, sort=%s, skip=%s, limit=%s, fields=%s", query, sort, skip, limit, fields
+    )
 
     service = Tax_ratesService(db)
     try:
@@ -143,23 +166,44 @@ async def query_tax_ratess_all(
             query_dict=query_dict,
             sort=sort
         )
-        logger.debug(f"Found {result['total']} tax_ratess")
+        logger.debug("Found %s tax_ratess", result['total'])
         return result
     except HTTPException:
         raise
+    except InvalidFilter as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         logger.error(f"Error querying tax_ratess: {str(e)}", exc_info=True)
         raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
 
 
+@router.get("/changes", response_model=Tax_ratesChangesResponse)
+async def get_tax_ratess_changes(
+    since: int = Query(None, ge=0, description="next_since of the previous response; omit to get the current version"),
+    limit: int = Query(500, ge=1, le=5000, description="Max number of changes to return"),
+    db: AsyncSession = Depends(get_read_db),
+):
+    """Inserts, updates and deletes of tax_ratess after version `since`, oldest first"""
+    logger.debug("Fetching tax_rates changes since %s, limit=%s", since, limit)
+
+    service = Tax_ratesService(db)
+    try:
+        return await service.get_changes(since, limit)
+    except ChangeFeedExpired as e:
+        raise HTTPException(status_code=410, detail=str(e))
+    except Exception as e:
+        logger.error(f"Error fetching tax_rates changes: {str(e)}", exc_info=True)
+        raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
+
+
 @router.get("/{id}", response_model=Tax_ratesResponse)
 async def get_tax_rates(
     id: int,
     fields: str = Query(None, description="Comma-separated list of fields to return"),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ):
     """Get a single tax_rates by ID"""
-    logger.debug(f"Fetching tax_rates with id: {id}, fields={fields}")
+    logger.debug("Fetching tax_rates with id: %s, fields=%s", id, fields)
     
     service = Tax_ratesService(db)
     try:
@@ -182,7 +226,7 @@ async def create_tax_rates(
     db: AsyncSession = Depends(get_db),
 ):
     """Create a new tax_rates"""
-    logger.debug(f"Creating new tax_rates with data: {data}")
+    logger.debug("Creating new tax_rates with data: %s", data)
     
     service = Tax_ratesService(db)
     try:
@@ -190,7 +234,7 @@ async def create_tax_rates(
         if not result:
             raise HTTPException(status_code=400, detail="Failed to create tax_rates")
         
-        logger.info(f"Tax_rates created successfully with id: {result.id}")
+        logger.info("Tax_rates created successfully with id: %s", result.id)
         return result
     except ValueError as e:
         logger.error(f"Validation error creating tax_rates: {str(e)}")
@@ -206,7 +250,7 @@ async def create_tax_ratess_batch(
     db: AsyncSession = Depends(get_db),
 ):
     """Create multiple tax_ratess in a single request"""
-    logger.debug(f"Batch creating {len(request.items)} tax_ratess")
+    logger.debug("Batch creating %s tax_ratess", len(request.items))
     
     service = Tax_ratesService(db)
     results = []
@@ -217,7 +261,7 @@ async def create_tax_ratess_batch(
             if result:
                 results.append(result)
         
-        logger.info(f"Batch created {len(results)} tax_ratess successfully")
+        logger.info("Batch created %s tax_ratess successfully", len(results))
         return results
     except Exception as e:
         await db.rollback()
@@ -231,7 +275,7 @@ async def update_tax_ratess_batch(
     db: AsyncSession = Depends(get_db),
 ):
     """Update multiple tax_ratess in a single request"""
-    logger.debug(f"Batch updating {len(request.items)} tax_ratess")
+    logger.debug("Batch updating %s tax_ratess", len(request.items))
     
     service = Tax_ratesService(db)
     results = []
@@ -244,7 +288,7 @@ async def update_tax_ratess_batch(
             if result:
                 results.append(result)
         
-        logger.info(f"Batch updated {len(results)} tax_ratess successfully")
+        logger.info("Batch updated %s tax_ratess successfully", len(results))
         return results
     except Exception as e:
         await db.rollback()
@@ -259,7 +303,7 @@ async def update_tax_rates(
     db: AsyncSession = Depends(get_db),
 ):
     """Update an existing tax_rates"""
-    logger.debug(f"Updating tax_rates {id} with data: {data}")
+    logger.debug("Updating tax_rates %s with data: %s", id, data)
 
     service = Tax_ratesService(db)
     try:
@@ -270,7 +314,7 @@ async def update_tax_rates(
             logger.warning(f"Tax_rates with id {id} not found for update")
             raise HTTPException(status_code=404, detail="Tax_rates not found")
         
-        logger.info(f"Tax_rates {id} updated successfully")
+        logger.info("Tax_rates %s updated successfully", id)
         return result
     except HTTPException:
         raise
@@ -288,7 +332,7 @@ async def delete_tax_ratess_batch(
     db: AsyncSession = Depends(get_db),
 ):
     """Delete multiple tax_ratess by their IDs"""
-    logger.debug(f"Batch deleting {len(request.ids)} tax_ratess")
+    logger.debug("Batch deleting %s tax_ratess", len(request.ids))
     
     service = Tax_ratesService(db)
     deleted_count = 0
@@ -299,7 +343,7 @@ async def delete_tax_ratess_batch(
             if success:
                 deleted_count += 1
         
-        logger.info(f"Batch deleted {deleted_count} tax_ratess successfully")
+        logger.info("Batch deleted %s tax_ratess successfully", deleted_count)
         return {"message": f"Successfully deleted {deleted_count} tax_ratess", "deleted_count": deleted_count}
     except Exception as e:
         await db.rollback()
@@ -313,7 +357,7 @@ async def delete_tax_rates(
     db: AsyncSession = Depends(get_db),
 ):
     """Delete a single tax_rates by ID"""
-    logger.debug(f"Deleting tax_rates with id: {id}")
+    logger.debug("Deleting tax_rates with id: %s", id)
     
     service = Tax_ratesService(db)
     try:
@@ -322,7 +366,7 @@ async def delete_tax_rates(
             logger.warning(f"Tax_rates with id {id} not found for deletion")
             raise HTTPException(status_code=404, detail="Tax_rates not found")
         
-        logger.info(f"Tax_rates {id} deleted successfully")
+        logger.info("Tax_rates %s deleted successfully", id)
         return {"message": "Tax_rates deleted successfully", "id": id}
     except HTTPException:
         raise
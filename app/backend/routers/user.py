@@ -1,6 +1,6 @@
 from typing import Optional
 
-from core.database import get_db
+from core.database import get_db, get_read_db
 from dependencies.auth import get_current_user
 from fastapi import APIRouter, Depends, HTTPException, status
 from models.auth import User
@@ -17,7 +17,7 @@ class UpdateProfileRequest(BaseModel):
 
 
 @router.get("/profile", response_model=UserResponse)
-async def get_profile(db: AsyncSession = Depends(get_db), current_user: User = Depends(get_current_user)):
+async def get_profile(db: AsyncSession = Depends(get_read_db), current_user: User = Depends(get_current_user)):
     """Get current user profile"""
     profile = await UserService.get_user_profile(db, current_user.id)
     if not profile:
@@ -38,8 +38,18 @@ class ObjectInfo(OSSBaseModel):
     etag: str = ""
 
 
+class ObjectListRequest(OSSBaseModel):
+    """Request for one page of a bucket listing."""
+
+    prefix: str = Field(default="", description="Only list objects whose key starts with this prefix")
+    continuation_token: str = Field(default="", description="Token returned by the previous page")
+    page_size: int = Field(default=1000, ge=1, le=1000, description="Max number of objects per page")
+
+
 class ObjectListResponse(BaseModel):
     objects: list[ObjectInfo] = []
+    next_continuation_token: str = ""
+    is_truncated: bool = False
 
 
 class BucketInfo(BucketRequest):
@@ -97,3 +107,17 @@ class RenameResponse(BaseModel):
 
 class DeleteResponse(BaseModel):
     success: bool = False
+
+
+class PresignedUrlCacheStats(BaseModel):
+    """Counters for the presigned download URL cache."""
+
+    enabled: bool = True
+    size: int = 0
+    max_entries: int = 0
+    margin_seconds: int = 0
+    hits: int = 0
+    misses: int = 0
+    invalidations: int = 0
+    upstream_calls: int = 0
+    hit_ratio: float = 0.0
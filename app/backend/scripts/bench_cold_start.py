@@ -0,0 +1,139 @@
+"""
+Cold Start Benchmark
+Measures Lambda cold-start cost with `python -X importtime`, comparing eager router
+discovery against LAZY_ROUTERS mode.
+
+Each run starts a fresh interpreter that imports `lambda_handler` and serves one
+API Gateway v2 event, which is what a cold Lambda container does:
+
+    python scripts/bench_cold_start.py --runs 5 --path /api/v1/entities/products
+    python scripts/bench_cold_start.py --json cold_start.json
+"""
+import argparse
+import json
+import logging
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+CHILD_CODE = """
+import json, sys, time
+start = time.perf_counter()
+import lambda_handler
+event = {
+    "version": "2.0",
+    "rawPath": sys.argv[1],
+    "requestContext": {"http": {"method": "GET", "path": sys.argv[1], "sourceIp": "127.0.0.1"}},
+    "headers": {"host": "localhost"},
+    "isBase64Encoded": False,
+}
+response = lambda_handler.lambda_handler(event, None)
+print(json.dumps({
+    "wall_ms": (time.perf_counter() - start) * 1000,
+    "cold_start_ms": lambda_handler.cold_start_ms,
+    "status": response.get("statusCode"),
+    "modules": len(sys.modules),
+}))
+"""
+
+
+def parse_importtime(stderr: str):
+    """Parse `-X importtime` output into (total_self_us, {top_level_module: cumulative_us})."""
+    total_self_us = 0
+    top_level = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "imported package" in line:
+            continue
+        try:
+            self_us, cumulative_us, name = line[len("import time:") :].split("|", 2)
+            total_self_us += int(self_us)
+        except ValueError:
+            continue
+        # Nested imports are indented; only keep modules imported directly by the app
+        if not name.startswith("  ", 1):
+            top_level[name.strip()] = top_level.get(name.strip(), 0) + int(cumulative_us)
+    return total_self_us, top_level
+
+
+def run_once(path: str, lazy: bool, database_url: str) -> dict:
+    env = dict(os.environ)
+    env.update(
+        {
+            "IS_LAMBDA": "true",
+            "LAZY_ROUTERS": "true" if lazy else "false",
+            "DATABASE_URL": database_url,
+            "LOG_LEVEL": "WARNING",
+        }
+    )
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", CHILD_CODE, path],
+        cwd=BACKEND_DIR,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=False,
+    )
+    if proc.returncode != 0 or not proc.stdout.strip():
+        raise RuntimeError(f"Benchmark child failed ({proc.returncode}):\n{proc.stderr[-2000:]}")
+    result = json.loads(proc.stdout.strip().splitlines()[-1])
+    total_self_us, top_level = parse_importtime(proc.stderr)
+    result["import_ms"] = total_self_us / 1000
+    result["top_imports"] = sorted(top_level.items(), key=lambda item: item[1], reverse=True)
+    return result
+
+
+def summarize(runs: list) -> dict:
+    def median(key):
+        values = [run[key] for run in runs if run.get(key) is not None]
+        return round(statistics.median(values), 1) if values else None
+
+    return {
+        "runs": len(runs),
+        "wall_ms_p50": median("wall_ms"),
+        "cold_start_ms_p50": median("cold_start_ms"),
+        "import_ms_p50": median("import_ms"),
+        "modules": runs[-1]["modules"],
+        "status": runs[-1]["status"],
+        "top_imports_ms": [(name, round(us / 1000, 1)) for name, us in runs[-1]["top_imports"][:15]],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5, help="Fresh interpreters per mode")
+    parser.add_argument("--path", default="/api/v1/entities/products", help="Request path served after import")
+    parser.add_argument("--json", dest="json_path", help="Write the results to this file")
+    args = parser.parse_args()
+
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        database_url = f"sqlite+aiosqlite:///{tmp}/bench.db"
+        for mode, lazy in (("eager", False), ("lazy", True)):
+            runs = [run_once(args.path, lazy, database_url) for _ in range(args.runs)]
+            results[mode] = summarize(runs)
+            logger.info(
+                "%s: cold start p50 %.1fms, imports %.1fms, %d modules",
+                mode,
+                results[mode]["cold_start_ms_p50"] or 0,
+                results[mode]["import_ms_p50"] or 0,
+                results[mode]["modules"],
+            )
+            for name, ms in results[mode]["top_imports_ms"]:
+                logger.info("    %8.1fms  %s", ms, name)
+
+    if args.json_path:
+        Path(args.json_path).write_text(json.dumps(results, indent=2) + "\n", encoding="utf-8")
+        logger.info("Results written to %s", args.json_path)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,140 @@
+"""
+SQLite Concurrent Checkout Benchmark
+Simulates POS checkouts (one sales row plus its sale_items) from many concurrent
+clients against a SQLite file and compares:
+
+- baseline: default journal mode, concurrent sessions (SQLITE_PRODUCTION_MODE=false)
+- tuned:    WAL + pragmas, request sessions serialized by the writer lock
+- queue:    WAL + pragmas, checkouts submitted to the group-committing writer queue
+
+    python scripts/bench_sqlite_checkouts.py --checkouts 2000 --concurrency 50 --items 5
+"""
+import argparse
+import json
+import logging
+import os
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+CHILD_CODE = """
+import asyncio, json, logging, random, sys, time
+from datetime import datetime, timezone
+logging.disable(logging.CRITICAL)
+from core.database import db_manager
+from models.sale_items import Sale_items
+from models.sales import Sales
+from services.database import initialize_database
+
+mode, checkouts, concurrency, items = sys.argv[1], int(sys.argv[2]), int(sys.argv[3]), int(sys.argv[4])
+
+async def write_checkout(session):
+    sale = Sales(user_id="bench", sale_date=datetime.now(timezone.utc), total_amount=0.0, cashier_name="bench")
+    session.add(sale)
+    await session.flush()
+    total = 0.0
+    for _ in range(items):
+        price = round(random.uniform(0.5, 50), 2)
+        total += price
+        session.add(Sale_items(user_id="bench", sale_id=sale.id, product_id=1, product_name="item", quantity=1, price=price))
+    sale.total_amount = round(total, 2)
+    return sale.id
+
+async def checkout():
+    if mode == "queue":
+        return await db_manager.sqlite_writer.submit(write_checkout)
+    async with db_manager.async_session_maker() as session:
+        sale_id = await write_checkout(session)
+        await session.commit()
+        return sale_id
+
+async def main():
+    await initialize_database()
+    latencies, errors = [], 0
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one():
+        nonlocal errors
+        async with semaphore:
+            start = time.perf_counter()
+            try:
+                await checkout()
+                latencies.append((time.perf_counter() - start) * 1000)
+            except Exception:
+                errors += 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one() for _ in range(checkouts)))
+    elapsed = time.perf_counter() - start
+    await db_manager.close_db()
+    latencies.sort()
+    pick = lambda p: latencies[min(len(latencies) - 1, int(p / 100 * len(latencies)))] if latencies else None
+    print(json.dumps({
+        "checkouts_per_s": round(len(latencies) / elapsed, 1),
+        "p50_ms": pick(50),
+        "p99_ms": pick(99),
+        "errors": errors,
+    }))
+
+asyncio.run(main())
+"""
+
+MODES = {
+    "baseline": "false",
+    "tuned": "true",
+    "queue": "true",
+}
+
+
+def run_mode(mode: str, database_url: str, args) -> dict:
+    env = dict(os.environ)
+    env.update({"DATABASE_URL": database_url, "SQLITE_PRODUCTION_MODE": MODES[mode]})
+    proc = subprocess.run(
+        [sys.executable, "-c", CHILD_CODE, mode, str(args.checkouts), str(args.concurrency), str(args.items)],
+        cwd=BACKEND_DIR,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=False,
+    )
+    if proc.returncode != 0 or not proc.stdout.strip():
+        raise RuntimeError(f"Benchmark child failed ({proc.returncode}):\n{proc.stderr[-2000:]}")
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--checkouts", type=int, default=1000)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--items", type=int, default=5, help="sale_items rows per checkout")
+    parser.add_argument("--json", dest="json_path", help="Write the results to this file")
+    args = parser.parse_args()
+
+    results = {}
+    for mode in MODES:
+        # Fresh file per mode so journal mode and table size do not carry over
+        with tempfile.TemporaryDirectory() as tmp:
+            results[mode] = run_mode(mode, f"sqlite+aiosqlite:///{tmp}/checkouts.db", args)
+        logger.info(
+            "%-8s %8.1f checkouts/s  p50 %sms  p99 %sms  errors %d",
+            mode,
+            results[mode]["checkouts_per_s"],
+            round(results[mode]["p50_ms"] or 0, 2),
+            round(results[mode]["p99_ms"] or 0, 2),
+            results[mode]["errors"],
+        )
+
+    if args.json_path:
+        Path(args.json_path).write_text(json.dumps(results, indent=2) + "\n", encoding="utf-8")
+        logger.info("Results written to %s", args.json_path)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
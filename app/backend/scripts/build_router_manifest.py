@@ -0,0 +1,84 @@
+"""
+Router Manifest Builder
+Scans the routers package and writes routers/manifest.json for LAZY_ROUTERS mode.
+
+The modules are parsed, not imported, so building the manifest never pulls in the
+heavy dependencies the lazy mode is meant to avoid. Re-run after adding a router:
+
+    python scripts/build_router_manifest.py
+"""
+import ast
+import json
+import logging
+import sys
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+ROUTERS_DIR = BACKEND_DIR / "routers"
+MANIFEST_PATH = ROUTERS_DIR / "manifest.json"
+ROUTER_ATTRS = ("router", "admin_router")
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def _router_prefix(call: ast.expr):
+    """Return the literal prefix of an `APIRouter(...)` call, or None if it is not one."""
+    if not isinstance(call, ast.Call):
+        return None
+    func_name = getattr(call.func, "id", None) or getattr(call.func, "attr", None)
+    if func_name != "APIRouter":
+        return None
+    for keyword in call.keywords:
+        if keyword.arg == "prefix" and isinstance(keyword.value, ast.Constant):
+            return keyword.value.value
+    return ""
+
+
+def scan_module(path: Path):
+    """Collect router attributes and prefixes declared at module level."""
+    tree = ast.parse(path.read_text(encoding="utf-8"), filename=str(path))
+    attrs, prefixes = [], []
+    for node in tree.body:
+        if not isinstance(node, ast.Assign):
+            continue
+        for target in node.targets:
+            if not isinstance(target, ast.Name) or target.id not in ROUTER_ATTRS:
+                continue
+            values = node.value.elts if isinstance(node.value, (ast.List, ast.Tuple)) else [node.value]
+            for value in values:
+                prefix = _router_prefix(value)
+                if prefix is None:
+                    continue
+                if not prefix:
+                    logger.warning("%s.%s has no literal prefix; it cannot be mounted lazily", path.stem, target.id)
+                    return None
+                if target.id not in attrs:
+                    attrs.append(target.id)
+                if prefix not in prefixes:
+                    prefixes.append(prefix)
+    if not attrs:
+        return None
+    return {"module": f"routers.{path.stem}", "attrs": attrs, "prefixes": prefixes}
+
+
+def build_manifest() -> dict:
+    entries = []
+    for path in sorted(ROUTERS_DIR.glob("*.py")):
+        if path.name == "__init__.py":
+            continue
+        entry = scan_module(path)
+        if entry:
+            entries.append(entry)
+    return {"routers": entries}
+
+
+def main():
+    manifest = build_manifest()
+    MANIFEST_PATH.write_text(json.dumps(manifest, indent=2) + "\n", encoding="utf-8")
+    logger.info("Wrote %d router entries to %s", len(manifest["routers"]), MANIFEST_PATH)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,136 @@
+"""
+Partition Management
+Monthly range partitioning of sales, sale_items, journal_details and audit_logs on
+PostgreSQL (see core/partitioning.py):
+
+    python scripts/manage_partitions.py status
+    python scripts/manage_partitions.py convert       # rebuild plain tables as partitioned tables
+    python scripts/manage_partitions.py maintain      # create the coming months' partitions
+    python scripts/manage_partitions.py archive --older-than-months 24 [--dir archive] [--dry-run]
+
+`convert` locks each table while its rows are copied, so run it in a maintenance window.
+`archive` writes every monthly partition that ended more than --older-than-months ago to
+<dir>/<table>/<partition>.csv.gz, then detaches and drops it.
+
+On SQLite there is nothing to partition: every command logs that and exits without
+changes.
+"""
+import argparse
+import asyncio
+import logging
+import sys
+from datetime import datetime, timezone
+from pathlib import Path
+
+# Add parent directory to path to import from core
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from core.config import settings  # noqa: E402
+from core.database import db_manager  # noqa: E402
+from core.partitioning import (  # noqa: E402
+    PARTITIONED_TABLES,
+    add_months,
+    archive_partition,
+    convert_to_partitioned,
+    is_partitioned,
+    maintain_partitions,
+    month_start,
+    monthly_partitions,
+    partition_name,
+    supports_partitioning,
+)
+from services.database import load_models  # noqa: E402
+from sqlalchemy import text  # noqa: E402
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+async def status(engine) -> int:
+    async with engine.connect() as conn:
+        for spec in PARTITIONED_TABLES:
+            if not await is_partitioned(conn, spec.table):
+                logger.info("%-16s not partitioned", spec.table)
+                continue
+            months = await monthly_partitions(conn, spec.table)
+            in_default = (await conn.execute(text(f"SELECT count(*) FROM {spec.table}_default"))).scalar()
+            logger.info(
+                "%-16s %d monthly partitions (%s to %s), %d rows in the default partition", spec.table, len(months),
+                f"{months[0]:%Y-%m}" if months else "-", f"{months[-1]:%Y-%m}" if months else "-", in_default,
+            )
+    return 0
+
+
+async def convert(engine, today) -> int:
+    for spec in PARTITIONED_TABLES:
+        async with engine.begin() as conn:
+            if await is_partitioned(conn, spec.table):
+                logger.info("%s is already partitioned", spec.table)
+                continue
+            await convert_to_partitioned(conn, spec, today, settings.partition_months_ahead)
+    return 0
+
+
+async def archive(engine, today, older_than_months: int, archive_dir: Path, dry_run: bool) -> int:
+    cutoff = add_months(month_start(today), -older_than_months)
+    failures = 0
+    for spec in PARTITIONED_TABLES:
+        async with engine.connect() as conn:
+            if not await is_partitioned(conn, spec.table):
+                continue
+            months = [month for month in await monthly_partitions(conn, spec.table) if month < cutoff]
+        for month in months:
+            if dry_run:
+                logger.info("Would archive %s", partition_name(spec.table, month))
+                continue
+            try:
+                async with engine.begin() as conn:
+                    await archive_partition(conn, spec, month, archive_dir)
+            except Exception as e:
+                failures += 1
+                logger.error(f"Failed to archive {partition_name(spec.table, month)}: {e}")
+    return 1 if failures else 0
+
+
+async def run(args) -> int:
+    load_models()
+    await db_manager.init_db()
+    try:
+        engine = db_manager.engine
+        if not supports_partitioning(engine):
+            logger.info("Table partitioning needs PostgreSQL; %s tables stay as they are", engine.dialect.name)
+            return 0
+        today = datetime.now(timezone.utc).date()
+        if args.command == "status":
+            return await status(engine)
+        if args.command == "convert":
+            return await convert(engine, today)
+        if args.command == "maintain":
+            created = await maintain_partitions(engine, today, settings.partition_months_ahead)
+            for table, names in created.items():
+                logger.info("%s: created %s", table, ", ".join(names))
+            return 0
+        return await archive(engine, today, args.older_than_months, Path(args.dir), args.dry_run)
+    finally:
+        await db_manager.close_db()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("status", help="Show the partitions of each table")
+    commands.add_parser("convert", help="Rebuild plain tables as partitioned tables")
+    commands.add_parser("maintain", help="Create the partitions of the coming months")
+    archive_parser = commands.add_parser("archive", help="Move old monthly partitions to compressed files")
+    archive_parser.add_argument("--older-than-months", type=int, required=True,
+                                help="Archive months that ended more than this many months ago")
+    archive_parser.add_argument("--dir", default=settings.partition_archive_dir, help="Archive directory")
+    archive_parser.add_argument("--dry-run", action="store_true", help="Only list the partitions to archive")
+    args = parser.parse_args()
+    if args.command == "archive" and args.older_than_months < 1:
+        parser.error("--older-than-months must be at least 1")
+    return asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,61 @@
+"""
+Schema Repair Tool
+Compares every existing table with the ORM models in a single catalogue query and
+adds missing columns. Runs as a dry run unless --apply is given:
+
+    python scripts/repair_schema.py                 # report drift only
+    python scripts/repair_schema.py --apply         # execute the ALTER TABLE statements
+    python scripts/repair_schema.py --json report.json
+"""
+import argparse
+import asyncio
+import json
+import logging
+import sys
+from pathlib import Path
+
+# Add parent directory to path to import from core
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from core.database import db_manager  # noqa: E402
+from services.database import load_models  # noqa: E402
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+async def run(apply: bool) -> dict:
+    load_models()
+    await db_manager.init_db()
+    try:
+        return await db_manager.check_and_repair_existing_tables(dry_run=not apply)
+    finally:
+        await db_manager.close_db()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--apply", action="store_true", help="Execute the repair statements")
+    parser.add_argument("--json", dest="json_path", help="Write the drift report to this file")
+    args = parser.parse_args()
+
+    report = asyncio.run(run(args.apply))
+
+    if not report:
+        logger.info("No schema drift detected")
+    for table_name, drift in report.items():
+        logger.info("%s: missing %s", table_name, ", ".join(drift["missing_columns"]))
+        for statement in drift["statements"]:
+            print(f"{statement};")
+    if report and not args.apply:
+        logger.info("Dry run: %d table(s) need repair; re-run with --apply to execute", len(report))
+
+    if args.json_path:
+        Path(args.json_path).write_text(json.dumps(report, indent=2) + "\n", encoding="utf-8")
+        logger.info("Report written to %s", args.json_path)
+    # Non-zero exit on drift in dry-run mode so CI can flag it
+    return 1 if report and not args.apply else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
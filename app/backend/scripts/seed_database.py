@@ -1,453 +1,617 @@
 """
-Database Seeding Script
-Automatically populates the database with sample data for testing and demo purposes.
+Synthetic Dataset Generator
+Populates the database with a reproducible retail dataset (stores, cashiers, products,
+customers, payment methods, sales, sale lines and receipts) for demos and performance
+testing.
+
+The size is driven by stores x days x sales per store-day x basket size, e.g. about 50M
+sale lines:
+
+    python scripts/seed_database.py --stores 50 --days 365 --sales-per-day 600 --basket 4 --workers 8
+
+Daily volume follows weekday, annual and holiday seasonality with a per-store size
+factor; within a day sales peak around lunch and after work, and products are picked
+with a long-tail popularity. Every (store, day) draws from its own RNG seeded from
+--seed, so the dataset is identical for any worker count or chunk size.
+
+Rows are written in chunks of about --chunk-lines sale lines. On PostgreSQL each worker
+process generates a chunk and loads it with COPY on its own connection; on SQLite the
+workers generate and the parent writes with executemany (SQLite has a single writer).
+Only columns defined on the ORM models are written, and the generated tables are
+cleared first.
 """
+import argparse
 import asyncio
 import logging
-from datetime import datetime, timedelta
+import math
+import os
 import random
-from pathlib import Path
+import sqlite3
 import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta, timezone
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
 
 # Add parent directory to path to import from core
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
-from core.database import get_db
-from sqlalchemy.ext.asyncio import AsyncSession
+from core.config import settings
+from core.database import Base
 from sqlalchemy import text
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession
 
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Columns written per table, in row-tuple order; checked against the models before loading
+COLUMNS: Dict[str, Tuple[str, ...]] = {
+    "payment_methods": ("id", "name", "type", "is_active", "created_at"),
+    "locations": ("id", "location_code", "name", "address", "phone", "manager_name", "is_active", "created_at"),
+    "employees": (
+        "id", "user_id", "employee_code", "name", "email", "phone", "role", "department", "hire_date", "salary",
+        "status", "created_at",
+    ),
+    "products": ("id", "name", "category", "quantity", "cost_price", "sell_price", "low_stock_threshold"),
+    "customers": (
+        "id", "user_id", "customer_code", "name", "email", "phone", "address", "loyalty_points", "total_purchases",
+        "last_purchase_date", "created_at",
+    ),
+    "sales": ("id", "user_id", "sale_date", "total_amount", "cashier_name"),
+    "sale_items": ("user_id", "sale_id", "product_id", "product_name", "quantity", "price", "created_at"),
+    "receipts": (
+        "user_id", "receipt_number", "sale_id", "customer_id", "total_amount", "payment_method", "cashier_name",
+        "receipt_date", "created_at",
+    ),
+    "suppliers": (
+        "id", "user_id", "supplier_code", "name", "contact_person", "email", "phone", "address", "payment_terms",
+        "status", "created_at",
+    ),
+    "purchase_orders": (
+        "id", "user_id", "po_number", "supplier_id", "supplier_name", "order_date", "expected_delivery",
+        "total_amount", "status", "created_by", "created_at",
+    ),
+    "purchase_order_items": (
+        "user_id", "po_id", "product_id", "product_name", "quantity", "unit_price", "total_price",
+        "received_quantity", "created_at",
+    ),
+}
+DIMENSION_TABLES = ("payment_methods", "locations", "employees", "products", "customers")
+FACT_TABLES = ("sales", "sale_items", "receipts")
+# Only written by the demo reset, which also seeds suppliers and their purchase orders
+PROCUREMENT_TABLES = ("suppliers", "purchase_orders", "purchase_order_items")
+# Everything the demo reset clears, children first; rows in any of these may point at the regenerated ones
+DEMO_CLEAR_TABLES = (
+    "sale_items", "sales", "receipts", "return_items", "returns", "purchase_order_items", "purchase_orders",
+    "stock_adjustments", "journal_details", "journal_entries", "shifts", "ai_alerts", "sales_forecasts",
+    "profit_predictions", "cash_flow_predictions", "daily_summaries", "notifications", "audit_logs", "products",
+    "customers", "employees", "suppliers", "accounts", "tax_rates", "locations", "payment_methods",
+)
 
-async def clear_all_data(db: AsyncSession):
-    """Clear all existing data from tables"""
-    logger.info("Clearing existing data...")
-    
-    tables = [
-        'sale_items', 'sales', 'receipts', 'return_items', 'returns',
-        'purchase_order_items', 'purchase_orders', 'stock_adjustments',
-        'journal_details', 'journal_entries', 'shifts',
-        'ai_alerts', 'sales_forecasts', 'profit_predictions', 'cash_flow_predictions',
-        'daily_summaries', 'notifications', 'audit_logs',
-        'products', 'customers', 'employees', 'suppliers',
-        'accounts', 'tax_rates', 'locations', 'payment_methods'
-    ]
-    
-    for table in tables:
-        try:
-            await db.execute(text(f"DELETE FROM {table}"))
-        except Exception as e:
-            logger.warning(f"Could not clear table {table}: {e}")
-    
-    await db.commit()
-    logger.info("Data cleared successfully")
-
-
-async def seed_payment_methods(db: AsyncSession, user_id: str):
-    """Seed payment methods"""
-    logger.info("Seeding payment methods...")
-    
-    payment_methods = [
-        {'name': 'Cash', 'type': 'Cash', 'is_active': True},
-        {'name': 'Credit Card', 'type': 'Card', 'is_active': True},
-        {'name': 'Debit Card', 'type': 'Card', 'is_active': True},
-        {'name': 'Mobile Payment', 'type': 'Mobile', 'is_active': True},
-    ]
-    
-    for pm in payment_methods:
-        await db.execute(text("""
-            INSERT INTO payment_methods (user_id, name, type, is_active, created_at)
-            VALUES (:user_id, :name, :type, :is_active, :created_at)
-        """), {
-            'user_id': user_id,
-            'name': pm['name'],
-            'type': pm['type'],
-            'is_active': pm['is_active'],
-            'created_at': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-        })
-    
-    await db.commit()
-    logger.info(f"Seeded {len(payment_methods)} payment methods")
-
-
-async def seed_products(db: AsyncSession, user_id: str):
-    """Seed products"""
-    logger.info("Seeding products...")
-    
-    products = [
-        {'sku': 'PROD-001', 'name': 'Fresh Milk 1L', 'category': 'Dairy', 'cost_price': 1.50, 'sell_price': 2.99, 'quantity': 150, 'low_stock_threshold': 20},
-        {'sku': 'PROD-002', 'name': 'Whole Wheat Bread', 'category': 'Bakery', 'cost_price': 1.20, 'sell_price': 2.49, 'quantity': 80, 'low_stock_threshold': 15},
-        {'sku': 'PROD-003', 'name': 'Organic Eggs (12)', 'category': 'Dairy', 'cost_price': 3.00, 'sell_price': 5.99, 'quantity': 60, 'low_stock_threshold': 10},
-        {'sku': 'PROD-004', 'name': 'Bananas (1kg)', 'category': 'Fruits', 'cost_price': 1.00, 'sell_price': 1.99, 'quantity': 200, 'low_stock_threshold': 30},
-        {'sku': 'PROD-005', 'name': 'Tomatoes (1kg)', 'category': 'Vegetables', 'cost_price': 1.50, 'sell_price': 2.99, 'quantity': 120, 'low_stock_threshold': 20},
-        {'sku': 'PROD-006', 'name': 'Chicken Breast (1kg)', 'category': 'Meat', 'cost_price': 5.00, 'sell_price': 9.99, 'quantity': 45, 'low_stock_threshold': 10},
-        {'sku': 'PROD-007', 'name': 'Rice (5kg)', 'category': 'Grains', 'cost_price': 8.00, 'sell_price': 14.99, 'quantity': 90, 'low_stock_threshold': 15},
-        {'sku': 'PROD-008', 'name': 'Olive Oil (1L)', 'category': 'Cooking', 'cost_price': 6.00, 'sell_price': 11.99, 'quantity': 70, 'low_stock_threshold': 10},
-        {'sku': 'PROD-009', 'name': 'Orange Juice (1L)', 'category': 'Beverages', 'cost_price': 2.00, 'sell_price': 3.99, 'quantity': 100, 'low_stock_threshold': 20},
-        {'sku': 'PROD-010', 'name': 'Coffee Beans (500g)', 'category': 'Beverages', 'cost_price': 7.00, 'sell_price': 12.99, 'quantity': 55, 'low_stock_threshold': 10},
-        {'sku': 'PROD-011', 'name': 'Pasta (500g)', 'category': 'Grains', 'cost_price': 1.50, 'sell_price': 2.99, 'quantity': 130, 'low_stock_threshold': 25},
-        {'sku': 'PROD-012', 'name': 'Cheddar Cheese (200g)', 'category': 'Dairy', 'cost_price': 3.00, 'sell_price': 5.99, 'quantity': 65, 'low_stock_threshold': 15},
-        {'sku': 'PROD-013', 'name': 'Apples (1kg)', 'category': 'Fruits', 'cost_price': 1.80, 'sell_price': 3.49, 'quantity': 180, 'low_stock_threshold': 30},
-        {'sku': 'PROD-014', 'name': 'Potatoes (2kg)', 'category': 'Vegetables', 'cost_price': 2.00, 'sell_price': 3.99, 'quantity': 150, 'low_stock_threshold': 25},
-        {'sku': 'PROD-015', 'name': 'Salmon Fillet (500g)', 'category': 'Seafood', 'cost_price': 8.00, 'sell_price': 15.99, 'quantity': 30, 'low_stock_threshold': 8},
-        {'sku': 'PROD-016', 'name': 'Yogurt (500g)', 'category': 'Dairy', 'cost_price': 2.00, 'sell_price': 3.99, 'quantity': 95, 'low_stock_threshold': 20},
-        {'sku': 'PROD-017', 'name': 'Carrots (1kg)', 'category': 'Vegetables', 'cost_price': 1.20, 'sell_price': 2.49, 'quantity': 140, 'low_stock_threshold': 25},
-        {'sku': 'PROD-018', 'name': 'Honey (500g)', 'category': 'Condiments', 'cost_price': 5.00, 'sell_price': 9.99, 'quantity': 50, 'low_stock_threshold': 10},
-        {'sku': 'PROD-019', 'name': 'Green Tea (100 bags)', 'category': 'Beverages', 'cost_price': 4.00, 'sell_price': 7.99, 'quantity': 75, 'low_stock_threshold': 15},
-        {'sku': 'PROD-020', 'name': 'Chocolate Bar', 'category': 'Snacks', 'cost_price': 1.00, 'sell_price': 1.99, 'quantity': 200, 'low_stock_threshold': 40},
-        {'sku': 'PROD-021', 'name': 'Mineral Water (1.5L)', 'category': 'Beverages', 'cost_price': 0.50, 'sell_price': 1.29, 'quantity': 250, 'low_stock_threshold': 50},
-        {'sku': 'PROD-022', 'name': 'Butter (250g)', 'category': 'Dairy', 'cost_price': 2.50, 'sell_price': 4.99, 'quantity': 70, 'low_stock_threshold': 15},
-        {'sku': 'PROD-023', 'name': 'Onions (1kg)', 'category': 'Vegetables', 'cost_price': 1.00, 'sell_price': 1.99, 'quantity': 160, 'low_stock_threshold': 30},
-        {'sku': 'PROD-024', 'name': 'Beef Steak (500g)', 'category': 'Meat', 'cost_price': 7.00, 'sell_price': 13.99, 'quantity': 40, 'low_stock_threshold': 10},
-        {'sku': 'PROD-025', 'name': 'Soy Sauce (500ml)', 'category': 'Condiments', 'cost_price': 2.00, 'sell_price': 3.99, 'quantity': 85, 'low_stock_threshold': 15},
-        {'sku': 'PROD-026', 'name': 'Cereal (500g)', 'category': 'Breakfast', 'cost_price': 3.00, 'sell_price': 5.99, 'quantity': 90, 'low_stock_threshold': 20},
-        {'sku': 'PROD-027', 'name': 'Peanut Butter (400g)', 'category': 'Spreads', 'cost_price': 3.50, 'sell_price': 6.99, 'quantity': 60, 'low_stock_threshold': 12},
-        {'sku': 'PROD-028', 'name': 'Strawberries (500g)', 'category': 'Fruits', 'cost_price': 3.00, 'sell_price': 5.99, 'quantity': 45, 'low_stock_threshold': 10},
-        {'sku': 'PROD-029', 'name': 'Ice Cream (1L)', 'category': 'Frozen', 'cost_price': 4.00, 'sell_price': 7.99, 'quantity': 55, 'low_stock_threshold': 12},
-        {'sku': 'PROD-030', 'name': 'Frozen Pizza', 'category': 'Frozen', 'cost_price': 3.50, 'sell_price': 6.99, 'quantity': 65, 'low_stock_threshold': 15},
-    ]
-    
-    for product in products:
-        await db.execute(text("""
-            INSERT INTO products (user_id, sku, name, category, cost_price, sell_price, quantity, low_stock_threshold, created_at)
-            VALUES (:user_id, :sku, :name, :category, :cost_price, :sell_price, :quantity, :low_stock_threshold, :created_at)
-        """), {
-            'user_id': user_id,
-            **product,
-            'created_at': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-        })
-    
-    await db.commit()
-    logger.info(f"Seeded {len(products)} products")
-
-
-async def seed_customers(db: AsyncSession, user_id: str):
-    """Seed customers"""
-    logger.info("Seeding customers...")
-    
-    customers = [
-        {'customer_code': 'CUST-001', 'name': 'John Smith', 'email': 'john.smith@email.com', 'phone': '+1-555-0101', 'address': '123 Main St, City', 'membership_tier': 'Gold', 'loyalty_points': 850, 'total_purchases': 2500.00, 'status': 'Active'},
-        {'customer_code': 'CUST-002', 'name': 'Sarah Johnson', 'email': 'sarah.j@email.com', 'phone': '+1-555-0102', 'address': '456 Oak Ave, Town', 'membership_tier': 'Platinum', 'loyalty_points': 1200, 'total_purchases': 4200.00, 'status': 'Active'},
-        {'customer_code': 'CUST-003', 'name': 'Michael Brown', 'email': 'mbrown@email.com', 'phone': '+1-555-0103', 'address': '789 Pine Rd, Village', 'membership_tier': 'Silver', 'loyalty_points': 450, 'total_purchases': 1200.00, 'status': 'Active'},
-        {'customer_code': 'CUST-004', 'name': 'Emily Davis', 'email': 'emily.d@email.com', 'phone': '+1-555-0104', 'address': '321 Elm St, City', 'membership_tier': 'Bronze', 'loyalty_points': 180, 'total_purchases': 550.00, 'status': 'Active'},
-        {'customer_code': 'CUST-005', 'name': 'David Wilson', 'email': 'dwilson@email.com', 'phone': '+1-555-0105', 'address': '654 Maple Dr, Town', 'membership_tier': 'Gold', 'loyalty_points': 720, 'total_purchases': 2100.00, 'status': 'Active'},
-        {'customer_code': 'CUST-006', 'name': 'Lisa Anderson', 'email': 'lisa.a@email.com', 'phone': '+1-555-0106', 'address': '987 Cedar Ln, Village', 'membership_tier': 'Silver', 'loyalty_points': 380, 'total_purchases': 980.00, 'status': 'Active'},
-        {'customer_code': 'CUST-007', 'name': 'Robert Taylor', 'email': 'rtaylor@email.com', 'phone': '+1-555-0107', 'address': '147 Birch St, City', 'membership_tier': 'Bronze', 'loyalty_points': 120, 'total_purchases': 350.00, 'status': 'Active'},
-        {'customer_code': 'CUST-008', 'name': 'Jennifer Martinez', 'email': 'jmartinez@email.com', 'phone': '+1-555-0108', 'address': '258 Spruce Ave, Town', 'membership_tier': 'Platinum', 'loyalty_points': 1500, 'total_purchases': 5200.00, 'status': 'Active'},
-        {'customer_code': 'CUST-009', 'name': 'William Garcia', 'email': 'wgarcia@email.com', 'phone': '+1-555-0109', 'address': '369 Willow Rd, Village', 'membership_tier': 'Gold', 'loyalty_points': 650, 'total_purchases': 1900.00, 'status': 'Active'},
-        {'customer_code': 'CUST-010', 'name': 'Mary Rodriguez', 'email': 'mrodriguez@email.com', 'phone': '+1-555-0110', 'address': '741 Ash Dr, City', 'membership_tier': 'Silver', 'loyalty_points': 420, 'total_purchases': 1150.00, 'status': 'Active'},
-        {'customer_code': 'CUST-011', 'name': 'James Lee', 'email': 'jlee@email.com', 'phone': '+1-555-0111', 'address': '852 Poplar Ln, Town', 'membership_tier': 'Bronze', 'loyalty_points': 95, 'total_purchases': 280.00, 'status': 'Active'},
-        {'customer_code': 'CUST-012', 'name': 'Patricia White', 'email': 'pwhite@email.com', 'phone': '+1-555-0112', 'address': '963 Hickory St, Village', 'membership_tier': 'Gold', 'loyalty_points': 890, 'total_purchases': 2800.00, 'status': 'Active'},
-        {'customer_code': 'CUST-013', 'name': 'Christopher Harris', 'email': 'charris@email.com', 'phone': '+1-555-0113', 'address': '159 Walnut Ave, City', 'membership_tier': 'Silver', 'loyalty_points': 340, 'total_purchases': 890.00, 'status': 'Active'},
-        {'customer_code': 'CUST-014', 'name': 'Linda Clark', 'email': 'lclark@email.com', 'phone': '+1-555-0114', 'address': '357 Chestnut Rd, Town', 'membership_tier': 'Bronze', 'loyalty_points': 150, 'total_purchases': 420.00, 'status': 'Active'},
-        {'customer_code': 'CUST-015', 'name': 'Daniel Lewis', 'email': 'dlewis@email.com', 'phone': '+1-555-0115', 'address': '486 Sycamore Dr, Village', 'membership_tier': 'Platinum', 'loyalty_points': 1350, 'total_purchases': 4800.00, 'status': 'Active'},
-    ]
-    
-    for customer in customers:
-        await db.execute(text("""
-            INSERT INTO customers (user_id, customer_code, name, email, phone, address, membership_tier, loyalty_points, total_purchases, status, created_at)
-            VALUES (:user_id, :customer_code, :name, :email, :phone, :address, :membership_tier, :loyalty_points, :total_purchases, :status, :created_at)
-        """), {
-            'user_id': user_id,
-            **customer,
-            'created_at': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-        })
-    
-    await db.commit()
-    logger.info(f"Seeded {len(customers)} customers")
-
-
-async def seed_employees(db: AsyncSession, user_id: str):
-    """Seed employees"""
-    logger.info("Seeding employees...")
-    
-    employees = [
-        {'employee_code': 'EMP-001', 'name': 'Alice Cooper', 'email': 'alice.c@company.com', 'phone': '+1-555-0201', 'position': 'Store Manager', 'department': 'Management', 'hire_date': '2020-01-15 00:00:00', 'salary': 55000, 'status': 'Active'},
-        {'employee_code': 'EMP-002', 'name': 'Bob Turner', 'email': 'bob.t@company.com', 'phone': '+1-555-0202', 'position': 'Assistant Manager', 'department': 'Management', 'hire_date': '2020-06-01 00:00:00', 'salary': 45000, 'status': 'Active'},
-        {'employee_code': 'EMP-003', 'name': 'Carol King', 'email': 'carol.k@company.com', 'phone': '+1-555-0203', 'position': 'Cashier', 'department': 'Sales', 'hire_date': '2021-03-10 00:00:00', 'salary': 28000, 'status': 'Active'},
-        {'employee_code': 'EMP-004', 'name': 'David Miller', 'email': 'david.m@company.com', 'phone': '+1-555-0204', 'position': 'Cashier', 'department': 'Sales', 'hire_date': '2021-07-20 00:00:00', 'salary': 28000, 'status': 'Active'},
-        {'employee_code': 'EMP-005', 'name': 'Emma Scott', 'email': 'emma.s@company.com', 'phone': '+1-555-0205', 'position': 'Stock Clerk', 'department': 'Inventory', 'hire_date': '2022-01-05 00:00:00', 'salary': 26000, 'status': 'Active'},
-        {'employee_code': 'EMP-006', 'name': 'Frank Adams', 'email': 'frank.a@company.com', 'phone': '+1-555-0206', 'position': 'Stock Clerk', 'department': 'Inventory', 'hire_date': '2022-04-12 00:00:00', 'salary': 26000, 'status': 'Active'},
-        {'employee_code': 'EMP-007', 'name': 'Grace Nelson', 'email': 'grace.n@company.com', 'phone': '+1-555-0207', 'position': 'Accountant', 'department': 'Finance', 'hire_date': '2020-09-01 00:00:00', 'salary': 48000, 'status': 'Active'},
-        {'employee_code': 'EMP-008', 'name': 'Henry Baker', 'email': 'henry.b@company.com', 'phone': '+1-555-0208', 'position': 'Security Guard', 'department': 'Security', 'hire_date': '2021-11-15 00:00:00', 'salary': 32000, 'status': 'Active'},
-        {'employee_code': 'EMP-009', 'name': 'Iris Carter', 'email': 'iris.c@company.com', 'phone': '+1-555-0209', 'position': 'Cashier', 'department': 'Sales', 'hire_date': '2023-02-01 00:00:00', 'salary': 28000, 'status': 'Active'},
-        {'employee_code': 'EMP-010', 'name': 'Jack Phillips', 'email': 'jack.p@company.com', 'phone': '+1-555-0210', 'position': 'Delivery Driver', 'department': 'Logistics', 'hire_date': '2022-08-20 00:00:00', 'salary': 35000, 'status': 'Active'},
-    ]
-    
-    for employee in employees:
-        await db.execute(text("""
-            INSERT INTO employees (user_id, employee_code, name, email, phone, position, department, hire_date, salary, status, created_at)
-            VALUES (:user_id, :employee_code, :name, :email, :phone, :position, :department, :hire_date, :salary, :status, :created_at)
-        """), {
-            'user_id': user_id,
-            **employee,
-            'created_at': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-        })
-    
-    await db.commit()
-    logger.info(f"Seeded {len(employees)} employees")
-
-
-async def seed_suppliers(db: AsyncSession, user_id: str):
-    """Seed suppliers"""
-    logger.info("Seeding suppliers...")
-    
-    suppliers = [
-        {'supplier_code': 'SUP-001', 'name': 'Fresh Farms Co.', 'contact_person': 'Tom Green', 'email': 'tom@freshfarms.com', 'phone': '+1-555-0301', 'address': '100 Farm Road, Countryside', 'payment_terms': 'Net 30', 'status': 'Active'},
-        {'supplier_code': 'SUP-002', 'name': 'Dairy Delights Inc.', 'contact_person': 'Mary White', 'email': 'mary@dairydelights.com', 'phone': '+1-555-0302', 'address': '200 Milk Lane, Dairy Town', 'payment_terms': 'Net 30', 'status': 'Active'},
-        {'supplier_code': 'SUP-003', 'name': 'Meat Masters Ltd.', 'contact_person': 'John Butcher', 'email': 'john@meatmasters.com', 'phone': '+1-555-0303', 'address': '300 Butcher Street, Meat City', 'payment_terms': 'Net 15', 'status': 'Active'},
-        {'supplier_code': 'SUP-004', 'name': 'Beverage Bros.', 'contact_person': 'Sam Drinks', 'email': 'sam@beveragebros.com', 'phone': '+1-555-0304', 'address': '400 Drink Avenue, Beverage Town', 'payment_terms': 'Net 30', 'status': 'Active'},
-        {'supplier_code': 'SUP-005', 'name': 'Grain Growers Co-op', 'contact_person': 'Lisa Fields', 'email': 'lisa@graingrowers.com', 'phone': '+1-555-0305', 'address': '500 Grain Road, Harvest Valley', 'payment_terms': 'Net 45', 'status': 'Active'},
-        {'supplier_code': 'SUP-006', 'name': 'Seafood Specialists', 'contact_person': 'Mike Ocean', 'email': 'mike@seafoodspec.com', 'phone': '+1-555-0306', 'address': '600 Harbor Drive, Coastal City', 'payment_terms': 'Net 15', 'status': 'Active'},
-        {'supplier_code': 'SUP-007', 'name': 'Bakery Supplies Inc.', 'contact_person': 'Betty Baker', 'email': 'betty@bakerysupplies.com', 'phone': '+1-555-0307', 'address': '700 Flour Street, Bakery Town', 'payment_terms': 'Net 30', 'status': 'Active'},
-        {'supplier_code': 'SUP-008', 'name': 'Frozen Foods Warehouse', 'contact_person': 'Frank Freeze', 'email': 'frank@frozenfoods.com', 'phone': '+1-555-0308', 'address': '800 Cold Storage Rd, Freezer City', 'payment_terms': 'Net 30', 'status': 'Active'},
+CATALOG = (
+    ("Fresh Milk 1L", "Dairy", 1.50, 2.99), ("Whole Wheat Bread", "Bakery", 1.20, 2.49),
+    ("Organic Eggs (12)", "Dairy", 3.00, 5.99), ("Bananas (1kg)", "Fruits", 1.00, 1.99),
+    ("Tomatoes (1kg)", "Vegetables", 1.50, 2.99), ("Chicken Breast (1kg)", "Meat", 5.00, 9.99),
+    ("Rice (5kg)", "Grains", 8.00, 14.99), ("Olive Oil (1L)", "Cooking", 6.00, 11.99),
+    ("Orange Juice (1L)", "Beverages", 2.00, 3.99), ("Coffee Beans (500g)", "Beverages", 7.00, 12.99),
+    ("Pasta (500g)", "Grains", 1.50, 2.99), ("Cheddar Cheese (200g)", "Dairy", 3.00, 5.99),
+    ("Apples (1kg)", "Fruits", 1.80, 3.49), ("Potatoes (2kg)", "Vegetables", 2.00, 3.99),
+    ("Salmon Fillet (500g)", "Seafood", 8.00, 15.99), ("Yogurt (500g)", "Dairy", 2.00, 3.99),
+    ("Carrots (1kg)", "Vegetables", 1.20, 2.49), ("Honey (500g)", "Condiments", 5.00, 9.99),
+    ("Green Tea (100 bags)", "Beverages", 4.00, 7.99), ("Chocolate Bar", "Snacks", 1.00, 1.99),
+    ("Mineral Water (1.5L)", "Beverages", 0.50, 1.29), ("Butter (250g)", "Dairy", 2.50, 4.99),
+    ("Onions (1kg)", "Vegetables", 1.00, 1.99), ("Beef Steak (500g)", "Meat", 7.00, 13.99),
+    ("Soy Sauce (500ml)", "Condiments", 2.00, 3.99), ("Cereal (500g)", "Breakfast", 3.00, 5.99),
+    ("Peanut Butter (400g)", "Spreads", 3.50, 6.99), ("Strawberries (500g)", "Fruits", 3.00, 5.99),
+    ("Ice Cream (1L)", "Frozen", 4.00, 7.99), ("Frozen Pizza", "Frozen", 3.50, 6.99),
+)
+PAYMENT_METHODS = (("Cash", "Cash", 0.35), ("Credit Card", "Card", 0.30), ("Debit Card", "Card", 0.20),
+                   ("Mobile Payment", "Mobile", 0.15))
+FIRST_NAMES = ("Alice", "Bob", "Carol", "David", "Emma", "Frank", "Grace", "Henry", "Iris", "Jack", "Karen", "Leo",
+               "Maria", "Nina", "Oscar", "Paul", "Quinn", "Rosa", "Sam", "Tina")
+LAST_NAMES = ("Cooper", "King", "Miller", "Carter", "Brown", "Davis", "Evans", "Garcia", "Hughes", "Jones", "Lopez",
+              "Moore", "Nguyen", "Patel", "Reed", "Smith", "Turner", "Walker", "Young", "Zhang")
+SUPPLIERS = (
+    ("Fresh Farms Co.", "Net 30"), ("Dairy Delights Inc.", "Net 30"), ("Meat Masters Ltd.", "Net 15"),
+    ("Beverage Bros.", "Net 30"), ("Grain Growers Co-op", "Net 45"), ("Seafood Specialists", "Net 15"),
+    ("Bakery Supplies Inc.", "Net 30"), ("Frozen Foods Warehouse", "Net 30"),
+)
+STREETS = ("Main St", "Oak Ave", "Pine Rd", "Elm St", "Market St", "Lake Dr", "Hill Rd", "Park Ave")
+
+# Monday..Sunday
+WEEKDAY_FACTOR = (0.85, 0.88, 0.93, 1.0, 1.18, 1.38, 1.12)
+# Opening hours 7:00-22:00 with lunch and after-work peaks
+HOUR_WEIGHTS = {7: 2, 8: 4, 9: 5, 10: 6, 11: 8, 12: 10, 13: 9, 14: 6, 15: 6, 16: 8, 17: 11, 18: 12, 19: 10, 20: 7,
+                21: 4}
+QUANTITY_WEIGHTS = ((1, 0.72), (2, 0.18), (3, 0.07), (4, 0.03))
+TAX_RATE = 0.15
+LOYALTY_SHARE = 0.6
+
+
+@dataclass(frozen=True)
+class DatasetConfig:
+    stores: int = 5
+    days: int = 90
+    skus: int = 2000
+    customers: int = 5000
+    cashiers_per_store: int = 6
+    sales_per_day: float = 300.0  # Per store on an average day, before seasonality and store size
+    basket: float = 4.0  # Mean lines per sale
+    start: Optional[date] = None  # First day; defaults to `days` days before today
+    seed: int = 42
+    user_id: str = "system"
+
+    @property
+    def first_day(self) -> date:
+        return self.start or date.today() - timedelta(days=self.days)
+
+
+# Small dataset used by the "reset demo data" endpoint
+DEMO_CONFIG = DatasetConfig(stores=1, days=30, skus=30, customers=15, cashiers_per_store=4, sales_per_day=2,
+                            basket=3)
+
+
+def check_columns() -> None:
+    """Fail fast if a generated column is missing from the models."""
+    import services.database
+
+    services.database.load_models()
+    for table_name, columns in COLUMNS.items():
+        missing = set(columns) - set(Base.metadata.tables[table_name].columns.keys())
+        if missing:
+            raise RuntimeError(f"{table_name} has no column(s) {', '.join(sorted(missing))}")
+
+
+def _unit_rng(config: DatasetConfig, unit: int, stream: int) -> random.Random:
+    # Separate streams for planning the day's sale count and for generating its sales
+    return random.Random((config.seed * 1_000_003 + unit) * 2 + stream)
+
+
+def _store_factors(config: DatasetConfig) -> List[float]:
+    rng = random.Random(config.seed)
+    return [rng.lognormvariate(0, 0.35) for _ in range(config.stores)]
+
+
+def day_factor(day: date) -> float:
+    """Relative sales volume of a calendar day (weekday, annual cycle and holiday peaks)."""
+    factor = WEEKDAY_FACTOR[day.weekday()]
+    # Gentle annual wave peaking in late December, lowest in late June
+    factor *= 1 + 0.12 * math.cos(2 * math.pi * (day.timetuple().tm_yday - 358) / 365)
+    if day.month == 12 and 15 <= day.day <= 24:
+        factor *= 1.45
+    elif day.month == 12 and day.day in (25, 26) or day.month == 1 and day.day == 1:
+        factor *= 0.3
+    elif day.month == 11 and day.weekday() == 4 and 23 <= day.day <= 29:
+        factor *= 1.8  # Black Friday
+    return factor
+
+
+def plan_sale_counts(config: DatasetConfig) -> List[int]:
+    """Number of sales per (store, day) unit; unit = store * days + day_index."""
+    store_factors = _store_factors(config)
+    day_factors = [day_factor(config.first_day + timedelta(days=i)) for i in range(config.days)]
+    counts = []
+    for store in range(config.stores):
+        for day_index in range(config.days):
+            rng = _unit_rng(config, store * config.days + day_index, 0)
+            mean = config.sales_per_day * store_factors[store] * day_factors[day_index]
+            counts.append(max(0, round(rng.gauss(mean, mean * 0.08))))
+    return counts
+
+
+def plan_chunks(counts: List[int], basket: float, chunk_lines: int) -> List[Tuple[int, int, int]]:
+    """Group consecutive units into (first_unit, end_unit, first_sale_id) chunks of ~chunk_lines lines."""
+    chunks = []
+    first_unit, first_sale_id, sale_id, lines = 0, 1, 1, 0.0
+    for unit, count in enumerate(counts):
+        sale_id += count
+        lines += count * basket
+        if lines >= chunk_lines:
+            chunks.append((first_unit, unit + 1, first_sale_id))
+            first_unit, first_sale_id, lines = unit + 1, sale_id, 0.0
+    if first_unit < len(counts):
+        chunks.append((first_unit, len(counts), first_sale_id))
+    return chunks
+
+
+def _person(rng: random.Random) -> str:
+    return f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}"
+
+
+def _phone(rng: random.Random) -> str:
+    return f"555-{rng.randrange(1000):03d}-{rng.randrange(10000):04d}"
+
+
+def _address(rng: random.Random) -> str:
+    return f"{rng.randint(1, 999)} {rng.choice(STREETS)}"
+
+
+def product_catalog(config: DatasetConfig) -> List[Tuple[int, str, str, int, float, float, int]]:
+    rng = random.Random(config.seed + 1)
+    products = []
+    for i in range(config.skus):
+        name, category, cost, price = CATALOG[i % len(CATALOG)]
+        variant = i // len(CATALOG)
+        if variant:
+            name = f"{name} #{variant + 1}"
+            jitter = rng.uniform(0.8, 1.25)
+            cost, price = round(cost * jitter, 2), round(price * jitter, 2)
+        threshold = rng.choice((5, 10, 15, 20, 25, 30))
+        products.append((i + 1, name, category, rng.randint(threshold, threshold * 10), cost, price, threshold))
+    return products
+
+
+def cashier_names(config: DatasetConfig) -> List[List[str]]:
+    rng = random.Random(config.seed + 2)
+    return [
+        [f"{_person(rng)} (S{store + 1:03d})" for _ in range(config.cashiers_per_store)]
+        for store in range(config.stores)
     ]
-    
-    for supplier in suppliers:
-        await db.execute(text("""
-            INSERT INTO suppliers (user_id, supplier_code, name, contact_person, email, phone, address, payment_terms, status, created_at)
-            VALUES (:user_id, :supplier_code, :name, :contact_person, :email, :phone, :address, :payment_terms, :status, :created_at)
-        """), {
-            'user_id': user_id,
-            **supplier,
-            'created_at': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-        })
-    
-    await db.commit()
-    logger.info(f"Seeded {len(suppliers)} suppliers")
-
-
-async def seed_sales_transactions(db: AsyncSession, user_id: str):
-    """Seed sample sales transactions"""
-    logger.info("Seeding sales transactions...")
-    
-    # Get product IDs
-    result = await db.execute(text("SELECT id, sell_price FROM products LIMIT 30"))
-    products = result.fetchall()
-    
-    # Get customer IDs
-    result = await db.execute(text("SELECT id FROM customers LIMIT 15"))
-    customers = result.fetchall()
-    
-    if not products or not customers:
-        logger.warning("No products or customers found, skipping sales seeding")
-        return
-    
-    payment_methods = ['Cash', 'Credit Card', 'Debit Card', 'Mobile Payment']
-    
-    # Create 50 sales transactions over the last 30 days
-    num_sales = 50
-    for i in range(num_sales):
-        # Random date in last 30 days
-        days_ago = random.randint(0, 30)
-        sale_date = datetime.now() - timedelta(days=days_ago)
-        sale_datetime = sale_date.strftime('%Y-%m-%d %H:%M:%S')
-        
-        # Random customer (80% chance) or walk-in
-        customer_id = random.choice(customers)[0] if random.random() < 0.8 else None
-        
-        # Random payment method
-        payment_method = random.choice(payment_methods)
-        
-        # Random number of items (1-5)
-        num_items = random.randint(1, 5)
-        selected_products = random.sample(products, min(num_items, len(products)))
-        
-        # Calculate total
-        subtotal = 0
-        for product in selected_products:
-            quantity = random.randint(1, 3)
-            subtotal += product[1] * quantity
-        
-        tax_amount = subtotal * 0.15
-        total_amount = subtotal + tax_amount
-        
-        # Create sale
-        result = await db.execute(text("""
-            INSERT INTO sales (user_id, sale_date, total_amount, cashier_name, customer_id, payment_method, tax_amount, created_at)
-            VALUES (:user_id, :sale_date, :total_amount, :cashier_name, :customer_id, :payment_method, :tax_amount, :created_at)
-            RETURNING id
-        """), {
-            'user_id': user_id,
-            'sale_date': sale_datetime,
-            'total_amount': total_amount,
-            'cashier_name': random.choice(['Alice Cooper', 'Carol King', 'David Miller', 'Iris Carter']),
-            'customer_id': customer_id,
-            'payment_method': payment_method,
-            'tax_amount': tax_amount,
-            'created_at': sale_datetime
-        })
-        sale_id = result.fetchone()[0]
-        
-        # Create sale items
-        for product in selected_products:
-            quantity = random.randint(1, 3)
-            price = product[1]
-            total_price = price * quantity
-            
-            # Get product name
-            prod_result = await db.execute(text("SELECT name FROM products WHERE id = :id"), {'id': product[0]})
-            product_name = prod_result.fetchone()[0]
-            
-            await db.execute(text("""
-                INSERT INTO sale_items (user_id, sale_id, product_id, product_name, quantity, price, total_price, created_at)
-                VALUES (:user_id, :sale_id, :product_id, :product_name, :quantity, :price, :total_price, :created_at)
-            """), {
-                'user_id': user_id,
-                'sale_id': sale_id,
-                'product_id': product[0],
-                'product_name': product_name,
-                'quantity': quantity,
-                'price': price,
-                'total_price': total_price,
-                'created_at': sale_datetime
-            })
-        
-        # Create receipt
-        receipt_number = f"RCP-{int(sale_date.timestamp())}-{i}"
-        await db.execute(text("""
-            INSERT INTO receipts (user_id, receipt_number, sale_id, customer_id, total_amount, payment_method, cashier_name, receipt_date, created_at)
-            VALUES (:user_id, :receipt_number, :sale_id, :customer_id, :total_amount, :payment_method, :cashier_name, :receipt_date, :created_at)
-        """), {
-            'user_id': user_id,
-            'receipt_number': receipt_number,
-            'sale_id': sale_id,
-            'customer_id': customer_id,
-            'total_amount': total_amount,
-            'payment_method': payment_method,
-            'cashier_name': random.choice(['Alice Cooper', 'Carol King', 'David Miller', 'Iris Carter']),
-            'receipt_date': sale_datetime,
-            'created_at': sale_datetime
-        })
-    
-    await db.commit()
-    logger.info(f"Seeded {num_sales} sales transactions")
-
-
-async def seed_purchase_orders(db: AsyncSession, user_id: str):
-    """Seed sample purchase orders"""
-    logger.info("Seeding purchase orders...")
-    
-    # Get supplier IDs
-    result = await db.execute(text("SELECT id, name FROM suppliers LIMIT 8"))
-    suppliers = result.fetchall()
-    
-    # Get product IDs
-    result = await db.execute(text("SELECT id, name, cost_price FROM products LIMIT 30"))
-    products = result.fetchall()
-    
-    if not suppliers or not products:
-        logger.warning("No suppliers or products found, skipping purchase orders seeding")
-        return
-    
-    # Create 15 purchase orders over the last 60 days
-    num_pos = 15
-    for i in range(num_pos):
-        days_ago = random.randint(0, 60)
-        order_date = datetime.now() - timedelta(days=days_ago)
-        expected_delivery = order_date + timedelta(days=random.randint(7, 21))
-        
-        order_datetime = order_date.strftime('%Y-%m-%d %H:%M:%S')
-        delivery_datetime = expected_delivery.strftime('%Y-%m-%d %H:%M:%S')
-        
-        # Random supplier
-        supplier = random.choice(suppliers)
-        
-        # Random number of items (2-6)
-        num_items = random.randint(2, 6)
-        selected_products = random.sample(products, min(num_items, len(products)))
-        
-        # Calculate total
-        total_amount = 0
-        for product in selected_products:
-            quantity = random.randint(20, 100)
-            total_amount += product[2] * quantity
-        
-        # Determine status
+
+
+def dimension_rows(config: DatasetConfig) -> Dict[str, List[tuple]]:
+    rng = random.Random(config.seed + 3)
+    created_at = datetime.combine(config.first_day, datetime.min.time()).strftime("%Y-%m-%d %H:%M:%S")
+    rows: Dict[str, List[tuple]] = {
+        "payment_methods": [
+            (i + 1, name, kind, True, created_at) for i, (name, kind, _) in enumerate(PAYMENT_METHODS)
+        ],
+        "locations": [],
+        "employees": [],
+        "products": product_catalog(config),
+        "customers": [],
+    }
+    names = cashier_names(config)
+    for store in range(config.stores):
+        code = f"S{store + 1:03d}"
+        rows["locations"].append(
+            (store + 1, code, f"Store {code}", _address(rng), _phone(rng), names[store][0], True, created_at)
+        )
+        for i, cashier in enumerate(names[store]):
+            employee_id = store * config.cashiers_per_store + i + 1
+            hire_date = (config.first_day - timedelta(days=rng.randint(30, 2000))).isoformat()
+            rows["employees"].append((
+                employee_id, config.user_id, f"EMP-{employee_id:06d}", cashier,
+                f"emp{employee_id}@example.com", _phone(rng), "Manager" if i == 0 else "Cashier", code, hire_date,
+                float(rng.randrange(28000, 65000, 500)), "active", created_at,
+            ))
+    for i in range(config.customers):
+        customer_id = i + 1
+        rows["customers"].append((
+            customer_id, config.user_id, f"CUST-{customer_id:07d}", _person(rng),
+            f"customer{customer_id}@example.com", _phone(rng), _address(rng), 0, 0.0, None, created_at,
+        ))
+    return rows
+
+
+def procurement_rows(config: DatasetConfig, purchase_orders: int = 15) -> Dict[str, List[tuple]]:
+    """Suppliers and purchase orders of the last 60 days for the products of `config`."""
+    rng = random.Random(config.seed + 4)
+    created_at = datetime.combine(config.first_day, datetime.min.time()).strftime("%Y-%m-%d %H:%M:%S")
+    rows: Dict[str, List[tuple]] = {table_name: [] for table_name in PROCUREMENT_TABLES}
+    for i, (name, terms) in enumerate(SUPPLIERS):
+        supplier_id = i + 1
+        rows["suppliers"].append((
+            supplier_id, config.user_id, f"SUP-{supplier_id:03d}", name, _person(rng),
+            f"orders@supplier{supplier_id}.example.com", _phone(rng), _address(rng), terms, "Active", created_at,
+        ))
+    products = product_catalog(config)
+    today = datetime.combine(date.today(), datetime.min.time())
+    for i in range(purchase_orders):
+        po_id = i + 1
+        days_ago = rng.randint(0, 60)
+        order_date = today - timedelta(days=days_ago, seconds=rng.randrange(8 * 3600, 18 * 3600))
         if days_ago > 30:
-            status = 'Received'
+            status = "Received"
         elif days_ago > 15:
-            status = random.choice(['Received', 'Pending'])
+            status = rng.choice(("Received", "Pending"))
         else:
-            status = 'Pending'
-        
-        # Create purchase order
-        po_number = f"PO-{int(order_date.timestamp())}-{i}"
-        result = await db.execute(text("""
-            INSERT INTO purchase_orders (user_id, po_number, supplier_id, supplier_name, order_date, expected_delivery, total_amount, status, created_by, created_at)
-            VALUES (:user_id, :po_number, :supplier_id, :supplier_name, :order_date, :expected_delivery, :total_amount, :status, :created_by, :created_at)
-            RETURNING id
-        """), {
-            'user_id': user_id,
-            'po_number': po_number,
-            'supplier_id': supplier[0],
-            'supplier_name': supplier[1],
-            'order_date': order_datetime,
-            'expected_delivery': delivery_datetime,
-            'total_amount': total_amount,
-            'status': status,
-            'created_by': 'Alice Cooper',
-            'created_at': order_datetime
-        })
-        po_id = result.fetchone()[0]
-        
-        # Create purchase order items
-        for product in selected_products:
-            quantity = random.randint(20, 100)
-            unit_price = product[2]
-            total_price = unit_price * quantity
-            received_quantity = quantity if status == 'Received' else 0
-            
-            await db.execute(text("""
-                INSERT INTO purchase_order_items (user_id, po_id, product_id, product_name, quantity, unit_price, total_price, received_quantity, created_at)
-                VALUES (:user_id, :po_id, :product_id, :product_name, :quantity, :unit_price, :total_price, :received_quantity, :created_at)
-            """), {
-                'user_id': user_id,
-                'po_id': po_id,
-                'product_id': product[0],
-                'product_name': product[1],
-                'quantity': quantity,
-                'unit_price': unit_price,
-                'total_price': total_price,
-                'received_quantity': received_quantity,
-                'created_at': order_datetime
-            })
-    
+            status = "Pending"
+        ordered = order_date.strftime("%Y-%m-%d %H:%M:%S")
+        total = 0.0
+        for product_id, product_name, _, _, cost, _, _ in rng.sample(products, min(rng.randint(2, 6), len(products))):
+            quantity = rng.randint(20, 100)
+            total += cost * quantity
+            rows["purchase_order_items"].append((
+                config.user_id, po_id, product_id, product_name, quantity, cost, round(cost * quantity, 2),
+                quantity if status == "Received" else 0, ordered,
+            ))
+        supplier_id, _, _, supplier_name = rows["suppliers"][rng.randrange(len(SUPPLIERS))][:4]
+        expected = (order_date + timedelta(days=rng.randint(7, 21))).strftime("%Y-%m-%d %H:%M:%S")
+        rows["purchase_orders"].append((
+            po_id, config.user_id, f"PO-{po_id:06d}", supplier_id, supplier_name, ordered, expected,
+            round(total, 2), status, "system", ordered,
+        ))
+    return rows
+
+
+class ChunkGenerator:
+    """Generates the sales, sale_items and receipts rows of a range of (store, day) units."""
+
+    def __init__(self, config: DatasetConfig):
+        self.config = config
+        self.counts = plan_sale_counts(config)
+        self.products = [(product[0], product[1], product[5]) for product in product_catalog(config)]
+        self.cashiers = cashier_names(config)
+        # Long-tail popularity: weight of the k-th most popular product ~ 1 / k^0.9, ranks shuffled
+        ranks = list(range(1, config.skus + 1))
+        random.Random(config.seed + 4).shuffle(ranks)
+        total, self.product_weights = 0.0, []
+        for rank in ranks:
+            total += 1 / rank ** 0.9
+            self.product_weights.append(total)
+        self.hours = list(HOUR_WEIGHTS)
+        self.hour_weights = list(HOUR_WEIGHTS.values())
+        self.payment_names = [name for name, _, _ in PAYMENT_METHODS]
+        self.payment_weights = [share for _, _, share in PAYMENT_METHODS]
+        self.quantities = [quantity for quantity, _ in QUANTITY_WEIGHTS]
+        self.quantity_weights = [share for _, share in QUANTITY_WEIGHTS]
+
+    def generate(self, first_unit: int, end_unit: int, first_sale_id: int) -> Dict[str, List[tuple]]:
+        config = self.config
+        user_id = config.user_id
+        products, product_weights = self.products, self.product_weights
+        # floor(Exponential(rate)) is geometric with mean 1 / (e^rate - 1) = basket - 1
+        extra_lines_rate = math.log(1 + 1 / (config.basket - 1)) if config.basket > 1 else None
+        sales, items, receipts = [], [], []
+        sale_id = first_sale_id
+        for unit in range(first_unit, end_unit):
+            store, day_index = divmod(unit, config.days)
+            rng = _unit_rng(config, unit, 1)
+            count = self.counts[unit]
+            day = config.first_day + timedelta(days=day_index)
+            day_start = datetime.combine(day, datetime.min.time(), tzinfo=timezone.utc)
+            day_text = day.isoformat()
+            hours = rng.choices(self.hours, self.hour_weights, k=count)
+            payments = rng.choices(self.payment_names, self.payment_weights, k=count)
+            cashiers = self.cashiers[store]
+            offsets = sorted(hour * 3600 + rng.randrange(3600) for hour in hours)
+            for seconds, payment in zip(offsets, payments):
+                sale_date = day_start + timedelta(seconds=seconds)
+                cashier = rng.choice(cashiers)
+                lines = 1 + min(int(rng.expovariate(extra_lines_rate)), 60) if extra_lines_rate else 1
+                subtotal = 0.0
+                picked = rng.choices(products, cum_weights=product_weights, k=lines)
+                quantities = rng.choices(self.quantities, self.quantity_weights, k=lines)
+                for (product_id, product_name, price), quantity in zip(picked, quantities):
+                    items.append((user_id, sale_id, product_id, product_name, quantity, price, sale_date))
+                    subtotal += price * quantity
+                total = round(subtotal * (1 + TAX_RATE), 2)
+                sales.append((sale_id, user_id, sale_date, total, cashier))
+                if config.customers and rng.random() < LOYALTY_SHARE:
+                    customer_id = rng.randint(1, config.customers)
+                else:
+                    customer_id = None
+                minutes, second = divmod(seconds, 60)
+                stamp = f"{day_text} {minutes // 60:02d}:{minutes % 60:02d}:{second:02d}"
+                receipts.append(
+                    (user_id, f"RCP-{sale_id:010d}", sale_id, customer_id, total, payment, cashier, stamp, stamp)
+                )
+                sale_id += 1
+        return {"sales": sales, "sale_items": items, "receipts": receipts}
+
+
+async def clear_tables(db: AsyncSession, tables=DIMENSION_TABLES + FACT_TABLES) -> None:
+    for table in tables:
+        await db.execute(text(f"DELETE FROM {table}"))
+    await db.commit()
+
+
+def _sequence_reset(table_name: str) -> str:
+    """Explicit ids were written; move the table's serial sequence past them (PostgreSQL)."""
+    return (
+        f"SELECT setval(pg_get_serial_sequence('{table_name}', 'id'), "
+        f"COALESCE((SELECT MAX(id) FROM {table_name}), 0) + 1, false)"
+    )
+
+
+async def seed_session(db: AsyncSession, config: DatasetConfig = DEMO_CONFIG) -> Dict[str, int]:
+    """Replace the demo data through an application session; meant for small datasets.
+
+    Clears every table in DEMO_CLEAR_TABLES, then writes the generated tables and a
+    handful of suppliers and purchase orders.
+    """
+    check_columns()
+    await clear_tables(db, [table for table in DEMO_CLEAR_TABLES if table in Base.metadata.tables])
+    generator = ChunkGenerator(config)
+    rows = dimension_rows(config)
+    rows.update(generator.generate(0, len(generator.counts), 1))
+    rows.update(procurement_rows(config))
+    for table_name in DIMENSION_TABLES + FACT_TABLES + PROCUREMENT_TABLES:
+        columns = COLUMNS[table_name]
+        if rows[table_name]:
+            await db.execute(
+                Base.metadata.tables[table_name].insert(), [dict(zip(columns, row)) for row in rows[table_name]]
+            )
+    if db.get_bind().dialect.name == "postgresql":
+        for table_name in DIMENSION_TABLES + FACT_TABLES + PROCUREMENT_TABLES:
+            await db.execute(text(_sequence_reset(table_name)))
     await db.commit()
-    logger.info(f"Seeded {num_pos} purchase orders")
-
-
-async def main():
-    """Main seeding function"""
-    logger.info("Starting database seeding...")
-    
-    # Use a system user ID for seeding
-    user_id = "system"
-    
-    async for db in get_db():
-        try:
-            # Clear existing data
-            await clear_all_data(db)
-            
-            # Seed data in order
-            await seed_payment_methods(db, user_id)
-            await seed_products(db, user_id)
-            await seed_customers(db, user_id)
-            await seed_employees(db, user_id)
-            await seed_suppliers(db, user_id)
-            await seed_sales_transactions(db, user_id)
-            await seed_purchase_orders(db, user_id)
-            
-            logger.info("✅ Database seeding completed successfully!")
-            
-        except Exception as e:
-            logger.error(f"❌ Error during seeding: {e}")
-            await db.rollback()
-            raise
-        finally:
-            await db.close()
+    return {table_name: len(table_rows) for table_name, table_rows in rows.items()}
+
+
+# ------------------ Bulk loading ------------------
+_worker_generator: Optional[ChunkGenerator] = None
+_worker_dsn: Optional[str] = None
+
+
+def _init_worker(config: DatasetConfig, dsn: Optional[str]) -> None:
+    global _worker_generator, _worker_dsn
+    logging.disable(logging.CRITICAL)
+    _worker_generator = ChunkGenerator(config)
+    _worker_dsn = dsn
+
+
+def _sqlite_rows(rows: Dict[str, List[tuple]]) -> Dict[str, List[tuple]]:
+    # Same text format SQLAlchemy's SQLite DateTime type stores
+    rows["sales"] = [
+        (sale_id, user_id, sale_date.strftime("%Y-%m-%d %H:%M:%S.%f"), total, cashier)
+        for sale_id, user_id, sale_date, total, cashier in rows["sales"]
+    ]
+    return rows
+
+
+def _generate_sqlite_chunk(chunk: Tuple[int, int, int]) -> Dict[str, List[tuple]]:
+    return _sqlite_rows(_worker_generator.generate(*chunk))
+
+
+async def _copy_rows(dsn: str, rows: Dict[str, List[tuple]]) -> None:
+    import asyncpg
+
+    conn = await asyncpg.connect(dsn)
+    try:
+        async with conn.transaction():
+            for table_name, table_rows in rows.items():
+                if table_rows:
+                    await conn.copy_records_to_table(table_name, records=table_rows, columns=list(COLUMNS[table_name]))
+    finally:
+        await conn.close()
+
+
+def _copy_postgres_chunk(chunk: Tuple[int, int, int]) -> Dict[str, int]:
+    rows = _worker_generator.generate(*chunk)
+    asyncio.run(_copy_rows(_worker_dsn, rows))
+    return {table_name: len(table_rows) for table_name, table_rows in rows.items()}
+
+
+def _insert_sqlite(conn: sqlite3.Connection, rows: Dict[str, List[tuple]]) -> Dict[str, int]:
+    for table_name, table_rows in rows.items():
+        columns = COLUMNS[table_name]
+        conn.executemany(
+            f"INSERT INTO {table_name} ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))})", table_rows
+        )
+    conn.commit()
+    return {table_name: len(table_rows) for table_name, table_rows in rows.items()}
+
+
+def load_sqlite(path: str, config: DatasetConfig, chunks: list, workers: int) -> Dict[str, int]:
+    conn = sqlite3.connect(path)
+    conn.execute("PRAGMA synchronous=OFF")
+    conn.execute("PRAGMA cache_size=-262144")
+    totals: Dict[str, int] = {}
+    try:
+        for table_name in DIMENSION_TABLES + FACT_TABLES:
+            conn.execute(f"DELETE FROM {table_name}")
+        totals.update(_insert_sqlite(conn, dimension_rows(config)))
+        with ProcessPoolExecutor(workers, initializer=_init_worker, initargs=(config, None)) as pool:
+            for rows in _progress(pool.map(_generate_sqlite_chunk, chunks), len(chunks)):
+                for table_name, count in _insert_sqlite(conn, rows).items():
+                    totals[table_name] = totals.get(table_name, 0) + count
+    finally:
+        conn.close()
+    return totals
+
+
+async def _prepare_postgres(dsn: str, config: DatasetConfig) -> None:
+    import asyncpg
+
+    conn = await asyncpg.connect(dsn)
+    try:
+        await conn.execute(f"TRUNCATE {', '.join(DIMENSION_TABLES + FACT_TABLES)} RESTART IDENTITY")
+    finally:
+        await conn.close()
+    await _copy_rows(dsn, dimension_rows(config))
+
+
+async def _reset_sequences(dsn: str) -> None:
+    import asyncpg
+
+    conn = await asyncpg.connect(dsn)
+    try:
+        for table_name in DIMENSION_TABLES + FACT_TABLES:
+            await conn.execute(_sequence_reset(table_name))
+    finally:
+        await conn.close()
+
+
+def load_postgres(dsn: str, config: DatasetConfig, chunks: list, workers: int) -> Dict[str, int]:
+    asyncio.run(_prepare_postgres(dsn, config))
+    totals = {table_name: len(rows) for table_name, rows in dimension_rows(config).items()}
+    with ProcessPoolExecutor(workers, initializer=_init_worker, initargs=(config, dsn)) as pool:
+        for written in _progress(pool.map(_copy_postgres_chunk, chunks), len(chunks)):
+            for table_name, count in written.items():
+                totals[table_name] = totals.get(table_name, 0) + count
+    asyncio.run(_reset_sequences(dsn))
+    return totals
+
+
+def _progress(results, total: int):
+    start = time.perf_counter()
+    step = max(1, total // 20)
+    for done, result in enumerate(results, 1):
+        if done % step == 0 or done == total:
+            logger.info("Chunks %d/%d (%.0fs)", done, total, time.perf_counter() - start)
+        yield result
+
+
+async def _create_tables() -> None:
+    from services.database import close_database, initialize_database
+
+    await initialize_database()
+    await close_database()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", default=None, help="Defaults to DATABASE_URL / settings.database_url")
+    parser.add_argument("--stores", type=int, default=DatasetConfig.stores)
+    parser.add_argument("--days", type=int, default=DatasetConfig.days)
+    parser.add_argument("--start", type=date.fromisoformat, default=None, help="First day (YYYY-MM-DD)")
+    parser.add_argument("--skus", type=int, default=DatasetConfig.skus)
+    parser.add_argument("--customers", type=int, default=DatasetConfig.customers)
+    parser.add_argument("--cashiers-per-store", type=int, default=DatasetConfig.cashiers_per_store)
+    parser.add_argument("--sales-per-day", type=float, default=DatasetConfig.sales_per_day,
+                        help="Sales per store on an average day")
+    parser.add_argument("--basket", type=float, default=DatasetConfig.basket, help="Mean lines per sale")
+    parser.add_argument("--seed", type=int, default=DatasetConfig.seed)
+    parser.add_argument("--user-id", default=DatasetConfig.user_id)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--chunk-lines", type=int, default=200_000, help="Approximate sale lines per chunk")
+    parser.add_argument("--dry-run", action="store_true", help="Only print the planned row counts")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    if args.database_url:
+        settings.database_url = args.database_url
+    if args.stores < 1 or args.days < 1 or args.skus < 1 or args.basket < 1:
+        parser.error("--stores, --days, --skus and --basket must be at least 1")
+    config = DatasetConfig(
+        stores=args.stores, days=args.days, skus=args.skus, customers=args.customers,
+        cashiers_per_store=max(1, args.cashiers_per_store), sales_per_day=args.sales_per_day, basket=args.basket,
+        start=args.start, seed=args.seed, user_id=args.user_id,
+    )
+
+    counts = plan_sale_counts(config)
+    chunks = plan_chunks(counts, config.basket, args.chunk_lines)
+    logger.info(
+        "Planned %d stores x %d days from %s: %d sales, ~%d sale lines in %d chunks",
+        config.stores, config.days, config.first_day, sum(counts), sum(counts) * config.basket, len(chunks),
+    )
+    if args.dry_run:
+        return 0
+
+    check_columns()
+    asyncio.run(_create_tables())
+    url = make_url(settings.database_url)
+    backend = url.get_backend_name()
+    start = time.perf_counter()
+    if backend == "sqlite":
+        totals = load_sqlite(url.database, config, chunks, args.workers)
+    elif backend == "postgresql":
+        dsn = url.set(drivername="postgresql").render_as_string(hide_password=False)
+        totals = load_postgres(dsn, config, chunks, args.workers)
+    else:
+        logger.error("Unsupported database backend for bulk loading: %s", backend)
+        return 1
+    elapsed = time.perf_counter() - start
+    for table_name, count in totals.items():
+        logger.info("  %-16s %12d rows", table_name, count)
+    logger.info("Loaded %d sale lines in %.1fs (%.0f lines/s)", totals.get("sale_items", 0), elapsed,
+                totals.get("sale_items", 0) / elapsed if elapsed else 0)
+    return 0
 
 
 if __name__ == "__main__":
-    asyncio.run(main())
\ No newline at end of file
+    sys.exit(main())
@@ -1,9 +1,10 @@
 import logging
 from typing import Optional, Dict, Any, List
 
-from sqlalchemy import select, func
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from core.change_feed import read_changes
+from core.statement_cache import by_field_statement, by_id_statement, list_statements
 from models.accounts import Accounts
 
 logger = logging.getLogger(__name__)
@@ -23,7 +24,7 @@ class AccountsService:
             self.db.add(obj)
             await self.db.commit()
             await self.db.refresh(obj)
-            logger.info(f"Created accounts with id: {obj.id}")
+            logger.info("Created accounts with id: %s", obj.id)
             return obj
         except Exception as e:
             await self.db.rollback()
@@ -33,8 +34,8 @@ class AccountsService:
     async def get_by_id(self, obj_id: int) -> Optional[Accounts]:
         """Get accounts by ID"""
         try:
-            query = select(Accounts).where(Accounts.id == obj_id)
-            result = await self.db.execute(query)
+            query, params = by_id_statement(Accounts, obj_id)
+            result = await self.db.execute(query, params)
             return result.scalar_one_or_none()
         except Exception as e:
             logger.error(f"Error fetching accounts {obj_id}: {str(e)}")
@@ -49,30 +50,13 @@ class AccountsService:
     ) -> Dict[str, Any]:
         """Get paginated list of accountss"""
         try:
-            query = select(Accounts)
-            count_query = select(func.count(Accounts.id))
-            
-            if query_dict:
-                for field, value in query_dict.items():
-                    if hasattr(Accounts, field):
-                        query = query.where(getattr(Accounts, field) == value)
-                        count_query = count_query.where(getattr(Accounts, field) == value)
-            
-            count_result = await self.db.execute(count_query)
+            query, count_query, params = list_statements(
+                Accounts, skip, limit, query_dict=query_dict, sort=sort
+            )
+            count_result = await self.db.execute(count_query, params)
             total = count_result.scalar()
 
-            if sort:
-                if sort.startswith('-'):
-                    field_name = sort[1:]
-                    if hasattr(Accounts, field_name):
-                        query = query.order_by(getattr(Accounts, field_name).desc())
-                else:
-                    if hasattr(Accounts, sort):
-                        query = query.order_by(getattr(Accounts, sort))
-            else:
-                query = query.order_by(Accounts.id.desc())
-
-            result = await self.db.execute(query.offset(skip).limit(limit))
+            result = await self.db.execute(query, params)
             items = result.scalars().all()
 
             return {
@@ -85,6 +69,14 @@ class AccountsService:
             logger.error(f"Error fetching accounts list: {str(e)}")
             raise
 
+    async def get_changes(self, since: Optional[int], limit: int = 500) -> Dict[str, Any]:
+        """Get accountss changed after version `since`"""
+        try:
+            return await read_changes(self.db, Accounts, since, limit)
+        except Exception as e:
+            logger.error(f"Error fetching accounts changes: {str(e)}")
+            raise
+
     async def update(self, obj_id: int, update_data: Dict[str, Any]) -> Optional[Accounts]:
         """Update accounts"""
         try:
@@ -98,7 +90,7 @@ class AccountsService:
 
             await self.db.commit()
             await self.db.refresh(obj)
-            logger.info(f"Updated accounts {obj_id}")
+            logger.info("Updated accounts %s", obj_id)
             return obj
         except Exception as e:
             await self.db.rollback()
@@ -114,7 +106,7 @@ class AccountsService:
                 return False
             await self.db.delete(obj)
             await self.db.commit()
-            logger.info(f"Deleted accounts {obj_id}")
+            logger.info("Deleted accounts %s", obj_id)
             return True
         except Exception as e:
             await self.db.rollback()
@@ -126,9 +118,8 @@ class AccountsService:
         try:
             if not hasattr(Accounts, field_name):
                 raise ValueError(f"Field {field_name} does not exist on Accounts")
-            result = await self.db.execute(
-                select(Accounts).where(getattr(Accounts, field_name) == field_value)
-            )
+            query, params = by_field_statement(Accounts, field_name, field_value)
+            result = await self.db.execute(query, params)
             return result.scalar_one_or_none()
         except Exception as e:
             logger.error(f"Error fetching accounts by {field_name}: {str(e)}")
@@ -141,13 +132,8 @@ class AccountsService:
         try:
             if not hasattr(Accounts, field_name):
                 raise ValueError(f"Field {field_name} does not exist on Accounts")
-            result = await self.db.execute(
-                select(Accounts)
-                .where(getattr(Accounts, field_name) == field_value)
-                .offset(skip)
-                .limit(limit)
-                .order_by(Accounts.id.desc())
-            )
+            query, params = by_field_statement(Accounts, field_name, field_value, skip=skip, limit=limit)
+            result = await self.db.execute(query, params)
             return result.scalars().all()
         except Exception as e:
             logger.error(f"Error fetching accountss by {field_name}: {str(e)}")
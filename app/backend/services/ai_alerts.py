@@ -1,9 +1,10 @@
 import logging
 from typing import Optional, Dict, Any, List
 
-from sqlalchemy import select, func
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from core.change_feed import read_changes
+from core.statement_cache import by_field_statement, by_id_statement, list_statements
 from models.ai_alerts import Ai_alerts
 
 logger = logging.getLogger(__name__)
@@ -23,7 +24,7 @@ class Ai_alertsService:
             self.db.add(obj)
             await self.db.commit()
             await self.db.refresh(obj)
-            logger.info(f"Created ai_alerts with id: {obj.id}")
+            logger.info("Created ai_alerts with id: %s", obj.id)
             return obj
         except Exception as e:
             await self.db.rollback()
@@ -33,8 +34,8 @@ class Ai_alertsService:
     async def get_by_id(self, obj_id: int) -> Optional[Ai_alerts]:
         """Get ai_alerts by ID"""
         try:
-            query = select(Ai_alerts).where(Ai_alerts.id == obj_id)
-            result = await self.db.execute(query)
+            query, params = by_id_statement(Ai_alerts, obj_id)
+            result = await self.db.execute(query, params)
             return result.scalar_one_or_none()
         except Exception as e:
             logger.error(f"Error fetching ai_alerts {obj_id}: {str(e)}")
@@ -49,30 +50,13 @@ class Ai_alertsService:
     ) -> Dict[str, Any]:
         """Get paginated list of ai_alertss"""
         try:
-            query = select(Ai_alerts)
-            count_query = select(func.count(Ai_alerts.id))
-            
-            if query_dict:
-                for field, value in query_dict.items():
-                    if hasattr(Ai_alerts, field):
-                        query = query.where(getattr(Ai_alerts, field) == value)
-                        count_query = count_query.where(getattr(Ai_alerts, field) == value)
-            
-            count_result = await self.db.execute(count_query)
+            query, count_query, params = list_statements(
+                Ai_alerts, skip, limit, query_dict=query_dict, sort=sort
+            )
+            count_result = await self.db.execute(count_query, params)
             total = count_result.scalar()
 
-            if sort:
-                if sort.startswith('-'):
-                    field_name = sort[1:]
-                    if hasattr(Ai_alerts, field_name):
-                        query = query.order_by(getattr(Ai_alerts, field_name).desc())
-                else:
-                    if hasattr(Ai_alerts, sort):
-                        query = query.order_by(getattr(Ai_alerts, sort))
-            else:
-                query = query.order_by(Ai_alerts.id.desc())
-
-            result = await self.db.execute(query.offset(skip).limit(limit))
+            result = await self.db.execute(query, params)
             items = result.scalars().all()
 
             return {
@@ -85,6 +69,14 @@ class Ai_alertsService:
             logger.error(f"Error fetching ai_alerts list: {str(e)}")
             raise
 
+    async def get_changes(self, since: Optional[int], limit: int = 500) -> Dict[str, Any]:
+        """Get ai_alertss changed after version `since`"""
+        try:
+            return await read_changes(self.db, Ai_alerts, since, limit)
+        except Exception as e:
+            logger.error(f"Error fetching ai_alerts changes: {str(e)}")
+            raise
+
     async def update(self, obj_id: int, update_data: Dict[str, Any]) -> Optional[Ai_alerts]:
         """Update ai_alerts"""
         try:
@@ -98,7 +90,7 @@ class Ai_alertsService:
 
             await self.db.commit()
             await self.db.refresh(obj)
-            logger.info(f"Updated ai_alerts {obj_id}")
+            logger.info("Updated ai_alerts %s", obj_id)
             return obj
         except Exception as e:
             await self.db.rollback()
@@ -114,7 +106,7 @@ class Ai_alertsService:
                 return False
             await self.db.delete(obj)
             await self.db.commit()
-            logger.info(f"Deleted ai_alerts {obj_id}")
+            logger.info("Deleted ai_alerts %s", obj_id)
             return True
         except Exception as e:
             await self.db.rollback()
@@ -126,9 +118,8 @@ class Ai_alertsService:
         try:
             if not hasattr(Ai_alerts, field_name):
                 raise ValueError(f"Field {field_name} does not exist on Ai_alerts")
-            result = await self.db.execute(
-                select(Ai_alerts).where(getattr(Ai_alerts, field_name) == field_value)
-            )
+            query, params = by_field_statement(Ai_alerts, field_name, field_value)
+            result = await self.db.execute(query, params)
             return result.scalar_one_or_none()
         except Exception as e:
             logger.error(f"Error fetching ai_alerts by {field_name}: {str(e)}")
@@ -141,13 +132,8 @@ class Ai_alertsService:
         try:
             if not hasattr(Ai_alerts, field_name):
                 raise ValueError(f"Field {field_name} does not exist on Ai_alerts")
-            result = await self.db.execute(
-                select(Ai_alerts)
-                .where(getattr(Ai_alerts, field_name) == field_value)
-                .offset(skip)
-                .limit(limit)
-                .order_by(Ai_alerts.id.desc())
-            )
+            query, params = by_field_statement(Ai_alerts, field_name, field_value, skip=skip, limit=limit)
+            result = await self.db.execute(query, params)
             return result.scalars().all()
         except Exception as e:
             logger.error(f"Error fetching ai_alertss by {field_name}: {str(e)}")
@@ -0,0 +1,43 @@
+import logging
+import os
+
+from core import audit
+from core.audit import start_audit_writer, stop_audit_writer
+from core.config import settings
+from core.database import db_manager
+
+logger = logging.getLogger(__name__)
+
+
+async def initialize_audit_trail(background: bool = True):
+    """Record entity writes in audit_logs; disabled with AUDIT_ENABLED=false.
+
+    Without `background` the records are only written by `flush_audit_trail`, for
+    callers whose event loop does not outlive the request (Lambda).
+    """
+    if not settings.audit_enabled or not db_manager.async_session_maker:
+        return
+    spool_dir = settings.audit_spool_dir
+    if settings.is_lambda and not os.path.isabs(spool_dir):
+        spool_dir = os.path.join("/tmp", spool_dir)  # The deployment package is read-only on Lambda
+    try:
+        await start_audit_writer(
+            db_manager.async_session_maker,
+            spool_dir,
+            settings.audit_buffer_size,
+            settings.audit_batch_size,
+            settings.audit_flush_interval_seconds,
+            background,
+        )
+    except OSError as e:
+        logger.error(f"Audit trail disabled, spool directory {spool_dir} is not usable: {e}")
+
+
+async def flush_audit_trail():
+    """Write the captured records now, e.g. at the end of a Lambda invocation."""
+    if audit.audit_writer is not None:
+        await audit.audit_writer.flush()
+
+
+async def close_audit_trail():
+    await stop_audit_writer()
@@ -1,9 +1,10 @@
 import logging
 from typing import Optional, Dict, Any, List
 
-from sqlalchemy import select, func
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from core.change_feed import read_changes
+from core.statement_cache import by_field_statement, by_id_statement, list_statements
 from models.audit_logs import Audit_logs
 
 logger = logging.getLogger(__name__)
@@ -25,7 +26,7 @@ class Audit_logsService:
             self.db.add(obj)
             await self.db.commit()
             await self.db.refresh(obj)
-            logger.info(f"Created audit_logs with id: {obj.id}")
+            logger.info("Created audit_logs with id: %s", obj.id)
             return obj
         except Exception as e:
             await self.db.rollback()
@@ -44,10 +45,8 @@ class Audit_logsService:
     async def get_by_id(self, obj_id: int, user_id: Optional[str] = None) -> Optional[Audit_logs]:
         """Get audit_logs by ID (user can only see their own records)"""
         try:
-            query = select(Audit_logs).where(Audit_logs.id == obj_id)
-            if user_id:
-                query = query.where(Audit_logs.user_id == user_id)
-            result = await self.db.execute(query)
+            query, params = by_id_statement(Audit_logs, obj_id, user_id=user_id)
+            result = await self.db.execute(query, params)
             return result.scalar_one_or_none()
         except Exception as e:
             logger.error(f"Error fetching audit_logs {obj_id}: {str(e)}")
@@ -63,34 +62,13 @@ class Audit_logsService:
     ) -> Dict[str, Any]:
         """Get paginated list of audit_logss (user can only see their own records)"""
         try:
-            query = select(Audit_logs)
-            count_query = select(func.count(Audit_logs.id))
-            
-            if user_id:
-                query = query.where(Audit_logs.user_id == user_id)
-                count_query = count_query.where(Audit_logs.user_id == user_id)
-            
-            if query_dict:
-                for field, value in query_dict.items():
-                    if hasattr(Audit_logs, field):
-                        query = query.where(getattr(Audit_logs, field) == value)
-                        count_query = count_query.where(getattr(Audit_logs, field) == value)
-            
-            count_result = await self.db.execute(count_query)
+            query, count_query, params = list_statements(
+                Audit_logs, skip, limit, user_id=user_id, query_dict=query_dict, sort=sort
+            )
+            count_result = await self.db.execute(count_query, params)
             total = count_result.scalar()
 
-            if sort:
-                if sort.startswith('-'):
-                    field_name = sort[1:]
-                    if hasattr(Audit_logs, field_name):
-                        query = query.order_by(getattr(Audit_logs, field_name).desc())
-                else:
-                    if hasattr(Audit_logs, sort):
-                        query = query.order_by(getattr(Audit_logs, sort))
-            else:
-                query = query.order_by(Audit_logs.id.desc())
-
-            result = await self.db.execute(query.offset(skip).limit(limit))
+            result = await self.db.execute(query, params)
             items = result.scalars().all()
 
             return {
@@ -103,6 +81,14 @@ class Audit_logsService:
             logger.error(f"Error fetching audit_logs list: {str(e)}")
             raise
 
+    async def get_changes(self, since: Optional[int], limit: int = 500, user_id: Optional[str] = None) -> Dict[str, Any]:
+        """Get audit_logss changed after version `since` (user can only see their own records)"""
+        try:
+            return await read_changes(self.db, Audit_logs, since, limit, user_id=user_id)
+        except Exception as e:
+            logger.error(f"Error fetching audit_logs changes: {str(e)}")
+            raise
+
     async def update(self, obj_id: int, update_data: Dict[str, Any], user_id: Optional[str] = None) -> Optional[Audit_logs]:
         """Update audit_logs (requires ownership)"""
         try:
@@ -116,7 +102,7 @@ class Audit_logsService:
 
             await self.db.commit()
             await self.db.refresh(obj)
-            logger.info(f"Updated audit_logs {obj_id}")
+            logger.info("Updated audit_logs %s", obj_id)
             return obj
         except Exception as e:
             await self.db.rollback()
@@ -132,7 +118,7 @@ class Audit_logsService:
                 return False
             await self.db.delete(obj)
             await self.db.commit()
-            logger.info(f"Deleted audit_logs {obj_id}")
+            logger.info("Deleted audit_logs %s", obj_id)
             return True
         except Exception as e:
             await self.db.rollback()
@@ -144,9 +130,8 @@ class Audit_logsService:
         try:
             if not hasattr(Audit_logs, field_name):
                 raise ValueError(f"Field {field_name} does not exist on Audit_logs")
-            result = await self.db.execute(
-                select(Audit_logs).where(getattr(Audit_logs, field_name) == field_value)
-            )
+            query, params = by_field_statement(Audit_logs, field_name, field_value)
+            result = await self.db.execute(query, params)
             return result.scalar_one_or_none()
         except Exception as e:
             logger.error(f"Error fetching audit_logs by {field_name}: {str(e)}")
@@ -159,13 +144,8 @@ class Audit_logsService:
         try:
             if not hasattr(Audit_logs, field_name):
                 raise ValueError(f"Field {field_name} does not exist on Audit_logs")
-            result = await self.db.execute(
-                select(Audit_logs)
-                .where(getattr(Audit_logs, field_name) == field_value)
-                .offset(skip)
-                .limit(limit)
-                .order_by(Audit_logs.id.desc())
-            )
+            query, params = by_field_statement(Audit_logs, field_name, field_value, skip=skip, limit=limit)
+            result = await self.db.execute(query, params)
             return result.scalars().all()
         except Exception as e:
             logger.error(f"Error fetching audit_logss by {field_name}: {str(e)}")
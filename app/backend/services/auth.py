@@ -20,11 +20,11 @@ class AuthService:
     async def get_or_create_user(self, platform_sub: str, email: str, name: Optional[str] = None) -> User:
         """Get existing user or create new one."""
         start_time = time.time()
-        logger.debug(f"[DB_OP] Starting get_or_create_user - platform_sub: {platform_sub}")
+        logger.debug("[DB_OP] Starting get_or_create_user - platform_sub: %s", platform_sub)
         # Try to find existing user
         result = await self.db.execute(select(User).where(User.id == platform_sub))
         user = result.scalar_one_or_none()
-        logger.debug(f"[DB_OP] User lookup completed in {time.time() - start_time:.4f}s - found: {user is not None}")
+        logger.debug("[DB_OP] User lookup completed in %.4fs - found: %s", time.time() - start_time, user is not None)
 
         if user:
             # Update user info if needed
@@ -40,7 +40,7 @@ class AuthService:
         logger.debug("[DB_OP] Starting user commit/refresh")
         await self.db.commit()
         await self.db.refresh(user)
-        logger.debug(f"[DB_OP] User commit/refresh completed in {time.time() - start_time_commit:.4f}s")
+        logger.debug("[DB_OP] User commit/refresh completed in %.4fs", time.time() - start_time_commit)
         return user
 
     async def issue_app_token(
@@ -106,10 +106,8 @@ class AuthService:
 async def initialize_admin_user():
     """Initialize admin user if not exists"""
 
-    from services.database import initialize_database
-
-    # Ensure database is initialized first
-    await initialize_database()
+    # Ensure database is initialized first; a no-op when startup already ran initialize_database()
+    await db_manager.ensure_initialized()
 
     admin_user_id = getattr(settings, "admin_user_id", "")
     admin_user_email = getattr(settings, "admin_user_email", "")
@@ -129,12 +127,12 @@ async def initialize_admin_user():
                 user.role = "admin"
                 user.email = admin_user_email  # Update email too
                 await db.commit()
-                logger.debug(f"Updated user {admin_user_id} to admin role")
+                logger.debug("Updated user %s to admin role", admin_user_id)
             else:
-                logger.debug(f"Admin user {admin_user_id} already exists")
+                logger.debug("Admin user %s already exists", admin_user_id)
         else:
             # Create new admin user
             admin_user = User(id=admin_user_id, email=admin_user_email, role="admin")
             db.add(admin_user)
             await db.commit()
-            logger.debug(f"Created admin user: {admin_user_id} with email: {admin_user_email}")
+            logger.debug("Created admin user: %s with email: %s", admin_user_id, admin_user_email)
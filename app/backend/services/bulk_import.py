@@ -0,0 +1,404 @@
+"""
+Bulk CSV/XLSX import.
+
+An upload is spooled to a temporary file and processed by a background task. Rows are
+read in chunks in a worker thread (csv.reader, or openpyxl in read-only mode) and
+validated a chunk at a time against the entity's Pydantic schema. Valid rows are
+upserted on the entity's natural key with `core.upsert.bulk_upsert`, and each chunk is
+its own transaction together with its change feed entries. Invalid rows are recorded
+on the job with their row number instead of failing the import, and so is every row
+whose key appears again later in its chunk: only the last of them is imported.
+
+Products have no unique code, so they are matched by name with a lookup instead. A name
+shared by several existing products is reported as an error rather than updating all
+of them. Two imports running at the same time can both insert the same new name.
+
+Jobs live in the memory of the worker process that accepted the upload.
+"""
+
+import asyncio
+import csv
+import logging
+import os
+import time
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import date, datetime
+from typing import Any, Dict, Iterator, List, Optional, Tuple, Type
+
+from core.change_feed import is_tracked, record_changes_async
+from core.config import settings
+from core.upsert import bulk_upsert_counts
+from pydantic import BaseModel, TypeAdapter, ValidationError
+from sqlalchemy import bindparam, select, update
+
+try:
+    import openpyxl
+except ImportError:  # pragma: no cover - optional dependency, only CSV can be imported without it
+    openpyxl = None
+
+logger = logging.getLogger(__name__)
+
+SUPPORTED_FORMATS = ("csv", "xlsx")
+
+RowError = Tuple[int, Optional[str], str]  # (row number, field, message)
+
+
+@dataclass(frozen=True)
+class ImportSpec:
+    """How rows of one entity are validated and matched against existing records."""
+
+    model: type
+    schema: Type[BaseModel]
+    natural_key: str
+    user_scoped: bool = True  # The table has a user_id column and rows belong to the importing user
+
+
+class ImportJob:
+    def __init__(self, entity: str, filename: str, file_format: str, user_id: str, max_errors: int):
+        self.id = uuid.uuid4().hex
+        self.entity = entity
+        self.filename = filename
+        self.format = file_format
+        self.user_id = user_id
+        self.max_errors = max_errors
+        self.status = "queued"
+        self.rows_processed = 0
+        self.inserted = 0
+        self.updated = 0
+        self.failed = 0
+        self.errors: List[Dict[str, Any]] = []
+        self.errors_truncated = False
+        self.ignored_columns: List[str] = []
+        self.error: Optional[str] = None
+        self.created_at = time.time()
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self.task: Optional[asyncio.Task] = None
+
+    @property
+    def finished(self) -> bool:
+        return self.status in ("completed", "failed")
+
+    def add_error(self, row: Optional[int], message: str, field: Optional[str] = None) -> None:
+        if len(self.errors) < self.max_errors:
+            self.errors.append({"row": row, "field": field, "message": message})
+        else:
+            self.errors_truncated = True
+
+    def add_row_errors(self, errors: List[RowError]) -> None:
+        """Record every message; a row with several invalid fields counts once in `failed`."""
+        self.failed += len({row for row, _, _ in errors})
+        for row, field, message in errors:
+            self.add_error(row, message, field)
+
+    def to_dict(self) -> dict:
+        end = self.finished_at or time.time()
+        elapsed = end - self.started_at if self.started_at else 0.0
+        return {
+            "id": self.id,
+            "entity": self.entity,
+            "filename": self.filename,
+            "format": self.format,
+            "status": self.status,
+            "rows_processed": self.rows_processed,
+            "inserted": self.inserted,
+            "updated": self.updated,
+            "failed": self.failed,
+            "rows_per_second": round(self.rows_processed / elapsed, 1) if elapsed else None,
+            "errors": self.errors,
+            "errors_truncated": self.errors_truncated,
+            "ignored_columns": self.ignored_columns,
+            "error": self.error,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+        }
+
+
+class ImportJobRegistry:
+    """Import jobs of this worker; the oldest finished jobs are dropped beyond `max_jobs`."""
+
+    def __init__(self, max_jobs: int = 100):
+        self.max_jobs = max_jobs
+        self.jobs: "OrderedDict[str, ImportJob]" = OrderedDict()
+
+    def add(self, job: ImportJob) -> ImportJob:
+        self.jobs[job.id] = job
+        finished = [job_id for job_id, existing in self.jobs.items() if existing.finished]
+        for job_id in finished[: max(0, len(self.jobs) - self.max_jobs)]:
+            del self.jobs[job_id]
+        return job
+
+    def get(self, job_id: str) -> Optional[ImportJob]:
+        return self.jobs.get(job_id)
+
+    def for_user(self, user_id: str) -> List[ImportJob]:
+        return [job for job in reversed(self.jobs.values()) if job.user_id == user_id]
+
+
+import_jobs = ImportJobRegistry(settings.import_max_jobs)
+
+
+# ------------------ Reading ------------------
+def _clean_cell(value: Any) -> Any:
+    """Normalise a cell to text, so XLSX values validate exactly like the same CSV values."""
+    if value is None:
+        return None
+    if isinstance(value, str):
+        return value.strip() or None
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return str(value)
+
+
+def _rows_to_dicts(header: List[str], rows: List[tuple]) -> List[Dict[str, Any]]:
+    """Map cells to columns; empty cells are left out so schema defaults apply."""
+    records = []
+    for row in rows:
+        record = {}
+        for name, value in zip(header, row):
+            value = _clean_cell(value)
+            if name and value is not None:
+                record[name] = value
+        records.append(record)
+    return records
+
+
+def read_chunks(path: str, file_format: str, chunk_size: int) -> Tuple[List[str], Iterator[Tuple[int, List[Dict]]]]:
+    """Open an upload and return its header and an iterator of (first row number, records) chunks.
+
+    Row numbers count the header as row 1, as spreadsheet programs do. Completely empty
+    rows are skipped.
+    """
+    if file_format == "csv":
+        handle = open(path, newline="", encoding="utf-8-sig")
+        reader = csv.reader(handle)
+        rows: Iterator[tuple] = (tuple(row) for row in reader)
+        close = handle.close
+    elif file_format == "xlsx":
+        if openpyxl is None:
+            raise ValueError("XLSX import requires the openpyxl package")
+        workbook = openpyxl.load_workbook(path, read_only=True, data_only=True)
+        rows = workbook.active.iter_rows(values_only=True)
+        close = workbook.close
+    else:
+        raise ValueError(f"Unsupported file format: {file_format}")
+
+    header_row = next(rows, None)
+    if header_row is None:
+        close()
+        return [], iter(())
+    header = [str(cell).strip() if cell is not None else "" for cell in header_row]
+
+    def chunks() -> Iterator[Tuple[int, List[Dict]]]:
+        try:
+            row_number, first_row, batch = 1, 2, []
+            for row in rows:
+                row_number += 1
+                if not any(cell not in (None, "") for cell in row):
+                    continue
+                if not batch:
+                    first_row = row_number
+                batch.append((row_number, row))
+                if len(batch) >= chunk_size:
+                    yield first_row, _numbered(header, batch)
+                    batch = []
+            if batch:
+                yield first_row, _numbered(header, batch)
+        finally:
+            close()
+
+    return header, chunks()
+
+
+def _numbered(header: List[str], batch: List[Tuple[int, tuple]]) -> List[Dict]:
+    records = _rows_to_dicts(header, [row for _, row in batch])
+    for (row_number, _), record in zip(batch, records):
+        record["__row__"] = row_number
+    return records
+
+
+# ------------------ Validation ------------------
+_adapters: Dict[type, TypeAdapter] = {}
+
+
+def _list_adapter(schema: Type[BaseModel]) -> TypeAdapter:
+    adapter = _adapters.get(schema)
+    if adapter is None:
+        adapter = _adapters[schema] = TypeAdapter(List[schema])
+    return adapter
+
+
+def validate_chunk(
+    spec: ImportSpec, columns: List[str], records: List[Dict[str, Any]]
+) -> Tuple[List[Tuple[int, Dict[str, Any]]], List[RowError]]:
+    """Validate a chunk with one list validation; returns ((row number, valid values), errors)."""
+    row_numbers = [record.pop("__row__") for record in records]
+    adapter = _list_adapter(spec.schema)
+    errors: List[RowError] = []
+    try:
+        models = adapter.validate_python(records)
+    except ValidationError as exc:
+        bad = set()
+        for error in exc.errors():
+            index = error["loc"][0]
+            bad.add(index)
+            field = ".".join(str(part) for part in error["loc"][1:]) or None
+            errors.append((row_numbers[index], field, error["msg"]))
+        row_numbers = [row for index, row in enumerate(row_numbers) if index not in bad]
+        records = [record for index, record in enumerate(records) if index not in bad]
+        models = adapter.validate_python(records)
+    included = set(columns)
+    return [(row, model.model_dump(include=included)) for row, model in zip(row_numbers, models)], errors
+
+
+# ------------------ Writing ------------------
+def _has_unique_index(table, columns: Tuple[str, ...]) -> bool:
+    return any(index.unique and tuple(index.columns.keys()) == columns for index in table.indexes)
+
+
+def _last_per_key(spec: ImportSpec, rows: List[Tuple[int, Dict[str, Any]]]):
+    """Keep the last row of each key; the earlier ones are returned as errors."""
+    key = spec.natural_key
+    last: Dict[Any, Tuple[int, Dict[str, Any]]] = {}
+    errors: List[RowError] = []
+    for row_number, row in reversed(rows):
+        kept = last.setdefault(row[key], (row_number, row))
+        if kept[0] != row_number:
+            message = f"{key} {row[key]!r} appears again in row {kept[0]}, which was imported instead"
+            errors.append((row_number, key, message))
+    return list(reversed(last.values())), errors[::-1]
+
+
+async def upsert_chunk(
+    db, spec: ImportSpec, columns: List[str], rows: List[Tuple[int, Dict[str, Any]]], user_id: str
+) -> Tuple[int, int, List[RowError]]:
+    """Insert rows whose natural key is new and update the others; returns (inserted, updated, errors)."""
+    table = spec.model.__table__
+    rows, errors = _last_per_key(spec, rows)
+    key_columns = ("user_id", spec.natural_key) if spec.user_scoped else (spec.natural_key,)
+    if _has_unique_index(table, key_columns):
+        values = [{**row, "user_id": user_id} if spec.user_scoped else row for _, row in rows]
+        inserted, _ = await bulk_upsert_counts(db, table, values, key_columns)
+        # A row matching an existing key counts as updated even when the file only has the key column
+        return inserted, len(values) - inserted, errors
+    inserted, updated, match_errors = await _match_and_write(db, spec, columns, rows, user_id)
+    return inserted, updated, errors + match_errors
+
+
+async def _match_and_write(
+    db, spec: ImportSpec, columns: List[str], rows: List[Tuple[int, Dict[str, Any]]], user_id: str
+) -> Tuple[int, int, List[RowError]]:
+    """Upsert on a key without a unique index: look the keys up, then update by primary key or insert."""
+    table = spec.model.__table__
+    key = spec.natural_key
+    existing_query = select(table.c.id, table.c[key]).where(table.c[key].in_([row[key] for _, row in rows]))
+    if spec.user_scoped:
+        existing_query = existing_query.where(table.c.user_id == user_id)
+    ids_by_key: Dict[Any, List[int]] = {}
+    for row_id, value in (await db.execute(existing_query)).all():
+        ids_by_key.setdefault(value, []).append(row_id)
+
+    errors: List[RowError] = []
+    updates, inserts = [], []
+    for row_number, row in rows:
+        matches = ids_by_key.get(row[key], ())
+        if len(matches) > 1:
+            message = f"{len(matches)} existing records have {key} {row[key]!r}; none was changed"
+            errors.append((row_number, key, message))
+        elif matches:
+            updates.append((matches[0], row))
+        else:
+            inserts.append(row)
+
+    value_columns = [column for column in columns if column != key]
+    if updates and value_columns:
+        statement = (
+            update(table)
+            .where(table.c.id == bindparam("match_id"))
+            .values({column: bindparam(f"set_{column}") for column in value_columns})
+        )
+        await db.execute(statement, [
+            {"match_id": row_id, **{f"set_{column}": row[column] for column in value_columns}}
+            for row_id, row in updates
+        ])
+    if inserts:
+        if spec.user_scoped:
+            inserts = [{**row, "user_id": user_id} for row in inserts]
+        await db.execute(table.insert(), inserts)
+
+    if is_tracked(table):
+        owner = user_id if spec.user_scoped else None
+        changes = [(row_id, owner, "update") for row_id, _ in updates]
+        if inserts:
+            inserted_query = select(table.c.id).where(table.c[key].in_([row[key] for row in inserts]))
+            if spec.user_scoped:
+                inserted_query = inserted_query.where(table.c.user_id == user_id)
+            # These keys had no rows before the INSERT, so every match is a new row
+            changes += [(row_id, owner, "insert") for row_id in await db.scalars(inserted_query)]
+        await record_changes_async(db, table, changes)
+    return len(inserts), len(updates), errors
+
+
+async def run_import(job: ImportJob, spec: ImportSpec, path: str, session_maker, chunk_size: int) -> None:
+    """Process a spooled upload; the temporary file is removed when done."""
+    job.status = "running"
+    job.started_at = time.time()
+    logger.info("Import %s started: %s into %s", job.id, job.filename, job.entity)
+    chunks = None
+    try:
+        header, chunks = await asyncio.to_thread(read_chunks, path, job.format, chunk_size)
+        fields = set(spec.schema.model_fields)
+        columns = [name for name in dict.fromkeys(header) if name in fields]
+        job.ignored_columns = [name for name in header if name and name not in fields]
+        if spec.natural_key not in columns:
+            raise ValueError(f"The file has no '{spec.natural_key}' column")
+
+        def next_validated():
+            chunk = next(chunks, None)
+            if chunk is None:
+                return None
+            return len(chunk[1]), chunk[0], validate_chunk(spec, columns, chunk[1])
+
+        while True:
+            # Parsing and validation run off the event loop
+            result = await asyncio.to_thread(next_validated)
+            if result is None:
+                break
+            count, first_row, (rows, errors) = result
+            job.add_row_errors(errors)
+            if rows:
+                try:
+                    async with session_maker() as db:
+                        inserted, updated, row_errors = await upsert_chunk(db, spec, columns, rows, job.user_id)
+                        await db.commit()
+                    job.inserted += inserted
+                    job.updated += updated
+                    job.add_row_errors(row_errors)
+                except Exception as exc:
+                    logger.error("Import %s: chunk starting at row %d failed: %s", job.id, first_row, exc)
+                    job.failed += len(rows)
+                    job.add_error(first_row, f"{len(rows)} rows from row {first_row} were not saved: {exc}")
+            job.rows_processed += count
+        job.status = "completed"
+    except Exception as exc:
+        job.status = "failed"
+        job.error = str(exc)
+        logger.error("Import %s failed: %s", job.id, exc)
+    finally:
+        job.finished_at = time.time()
+        if chunks is not None:
+            chunks.close()  # Closes the file if the import stopped early
+        try:
+            os.unlink(path)
+        except OSError:
+            pass
+    logger.info(
+        "Import %s %s: %d rows, %d inserted, %d updated, %d failed in %.1fs",
+        job.id, job.status, job.rows_processed, job.inserted, job.updated, job.failed,
+        job.finished_at - job.started_at,
+    )
@@ -1,9 +1,10 @@
 import logging
 from typing import Optional, Dict, Any, List
 
-from sqlalchemy import select, func
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from core.change_feed import read_changes
+from core.statement_cache import by_field_statement, by_id_statement, list_statements
 from models.cash_flow_predictions import Cash_flow_predictions
 
 logger = logging.getLogger(__name__)
@@ -23,7 +24,7 @@ class Cash_flow_predictionsService:
             self.db.add(obj)
             await self.db.commit()
             await self.db.refresh(obj)
-            logger.info(f"Created cash_flow_predictions with id: {obj.id}")
+            logger.info("Created cash_flow_predictions with id: %s", obj.id)
             return obj
         except Exception as e:
             await self.db.rollback()
@@ -33,8 +34,8 @@ class Cash_flow_predictionsService:
     async def get_by_id(self, obj_id: int) -> Optional[Cash_flow_predictions]:
         """Get cash_flow_predictions by ID"""
         try:
-            query = select(Cash_flow_predictions).where(Cash_flow_predictions.id == obj_id)
-            result = await self.db.execute(query)
+            query, params = by_id_statement(Cash_flow_predictions, obj_id)
+            result = await self.db.execute(query, params)
             return result.scalar_one_or_none()
         except Exception as e:
             logger.error(f"Error fetching cash_flow_predictions {obj_id}: {str(e)}")
@@ -49,30 +50,13 @@ class Cash_flow_predictionsService:
     ) -> Dict[str, Any]:
         """Get paginated list of cash_flow_predictionss"""
         try:
-            query = select(Cash_flow_predictions)
-            count_query = select(func.count(Cash_flow_predictions.id))
-            
-            if query_dict:
-                for field, value in query_dict.items():
-                    if hasattr(Cash_flow_predictions, field):
-                        query = query.where(getattr(Cash_flow_predictions, field) == value)
-                        count_query = count_query.where(getattr(Cash_flow_predictions, field) == value)
-            
-            count_result = await self.db.execute(count_query)
+            query, count_query, params = list_statements(
+                Cash_flow_predictions, skip, limit, query_dict=query_dict, sort=sort
+            )
+            count_result = await self.db.execute(count_query, params)
             total = count_result.scalar()
 
-            if sort:
-                if sort.startswith('-'):
-                    field_name = sort[1:]
-                    if hasattr(Cash_flow_predictions, field_name):
-                        query = query.order_by(getattr(Cash_flow_predictions, field_name).desc())
-                else:
-                    if hasattr(Cash_flow_predictions, sort):
-                        query = query.order_by(getattr(Cash_flow_predictions, sort))
-            else:
-                query = query.order_by(Cash_flow_predictions.id.desc())
-
-            result = await self.db.execute(query.offset(skip).limit(limit))
+            result = await self.db.execute(query, params)
             items = result.scalars().all()
 
             return {
@@ -85,6 +69,14 @@ class Cash_flow_predictionsService:
             logger.error(f"Error fetching cash_flow_predictions list: {str(e)}")
             raise
 
+    async def get_changes(self, since: Optional[int], limit: int = 500) -> Dict[str, Any]:
+        """Get cash_flow_predictionss changed after version `since`"""
+        try:
+            return await read_changes(self.db, Cash_flow_predictions, since, limit)
+        except Exception as e:
+            logger.error(f"Error fetching cash_flow_predictions changes: {str(e)}")
+            raise
+
     async def update(self, obj_id: int, update_data: Dict[str, Any]) -> Optional[Cash_flow_predictions]:
         """Update cash_flow_predictions"""
         try:
@@ -98,7 +90,7 @@ class Cash_flow_predictionsService:
 
             await self.db.commit()
             await self.db.refresh(obj)
-            logger.info(f"Updated cash_flow_predictions {obj_id}")
+            logger.info("Updated cash_flow_predictions %s", obj_id)
             return obj
         except Exception as e:
             await self.db.rollback()
@@ -114,7 +106,7 @@ class Cash_flow_predictionsService:
                 return False
             await self.db.delete(obj)
             await self.db.commit()
-            logger.info(f"Deleted cash_flow_predictions {obj_id}")
+            logger.info("Deleted cash_flow_predictions %s", obj_id)
             return True
         except Exception as e:
             await self.db.rollback()
@@ -126,9 +118,8 @@ class Cash_flow_predictionsService:
         try:
             if not hasattr(Cash_flow_predictions, field_name):
                 raise ValueError(f"Field {field_name} does not exist on Cash_flow_predictions")
-            result = await self.db.execute(
-                select(Cash_flow_predictions).where(getattr(Cash_flow_predictions, field_name) == field_value)
-            )
+            query, params = by_field_statement(Cash_flow_predictions, field_name, field_value)
+            result = await self.db.execute(query, params)
             return result.scalar_one_or_none()
         except Exception as e:
             logger.error(f"Error fetching cash_flow_predictions by {field_name}: {str(e)}")
@@ -141,13 +132,8 @@ class Cash_flow_predictionsService:
         try:
             if not hasattr(Cash_flow_predictions, field_name):
                 raise ValueError(f"Field {field_name} does not exist on Cash_flow_predictions")
-            result = await self.db.execute(
-                select(Cash_flow_predictions)
-                .where(getattr(Cash_flow_predictions, field_name) == field_value)
-                .offset(skip)
-                .limit(limit)
-                .order_by(Cash_flow_predictions.id.desc())
-            )
+            query, params = by_field_statement(Cash_flow_predictions, field_name, field_value, skip=skip, limit=limit)
+            result = await self.db.execute(query, params)
             return result.scalars().all()
         except Exception as e:
             logger.error(f"Error fetching cash_flow_predictionss by {field_name}: {str(e)}")
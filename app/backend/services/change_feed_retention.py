@@ -0,0 +1,68 @@
+"""
+Retention of the change feed.
+
+Each worker runs a background task that, every `change_feed_prune_interval_seconds`,
+deletes changes older than `change_feed_retention_days` in batches of
+`change_feed_prune_batch_size`, each in its own short transaction. Clients whose cursor
+is older than the pruned changes get 410 from the /changes endpoints and reload.
+Workers that run concurrently only delete the same rows twice, which is harmless.
+"""
+
+import asyncio
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+from core.change_feed import prune_changes
+from core.config import settings
+from core.database import db_manager
+
+logger = logging.getLogger(__name__)
+
+_task: Optional[asyncio.Task] = None
+
+
+async def purge_old_changes(retention_days: int, batch_size: int) -> int:
+    """Delete changes made more than `retention_days` ago; returns the number deleted."""
+    changed_before = datetime.now(timezone.utc) - timedelta(days=retention_days)
+    deleted = 0
+    while True:
+        async with db_manager.async_session_maker() as db:
+            count = await prune_changes(db, changed_before, batch_size)
+        deleted += count
+        if count < batch_size:
+            return deleted
+        await asyncio.sleep(0)  # Let requests waiting for the writer in between batches
+
+
+async def _run() -> None:
+    while True:
+        try:
+            deleted = await purge_old_changes(settings.change_feed_retention_days, settings.change_feed_prune_batch_size)
+            if deleted:
+                logger.info("Pruned %d change feed entries older than %d days", deleted,
+                            settings.change_feed_retention_days)
+        except Exception as e:
+            logger.error(f"Change feed pruning failed: {e}")
+        await asyncio.sleep(settings.change_feed_prune_interval_seconds)
+
+
+def start_change_feed_retention():
+    """Start the pruning task; disabled with CHANGE_FEED_RETENTION_DAYS=0 and on Lambda."""
+    global _task
+    if settings.change_feed_retention_days <= 0 or settings.is_lambda or not db_manager.async_session_maker:
+        return
+    if _task is None or _task.done():
+        _task = asyncio.get_running_loop().create_task(_run())
+        logger.info("Change feed retention enabled: changes are kept %d days", settings.change_feed_retention_days)
+
+
+async def stop_change_feed_retention():
+    global _task
+    if _task is not None:
+        _task.cancel()
+        try:
+            await _task
+        except asyncio.CancelledError:
+            pass
+        _task = None
@@ -1,9 +1,11 @@
 import logging
 from typing import Optional, Dict, Any, List
 
-from sqlalchemy import select, func
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from core.change_feed import read_changes
+from core.statement_cache import by_field_statement, by_id_statement, list_statements
+from core.upsert import bulk_upsert
 from models.customers import Customers
 
 logger = logging.getLogger(__name__)
@@ -25,13 +27,26 @@ class CustomersService:
             self.db.add(obj)
             await self.db.commit()
             await self.db.refresh(obj)
-            logger.info(f"Created customers with id: {obj.id}")
+            logger.info("Created customers with id: %s", obj.id)
             return obj
         except Exception as e:
             await self.db.rollback()
             logger.error(f"Error creating customers: {str(e)}")
             raise
 
+    async def upsert_batch(self, items: List[Dict[str, Any]], user_id: str) -> int:
+        """Insert or update customerss matched on the user's customer_code in bulk; returns the number written"""
+        try:
+            rows = [{**item, 'user_id': user_id} for item in items]
+            count = await bulk_upsert(self.db, Customers.__table__, rows, ("user_id", "customer_code"))
+            await self.db.commit()
+            logger.info("Upserted %s customerss", count)
+            return count
+        except Exception as e:
+            await self.db.rollback()
+            logger.error(f"Error upserting customerss: {str(e)}")
+            raise
+
     async def check_ownership(self, obj_id: int, user_id: str) -> bool:
         """Check if user owns this record"""
         try:
@@ -44,10 +59,8 @@ class CustomersService:
     async def get_by_id(self, obj_id: int, user_id: Optional[str] = None) -> Optional[Customers]:
         """Get customers by ID (user can only see their own records)"""
         try:
-            query = select(Customers).where(Customers.id == obj_id)
-            if user_id:
-                query = query.where(Customers.user_id == user_id)
-            result = await self.db.execute(query)
+            query, params = by_id_statement(Customers, obj_id, user_id=user_id)
+            result = await self.db.execute(query, params)
             return result.scalar_one_or_none()
         except Exception as e:
             logger.error(f"Error fetching customers {obj_id}: {str(e)}")
@@ -63,34 +76,13 @@ class CustomersService:
     ) -> Dict[str, Any]:
         """Get paginated list of customerss (user can only see their own records)"""
         try:
-            query = select(Customers)
-            count_query = select(func.count(Customers.id))
-            
-            if user_id:
-                query = query.where(Customers.user_id == user_id)
-                count_query = count_query.where(Customers.user_id == user_id)
-            
-            if query_dict:
-                for field, value in query_dict.items():
-                    if hasattr(Customers, field):
-                        query = query.where(getattr(Customers, field) == value)
-                        count_query = count_query.where(getattr(Customers, field) == value)
-            
-            count_result = await self.db.execute(count_query)
+            query, count_query, params = list_statements(
+                Customers, skip, limit, user_id=user_id, query_dict=query_dict, sort=sort
+            )
+            count_result = await self.db.execute(count_query, params)
             total = count_result.scalar()
 
-            if sort:
-                if sort.startswith('-'):
-                    field_name = sort[1:]
-                    if hasattr(Customers, field_name):
-                        query = query.order_by(getattr(Customers, field_name).desc())
-                else:
-                    if hasattr(Customers, sort):
-                        query = query.order_by(getattr(Customers, sort))
-            else:
-                query = query.order_by(Customers.id.desc())
-
-            result = await self.db.execute(query.offset(skip).limit(limit))
+            result = await self.db.execute(query, params)
             items = result.scalars().all()
 
             return {
@@ -103,6 +95,14 @@ class CustomersService:
             logger.error(f"Error fetching customers list: {str(e)}")
             raise
 
+    async def get_changes(self, since: Optional[int], limit: int = 500, user_id: Optional[str] = None) -> Dict[str, Any]:
+        """Get customerss changed after version `since` (user can only see their own records)"""
+        try:
+            return await read_changes(self.db, Customers, since, limit, user_id=user_id)
+        except Exception as e:
+            logger.error(f"Error fetching customers changes: {str(e)}")
+            raise
+
     async def update(self, obj_id: int, update_data: Dict[str, Any], user_id: Optional[str] = None) -> Optional[Customers]:
         """Update customers (requires ownership)"""
         try:
@@ -116,7 +116,7 @@ class CustomersService:
 
             await self.db.commit()
             await self.db.refresh(obj)
-            logger.info(f"Updated customers {obj_id}")
+            logger.info("Updated customers %s", obj_id)
             return obj
         except Exception as e:
             await self.db.rollback()
@@ -132,7 +132,7 @@ class CustomersService:
                 return False
             await self.db.delete(obj)
             await self.db.commit()
-            logger.info(f"Deleted customers {obj_id}")
+            logger.info("Deleted customers %s", obj_id)
             return True
         except Exception as e:
             await self.db.rollback()
@@ -144,9 +144,8 @@ class CustomersService:
         try:
             if not hasattr(Customers, field_name):
                 raise ValueError(f"Field {field_name} does not exist on Customers")
-            result = await self.db.execute(
-                select(Customers).where(getattr(Customers, field_name) == field_value)
-            )
+            query, params = by_field_statement(Customers, field_name, field_value)
+            result = await self.db.execute(query, params)
             return result.scalar_one_or_none()
         except Exception as e:
             logger.error(f"Error fetching customers by {field_name}: {str(e)}")
@@ -159,13 +158,8 @@ class CustomersService:
         try:
             if not hasattr(Customers, field_name):
                 raise ValueError(f"Field {field_name} does not exist on Customers")
-            result = await self.db.execute(
-                select(Customers)
-                .where(getattr(Customers, field_name) == field_value)
-                .offset(skip)
-                .limit(limit)
-                .order_by(Customers.id.desc())
-            )
+            query, params = by_field_statement(Customers, field_name, field_value, skip=skip, limit=limit)
+            result = await self.db.execute(query, params)
             return result.scalars().all()
         except Exception as e:
             logger.error(f"Error fetching customerss by {field_name}: {str(e)}")
@@ -1,9 +1,10 @@
 import logging
 from typing import Optional, Dict, Any, List
 
-from sqlalchemy import select, func
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from core.change_feed import read_changes
+from core.statement_cache import by_field_statement, by_id_statement, list_statements
 from models.daily_summaries import Daily_summaries
 
 logger = logging.getLogger(__name__)
@@ -23,7 +24,7 @@ class Daily_summariesService:
             self.db.add(obj)
             await self.db.commit()
             await self.db.refresh(obj)
-            logger.info(f"Created daily_summaries with id: {obj.id}")
+            logger.info("Created daily_summaries with id: %s", obj.id)
             return obj
         except Exception as e:
             await self.db.rollback()
@@ -33,8 +34,8 @@ class Daily_summariesService:
     async def get_by_id(self, obj_id: int) -> Optional[Daily_summaries]:
         """Get daily_summaries by ID"""
         try:
-            query = select(Daily_summaries).where(Daily_summaries.id == obj_id)
-            result = await self.db.execute(query)
+            query, params = by_id_statement(Daily_summaries, obj_id)
+            result = await self.db.execute(query, params)
             return result.scalar_one_or_none()
         except Exception as e:
             logger.error(f"Error fetching daily_summaries {obj_id}: {str(e)}")
@@ -49,30 +50,13 @@ class Daily_summariesService:
     ) -> Dict[str, Any]:
         """Get paginated list of daily_summariess"""
         try:
-            query = select(Daily_summaries)
-            count_query = select(func.count(Daily_summaries.id))
-            
-            if query_dict:
-                for field, value in query_dict.items():
-                    if hasattr(Daily_summaries, field):
-                        query = query.where(getattr(Daily_summaries, field) == value)
-                        count_query = count_query.where(getattr(Daily_summaries, field) == value)
-            
-            count_result = await self.db.execute(count_query)
+            query, count_query, params = list_statements(
+                Daily_summaries, skip, limit, query_dict=query_dict, sort=sort
+            )
+            count_result = await self.db.execute(count_query, params)
             total = count_result.scalar()
 
-            if sort:
-                if sort.startswith('-'):
-                    field_name = sort[1:]
-                    if hasattr(Daily_summaries, field_name):
-                        query = query.order_by(getattr(Daily_summaries, field_name).desc())
-                else:
-                    if hasattr(Daily_summaries, sort):
-                        query = query.order_by(getattr(Daily_summaries, sort))
-            else:
-                query = query.order_by(Daily_summaries.id.desc())
-
-            result = await self.db.execute(query.offset(skip).limit(limit))
+            result = await self.db.execute(query, params)
             items = result.scalars().all()
 
             return {
@@ -85,6 +69,14 @@ class Daily_summariesService:
             logger.error(f"Error fetching daily_summaries list: {str(e)}")
             raise
 
+    async def get_changes(self, since: Optional[int], limit: int = 500) -> Dict[str, Any]:
+        """Get daily_summariess changed after version `since`"""
+        try:
+            return await read_changes(self.db, Daily_summaries, since, limit)
+        except Exception as e:
+            logger.error(f"Error fetching daily_summaries changes: {str(e)}")
+            raise
+
     async def update(self, obj_id: int, update_data: Dict[str, Any]) -> Optional[Daily_summaries]:
         """Update daily_summaries"""
         try:
@@ -98,7 +90,7 @@ class Daily_summariesService:
 
             await self.db.commit()
             await self.db.refresh(obj)
-            logger.info(f"Updated daily_summaries {obj_id}")
+            logger.info("Updated daily_summaries %s", obj_id)
             return obj
         except Exception as e:
             await self.db.rollback()
@@ -114,7 +106,7 @@ class Daily_summariesService:
                 return False
             await self.db.delete(obj)
             await self.db.commit()
-            logger.info(f"Deleted daily_summaries {obj_id}")
+            logger.info("Deleted daily_summaries %s", obj_id)
             return True
         except Exception as e:
             await self.db.rollback()
@@ -126,9 +118,8 @@ class Daily_summariesService:
         try:
             if not hasattr(Daily_summaries, field_name):
                 raise ValueError(f"Field {field_name} does not exist on Daily_summaries")
-            result = await self.db.execute(
-                select(Daily_summaries).where(getattr(Daily_summaries, field_name) == field_value)
-            )
+            query, params = by_field_statement(Daily_summaries, field_name, field_value)
+            result = await self.db.execute(query, params)
             return result.scalar_one_or_none()
         except Exception as e:
             logger.error(f"Error fetching daily_summaries by {field_name}: {str(e)}")
@@ -141,13 +132,8 @@ class Daily_summariesService:
         try:
             if not hasattr(Daily_summaries, field_name):
                 raise ValueError(f"Field {field_name} does not exist on Daily_summaries")
-            result = await self.db.execute(
-                select(Daily_summaries)
-                .where(getattr(Daily_summaries, field_name) == field_value)
-                .offset(skip)
-                .limit(limit)
-                .order_by(Daily_summaries.id.desc())
-            )
+            query, params = by_field_statement(Daily_summaries, field_name, field_value, skip=skip, limit=limit)
+            result = await self.db.execute(query, params)
             return result.scalars().all()
         except Exception as e:
             logger.error(f"Error fetching daily_summariess by {field_name}: {str(e)}")
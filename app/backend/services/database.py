@@ -1,7 +1,9 @@
+import importlib
 import logging
+import pkgutil
 import time
 
-from core.database import db_manager
+from core.database import db_manager, pool_status
 from sqlalchemy import text
 
 logger = logging.getLogger(__name__)
@@ -17,26 +19,49 @@ async def check_database_health() -> bool:
 
         async with db_manager.async_session_maker() as session:
             await session.execute(text("SELECT 1"))
-            logger.debug(f"[DB_OP] Database health check completed in {time.time() - start_time:.4f}s - healthy: True")
+            logger.debug("[DB_OP] Database health check completed in %.4fs - healthy: True", time.time() - start_time)
             return True
     except Exception as e:
         logger.error(f"Database health check failed: {e}")
-        logger.debug(f"[DB_OP] Database health check failed in {time.time() - start_time:.4f}s - healthy: False")
+        logger.debug("[DB_OP] Database health check failed in %.4fs - healthy: False", time.time() - start_time)
         return False
 
 
+def get_pool_status() -> dict:
+    """Get occupancy and wait-time metrics for the primary and replica connection pools"""
+    if not db_manager.engine:
+        return {"primary": None, "replicas": []}
+    return {
+        "primary": pool_status(db_manager.engine),
+        "replicas": [pool_status(replica.engine) for replica in db_manager.replicas],
+    }
+
+
+def load_models():
+    """Import every ORM module so Base.metadata is complete before create_all.
+
+    Routers normally import the models indirectly; this keeps table creation correct
+    when routers are mounted lazily or not imported yet (e.g. Lambda cold start).
+    """
+    import models
+
+    for _, module_name, _ in pkgutil.iter_modules(models.__path__):
+        importlib.import_module(f"{models.__name__}.{module_name}")
+
+
 async def initialize_database():
     """Initialize database and create tables"""
     start_time = time.time()
     logger.debug("[DB_OP] Starting database initialization")
     try:
+        load_models()
         logger.info("🔧 Starting database initialization...")
         await db_manager.init_db()
         logger.info("🔧 Database connection initialized, now creating tables if tables not exist...")
         await db_manager.create_tables()
         logger.info("🔧 Table creation completed")
         logger.info("Database initialized successfully")
-        logger.debug(f"[DB_OP] Database initialization completed in {time.time() - start_time:.4f}s")
+        logger.debug("[DB_OP] Database initialization completed in %.4fs", time.time() - start_time)
     except Exception as e:
         logger.error(f"Failed to initialize database: {e}")
         raise
@@ -49,7 +74,7 @@ async def close_database():
     try:
         await db_manager.close_db()
         logger.info("Database connections closed")
-        logger.debug(f"[DB_OP] Database close completed in {time.time() - start_time:.4f}s")
+        logger.debug("[DB_OP] Database close completed in %.4fs", time.time() - start_time)
     except Exception as e:
         logger.error(f"Error closing database: {e}")
-        logger.debug(f"[DB_OP] Database close failed in {time.time() - start_time:.4f}s")
+        logger.debug("[DB_OP] Database close failed in %.4fs", time.time() - start_time)
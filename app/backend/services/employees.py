@@ -1,9 +1,11 @@
 import logging
 from typing import Optional, Dict, Any, List
 
-from sqlalchemy import select, func
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from core.change_feed import read_changes
+from core.statement_cache import by_field_statement, by_id_statement, list_statements
+from core.upsert import bulk_upsert
 from models.employees import Employees
 
 logger = logging.getLogger(__name__)
@@ -25,13 +27,26 @@ class EmployeesService:
             self.db.add(obj)
             await self.db.commit()
             await self.db.refresh(obj)
-            logger.info(f"Created employees with id: {obj.id}")
+            logger.info("Created employees with id: %s", obj.id)
             return obj
         except Exception as e:
             await self.db.rollback()
             logger.error(f"Error creating employees: {str(e)}")
             raise
 
+    async def upsert_batch(self, items: List[Dict[str, Any]], user_id: str) -> int:
+        """Insert or update employeess matched on the user's employee_code in bulk; returns the number written"""
+        try:
+            rows = [{**item, 'user_id': user_id} for item in items]
+            count = await bulk_upsert(self.db, Employees.__table__, rows, ("user_id", "employee_code"))
+            await self.db.commit()
+            logger.info("Upserted %s employeess", count)
+            return count
+        except Exception as e:
+            await self.db.rollback()
+            logger.error(f"Error upserting employeess: {str(e)}")
+            raise
+
     async def check_ownership(self, obj_id: int, user_id: str) -> bool:
         """Check if user owns this record"""
         try:
@@ -44,10 +59,8 @@ class EmployeesService:
     async def get_by_id(self, obj_id: int, user_id: Optional[str] = None) -> Optional[Employees]:
         """Get employees by ID (user can only see their own records)"""
         try:
-            query = select(Employees).where(Employees.id == obj_id)
-            if user_id:
-                query = query.where(Employees.user_id == user_id)
-            result = await self.db.execute(query)
+            query, params = by_id_statement(Employees, obj_id, user_id=user_id)
+            result = await self.db.execute(query, params)
             return result.scalar_one_or_none()
         except Exception as e:
             logger.error(f"Error fetching employees {obj_id}: {str(e)}")
@@ -63,34 +76,13 @@ class EmployeesService:
     ) -> Dict[str, Any]:
         """Get paginated list of employeess (user can only see their own records)"""
         try:
-            query = select(Employees)
-            count_query = select(func.count(Employees.id))
-            
-            if user_id:
-                query = query.where(Employees.user_id == user_id)
-                count_query = count_query.where(Employees.user_id == user_id)
-            
-            if query_dict:
-                for field, value in query_dict.items():
-                    if hasattr(Employees, field):
-                        query = query.where(getattr(Employees, field) == value)
-                        count_query = count_query.where(getattr(Employees, field) == value)
-            
-            count_result = await self.db.execute(count_query)
+            query, count_query, params = list_statements(
+                Employees, skip, limit, user_id=user_id, query_dict=query_dict, sort=sort
+            )
+            count_result = await self.db.execute(count_query, params)
             total = count_result.scalar()
 
-            if sort:
-                if sort.startswith('-'):
-                    field_name = sort[1:]
-                    if hasattr(Employees, field_name):
-                        query = query.order_by(getattr(Employees, field_name).desc())
-                else:
-                    if hasattr(Employees, sort):
-                        query = query.order_by(getattr(Employees, sort))
-            else:
-                query = query.order_by(Employees.id.desc())
-
-            result = await self.db.execute(query.offset(skip).limit(limit))
+            result = await self.db.execute(query, params)
             items = result.scalars().all()
 
             return {
@@ -103,6 +95,14 @@ class EmployeesService:
             logger.error(f"Error fetching employees list: {str(e)}")
             raise
 
+    async def get_changes(self, since: Optional[int], limit: int = 500, user_id: Optional[str] = None) -> Dict[str, Any]:
+        """Get employeess changed after version `since` (user can only see their own records)"""
+        try:
+            return await read_changes(self.db, Employees, since, limit, user_id=user_id)
+        except Exception as e:
+            logger.error(f"Error fetching employees changes: {str(e)}")
+            raise
+
     async def update(self, obj_id: int, update_data: Dict[str, Any], user_id: Optional[str] = None) -> Optional[Employees]:
         """Update employees (requires ownership)"""
         try:
@@ -116,7 +116,7 @@ class EmployeesService:
 
             await self.db.commit()
             await self.db.refresh(obj)
-            logger.info(f"Updated employees {obj_id}")
+            logger.info("Updated employees %s", obj_id)
             return obj
         except Exception as e:
             await self.db.rollback()
@@ -132,7 +132,7 @@ class EmployeesService:
                 return False
             await self.db.delete(obj)
             await self.db.commit()
-            logger.info(f"Deleted employees {obj_id}")
+            logger.info("Deleted employees %s", obj_id)
             return True
         except Exception as e:
             await self.db.rollback()
@@ -144,9 +144,8 @@ class EmployeesService:
         try:
             if not hasattr(Employees, field_name):
                 raise ValueError(f"Field {field_name} does not exist on Employees")
-            result = await self.db.execute(
-                select(Employees).where(getattr(Employees, field_name) == field_value)
-            )
+            query, params = by_field_statement(Employees, field_name, field_value)
+            result = await self.db.execute(query, params)
             return result.scalar_one_or_none()
         except Exception as e:
             logger.error(f"Error fetching employees by {field_name}: {str(e)}")
@@ -159,13 +158,8 @@ class EmployeesService:
         try:
             if not hasattr(Employees, field_name):
                 raise ValueError(f"Field {field_name} does not exist on Employees")
-            result = await self.db.execute(
-                select(Employees)
-                .where(getattr(Employees, field_name) == field_value)
-                .offset(skip)
-                .limit(limit)
-                .order_by(Employees.id.desc())
-            )
+            query, params = by_field_statement(Employees, field_name, field_value, skip=skip, limit=limit)
+            result = await self.db.execute(query, params)
             return result.scalars().all()
         except Exception as e:
             logger.error(f"Error fetching employeess by {field_name}: {str(e)}")
@@ -1,9 +1,10 @@
 import logging
 from typing import Optional, Dict, Any, List
 
-from sqlalchemy import select, func
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from core.change_feed import read_changes
+from core.statement_cache import by_field_statement, by_id_statement, list_statements
 from models.journal_details import Journal_details
 
 logger = logging.getLogger(__name__)
@@ -25,7 +26,7 @@ class Journal_detailsService:
             self.db.add(obj)
             await self.db.commit()
             await self.db.refresh(obj)
-            logger.info(f"Created journal_details with id: {obj.id}")
+            logger.info("Created journal_details with id: %s", obj.id)
             return obj
         except Exception as e:
             await self.db.rollback()
@@ -44,10 +45,8 @@ class Journal_detailsService:
     async def get_by_id(self, obj_id: int, user_id: Optional[str] = None) -> Optional[Journal_details]:
         """Get journal_details by ID (user can only see their own records)"""
         try:
-            query = select(Journal_details).where(Journal_details.id == obj_id)
-            if user_id:
-                query = query.where(Journal_details.user_id == user_id)
-            result = await self.db.execute(query)
+            query, params = by_id_statement(Journal_details, obj_id, user_id=user_id)
+            result = await self.db.execute(query, params)
             return result.scalar_one_or_none()
         except Exception as e:
             logger.error(f"Error fetching journal_details {obj_id}: {str(e)}")
@@ -63,34 +62,13 @@ class Journal_detailsService:
     ) -> Dict[str, Any]:
         """Get paginated list of journal_detailss (user can only see their own records)"""
         try:
-            query = select(Journal_details)
-            count_query = select(func.count(Journal_details.id))
-            
-            if user_id:
-                query = query.where(Journal_details.user_id == user_id)
-                count_query = count_query.where(Journal_details.user_id == user_id)
-            
-            if query_dict:
-                for field, value in query_dict.items():
-                    if hasattr(Journal_details, field):
-                        query = query.where(getattr(Journal_details, field) == value)
-                        count_query = count_query.where(getattr(Journal_details, field) == value)
-            
-            count_result = await self.db.execute(count_query)
+            query, count_query, params = list_statements(
+                Journal_details, skip, limit, user_id=user_id, query_dict=query_dict, sort=sort
+            )
+            count_result = await self.db.execute(count_query, params)
             total = count_result.scalar()
 
-            if sort:
-                if sort.startswith('-'):
-                    field_name = sort[1:]
-                    if hasattr(Journal_details, field_name):
-                        query = query.order_by(getattr(Journal_details, field_name).desc())
-                else:
-                    if hasattr(Journal_details, sort):
-                        query = query.order_by(getattr(Journal_details, sort))
-            else:
-                query = query.order_by(Journal_details.id.desc())
-
-            result = await self.db.execute(query.offset(skip).limit(limit))
+            result = await self.db.execute(query, params)
             items = result.scalars().all()
 
             return {
@@ -103,6 +81,14 @@ class Journal_detailsService:
             logger.error(f"Error fetching journal_details list: {str(e)}")
             raise
 
+    async def get_changes(self, since: Optional[int], limit: int = 500, user_id: Optional[str] = None) -> Dict[str, Any]:
+        """Get journal_detailss changed after version `since` (user can only see their own records)"""
+        try:
+            return await read_changes(self.db, Journal_details, since, limit, user_id=user_id)
+        except Exception as e:
+            logger.error(f"Error fetching journal_details changes: {str(e)}")
+            raise
+
     async def update(self, obj_id: int, update_data: Dict[str, Any], user_id: Optional[str] = None) -> Optional[Journal_details]:
         """Update journal_details (requires ownership)"""
         try:
@@ -116,7 +102,7 @@ class Journal_detailsService:
 
             await self.db.commit()
             await self.db.refresh(obj)
-            logger.info(f"Updated journal_details {obj_id}")
+            logger.info("Updated journal_details %s", obj_id)
             return obj
         except Exception as e:
             await self.db.rollback()
@@ -132,7 +118,7 @@ class Journal_detailsService:
                 return False
             await self.db.delete(obj)
             await self.db.commit()
-            logger.info(f"Deleted journal_details {obj_id}")
+            logger.info("Deleted journal_details %s", obj_id)
             return True
         except Exception as e:
             await self.db.rollback()
@@ -144,9 +130,8 @@ class Journal_detailsService:
         try:
             if not hasattr(Journal_details, field_name):
                 raise ValueError(f"Field {field_name} does not exist on Journal_details")
-            result = await self.db.execute(
-                select(Journal_details).where(getattr(Journal_details, field_name) == field_value)
-            )
+            query, params = by_field_statement(Journal_details, field_name, field_value)
+            result = await self.db.execute(query, params)
             return result.scalar_one_or_none()
         except Exception as e:
             logger.error(f"Error fetching journal_details by {field_name}: {str(e)}")
@@ -159,13 +144,8 @@ class Journal_detailsService:
         try:
             if not hasattr(Journal_details, field_name):
                 raise ValueError(f"Field {field_name} does not exist on Journal_details")
-            result = await self.db.execute(
-                select(Journal_details)
-                .where(getattr(Journal_details, field_name) == field_value)
-                .offset(skip)
-                .limit(limit)
-                .order_by(Journal_details.id.desc())
-            )
+            query, params = by_field_statement(Journal_details, field_name, field_value, skip=skip, limit=limit)
+            result = await self.db.execute(query, params)
             return result.scalars().all()
         except Exception as e:
             logger.error(f"Error fetching journal_detailss by {field_name}: {str(e)}")
@@ -1,9 +1,10 @@
 import logging
 from typing import Optional, Dict, Any, List
 
-from sqlalchemy import select, func
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from core.change_feed import read_changes
+from core.statement_cache import by_field_statement, by_id_statement, list_statements
 from models.journal_entries import Journal_entries
 
 logger = logging.getLogger(__name__)
@@ -25,7 +26,7 @@ class Journal_entriesService:
             self.db.add(obj)
             await self.db.commit()
             await self.db.refresh(obj)
-            logger.info(f"Created journal_entries with id: {obj.id}")
+            logger.info("Created journal_entries with id: %s", obj.id)
             return obj
         except Exception as e:
             await self.db.rollback()
@@ -44,10 +45,8 @@ class Journal_entriesService:
     async def get_by_id(self, obj_id: int, user_id: Optional[str] = None) -> Optional[Journal_entries]:
         """Get journal_entries by ID (user can only see their own records)"""
         try:
-            query = select(Journal_entries).where(Journal_entries.id == obj_id)
-            if user_id:
-                query = query.where(Journal_entries.user_id == user_id)
-            result = await self.db.execute(query)
+            query, params = by_id_statement(Journal_entries, obj_id, user_id=user_id)
+            result = await self.db.execute(query, params)
             return result.scalar_one_or_none()
         except Exception as e:
             logger.error(f"Error fetching journal_entries {obj_id}: {str(e)}")
@@ -63,34 +62,13 @@ class Journal_entriesService:
     ) -> Dict[str, Any]:
         """Get paginated list of journal_entriess (user can only see their own records)"""
         try:
-            query = select(Journal_entries)
-            count_query = select(func.count(Journal_entries.id))
-            
-            if user_id:
-                query = query.where(Journal_entries.user_id == user_id)
-                count_query = count_query.where(Journal_entries.user_id == user_id)
-            
-            if query_dict:
-                for field, value in query_dict.items():
-                    if hasattr(Journal_entries, field):
-                        query = query.where(getattr(Journal_entries, field) == value)
-                        count_query = count_query.where(getattr(Journal_entries, field) == value)
-            
-            count_result = await self.db.execute(count_query)
+            query, count_query, params = list_statements(
+                Journal_entries, skip, limit, user_id=user_id, query_dict=query_dict, sort=sort
+            )
+            count_result = await self.db.execute(count_query, params)
             total = count_result.scalar()
 
-            if sort:
-                if sort.startswith('-'):
-                    field_name = sort[1:]
-                    if hasattr(Journal_entries, field_name):
-                        query = query.order_by(getattr(Journal_entries, field_name).desc())
-                else:
-                    if hasattr(Journal_entries, sort):
-                        query = query.order_by(getattr(Journal_entries, sort))
-            else:
-                query = query.order_by(Journal_entries.id.desc())
-
-            result = await self.db.execute(query.offset(skip).limit(limit))
+            result = await self.db.execute(query, params)
             items = result.scalars().all()
 
             return {
@@ -103,6 +81,14 @@ class Journal_entriesService:
             logger.error(f"Error fetching journal_entries list: {str(e)}")
             raise
 
+    async def get_changes(self, since: Optional[int], limit: int = 500, user_id: Optional[str] = None) -> Dict[str, Any]:
+        """Get journal_entriess changed after version `since` (user can only see their own records)"""
+        try:
+            return await read_changes(self.db, Journal_entries, since, limit, user_id=user_id)
+        except Exception as e:
+            logger.error(f"Error fetching journal_entries changes: {str(e)}")
+            raise
+
     async def update(self, obj_id: int, update_data: Dict[str, Any], user_id: Optional[str] = None) -> Optional[Journal_entries]:
         """Update journal_entries (requires ownership)"""
         try:
@@ -116,7 +102,7 @@ class Journal_entriesService:
 
             await self.db.commit()
             await self.db.refresh(obj)
-            logger.info(f"Updated journal_entries {obj_id}")
+            logger.info("Updated journal_entries %s", obj_id)
             return obj
         except Exception as e:
             await self.db.rollback()
@@ -132,7 +118,7 @@ class Journal_entriesService:
                 return False
             await self.db.delete(obj)
             await self.db.commit()
-            logger.info(f"Deleted journal_entries {obj_id}")
+            logger.info("Deleted journal_entries %s", obj_id)
             return True
         except Exception as e:
             await self.db.rollback()
@@ -144,9 +130,8 @@ class Journal_entriesService:
         try:
             if not hasattr(Journal_entries, field_name):
                 raise ValueError(f"Field {field_name} does not exist on Journal_entries")
-            result = await self.db.execute(
-                select(Journal_entries).where(getattr(Journal_entries, field_name) == field_value)
-            )
+            query, params = by_field_statement(Journal_entries, field_name, field_value)
+            result = await self.db.execute(query, params)
             return result.scalar_one_or_none()
         except Exception as e:
             logger.error(f"Error fetching journal_entries by {field_name}: {str(e)}")
@@ -159,13 +144,8 @@ class Journal_entriesService:
         try:
             if not hasattr(Journal_entries, field_name):
                 raise ValueError(f"Field {field_name} does not exist on Journal_entries")
-            result = await self.db.execute(
-                select(Journal_entries)
-                .where(getattr(Journal_entries, field_name) == field_value)
-                .offset(skip)
-                .limit(limit)
-                .order_by(Journal_entries.id.desc())
-            )
+            query, params = by_field_statement(Journal_entries, field_name, field_value, skip=skip, limit=limit)
+            result = await self.db.execute(query, params)
             return result.scalars().all()
         except Exception as e:
             logger.error(f"Error fetching journal_entriess by {field_name}: {str(e)}")
@@ -1,9 +1,11 @@
 import logging
 from typing import Optional, Dict, Any, List
 
-from sqlalchemy import select, func
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from core.change_feed import read_changes
+from core.statement_cache import by_field_statement, by_id_statement, list_statements
+from core.upsert import bulk_upsert
 from models.locations import Locations
 
 logger = logging.getLogger(__name__)
@@ -23,18 +25,30 @@ class LocationsService:
             self.db.add(obj)
             await self.db.commit()
             await self.db.refresh(obj)
-            logger.info(f"Created locations with id: {obj.id}")
+            logger.info("Created locations with id: %s", obj.id)
             return obj
         except Exception as e:
             await self.db.rollback()
             logger.error(f"Error creating locations: {str(e)}")
             raise
 
+    async def upsert_batch(self, items: List[Dict[str, Any]]) -> int:
+        """Insert or update locationss matched on location_code in bulk; returns the number written"""
+        try:
+            count = await bulk_upsert(self.db, Locations.__table__, items, ("location_code",))
+            await self.db.commit()
+            logger.info("Upserted %s locationss", count)
+            return count
+        except Exception as e:
+            await self.db.rollback()
+            logger.error(f"Error upserting locationss: {str(e)}")
+            raise
+
     async def get_by_id(self, obj_id: int) -> Optional[Locations]:
         """Get locations by ID"""
         try:
-            query = select(Locations).where(Locations.id == obj_id)
-            result = await self.db.execute(query)
+            query, params = by_id_statement(Locations, obj_id)
+            result = await self.db.execute(query, params)
             return result.scalar_one_or_none()
         except Exception as e:
             logger.error(f"Error fetching locations {obj_id}: {str(e)}")
@@ -49,30 +63,13 @@ class LocationsService:
     ) -> Dict[str, Any]:
         """Get paginated list of locationss"""
         try:
-            query = select(Locations)
-            count_query = select(func.count(Locations.id))
-            
-            if query_dict:
-                for field, value in query_dict.items():
-                    if hasattr(Locations, field):
-                        query = query.where(getattr(Locations, field) == value)
-                        count_query = count_query.where(getattr(Locations, field) == value)
-            
-            count_result = await self.db.execute(count_query)
+            query, count_query, params = list_statements(
+                Locations, skip, limit, query_dict=query_dict, sort=sort
+            )
+            count_result = await self.db.execute(count_query, params)
             total = count_result.scalar()
 
-            if sort:
-                if sort.startswith('-'):
-                    field_name = sort[1:]
-                    if hasattr(Locations, field_name):
-                        query = query.order_by(getattr(Locations, field_name).desc())
-                else:
-                    if hasattr(Locations, sort):
-                        query = query.order_by(getattr(Locations, sort))
-            else:
-                query = query.order_by(Locations.id.desc())
-
-            result = await self.db.execute(query.offset(skip).limit(limit))
+            result = await self.db.execute(query, params)
             items = result.scalars().all()
 
             return {
@@ -85,6 +82,14 @@ class LocationsService:
             logger.error(f"Error fetching locations list: {str(e)}")
             raise
 
+    async def get_changes(self, since: Optional[int], limit: int = 500) -> Dict[str, Any]:
+        """Get locationss changed after version `since`"""
+        try:
+            return await read_changes(self.db, Locations, since, limit)
+        except Exception as e:
+            logger.error(f"Error fetching locations changes: {str(e)}")
+            raise
+
     async def update(self, obj_id: int, update_data: Dict[str, Any]) -> Optional[Locations]:
         """Update locations"""
         try:
@@ -98,7 +103,7 @@ class LocationsService:
 
             await self.db.commit()
             await self.db.refresh(obj)
-            logger.info(f"Updated locations {obj_id}")
+            logger.info("Updated locations %s", obj_id)
             return obj
         except Exception as e:
             await self.db.rollback()
@@ -114,7 +119,7 @@ class LocationsService:
                 return False
             await self.db.delete(obj)
             await self.db.commit()
-            logger.info(f"Deleted locations {obj_id}")
+            logger.info("Deleted locations %s", obj_id)
             return True
         except Exception as e:
             await self.db.rollback()
@@ -126,9 +131,8 @@ class LocationsService:
         try:
             if not hasattr(Locations, field_name):
                 raise ValueError(f"Field {field_name} does not exist on Locations")
-            result = await self.db.execute(
-                select(Locations).where(getattr(Locations, field_name) == field_value)
-            )
+            query, params = by_field_statement(Locations, field_name, field_value)
+            result = await self.db.execute(query, params)
             return result.scalar_one_or_none()
         except Exception as e:
             logger.error(f"Error fetching locations by {field_name}: {str(e)}")
@@ -141,13 +145,8 @@ class LocationsService:
         try:
             if not hasattr(Locations, field_name):
                 raise ValueError(f"Field {field_name} does not exist on Locations")
-            result = await self.db.execute(
-                select(Locations)
-                .where(getattr(Locations, field_name) == field_value)
-                .offset(skip)
-                .limit(limit)
-                .order_by(Locations.id.desc())
-            )
+            query, params = by_field_statement(Locations, field_name, field_value, skip=skip, limit=limit)
+            result = await self.db.execute(query, params)
             return result.scalars().all()
         except Exception as e:
             logger.error(f"Error fetching locationss by {field_name}: {str(e)}")
@@ -1,18 +1,24 @@
 import asyncio
 import json
 import logging
-from datetime import datetime
+import re
+from datetime import date, datetime
 from pathlib import Path
-from typing import Any, Iterable
+from typing import Any, Callable, Dict, Iterator, List, Optional
 
-from core.database import db_manager
-from sqlalchemy import Date, DateTime, MetaData, Table, func, select
-from sqlalchemy.exc import NoSuchTableError, SQLAlchemyError
+from core.database import Base, db_manager
+from sqlalchemy import Boolean, Date, DateTime, Float, Integer, Numeric, String, Table, literal, select, text
+from sqlalchemy.exc import SQLAlchemyError
 
 logger = logging.getLogger(__name__)
 
 MOCK_DATA_DIR = Path(__file__).resolve().parent.parent / "mock_data"
+MOCK_DATA_PATTERNS = ("*.json", "*.ndjson", "*.jsonl")
 MAX_CONCURRENT_LOADS = 5
+BATCH_SIZE = 5000  # Records parsed, coerced and inserted per step
+READ_CHUNK_SIZE = 1 << 20
+COPY_MIN_ROWS = 1000  # Smaller batches are cheaper as a plain executemany
+_WHITESPACE = re.compile(r"[ \t\n\r]*")
 
 
 async def initialize_mock_data():
@@ -21,11 +27,21 @@ async def initialize_mock_data():
         logger.warning("Database engine is not ready; skipping mock data initialization")
         return
 
+    if db_manager.schema_fast_path:
+        logger.info("Schema fingerprint matches; mock data was loaded on a previous startup")
+        return
+
+    await _load_mock_files()
+    # Mock data only fills empty tables, so once it has run the next startup can skip it entirely
+    await db_manager.record_schema_fingerprint()
+
+
+async def _load_mock_files():
     if not MOCK_DATA_DIR.exists():
         logger.info("mock_data directory not found, skipping mock initialization")
         return
 
-    data_files = sorted(MOCK_DATA_DIR.glob("*.json"))
+    data_files = sorted(path for pattern in MOCK_DATA_PATTERNS for path in MOCK_DATA_DIR.glob(pattern))
     if not data_files:
         logger.info("No mock JSON files detected; skipping mock initialization")
         return
@@ -42,112 +58,195 @@ async def initialize_mock_data():
     await asyncio.gather(*(load_file(data_file) for data_file in data_files))
 
 
-def _prepare_records(raw_data: Any, table: Table) -> list[dict[str, Any]]:
-    """Filter JSON payload to match the table definition and coerce values."""
-    if isinstance(raw_data, dict):
-        records_iterable: Iterable[dict[str, Any]] = [raw_data]
-    elif isinstance(raw_data, list):
-        records_iterable = [item for item in raw_data if isinstance(item, dict)]
-    else:
-        return []
-
-    column_map = {column.name: column for column in table.columns}
-    prepared: list[dict[str, Any]] = []
-
-    for entry in records_iterable:
-        filtered = {}
-        for key, value in entry.items():
-            if key not in column_map:
+def _iter_json_records(data_file: Path) -> Iterator[Any]:
+    """Yield the records of a JSON array, a single JSON object or NDJSON, reading the file in chunks.
+
+    Array elements are decoded one at a time, so memory stays proportional to the
+    batch size rather than the file size.
+    """
+    decoder = json.JSONDecoder()
+    with data_file.open("r", encoding="utf-8") as handle:
+        buffer = handle.read(READ_CHUNK_SIZE)
+        pos = _WHITESPACE.match(buffer).end()
+        in_array = buffer.startswith("[", pos)
+        if in_array:
+            pos += 1
+        eof = False
+        while True:
+            pos = _WHITESPACE.match(buffer, pos).end()
+            if in_array and buffer.startswith(",", pos):
+                pos = _WHITESPACE.match(buffer, pos + 1).end()
+            if in_array and buffer.startswith("]", pos):
+                return
+            if pos == len(buffer) and eof:
+                if in_array:
+                    raise ValueError("unterminated JSON array")
+                return
+            try:
+                record, end = decoder.raw_decode(buffer, pos)
+                # A value that ends exactly at the chunk boundary (e.g. a number) may continue
+                complete = end < len(buffer) or eof
+            except json.JSONDecodeError:
+                if eof:
+                    raise
+                complete = False
+            if not complete:
+                chunk = handle.read(READ_CHUNK_SIZE)
+                eof = not chunk
+                buffer, pos = buffer[pos:] + chunk, 0
                 continue
-            column = column_map[key]
-            typed_value = _coerce_temporal_value(value, column)
-            filtered[key] = _coerce_value(typed_value, column)
-        if filtered:
-            prepared.append(filtered)
+            pos = end
+            yield record
 
-    return prepared
 
-
-def _coerce_temporal_value(value: Any, column) -> Any:
-    """Convert ISO-like strings to Date/DateTime objects when needed."""
-    if value is None or not isinstance(value, str):
+def _parse_datetime(value: str) -> Any:
+    try:
+        return datetime.fromisoformat(value)
+    except ValueError:
         return value
 
-    column_type = column.type
-    if isinstance(column_type, Date):
-        try:
-            return datetime.strptime(value, "%Y-%m-%d").date()
-        except ValueError:
-            return value
 
-    if isinstance(column_type, DateTime):
-        val_wo_z = value.replace("Z", "+00:00")
-        for parser in (lambda v: datetime.fromisoformat(v), lambda v: datetime.strptime(v, "%Y-%m-%d %H:%M:%S")):
-            try:
-                return parser(val_wo_z)
-            except ValueError:
-                continue
+def _parse_date(value: str) -> Any:
+    try:
+        return date.fromisoformat(value[:10])
+    except ValueError:
         return value
 
-    return value
-
-
-def _coerce_value(value: Any, column) -> Any:
-    """Coerce nested structures to JSON strings when the column is not JSON."""
-    if value is None:
-        return None
-
-    if isinstance(value, (dict, list)):
-        visit_name = getattr(column.type, "__visit_name__", "").lower()
-        if "json" in visit_name:
-            return value
-        return json.dumps(value, ensure_ascii=False)
-
-    return value
 
+def _make_converter(column) -> Optional[Callable[[Any], Any]]:
+    """Return a converter from JSON values to the column's Python type, or None if none is needed."""
+    column_type = column.type
+    visit_name = getattr(column_type, "__visit_name__", "").lower()
 
-async def _reflect_table(conn, table_name: str) -> Table:
-    """Reflect a table definition inside a synchronous context."""
+    def nested_to_text(value):
+        # Nested structures go into non-JSON columns as JSON text
+        return json.dumps(value, ensure_ascii=False) if isinstance(value, (dict, list)) else value
 
-    def _reflect(sync_conn):
-        metadata = MetaData()
-        return Table(table_name, metadata, autoload_with=sync_conn)
+    def to_text(value):
+        return value if isinstance(value, str) else str(nested_to_text(value))
 
-    return await conn.run_sync(_reflect)
+    if "json" in visit_name:
+        return None
+    # DateTime/Date first: on some dialects they subclass the generic types below
+    if isinstance(column_type, DateTime):
+        return lambda value: _parse_datetime(value) if isinstance(value, str) else value
+    if isinstance(column_type, Date):
+        return lambda value: _parse_date(value) if isinstance(value, str) else value
+    if isinstance(column_type, Boolean):
+        return lambda value: bool(value) if isinstance(value, int) else value
+    if isinstance(column_type, Integer):
+        return lambda value: int(value) if isinstance(value, float) and value.is_integer() else value
+    if isinstance(column_type, (Float, Numeric)):
+        return lambda value: float(value) if isinstance(value, int) and not isinstance(value, bool) else value
+    if isinstance(column_type, String):
+        return to_text
+    return nested_to_text
+
+
+class _RecordBatches:
+    """Reads a mock data file in batches of records coerced to `table`'s column types.
+
+    Coercion runs column by column over a whole batch, with one converter per column
+    chosen from the model metadata up front.
+    """
+
+    def __init__(self, data_file: Path, table: Table, batch_size: int = BATCH_SIZE):
+        self.table = table
+        self.batch_size = batch_size
+        self.columns = {column.name for column in table.columns}
+        self.converters = {
+            column.name: converter for column in table.columns if (converter := _make_converter(column)) is not None
+        }
+        self._records = _iter_json_records(data_file)
+
+    def next_batch(self) -> List[Dict[str, Any]]:
+        batch: List[Dict[str, Any]] = []
+        columns = self.columns
+        for entry in self._records:
+            if not isinstance(entry, dict):
+                continue
+            filtered = {key: value for key, value in entry.items() if key in columns}
+            if filtered:
+                batch.append(filtered)
+                if len(batch) >= self.batch_size:
+                    break
+        for name, convert in self.converters.items():
+            for record in batch:
+                if name in record and record[name] is not None:
+                    record[name] = convert(record[name])
+        return batch
+
+
+def _group_by_columns(records: List[Dict[str, Any]]) -> Dict[tuple, List[Dict[str, Any]]]:
+    """Split records by their key set; one executemany needs the same parameters in every row.
+
+    Missing keys are left out rather than filled with NULL, so column defaults still apply.
+    """
+    groups: Dict[tuple, List[Dict[str, Any]]] = {}
+    for record in records:
+        groups.setdefault(tuple(sorted(record)), []).append(record)
+    return groups
+
+
+async def _insert_batch(conn, table: Table, records: List[Dict[str, Any]]) -> None:
+    for columns, rows in _group_by_columns(records).items():
+        if len(rows) >= COPY_MIN_ROWS and conn.dialect.driver == "asyncpg":
+            raw = await conn.get_raw_connection()
+            await raw.driver_connection.copy_records_to_table(
+                table.name, records=[tuple(row[name] for name in columns) for row in rows], columns=list(columns)
+            )
+        else:
+            await conn.execute(table.insert(), rows)
+
+
+async def _reset_sequence(conn, table: Table) -> None:
+    """Mock files carry explicit ids; move a PostgreSQL serial sequence past them."""
+    if conn.dialect.name != "postgresql" or "id" not in table.columns:
+        return
+    await conn.execute(text(
+        f"SELECT setval(pg_get_serial_sequence('{table.name}', 'id'), "
+        f"COALESCE((SELECT MAX(id) FROM {table.name}), 0) + 1, false) "
+        f"WHERE pg_get_serial_sequence('{table.name}', 'id') IS NOT NULL"
+    ))
 
 
 async def _load_table_from_file(data_file: Path):
     table_name = data_file.stem
     logger.info("Processing mock data file %s for table %s", data_file.name, table_name)
 
-    async with db_manager.engine.begin() as conn:
-        try:
-            table = await _reflect_table(conn, table_name)
-        except NoSuchTableError:
-            logger.warning("Table %s does not exist; skipping %s", table_name, data_file.name)
-            return
-        except SQLAlchemyError as exc:
-            logger.error("Failed to reflect table %s: %s", table_name, exc)
-            return
-
-        row_count = await conn.scalar(select(func.count()).select_from(table))
-        if row_count and row_count > 0:
-            logger.info("Table %s already has %d rows; skipping mock insert", table_name, row_count)
-            return
-
-        try:
-            raw_records = json.loads(data_file.read_text(encoding="utf-8"))
-        except json.JSONDecodeError as exc:
-            logger.error("Invalid JSON in %s: %s", data_file.name, exc)
-            return
-
-        records = _prepare_records(raw_records, table)
-        if not records:
-            logger.warning("No valid records found in %s after preparing data", data_file.name)
-            return
-
-        try:
-            await conn.execute(table.insert(), records)
-            logger.info("Inserted %d mock records into %s", len(records), table_name)
-        except SQLAlchemyError as exc:
-            logger.error("Failed to insert mock data into %s: %s", table_name, exc)
+    # Table definitions come from the models; initialize_database has already created them
+    table = Base.metadata.tables.get(table_name)
+    if table is None:
+        logger.warning("No model defines table %s; skipping %s", table_name, data_file.name)
+        return
+
+    inserted = 0
+    try:
+        # A failure rolls back the whole file, so a table is either fully loaded or left empty
+        async with db_manager.engine.begin() as conn:
+            has_rows = await conn.scalar(select(literal(1)).select_from(table).limit(1))
+            if has_rows:
+                logger.info("Table %s already has rows; skipping mock insert", table_name)
+                return
+
+            batches = _RecordBatches(data_file, table)
+            while True:
+                # Reading, JSON decoding and coercion run off the event loop
+                records = await asyncio.to_thread(batches.next_batch)
+                if not records:
+                    break
+                await _insert_batch(conn, table, records)
+                inserted += len(records)
+            if inserted:
+                await _reset_sequence(conn, table)
+    except (ValueError, UnicodeDecodeError) as exc:
+        logger.error("Invalid JSON in %s: %s", data_file.name, exc)
+        return
+    except SQLAlchemyError as exc:
+        logger.error("Failed to insert mock data into %s: %s", table_name, exc)
+        return
+
+    if inserted:
+        logger.info("Inserted %d mock records into %s", inserted, table_name)
+    else:
+        logger.warning("No valid records found in %s after preparing data", data_file.name)
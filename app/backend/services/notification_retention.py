@@ -0,0 +1,74 @@
+"""
+Retention of read notifications.
+
+Each worker runs a background task that, every `notification_retention_interval_seconds`,
+deletes read notifications older than `notification_retention_days`. Rows are deleted
+in batches of `notification_retention_batch_size`, each in its own short transaction,
+so the SQLite writer lock and PostgreSQL row locks are never held for long. Workers
+that run concurrently only delete the same rows twice, which is harmless.
+"""
+
+import asyncio
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+from core.config import settings
+from core.database import db_manager
+from services.notifications import NotificationsService
+
+logger = logging.getLogger(__name__)
+
+_task: Optional[asyncio.Task] = None
+
+
+async def purge_read_notifications(retention_days: int, batch_size: int) -> int:
+    """Delete read notifications created more than `retention_days` ago; returns the number deleted."""
+    # Whole days: a date prefix compares correctly against any ISO timestamp format
+    created_before = (datetime.now(timezone.utc) - timedelta(days=retention_days)).date().isoformat()
+    deleted, after_id = 0, 0
+    while True:
+        async with db_manager.async_session_maker() as db:
+            ids = await NotificationsService(db).delete_read_batch(created_before, batch_size, after_id)
+        deleted += len(ids)
+        if len(ids) < batch_size:
+            return deleted
+        after_id = ids[-1]
+        await asyncio.sleep(0)  # Let requests waiting for the writer in between batches
+
+
+async def _run() -> None:
+    interval = settings.notification_retention_interval_seconds
+    while True:
+        try:
+            deleted = await purge_read_notifications(
+                settings.notification_retention_days, settings.notification_retention_batch_size
+            )
+            if deleted:
+                logger.info("Deleted %d read notifications older than %d days", deleted,
+                            settings.notification_retention_days)
+        except Exception as e:
+            logger.error(f"Notification retention run failed: {e}")
+        await asyncio.sleep(interval)
+
+
+def start_notification_retention():
+    """Start the retention task; disabled with NOTIFICATION_RETENTION_DAYS=0 and on Lambda."""
+    global _task
+    if settings.notification_retention_days <= 0 or settings.is_lambda or not db_manager.async_session_maker:
+        return
+    if _task is None or _task.done():
+        _task = asyncio.get_running_loop().create_task(_run())
+        logger.info("Notification retention enabled: read notifications are kept %d days",
+                    settings.notification_retention_days)
+
+
+async def stop_notification_retention():
+    global _task
+    if _task is not None:
+        _task.cancel()
+        try:
+            await _task
+        except asyncio.CancelledError:
+            pass
+        _task = None
@@ -1,14 +1,22 @@
 import logging
 from typing import Optional, Dict, Any, List
 
-from sqlalchemy import select, func
+from sqlalchemy import and_, delete, false, func, or_, select, true, update
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from core.change_feed import read_changes, record_changes_async
+from core.statement_cache import by_field_statement, by_id_statement, list_statements
 from models.notifications import Notifications
 
 logger = logging.getLogger(__name__)
 
 
+def _unread_condition(user_id: str):
+    # NULL is_read counts as unread; both branches are ranges of the (user_id, is_read) index
+    table = Notifications.__table__
+    return and_(table.c.user_id == user_id, or_(table.c.is_read == false(), table.c.is_read.is_(None)))
+
+
 # ------------------ Service Layer ------------------
 class NotificationsService:
     """Service layer for Notifications operations"""
@@ -25,7 +33,7 @@ class NotificationsService:
             self.db.add(obj)
             await self.db.commit()
             await self.db.refresh(obj)
-            logger.info(f"Created notifications with id: {obj.id}")
+            logger.info("Created notifications with id: %s", obj.id)
             return obj
         except Exception as e:
             await self.db.rollback()
@@ -44,10 +52,8 @@ class NotificationsService:
     async def get_by_id(self, obj_id: int, user_id: Optional[str] = None) -> Optional[Notifications]:
         """Get notifications by ID (user can only see their own records)"""
         try:
-            query = select(Notifications).where(Notifications.id == obj_id)
-            if user_id:
-                query = query.where(Notifications.user_id == user_id)
-            result = await self.db.execute(query)
+            query, params = by_id_statement(Notifications, obj_id, user_id=user_id)
+            result = await self.db.execute(query, params)
             return result.scalar_one_or_none()
         except Exception as e:
             logger.error(f"Error fetching notifications {obj_id}: {str(e)}")
@@ -63,34 +69,13 @@ class NotificationsService:
     ) -> Dict[str, Any]:
         """Get paginated list of notificationss (user can only see their own records)"""
         try:
-            query = select(Notifications)
-            count_query = select(func.count(Notifications.id))
-            
-            if user_id:
-                query = query.where(Notifications.user_id == user_id)
-                count_query = count_query.where(Notifications.user_id == user_id)
-            
-            if query_dict:
-                for field, value in query_dict.items():
-                    if hasattr(Notifications, field):
-                        query = query.where(getattr(Notifications, field) == value)
-                        count_query = count_query.where(getattr(Notifications, field) == value)
-            
-            count_result = await self.db.execute(count_query)
+            query, count_query, params = list_statements(
+                Notifications, skip, limit, user_id=user_id, query_dict=query_dict, sort=sort
+            )
+            count_result = await self.db.execute(count_query, params)
             total = count_result.scalar()
 
-            if sort:
-                if sort.startswith('-'):
-                    field_name = sort[1:]
-                    if hasattr(Notifications, field_name):
-                        query = query.order_by(getattr(Notifications, field_name).desc())
-                else:
-                    if hasattr(Notifications, sort):
-                        query = query.order_by(getattr(Notifications, sort))
-            else:
-                query = query.order_by(Notifications.id.desc())
-
-            result = await self.db.execute(query.offset(skip).limit(limit))
+            result = await self.db.execute(query, params)
             items = result.scalars().all()
 
             return {
@@ -103,6 +88,71 @@ class NotificationsService:
             logger.error(f"Error fetching notifications list: {str(e)}")
             raise
 
+    async def get_changes(self, since: Optional[int], limit: int = 500, user_id: Optional[str] = None) -> Dict[str, Any]:
+        """Get notificationss changed after version `since` (user can only see their own records)"""
+        try:
+            return await read_changes(self.db, Notifications, since, limit, user_id=user_id)
+        except Exception as e:
+            logger.error(f"Error fetching notifications changes: {str(e)}")
+            raise
+
+    async def count_unread(self, user_id: str) -> int:
+        """Count the user's unread notifications"""
+        try:
+            query = select(func.count()).select_from(Notifications.__table__).where(_unread_condition(user_id))
+            return await self.db.scalar(query)
+        except Exception as e:
+            logger.error(f"Error counting unread notifications: {str(e)}")
+            raise
+
+    async def mark_all_read(self, user_id: str, up_to_id: Optional[int] = None) -> int:
+        """Mark the user's unread notifications (up to `up_to_id`) read with one UPDATE; returns the number marked"""
+        table = Notifications.__table__
+        try:
+            condition = _unread_condition(user_id)
+            if up_to_id is not None:
+                condition = and_(condition, table.c.id <= up_to_id)
+            if self.db.get_bind().dialect.update_returning:
+                statement = update(table).where(condition).values(is_read=True).returning(table.c.id)
+                ids = (await self.db.execute(statement)).scalars().all()
+            else:
+                ids = (await self.db.scalars(select(table.c.id).where(condition))).all()
+                if ids:
+                    await self.db.execute(update(table).where(table.c.id.in_(ids)).values(is_read=True))
+            await record_changes_async(self.db, table, [(row_id, user_id, "update") for row_id in ids])
+            await self.db.commit()
+            logger.info("Marked %s notifications read for user %s", len(ids), user_id)
+            return len(ids)
+        except Exception as e:
+            await self.db.rollback()
+            logger.error(f"Error marking notifications read: {str(e)}")
+            raise
+
+    async def delete_read_batch(self, created_before: str, batch_size: int, after_id: int = 0) -> List[int]:
+        """Delete up to `batch_size` read notifications created before `created_before`, in id order after `after_id`
+
+        created_at holds ISO-8601 text, so it is compared as a string; rows without it are kept.
+        Returns the deleted ids.
+        """
+        table = Notifications.__table__
+        try:
+            query = (
+                select(table.c.id, table.c.user_id)
+                .where(table.c.id > after_id, table.c.is_read == true(), table.c.created_at < created_before)
+                .order_by(table.c.id)
+                .limit(batch_size)
+            )
+            rows = (await self.db.execute(query)).all()
+            if rows:
+                await self.db.execute(delete(table).where(table.c.id.in_([row.id for row in rows])))
+                await record_changes_async(self.db, table, [(row.id, row.user_id, "delete") for row in rows])
+                await self.db.commit()
+            return [row.id for row in rows]
+        except Exception as e:
+            await self.db.rollback()
+            logger.error(f"Error deleting read notifications: {str(e)}")
+            raise
+
     async def update(self, obj_id: int, update_data: Dict[str, Any], user_id: Optional[str] = None) -> Optional[Notifications]:
         """Update notifications (requires ownership)"""
         try:
@@ -116,7 +166,7 @@ class NotificationsService:
 
             await self.db.commit()
             await self.db.refresh(obj)
-            logger.info(f"Updated notifications {obj_id}")
+            logger.info("Updated notifications %s", obj_id)
             return obj
         except Exception as e:
             await self.db.rollback()
@@ -132,7 +182,7 @@ class NotificationsService:
                 return False
             await self.db.delete(obj)
             await self.db.commit()
-            logger.info(f"Deleted notifications {obj_id}")
+            logger.info("Deleted notifications %s", obj_id)
             return True
         except Exception as e:
             await self.db.rollback()
@@ -144,9 +194,8 @@ class NotificationsService:
         try:
             if not hasattr(Notifications, field_name):
                 raise ValueError(f"Field {field_name} does not exist on Notifications")
-            result = await self.db.execute(
-                select(Notifications).where(getattr(Notifications, field_name) == field_value)
-            )
+            query, params = by_field_statement(Notifications, field_name, field_value)
+            result = await self.db.execute(query, params)
             return result.scalar_one_or_none()
         except Exception as e:
             logger.error(f"Error fetching notifications by {field_name}: {str(e)}")
@@ -159,13 +208,8 @@ class NotificationsService:
         try:
             if not hasattr(Notifications, field_name):
                 raise ValueError(f"Field {field_name} does not exist on Notifications")
-            result = await self.db.execute(
-                select(Notifications)
-                .where(getattr(Notifications, field_name) == field_value)
-                .offset(skip)
-                .limit(limit)
-                .order_by(Notifications.id.desc())
-            )
+            query, params = by_field_statement(Notifications, field_name, field_value, skip=skip, limit=limit)
+            result = await self.db.execute(query, params)
             return result.scalars().all()
         except Exception as e:
             logger.error(f"Error fetching notificationss by {field_name}: {str(e)}")
@@ -0,0 +1,57 @@
+"""
+Upkeep of the monthly partitions (core/partitioning.py).
+
+On PostgreSQL each worker runs a background task that, every
+`partition_maintenance_interval_seconds`, creates the partitions of the current month
+and the next `partition_months_ahead` months, so inserts never fall back to the
+default partition. Tables that are still empty are partitioned on the first run. An
+advisory lock keeps workers from doing the same work at once. On SQLite, Lambda or with
+PARTITIONING_ENABLED=false the task is not started; run
+`scripts/manage_partitions.py maintain` from a scheduler instead.
+"""
+
+import asyncio
+import logging
+from datetime import datetime, timezone
+from typing import Optional
+
+from core.config import settings
+from core.database import db_manager
+from core.partitioning import maintain_partitions, supports_partitioning
+
+logger = logging.getLogger(__name__)
+
+_task: Optional[asyncio.Task] = None
+
+
+async def _run() -> None:
+    while True:
+        try:
+            created = await maintain_partitions(
+                db_manager.engine, datetime.now(timezone.utc).date(), settings.partition_months_ahead
+            )
+            for table, names in created.items():
+                logger.info("Created %d partition(s) of %s", len(names), table)
+        except Exception as e:
+            logger.error(f"Partition maintenance failed: {e}")
+        await asyncio.sleep(settings.partition_maintenance_interval_seconds)
+
+
+def start_partition_maintenance():
+    global _task
+    if not settings.partitioning_enabled or settings.is_lambda or not supports_partitioning(db_manager.engine):
+        return
+    if _task is None or _task.done():
+        _task = asyncio.get_running_loop().create_task(_run())
+        logger.info("Partition maintenance enabled: %d months ahead", settings.partition_months_ahead)
+
+
+async def stop_partition_maintenance():
+    global _task
+    if _task is not None:
+        _task.cancel()
+        try:
+            await _task
+        except asyncio.CancelledError:
+            pass
+        _task = None
@@ -218,7 +218,7 @@ class PaymentService:
             CheckoutError: If there"s an error creating the checkout session.
         """
         try:
-            logger.info(f"create checkout session with request: {request}")
+            logger.info("create checkout session with request: %s", request)
 
             # Prepare line items based on payment method/mode
             if request.mode == "subscription":
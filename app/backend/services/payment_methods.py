@@ -1,9 +1,10 @@
 import logging
 from typing import Optional, Dict, Any, List
 
-from sqlalchemy import select, func
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from core.change_feed import read_changes
+from core.statement_cache import by_field_statement, by_id_statement, list_statements
 from models.payment_methods import Payment_methods
 
 logger = logging.getLogger(__name__)
@@ -23,7 +24,7 @@ class Payment_methodsService:
             self.db.add(obj)
             await self.db.commit()
             await self.db.refresh(obj)
-            logger.info(f"Created payment_methods with id: {obj.id}")
+            logger.info("Created payment_methods with id: %s", obj.id)
             return obj
         except Exception as e:
             await self.db.rollback()
@@ -33,8 +34,8 @@ class Payment_methodsService:
     async def get_by_id(self, obj_id: int) -> Optional[Payment_methods]:
         """Get payment_methods by ID"""
         try:
-            query = select(Payment_methods).where(Payment_methods.id == obj_id)
-            result = await self.db.execute(query)
+            query, params = by_id_statement(Payment_methods, obj_id)
+            result = await self.db.execute(query, params)
             return result.scalar_one_or_none()
         except Exception as e:
             logger.error(f"Error fetching payment_methods {obj_id}: {str(e)}")
@@ -49,30 +50,13 @@ class Payment_methodsService:
     ) -> Dict[str, Any]:
         """Get paginated list of payment_methodss"""
         try:
-            query = select(Payment_methods)
-            count_query = select(func.count(Payment_methods.id))
-            
-            if query_dict:
-                for field, value in query_dict.items():
-                    if hasattr(Payment_methods, field):
-                        query = query.where(getattr(Payment_methods, field) == value)
-                        count_query = count_query.where(getattr(Payment_methods, field) == value)
-            
-            count_result = await self.db.execute(count_query)
+            query, count_query, params = list_statements(
+                Payment_methods, skip, limit, query_dict=query_dict, sort=sort
+            )
+            count_result = await self.db.execute(count_query, params)
             total = count_result.scalar()
 
-            if sort:
-                if sort.startswith('-'):
-                    field_name = sort[1:]
-                    if hasattr(Payment_methods, field_name):
-                        query = query.order_by(getattr(Payment_methods, field_name).desc())
-                else:
-                    if hasattr(Payment_methods, sort):
-                        query = query.order_by(getattr(Payment_methods, sort))
-            else:
-                query = query.order_by(Payment_methods.id.desc())
-
-            result = await self.db.execute(query.offset(skip).limit(limit))
+            result = await self.db.execute(query, params)
             items = result.scalars().all()
 
             return {
@@ -85,6 +69,14 @@ class Payment_methodsService:
             logger.error(f"Error fetching payment_methods list: {str(e)}")
             raise
 
+    async def get_changes(self, since: Optional[int], limit: int = 500) -> Dict[str, Any]:
+        """Get payment_methodss changed after version `since`"""
+        try:
+            return await read_changes(self.db, Payment_methods, since, limit)
+        except Exception as e:
+            logger.error(f"Error fetching payment_methods changes: {str(e)}")
+            raise
+
     async def update(self, obj_id: int, update_data: Dict[str, Any]) -> Optional[Payment_methods]:
         """Update payment_methods"""
         try:
@@ -98,7 +90,7 @@ class Payment_methodsService:
 
             await self.db.commit()
             await self.db.refresh(obj)
-            logger.info(f"Updated payment_methods {obj_id}")
+            logger.info("Updated payment_methods %s", obj_id)
             return obj
         except Exception as e:
             await self.db.rollback()
@@ -114,7 +106,7 @@ class Payment_methodsService:
                 return False
             await self.db.delete(obj)
             await self.db.commit()
-            logger.info(f"Deleted payment_methods {obj_id}")
+            logger.info("Deleted payment_methods %s", obj_id)
             return True
         except Exception as e:
             await self.db.rollback()
@@ -126,9 +118,8 @@ class Payment_methodsService:
         try:
             if not hasattr(Payment_methods, field_name):
                 raise ValueError(f"Field {field_name} does not exist on Payment_methods")
-            result = await self.db.execute(
-                select(Payment_methods).where(getattr(Payment_methods, field_name) == field_value)
-            )
+            query, params = by_field_statement(Payment_methods, field_name, field_value)
+            result = await self.db.execute(query, params)
             return result.scalar_one_or_none()
         except Exception as e:
             logger.error(f"Error fetching payment_methods by {field_name}: {str(e)}")
@@ -141,13 +132,8 @@ class Payment_methodsService:
         try:
             if not hasattr(Payment_methods, field_name):
                 raise ValueError(f"Field {field_name} does not exist on Payment_methods")
-            result = await self.db.execute(
-                select(Payment_methods)
-                .where(getattr(Payment_methods, field_name) == field_value)
-                .offset(skip)
-                .limit(limit)
-                .order_by(Payment_methods.id.desc())
-            )
+            query, params = by_field_statement(Payment_methods, field_name, field_value, skip=skip, limit=limit)
+            result = await self.db.execute(query, params)
             return result.scalars().all()
         except Exception as e:
             logger.error(f"Error fetching payment_methodss by {field_name}: {str(e)}")
@@ -1,9 +1,10 @@
 import logging
 from typing import Optional, Dict, Any, List
 
-from sqlalchemy import select, func
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from core.change_feed import read_changes
+from core.statement_cache import by_field_statement, by_id_statement, list_statements
 from models.products import Products
 
 logger = logging.getLogger(__name__)
@@ -23,7 +24,7 @@ class ProductsService:
             self.db.add(obj)
             await self.db.commit()
             await self.db.refresh(obj)
-            logger.info(f"Created products with id: {obj.id}")
+            logger.info("Created products with id: %s", obj.id)
             return obj
         except Exception as e:
             await self.db.rollback()
@@ -33,8 +34,8 @@ class ProductsService:
     async def get_by_id(self, obj_id: int) -> Optional[Products]:
         """Get products by ID"""
         try:
-            query = select(Products).where(Products.id == obj_id)
-            result = await self.db.execute(query)
+            query, params = by_id_statement(Products, obj_id)
+            result = await self.db.execute(query, params)
             return result.scalar_one_or_none()
         except Exception as e:
             logger.error(f"Error fetching products {obj_id}: {str(e)}")
@@ -49,30 +50,13 @@ class ProductsService:
     ) -> Dict[str, Any]:
         """Get paginated list of productss"""
         try:
-            query = select(Products)
-            count_query = select(func.count(Products.id))
-            
-            if query_dict:
-                for field, value in query_dict.items():
-                    if hasattr(Products, field):
-                        query = query.where(getattr(Products, field) == value)
-                        count_query = count_query.where(getattr(Products, field) == value)
-            
-            count_result = await self.db.execute(count_query)
+            query, count_query, params = list_statements(
+                Products, skip, limit, query_dict=query_dict, sort=sort
+            )
+            count_result = await self.db.execute(count_query, params)
             total = count_result.scalar()
 
-            if sort:
-                if sort.startswith('-'):
-                    field_name = sort[1:]
-                    if hasattr(Products, field_name):
-                        query = query.order_by(getattr(Products, field_name).desc())
-                else:
-                    if hasattr(Products, sort):
-                        query = query.order_by(getattr(Products, sort))
-            else:
-                query = query.order_by(Products.id.desc())
-
-            result = await self.db.execute(query.offset(skip).limit(limit))
+            result = await self.db.execute(query, params)
             items = result.scalars().all()
 
             return {
@@ -85,6 +69,14 @@ class ProductsService:
             logger.error(f"Error fetching products list: {str(e)}")
             raise
 
+    async def get_changes(self, since: Optional[int], limit: int = 500) -> Dict[str, Any]:
+        """Get productss changed after version `since`"""
+        try:
+            return await read_changes(self.db, Products, since, limit)
+        except Exception as e:
+            logger.error(f"Error fetching products changes: {str(e)}")
+            raise
+
     async def update(self, obj_id: int, update_data: Dict[str, Any]) -> Optional[Products]:
         """Update products"""
         try:
@@ -98,7 +90,7 @@ class ProductsService:
 
             await self.db.commit()
             await self.db.refresh(obj)
-            logger.info(f"Updated products {obj_id}")
+            logger.info("Updated products %s", obj_id)
             return obj
         except Exception as e:
             await self.db.rollback()
@@ -114,7 +106,7 @@ class ProductsService:
                 return False
             await self.db.delete(obj)
             await self.db.commit()
-            logger.info(f"Deleted products {obj_id}")
+            logger.info("Deleted products %s", obj_id)
             return True
         except Exception as e:
             await self.db.rollback()
@@ -126,9 +118,8 @@ class ProductsService:
         try:
             if not hasattr(Products, field_name):
                 raise ValueError(f"Field {field_name} does not exist on Products")
-            result = await self.db.execute(
-                select(Products).where(getattr(Products, field_name) == field_value)
-            )
+            query, params = by_field_statement(Products, field_name, field_value)
+            result = await self.db.execute(query, params)
             return result.scalar_one_or_none()
         except Exception as e:
             logger.error(f"Error fetching products by {field_name}: {str(e)}")
@@ -141,13 +132,8 @@ class ProductsService:
         try:
             if not hasattr(Products, field_name):
                 raise ValueError(f"Field {field_name} does not exist on Products")
-            result = await self.db.execute(
-                select(Products)
-                .where(getattr(Products, field_name) == field_value)
-                .offset(skip)
-                .limit(limit)
-                .order_by(Products.id.desc())
-            )
+            query, params = by_field_statement(Products, field_name, field_value, skip=skip, limit=limit)
+            result = await self.db.execute(query, params)
             return result.scalars().all()
         except Exception as e:
             logger.error(f"Error fetching productss by {field_name}: {str(e)}")
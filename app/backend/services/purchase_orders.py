@@ -1,9 +1,11 @@
 import logging
 from typing import Optional, Dict, Any, List
 
-from sqlalchemy import select, func
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from core.change_feed import read_changes
+from core.statement_cache import by_field_statement, by_id_statement, list_statements
+from core.upsert import bulk_upsert
 from models.purchase_orders import Purchase_orders
 
 logger = logging.getLogger(__name__)
@@ -25,13 +27,26 @@ class Purchase_ordersService:
             self.db.add(obj)
             await self.db.commit()
             await self.db.refresh(obj)
-            logger.info(f"Created purchase_orders with id: {obj.id}")
+            logger.info("Created purchase_orders with id: %s", obj.id)
             return obj
         except Exception as e:
             await self.db.rollback()
             logger.error(f"Error creating purchase_orders: {str(e)}")
             raise
 
+    async def upsert_batch(self, items: List[Dict[str, Any]], user_id: str) -> int:
+        """Insert or update purchase_orderss matched on the user's po_number in bulk; returns the number written"""
+        try:
+            rows = [{**item, 'user_id': user_id} for item in items]
+            count = await bulk_upsert(self.db, Purchase_orders.__table__, rows, ("user_id", "po_number"))
+            await self.db.commit()
+            logger.info("Upserted %s purchase_orderss", count)
+            return count
+        except Exception as e:
+            await self.db.rollback()
+            logger.error(f"Error upserting purchase_orderss: {str(e)}")
+            raise
+
     async def check_ownership(self, obj_id: int, user_id: str) -> bool:
         """Check if user owns this record"""
         try:
@@ -44,10 +59,8 @@ class Purchase_ordersService:
     async def get_by_id(self, obj_id: int, user_id: Optional[str] = None) -> Optional[Purchase_orders]:
         """Get purchase_orders by ID (user can only see their own records)"""
         try:
-            query = select(Purchase_orders).where(Purchase_orders.id == obj_id)
-            if user_id:
-                query = query.where(Purchase_orders.user_id == user_id)
-            result = await self.db.execute(query)
+            query, params = by_id_statement(Purchase_orders, obj_id, user_id=user_id)
+            result = await self.db.execute(query, params)
             return result.scalar_one_or_none()
         except Exception as e:
             logger.error(f"Error fetching purchase_orders {obj_id}: {str(e)}")
@@ -63,34 +76,13 @@ class Purchase_ordersService:
     ) -> Dict[str, Any]:
         """Get paginated list of purchase_orderss (user can only see their own records)"""
         try:
-            query = select(Purchase_orders)
-            count_query = select(func.count(Purchase_orders.id))
-            
-            if user_id:
-                query = query.where(Purchase_orders.user_id == user_id)
-                count_query = count_query.where(Purchase_orders.user_id == user_id)
-            
-            if query_dict:
-                for field, value in query_dict.items():
-                    if hasattr(Purchase_orders, field):
-                        query = query.where(getattr(Purchase_orders, field) == value)
-                        count_query = count_query.where(getattr(Purchase_orders, field) == value)
-            
-            count_result = await self.db.execute(count_query)
+            query, count_query, params = list_statements(
+                Purchase_orders, skip, limit, user_id=user_id, query_dict=query_dict, sort=sort
+            )
+            count_result = await self.db.execute(count_query, params)
             total = count_result.scalar()
 
-            if sort:
-                if sort.startswith('-'):
-                    field_name = sort[1:]
-                    if hasattr(Purchase_orders, field_name):
-                        query = query.order_by(getattr(Purchase_orders, field_name).desc())
-                else:
-                    if hasattr(Purchase_orders, sort):
-                        query = query.order_by(getattr(Purchase_orders, sort))
-            else:
-                query = query.order_by(Purchase_orders.id.desc())
-
-            result = await self.db.execute(query.offset(skip).limit(limit))
+            result = await self.db.execute(query, params)
             items = result.scalars().all()
 
             return {
@@ -103,6 +95,14 @@ class Purchase_ordersService:
             logger.error(f"Error fetching purchase_orders list: {str(e)}")
             raise
 
+    async def get_changes(self, since: Optional[int], limit: int = 500, user_id: Optional[str] = None) -> Dict[str, Any]:
+        """Get purchase_orderss changed after version `since` (user can only see their own records)"""
+        try:
+            return await read_changes(self.db, Purchase_orders, since, limit, user_id=user_id)
+        except Exception as e:
+            logger.error(f"Error fetching purchase_orders changes: {str(e)}")
+            raise
+
     async def update(self, obj_id: int, update_data: Dict[str, Any], user_id: Optional[str] = None) -> Optional[Purchase_orders]:
         """Update purchase_orders (requires ownership)"""
         try:
@@ -116,7 +116,7 @@ class Purchase_ordersService:
 
             await self.db.commit()
             await self.db.refresh(obj)
-            logger.info(f"Updated purchase_orders {obj_id}")
+            logger.info("Updated purchase_orders %s", obj_id)
             return obj
         except Exception as e:
             await self.db.rollback()
@@ -132,7 +132,7 @@ class Purchase_ordersService:
                 return False
             await self.db.delete(obj)
             await self.db.commit()
-            logger.info(f"Deleted purchase_orders {obj_id}")
+            logger.info("Deleted purchase_orders %s", obj_id)
             return True
         except Exception as e:
             await self.db.rollback()
@@ -144,9 +144,8 @@ class Purchase_ordersService:
         try:
             if not hasattr(Purchase_orders, field_name):
                 raise ValueError(f"Field {field_name} does not exist on Purchase_orders")
-            result = await self.db.execute(
-                select(Purchase_orders).where(getattr(Purchase_orders, field_name) == field_value)
-            )
+            query, params = by_field_statement(Purchase_orders, field_name, field_value)
+            result = await self.db.execute(query, params)
             return result.scalar_one_or_none()
         except Exception as e:
             logger.error(f"Error fetching purchase_orders by {field_name}: {str(e)}")
@@ -159,13 +158,8 @@ class Purchase_ordersService:
         try:
             if not hasattr(Purchase_orders, field_name):
                 raise ValueError(f"Field {field_name} does not exist on Purchase_orders")
-            result = await self.db.execute(
-                select(Purchase_orders)
-                .where(getattr(Purchase_orders, field_name) == field_value)
-                .offset(skip)
-                .limit(limit)
-                .order_by(Purchase_orders.id.desc())
-            )
+            query, params = by_field_statement(Purchase_orders, field_name, field_value, skip=skip, limit=limit)
+            result = await self.db.execute(query, params)
             return result.scalars().all()
         except Exception as e:
             logger.error(f"Error fetching purchase_orderss by {field_name}: {str(e)}")
@@ -1,9 +1,11 @@
 import logging
 from typing import Optional, Dict, Any, List
 
-from sqlalchemy import select, func
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from core.change_feed import read_changes
+from core.statement_cache import by_field_statement, by_id_statement, list_statements
+from core.upsert import bulk_upsert
 from models.receipts import Receipts
 
 logger = logging.getLogger(__name__)
@@ -25,13 +27,26 @@ class ReceiptsService:
             self.db.add(obj)
             await self.db.commit()
             await self.db.refresh(obj)
-            logger.info(f"Created receipts with id: {obj.id}")
+            logger.info("Created receipts with id: %s", obj.id)
             return obj
         except Exception as e:
             await self.db.rollback()
             logger.error(f"Error creating receipts: {str(e)}")
             raise
 
+    async def upsert_batch(self, items: List[Dict[str, Any]], user_id: str) -> int:
+        """Insert or update receiptss matched on the user's receipt_number in bulk; returns the number written"""
+        try:
+            rows = [{**item, 'user_id': user_id} for item in items]
+            count = await bulk_upsert(self.db, Receipts.__table__, rows, ("user_id", "receipt_number"))
+            await self.db.commit()
+            logger.info("Upserted %s receiptss", count)
+            return count
+        except Exception as e:
+            await self.db.rollback()
+            logger.error(f"Error upserting receiptss: {str(e)}")
+            raise
+
     async def check_ownership(self, obj_id: int, user_id: str) -> bool:
         """Check if user owns this record"""
         try:
@@ -44,10 +59,8 @@ class ReceiptsService:
     async def get_by_id(self, obj_id: int, user_id: Optional[str] = None) -> Optional[Receipts]:
         """Get receipts by ID (user can only see their own records)"""
         try:
-            query = select(Receipts).where(Receipts.id == obj_id)
-            if user_id:
-                query = query.where(Receipts.user_id == user_id)
-            result = await self.db.execute(query)
+            query, params = by_id_statement(Receipts, obj_id, user_id=user_id)
+            result = await self.db.execute(query, params)
             return result.scalar_one_or_none()
         except Exception as e:
             logger.error(f"Error fetching receipts {obj_id}: {str(e)}")
@@ -63,34 +76,13 @@ class ReceiptsService:
     ) -> Dict[str, Any]:
         """Get paginated list of receiptss (user can only see their own records)"""
         try:
-            query = select(Receipts)
-            count_query = select(func.count(Receipts.id))
-            
-            if user_id:
-                query = query.where(Receipts.user_id == user_id)
-                count_query = count_query.where(Receipts.user_id == user_id)
-            
-            if query_dict:
-                for field, value in query_dict.items():
-                    if hasattr(Receipts, field):
-                        query = query.where(getattr(Receipts, field) == value)
-                        count_query = count_query.where(getattr(Receipts, field) == value)
-            
-            count_result = await self.db.execute(count_query)
+            query, count_query, params = list_statements(
+                Receipts, skip, limit, user_id=user_id, query_dict=query_dict, sort=sort
+            )
+            count_result = await self.db.execute(count_query, params)
             total = count_result.scalar()
 
-            if sort:
-                if sort.startswith('-'):
-                    field_name = sort[1:]
-                    if hasattr(Receipts, field_name):
-                        query = query.order_by(getattr(Receipts, field_name).desc())
-                else:
-                    if hasattr(Receipts, sort):
-                        query = query.order_by(getattr(Receipts, sort))
-            else:
-                query = query.order_by(Receipts.id.desc())
-
-            result = await self.db.execute(query.offset(skip).limit(limit))
+            result = await self.db.execute(query, params)
             items = result.scalars().all()
 
             return {
@@ -103,6 +95,14 @@ class ReceiptsService:
             logger.error(f"Error fetching receipts list: {str(e)}")
             raise
 
+    async def get_changes(self, since: Optional[int], limit: int = 500, user_id: Optional[str] = None) -> Dict[str, Any]:
+        """Get receiptss changed after version `since` (user can only see their own records)"""
+        try:
+            return await read_changes(self.db, Receipts, since, limit, user_id=user_id)
+        except Exception as e:
+            logger.error(f"Error fetching receipts changes: {str(e)}")
+            raise
+
     async def update(self, obj_id: int, update_data: Dict[str, Any], user_id: Optional[str] = None) -> Optional[Receipts]:
         """Update receipts (requires ownership)"""
         try:
@@ -116,7 +116,7 @@ class ReceiptsService:
 
             await self.db.commit()
             await self.db.refresh(obj)
-            logger.info(f"Updated receipts {obj_id}")
+            logger.info("Updated receipts %s", obj_id)
             return obj
         except Exception as e:
             await self.db.rollback()
@@ -132,7 +132,7 @@ class ReceiptsService:
                 return False
             await self.db.delete(obj)
             await self.db.commit()
-            logger.info(f"Deleted receipts {obj_id}")
+            logger.info("Deleted receipts %s", obj_id)
             return True
         except Exception as e:
             await self.db.rollback()
@@ -144,9 +144,8 @@ class ReceiptsService:
         try:
             if not hasattr(Receipts, field_name):
                 raise ValueError(f"Field {field_name} does not exist on Receipts")
-            result = await self.db.execute(
-                select(Receipts).where(getattr(Receipts, field_name) == field_value)
-            )
+            query, params = by_field_statement(Receipts, field_name, field_value)
+            result = await self.db.execute(query, params)
             return result.scalar_one_or_none()
         except Exception as e:
             logger.error(f"Error fetching receipts by {field_name}: {str(e)}")
@@ -159,13 +158,8 @@ class ReceiptsService:
         try:
             if not hasattr(Receipts, field_name):
                 raise ValueError(f"Field {field_name} does not exist on Receipts")
-            result = await self.db.execute(
-                select(Receipts)
-                .where(getattr(Receipts, field_name) == field_value)
-                .offset(skip)
-                .limit(limit)
-                .order_by(Receipts.id.desc())
-            )
+            query, params = by_field_statement(Receipts, field_name, field_value, skip=skip, limit=limit)
+            result = await self.db.execute(query, params)
             return result.scalars().all()
         except Exception as e:
             logger.error(f"Error fetching receiptss by {field_name}: {str(e)}")
@@ -1,9 +1,10 @@
 import logging
 from typing import Optional, Dict, Any, List
 
-from sqlalchemy import select, func
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from core.change_feed import read_changes
+from core.statement_cache import by_field_statement, by_id_statement, list_statements
 from models.return_items import Return_items
 
 logger = logging.getLogger(__name__)
@@ -25,7 +26,7 @@ class Return_itemsService:
             self.db.add(obj)
             await self.db.commit()
             await self.db.refresh(obj)
-            logger.info(f"Created return_items with id: {obj.id}")
+            logger.info("Created return_items with id: %s", obj.id)
             return obj
         except Exception as e:
             await self.db.rollback()
@@ -44,10 +45,8 @@ class Return_itemsService:
     async def get_by_id(self, obj_id: int, user_id: Optional[str] = None) -> Optional[Return_items]:
         """Get return_items by ID (user can only see their own records)"""
         try:
-            query = select(Return_items).where(Return_items.id == obj_id)
-            if user_id:
-                query = query.where(Return_items.user_id == user_id)
-            result = await self.db.execute(query)
+            query, params = by_id_statement(Return_items, obj_id, user_id=user_id)
+            result = await self.db.execute(query, params)
             return result.scalar_one_or_none()
         except Exception as e:
             logger.error(f"Error fetching return_items {obj_id}: {str(e)}")
@@ -63,34 +62,13 @@ class Return_itemsService:
     ) -> Dict[str, Any]:
         """Get paginated list of return_itemss (user can only see their own records)"""
         try:
-            query = select(Return_items)
-            count_query = select(func.count(Return_items.id))
-            
-            if user_id:
-                query = query.where(Return_items.user_id == user_id)
-                count_query = count_query.where(Return_items.user_id == user_id)
-            
-            if query_dict:
-                for field, value in query_dict.items():
-                    if hasattr(Return_items, field):
-                        query = query.where(getattr(Return_items, field) == value)
-                        count_query = count_query.where(getattr(Return_items, field) == value)
-            
-            count_result = await self.db.execute(count_query)
+            query, count_query, params = list_statements(
+                Return_items, skip, limit, user_id=user_id, query_dict=query_dict, sort=sort
+            )
+            count_result = await self.db.execute(count_query, params)
             total = count_result.scalar()
 
-            if sort:
-                if sort.startswith('-'):
-                    field_name = sort[1:]
-                    if hasattr(Return_items, field_name):
-                        query = query.order_by(getattr(Return_items, field_name).desc())
-                else:
-                    if hasattr(Return_items, sort):
-                        query = query.order_by(getattr(Return_items, sort))
-            else:
-                query = query.order_by(Return_items.id.desc())
-
-            result = await self.db.execute(query.offset(skip).limit(limit))
+            result = await self.db.execute(query, params)
             items = result.scalars().all()
 
             return {
@@ -103,6 +81,14 @@ class Return_itemsService:
             logger.error(f"Error fetching return_items list: {str(e)}")
             raise
 
+    async def get_changes(self, since: Optional[int], limit: int = 500, user_id: Optional[str] = None) -> Dict[str, Any]:
+        """Get return_itemss changed after version `since` (user can only see their own records)"""
+        try:
+            return await read_changes(self.db, Return_items, since, limit, user_id=user_id)
+        except Exception as e:
+            logger.error(f"Error fetching return_items changes: {str(e)}")
+            raise
+
     async def update(self, obj_id: int, update_data: Dict[str, Any], user_id: Optional[str] = None) -> Optional[Return_items]:
         """Update return_items (requires ownership)"""
         try:
@@ -116,7 +102,7 @@ class Return_itemsService:
 
             await self.db.commit()
             await self.db.refresh(obj)
-            logger.info(f"Updated return_items {obj_id}")
+            logger.info("Updated return_items %s", obj_id)
             return obj
         except Exception as e:
             await self.db.rollback()
@@ -132,7 +118,7 @@ class Return_itemsService:
                 return False
             await self.db.delete(obj)
             await self.db.commit()
-            logger.info(f"Deleted return_items {obj_id}")
+            logger.info("Deleted return_items %s", obj_id)
             return True
         except Exception as e:
             await self.db.rollback()
@@ -144,9 +130,8 @@ class Return_itemsService:
         try:
             if not hasattr(Return_items, field_name):
                 raise ValueError(f"Field {field_name} does not exist on Return_items")
-            result = await self.db.execute(
-                select(Return_items).where(getattr(Return_items, field_name) == field_value)
-            )
+            query, params = by_field_statement(Return_items, field_name, field_value)
+            result = await self.db.execute(query, params)
             return result.scalar_one_or_none()
         except Exception as e:
             logger.error(f"Error fetching return_items by {field_name}: {str(e)}")
@@ -159,13 +144,8 @@ class Return_itemsService:
         try:
             if not hasattr(Return_items, field_name):
                 raise ValueError(f"Field {field_name} does not exist on Return_items")
-            result = await self.db.execute(
-                select(Return_items)
-                .where(getattr(Return_items, field_name) == field_value)
-                .offset(skip)
-                .limit(limit)
-                .order_by(Return_items.id.desc())
-            )
+            query, params = by_field_statement(Return_items, field_name, field_value, skip=skip, limit=limit)
+            result = await self.db.execute(query, params)
             return result.scalars().all()
         except Exception as e:
             logger.error(f"Error fetching return_itemss by {field_name}: {str(e)}")
@@ -1,9 +1,11 @@
 import logging
 from typing import Optional, Dict, Any, List
 
-from sqlalchemy import select, func
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from core.change_feed import read_changes
+from core.statement_cache import by_field_statement, by_id_statement, list_statements
+from core.upsert import bulk_upsert
 from models.returns import Returns
 
 logger = logging.getLogger(__name__)
@@ -25,13 +27,26 @@ class ReturnsService:
             self.db.add(obj)
             await self.db.commit()
             await self.db.refresh(obj)
-            logger.info(f"Created returns with id: {obj.id}")
+            logger.info("Created returns with id: %s", obj.id)
             return obj
         except Exception as e:
             await self.db.rollback()
             logger.error(f"Error creating returns: {str(e)}")
             raise
 
+    async def upsert_batch(self, items: List[Dict[str, Any]], user_id: str) -> int:
+        """Insert or update returnss matched on the user's return_number in bulk; returns the number written"""
+        try:
+            rows = [{**item, 'user_id': user_id} for item in items]
+            count = await bulk_upsert(self.db, Returns.__table__, rows, ("user_id", "return_number"))
+            await self.db.commit()
+            logger.info("Upserted %s returnss", count)
+            return count
+        except Exception as e:
+            await self.db.rollback()
+            logger.error(f"Error upserting returnss: {str(e)}")
+            raise
+
     async def check_ownership(self, obj_id: int, user_id: str) -> bool:
         """Check if user owns this record"""
         try:
@@ -44,10 +59,8 @@ class ReturnsService:
     async def get_by_id(self, obj_id: int, user_id: Optional[str] = None) -> Optional[Returns]:
         """Get returns by ID (user can only see their own records)"""
         try:
-            query = select(Returns).where(Returns.id == obj_id)
-            if user_id:
-                query = query.where(Returns.user_id == user_id)
-            result = await self.db.execute(query)
+            query, params = by_id_statement(Returns, obj_id, user_id=user_id)
+            result = await self.db.execute(query, params)
             return result.scalar_one_or_none()
         except Exception as e:
             logger.error(f"Error fetching returns {obj_id}: {str(e)}")
@@ -63,34 +76,13 @@ class ReturnsService:
     ) -> Dict[str, Any]:
         """Get paginated list of returnss (user can only see their own records)"""
         try:
-            query = select(Returns)
-            count_query = select(func.count(Returns.id))
-            
-            if user_id:
-                query = query.where(Returns.user_id == user_id)
-                count_query = count_query.where(Returns.user_id == user_id)
-            
-            if query_dict:
-                for field, value in query_dict.items():
-                    if hasattr(Returns, field):
-                        query = query.where(getattr(Returns, field) == value)
-                        count_query = count_query.where(getattr(Returns, field) == value)
-            
-            count_result = await self.db.execute(count_query)
+            query, count_query, params = list_statements(
+                Returns, skip, limit, user_id=user_id, query_dict=query_dict, sort=sort
+            )
+            count_result = await self.db.execute(count_query, params)
             total = count_result.scalar()
 
-            if sort:
-                if sort.startswith('-'):
-                    field_name = sort[1:]
-                    if hasattr(Returns, field_name):
-                        query = query.order_by(getattr(Returns, field_name).desc())
-                else:
-                    if hasattr(Returns, sort):
-                        query = query.order_by(getattr(Returns, sort))
-            else:
-                query = query.order_by(Returns.id.desc())
-
-            result = await self.db.execute(query.offset(skip).limit(limit))
+            result = await self.db.execute(query, params)
             items = result.scalars().all()
 
             return {
@@ -103,6 +95,14 @@ class ReturnsService:
             logger.error(f"Error fetching returns list: {str(e)}")
             raise
 
+    async def get_changes(self, since: Optional[int], limit: int = 500, user_id: Optional[str] = None) -> Dict[str, Any]:
+        """Get returnss changed after version `since` (user can only see their own records)"""
+        try:
+            return await read_changes(self.db, Returns, since, limit, user_id=user_id)
+        except Exception as e:
+            logger.error(f"Error fetching returns changes: {str(e)}")
+            raise
+
     async def update(self, obj_id: int, update_data: Dict[str, Any], user_id: Optional[str] = None) -> Optional[Returns]:
         """Update returns (requires ownership)"""
         try:
@@ -116,7 +116,7 @@ class ReturnsService:
 
             await self.db.commit()
             await self.db.refresh(obj)
-            logger.info(f"Updated returns {obj_id}")
+            logger.info("Updated returns %s", obj_id)
             return obj
         except Exception as e:
             await self.db.rollback()
@@ -132,7 +132,7 @@ class ReturnsService:
                 return False
             await self.db.delete(obj)
             await self.db.commit()
-            logger.info(f"Deleted returns {obj_id}")
+            logger.info("Deleted returns %s", obj_id)
             return True
         except Exception as e:
             await self.db.rollback()
@@ -144,9 +144,8 @@ class ReturnsService:
         try:
             if not hasattr(Returns, field_name):
                 raise ValueError(f"Field {field_name} does not exist on Returns")
-            result = await self.db.execute(
-                select(Returns).where(getattr(Returns, field_name) == field_value)
-            )
+            query, params = by_field_statement(Returns, field_name, field_value)
+            result = await self.db.execute(query, params)
             return result.scalar_one_or_none()
         except Exception as e:
             logger.error(f"Error fetching returns by {field_name}: {str(e)}")
@@ -159,13 +158,8 @@ class ReturnsService:
         try:
             if not hasattr(Returns, field_name):
                 raise ValueError(f"Field {field_name} does not exist on Returns")
-            result = await self.db.execute(
-                select(Returns)
-                .where(getattr(Returns, field_name) == field_value)
-                .offset(skip)
-                .limit(limit)
-                .order_by(Returns.id.desc())
-            )
+            query, params = by_field_statement(Returns, field_name, field_value, skip=skip, limit=limit)
+            result = await self.db.execute(query, params)
             return result.scalars().all()
         except Exception as e:
             logger.error(f"Error fetching returnss by {field_name}: {str(e)}")
@@ -1,9 +1,11 @@
 import logging
 from typing import Optional, Dict, Any, List
 
-from sqlalchemy import select, func
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from core.change_feed import read_changes
+from core.sqlite import commit_write
+from core.statement_cache import by_field_statement, by_id_statement, list_statements
 from models.sale_items import Sale_items
 
 logger = logging.getLogger(__name__)
@@ -21,17 +23,23 @@ class Sale_itemsService:
         try:
             if user_id:
                 data['user_id'] = user_id
-            obj = Sale_items(**data)
-            self.db.add(obj)
-            await self.db.commit()
-            await self.db.refresh(obj)
-            logger.info(f"Created sale_items with id: {obj.id}")
+            obj = await commit_write(self.db, lambda session: self._add(session, data))
+            logger.info("Created sale_items with id: %s", obj.id)
             return obj
         except Exception as e:
             await self.db.rollback()
             logger.error(f"Error creating sale_items: {str(e)}")
             raise
 
+    @staticmethod
+    async def _add(session: AsyncSession, data: Dict[str, Any]) -> Sale_items:
+        # Re-run from `data` if its group commit is retried
+        obj = Sale_items(**data)
+        session.add(obj)
+        await session.flush()
+        await session.refresh(obj)
+        return obj
+
     async def check_ownership(self, obj_id: int, user_id: str) -> bool:
         """Check if user owns this record"""
         try:
@@ -44,10 +52,8 @@ class Sale_itemsService:
     async def get_by_id(self, obj_id: int, user_id: Optional[str] = None) -> Optional[Sale_items]:
         """Get sale_items by ID (user can only see their own records)"""
         try:
-            query = select(Sale_items).where(Sale_items.id == obj_id)
-            if user_id:
-                query = query.where(Sale_items.user_id == user_id)
-            result = await self.db.execute(query)
+            query, params = by_id_statement(Sale_items, obj_id, user_id=user_id)
+            result = await self.db.execute(query, params)
             return result.scalar_one_or_none()
         except Exception as e:
             logger.error(f"Error fetching sale_items {obj_id}: {str(e)}")
@@ -63,34 +69,13 @@ class Sale_itemsService:
     ) -> Dict[str, Any]:
         """Get paginated list of sale_itemss (user can only see their own records)"""
         try:
-            query = select(Sale_items)
-            count_query = select(func.count(Sale_items.id))
-            
-            if user_id:
-                query = query.where(Sale_items.user_id == user_id)
-                count_query = count_query.where(Sale_items.user_id == user_id)
-            
-            if query_dict:
-                for field, value in query_dict.items():
-                    if hasattr(Sale_items, field):
-                        query = query.where(getattr(Sale_items, field) == value)
-                        count_query = count_query.where(getattr(Sale_items, field) == value)
-            
-            count_result = await self.db.execute(count_query)
+            query, count_query, params = list_statements(
+                Sale_items, skip, limit, user_id=user_id, query_dict=query_dict, sort=sort
+            )
+            count_result = await self.db.execute(count_query, params)
             total = count_result.scalar()
 
-            if sort:
-                if sort.startswith('-'):
-                    field_name = sort[1:]
-                    if hasattr(Sale_items, field_name):
-                        query = query.order_by(getattr(Sale_items, field_name).desc())
-                else:
-                    if hasattr(Sale_items, sort):
-                        query = query.order_by(getattr(Sale_items, sort))
-            else:
-                query = query.order_by(Sale_items.id.desc())
-
-            result = await self.db.execute(query.offset(skip).limit(limit))
+            result = await self.db.execute(query, params)
             items = result.scalars().all()
 
             return {
@@ -103,6 +88,14 @@ class Sale_itemsService:
             logger.error(f"Error fetching sale_items list: {str(e)}")
             raise
 
+    async def get_changes(self, since: Optional[int], limit: int = 500, user_id: Optional[str] = None) -> Dict[str, Any]:
+        """Get sale_itemss changed after version `since` (user can only see their own records)"""
+        try:
+            return await read_changes(self.db, Sale_items, since, limit, user_id=user_id)
+        except Exception as e:
+            logger.error(f"Error fetching sale_items changes: {str(e)}")
+            raise
+
     async def update(self, obj_id: int, update_data: Dict[str, Any], user_id: Optional[str] = None) -> Optional[Sale_items]:
         """Update sale_items (requires ownership)"""
         try:
@@ -116,7 +109,7 @@ class Sale_itemsService:
 
             await self.db.commit()
             await self.db.refresh(obj)
-            logger.info(f"Updated sale_items {obj_id}")
+            logger.info("Updated sale_items %s", obj_id)
             return obj
         except Exception as e:
             await self.db.rollback()
@@ -132,7 +125,7 @@ class Sale_itemsService:
                 return False
             await self.db.delete(obj)
             await self.db.commit()
-            logger.info(f"Deleted sale_items {obj_id}")
+            logger.info("Deleted sale_items %s", obj_id)
             return True
         except Exception as e:
             await self.db.rollback()
@@ -144,9 +137,8 @@ class Sale_itemsService:
         try:
             if not hasattr(Sale_items, field_name):
                 raise ValueError(f"Field {field_name} does not exist on Sale_items")
-            result = await self.db.execute(
-                select(Sale_items).where(getattr(Sale_items, field_name) == field_value)
-            )
+            query, params = by_field_statement(Sale_items, field_name, field_value)
+            result = await self.db.execute(query, params)
             return result.scalar_one_or_none()
         except Exception as e:
             logger.error(f"Error fetching sale_items by {field_name}: {str(e)}")
@@ -159,13 +151,8 @@ class Sale_itemsService:
         try:
             if not hasattr(Sale_items, field_name):
                 raise ValueError(f"Field {field_name} does not exist on Sale_items")
-            result = await self.db.execute(
-                select(Sale_items)
-                .where(getattr(Sale_items, field_name) == field_value)
-                .offset(skip)
-                .limit(limit)
-                .order_by(Sale_items.id.desc())
-            )
+            query, params = by_field_statement(Sale_items, field_name, field_value, skip=skip, limit=limit)
+            result = await self.db.execute(query, params)
             return result.scalars().all()
         except Exception as e:
             logger.error(f"Error fetching sale_itemss by {field_name}: {str(e)}")
@@ -1,9 +1,11 @@
 import logging
 from typing import Optional, Dict, Any, List
 
-from sqlalchemy import select, func
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from core.change_feed import read_changes
+from core.sqlite import commit_write
+from core.statement_cache import by_field_statement, by_id_statement, list_statements
 from models.sales import Sales
 
 logger = logging.getLogger(__name__)
@@ -21,17 +23,23 @@ class SalesService:
         try:
             if user_id:
                 data['user_id'] = user_id
-            obj = Sales(**data)
-            self.db.add(obj)
-            await self.db.commit()
-            await self.db.refresh(obj)
-            logger.info(f"Created sales with id: {obj.id}")
+            obj = await commit_write(self.db, lambda session: self._add(session, data))
+            logger.info("Created sales with id: %s", obj.id)
             return obj
         except Exception as e:
             await self.db.rollback()
             logger.error(f"Error creating sales: {str(e)}")
             raise
 
+    @staticmethod
+    async def _add(session: AsyncSession, data: Dict[str, Any]) -> Sales:
+        # Re-run from `data` if its group commit is retried
+        obj = Sales(**data)
+        session.add(obj)
+        await session.flush()
+        await session.refresh(obj)
+        return obj
+
     async def check_ownership(self, obj_id: int, user_id: str) -> bool:
         """Check if user owns this record"""
         try:
@@ -44,10 +52,8 @@ class SalesService:
     async def get_by_id(self, obj_id: int, user_id: Optional[str] = None) -> Optional[Sales]:
         """Get sales by ID (user can only see their own records)"""
         try:
-            query = select(Sales).where(Sales.id == obj_id)
-            if user_id:
-                query = query.where(Sales.user_id == user_id)
-            result = await self.db.execute(query)
+            query, params = by_id_statement(Sales, obj_id, user_id=user_id)
+            result = await self.db.execute(query, params)
             return result.scalar_one_or_none()
         except Exception as e:
             logger.error(f"Error fetching sales {obj_id}: {str(e)}")
@@ -63,34 +69,13 @@ class SalesService:
     ) -> Dict[str, Any]:
         """Get paginated list of saless (user can only see their own records)"""
         try:
-            query = select(Sales)
-            count_query = select(func.count(Sales.id))
-            
-            if user_id:
-                query = query.where(Sales.user_id == user_id)
-                count_query = count_query.where(Sales.user_id == user_id)
-            
-            if query_dict:
-                for field, value in query_dict.items():
-                    if hasattr(Sales, field):
-                        query = query.where(getattr(Sales, field) == value)
-                        count_query = count_query.where(getattr(Sales, field) == value)
-            
-            count_result = await self.db.execute(count_query)
+            query, count_query, params = list_statements(
+                Sales, skip, limit, user_id=user_id, query_dict=query_dict, sort=sort
+            )
+            count_result = await self.db.execute(count_query, params)
             total = count_result.scalar()
 
-            if sort:
-                if sort.startswith('-'):
-                    field_name = sort[1:]
-                    if hasattr(Sales, field_name):
-                        query = query.order_by(getattr(Sales, field_name).desc())
-                else:
-                    if hasattr(Sales, sort):
-                        query = query.order_by(getattr(Sales, sort))
-            else:
-                query = query.order_by(Sales.id.desc())
-
-            result = await self.db.execute(query.offset(skip).limit(limit))
+            result = await self.db.execute(query, params)
             items = result.scalars().all()
 
             return {
@@ -103,6 +88,14 @@ class SalesService:
             logger.error(f"Error fetching sales list: {str(e)}")
             raise
 
+    async def get_changes(self, since: Optional[int], limit: int = 500, user_id: Optional[str] = None) -> Dict[str, Any]:
+        """Get saless changed after version `since` (user can only see their own records)"""
+        try:
+            return await read_changes(self.db, Sales, since, limit, user_id=user_id)
+        except Exception as e:
+            logger.error(f"Error fetching sales changes: {str(e)}")
+            raise
+
     async def update(self, obj_id: int, update_data: Dict[str, Any], user_id: Optional[str] = None) -> Optional[Sales]:
         """Update sales (requires ownership)"""
         try:
@@ -116,7 +109,7 @@ class SalesService:
 
             await self.db.commit()
             await self.db.refresh(obj)
-            logger.info(f"Updated sales {obj_id}")
+            logger.info("Updated sales %s", obj_id)
             return obj
         except Exception as e:
             await self.db.rollback()
@@ -132,7 +125,7 @@ class SalesService:
                 return False
             await self.db.delete(obj)
             await self.db.commit()
-            logger.info(f"Deleted sales {obj_id}")
+            logger.info("Deleted sales %s", obj_id)
             return True
         except Exception as e:
             await self.db.rollback()
@@ -144,9 +137,8 @@ class SalesService:
         try:
             if not hasattr(Sales, field_name):
                 raise ValueError(f"Field {field_name} does not exist on Sales")
-            result = await self.db.execute(
-                select(Sales).where(getattr(Sales, field_name) == field_value)
-            )
+            query, params = by_field_statement(Sales, field_name, field_value)
+            result = await self.db.execute(query, params)
             return result.scalar_one_or_none()
         except Exception as e:
             logger.error(f"Error fetching sales by {field_name}: {str(e)}")
@@ -159,13 +151,8 @@ class SalesService:
         try:
             if not hasattr(Sales, field_name):
                 raise ValueError(f"Field {field_name} does not exist on Sales")
-            result = await self.db.execute(
-                select(Sales)
-                .where(getattr(Sales, field_name) == field_value)
-                .offset(skip)
-                .limit(limit)
-                .order_by(Sales.id.desc())
-            )
+            query, params = by_field_statement(Sales, field_name, field_value, skip=skip, limit=limit)
+            result = await self.db.execute(query, params)
             return result.scalars().all()
         except Exception as e:
             logger.error(f"Error fetching saless by {field_name}: {str(e)}")
@@ -1,9 +1,10 @@
 import logging
 from typing import Optional, Dict, Any, List
 
-from sqlalchemy import select, func
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from core.change_feed import read_changes
+from core.statement_cache import by_field_statement, by_id_statement, list_statements
 from models.sales_forecasts import Sales_forecasts
 
 logger = logging.getLogger(__name__)
@@ -23,7 +24,7 @@ class Sales_forecastsService:
             self.db.add(obj)
             await self.db.commit()
             await self.db.refresh(obj)
-            logger.info(f"Created sales_forecasts with id: {obj.id}")
+            logger.info("Created sales_forecasts with id: %s", obj.id)
             return obj
         except Exception as e:
             await self.db.rollback()
@@ -33,8 +34,8 @@ class Sales_forecastsService:
     async def get_by_id(self, obj_id: int) -> Optional[Sales_forecasts]:
         """Get sales_forecasts by ID"""
         try:
-            query = select(Sales_forecasts).where(Sales_forecasts.id == obj_id)
-            result = await self.db.execute(query)
+            query, params = by_id_statement(Sales_forecasts, obj_id)
+            result = await self.db.execute(query, params)
             return result.scalar_one_or_none()
         except Exception as e:
             logger.error(f"Error fetching sales_forecasts {obj_id}: {str(e)}")
@@ -49,30 +50,13 @@ class Sales_forecastsService:
     ) -> Dict[str, Any]:
         """Get paginated list of sales_forecastss"""
         try:
-            query = select(Sales_forecasts)
-            count_query = select(func.count(Sales_forecasts.id))
-            
-            if query_dict:
-                for field, value in query_dict.items():
-                    if hasattr(Sales_forecasts, field):
-                        query = query.where(getattr(Sales_forecasts, field) == value)
-                        count_query = count_query.where(getattr(Sales_forecasts, field) == value)
-            
-            count_result = await self.db.execute(count_query)
+            query, count_query, params = list_statements(
+                Sales_forecasts, skip, limit, query_dict=query_dict, sort=sort
+            )
+            count_result = await self.db.execute(count_query, params)
             total = count_result.scalar()
 
-            if sort:
-                if sort.startswith('-'):
-                    field_name = sort[1:]
-                    if hasattr(Sales_forecasts, field_name):
-                        query = query.order_by(getattr(Sales_forecasts, field_name).desc())
-                else:
-                    if hasattr(Sales_forecasts, sort):
-                        query = query.order_by(getattr(Sales_forecasts, sort))
-            else:
-                query = query.order_by(Sales_forecasts.id.desc())
-
-            result = await self.db.execute(query.offset(skip).limit(limit))
+            result = await self.db.execute(query, params)
             items = result.scalars().all()
 
             return {
@@ -85,6 +69,14 @@ class Sales_forecastsService:
             logger.error(f"Error fetching sales_forecasts list: {str(e)}")
             raise
 
+    async def get_changes(self, since: Optional[int], limit: int = 500) -> Dict[str, Any]:
+        """Get sales_forecastss changed after version `since`"""
+        try:
+            return await read_changes(self.db, Sales_forecasts, since, limit)
+        except Exception as e:
+            logger.error(f"Error fetching sales_forecasts changes: {str(e)}")
+            raise
+
     async def update(self, obj_id: int, update_data: Dict[str, Any]) -> Optional[Sales_forecasts]:
         """Update sales_forecasts"""
         try:
@@ -98,7 +90,7 @@ class Sales_forecastsService:
 
             await self.db.commit()
             await self.db.refresh(obj)
-            logger.info(f"Updated sales_forecasts {obj_id}")
+            logger.info("Updated sales_forecasts %s", obj_id)
             return obj
         except Exception as e:
             await self.db.rollback()
@@ -114,7 +106,7 @@ class Sales_forecastsService:
                 return False
             await self.db.delete(obj)
             await self.db.commit()
-            logger.info(f"Deleted sales_forecasts {obj_id}")
+            logger.info("Deleted sales_forecasts %s", obj_id)
             return True
         except Exception as e:
             await self.db.rollback()
@@ -126,9 +118,8 @@ class Sales_forecastsService:
         try:
             if not hasattr(Sales_forecasts, field_name):
                 raise ValueError(f"Field {field_name} does not exist on Sales_forecasts")
-            result = await self.db.execute(
-                select(Sales_forecasts).where(getattr(Sales_forecasts, field_name) == field_value)
-            )
+            query, params = by_field_statement(Sales_forecasts, field_name, field_value)
+            result = await self.db.execute(query, params)
             return result.scalar_one_or_none()
         except Exception as e:
             logger.error(f"Error fetching sales_forecasts by {field_name}: {str(e)}")
@@ -141,13 +132,8 @@ class Sales_forecastsService:
         try:
             if not hasattr(Sales_forecasts, field_name):
                 raise ValueError(f"Field {field_name} does not exist on Sales_forecasts")
-            result = await self.db.execute(
-                select(Sales_forecasts)
-                .where(getattr(Sales_forecasts, field_name) == field_value)
-                .offset(skip)
-                .limit(limit)
-                .order_by(Sales_forecasts.id.desc())
-            )
+            query, params = by_field_statement(Sales_forecasts, field_name, field_value, skip=skip, limit=limit)
+            result = await self.db.execute(query, params)
             return result.scalars().all()
         except Exception as e:
             logger.error(f"Error fetching sales_forecastss by {field_name}: {str(e)}")
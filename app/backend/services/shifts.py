@@ -1,9 +1,10 @@
 import logging
 from typing import Optional, Dict, Any, List
 
-from sqlalchemy import select, func
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from core.change_feed import read_changes
+from core.statement_cache import by_field_statement, by_id_statement, list_statements
 from models.shifts import Shifts
 
 logger = logging.getLogger(__name__)
@@ -25,7 +26,7 @@ class ShiftsService:
             self.db.add(obj)
             await self.db.commit()
             await self.db.refresh(obj)
-            logger.info(f"Created shifts with id: {obj.id}")
+            logger.info("Created shifts with id: %s", obj.id)
             return obj
         except Exception as e:
             await self.db.rollback()
@@ -44,10 +45,8 @@ class ShiftsService:
     async def get_by_id(self, obj_id: int, user_id: Optional[str] = None) -> Optional[Shifts]:
         """Get shifts by ID (user can only see their own records)"""
         try:
-            query = select(Shifts).where(Shifts.id == obj_id)
-            if user_id:
-                query = query.where(Shifts.user_id == user_id)
-            result = await self.db.execute(query)
+            query, params = by_id_statement(Shifts, obj_id, user_id=user_id)
+            result = await self.db.execute(query, params)
             return result.scalar_one_or_none()
         except Exception as e:
             logger.error(f"Error fetching shifts {obj_id}: {str(e)}")
@@ -63,34 +62,13 @@ class ShiftsService:
     ) -> Dict[str, Any]:
         """Get paginated list of shiftss (user can only see their own records)"""
         try:
-            query = select(Shifts)
-            count_query = select(func.count(Shifts.id))
-            
-            if user_id:
-                query = query.where(Shifts.user_id == user_id)
-                count_query = count_query.where(Shifts.user_id == user_id)
-            
-            if query_dict:
-                for field, value in query_dict.items():
-                    if hasattr(Shifts, field):
-                        query = query.where(getattr(Shifts, field) == value)
-                        count_query = count_query.where(getattr(Shifts, field) == value)
-            
-            count_result = await self.db.execute(count_query)
+            query, count_query, params = list_statements(
+                Shifts, skip, limit, user_id=user_id, query_dict=query_dict, sort=sort
+            )
+            count_result = await self.db.execute(count_query, params)
             total = count_result.scalar()
 
-            if sort:
-                if sort.startswith('-'):
-                    field_name = sort[1:]
-                    if hasattr(Shifts, field_name):
-                        query = query.order_by(getattr(Shifts, field_name).desc())
-                else:
-                    if hasattr(Shifts, sort):
-                        query = query.order_by(getattr(Shifts, sort))
-            else:
-                query = query.order_by(Shifts.id.desc())
-
-            result = await self.db.execute(query.offset(skip).limit(limit))
+            result = await self.db.execute(query, params)
             items = result.scalars().all()
 
             return {
@@ -103,6 +81,14 @@ class ShiftsService:
             logger.error(f"Error fetching shifts list: {str(e)}")
             raise
 
+    async def get_changes(self, since: Optional[int], limit: int = 500, user_id: Optional[str] = None) -> Dict[str, Any]:
+        """Get shiftss changed after version `since` (user can only see their own records)"""
+        try:
+            return await read_changes(self.db, Shifts, since, limit, user_id=user_id)
+        except Exception as e:
+            logger.error(f"Error fetching shifts changes: {str(e)}")
+            raise
+
     async def update(self, obj_id: int, update_data: Dict[str, Any], user_id: Optional[str] = None) -> Optional[Shifts]:
         """Update shifts (requires ownership)"""
         try:
@@ -116,7 +102,7 @@ class ShiftsService:
 
             await self.db.commit()
             await self.db.refresh(obj)
-            logger.info(f"Updated shifts {obj_id}")
+            logger.info("Updated shifts %s", obj_id)
             return obj
         except Exception as e:
             await self.db.rollback()
@@ -132,7 +118,7 @@ class ShiftsService:
                 return False
             await self.db.delete(obj)
             await self.db.commit()
-            logger.info(f"Deleted shifts {obj_id}")
+            logger.info("Deleted shifts %s", obj_id)
             return True
         except Exception as e:
             await self.db.rollback()
@@ -144,9 +130,8 @@ class ShiftsService:
         try:
             if not hasattr(Shifts, field_name):
                 raise ValueError(f"Field {field_name} does not exist on Shifts")
-            result = await self.db.execute(
-                select(Shifts).where(getattr(Shifts, field_name) == field_value)
-            )
+            query, params = by_field_statement(Shifts, field_name, field_value)
+            result = await self.db.execute(query, params)
             return result.scalar_one_or_none()
         except Exception as e:
             logger.error(f"Error fetching shifts by {field_name}: {str(e)}")
@@ -159,13 +144,8 @@ class ShiftsService:
         try:
             if not hasattr(Shifts, field_name):
                 raise ValueError(f"Field {field_name} does not exist on Shifts")
-            result = await self.db.execute(
-                select(Shifts)
-                .where(getattr(Shifts, field_name) == field_value)
-                .offset(skip)
-                .limit(limit)
-                .order_by(Shifts.id.desc())
-            )
+            query, params = by_field_statement(Shifts, field_name, field_value, skip=skip, limit=limit)
+            result = await self.db.execute(query, params)
             return result.scalars().all()
         except Exception as e:
             logger.error(f"Error fetching shiftss by {field_name}: {str(e)}")
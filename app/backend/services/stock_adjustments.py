@@ -1,9 +1,10 @@
 import logging
 from typing import Optional, Dict, Any, List
 
-from sqlalchemy import select, func
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from core.change_feed import read_changes
+from core.statement_cache import by_field_statement, by_id_statement, list_statements
 from models.stock_adjustments import Stock_adjustments
 
 logger = logging.getLogger(__name__)
@@ -25,7 +26,7 @@ class Stock_adjustmentsService:
             self.db.add(obj)
             await self.db.commit()
             await self.db.refresh(obj)
-            logger.info(f"Created stock_adjustments with id: {obj.id}")
+            logger.info("Created stock_adjustments with id: %s", obj.id)
             return obj
         except Exception as e:
             await self.db.rollback()
@@ -44,10 +45,8 @@ class Stock_adjustmentsService:
     async def get_by_id(self, obj_id: int, user_id: Optional[str] = None) -> Optional[Stock_adjustments]:
         """Get stock_adjustments by ID (user can only see their own records)"""
         try:
-            query = select(Stock_adjustments).where(Stock_adjustments.id == obj_id)
-            if user_id:
-                query = query.where(Stock_adjustments.user_id == user_id)
-            result = await self.db.execute(query)
+            query, params = by_id_statement(Stock_adjustments, obj_id, user_id=user_id)
+            result = await self.db.execute(query, params)
             return result.scalar_one_or_none()
         except Exception as e:
             logger.error(f"Error fetching stock_adjustments {obj_id}: {str(e)}")
@@ -63,34 +62,13 @@ class Stock_adjustmentsService:
     ) -> Dict[str, Any]:
         """Get paginated list of stock_adjustmentss (user can only see their own records)"""
         try:
-            query = select(Stock_adjustments)
-            count_query = select(func.count(Stock_adjustments.id))
-            
-            if user_id:
-                query = query.where(Stock_adjustments.user_id == user_id)
-                count_query = count_query.where(Stock_adjustments.user_id == user_id)
-            
-            if query_dict:
-                for field, value in query_dict.items():
-                    if hasattr(Stock_adjustments, field):
-                        query = query.where(getattr(Stock_adjustments, field) == value)
-                        count_query = count_query.where(getattr(Stock_adjustments, field) == value)
-            
-            count_result = await self.db.execute(count_query)
+            query, count_query, params = list_statements(
+                Stock_adjustments, skip, limit, user_id=user_id, query_dict=query_dict, sort=sort
+            )
+            count_result = await self.db.execute(count_query, params)
             total = count_result.scalar()
 
-            if sort:
-                if sort.startswith('-'):
-                    field_name = sort[1:]
-                    if hasattr(Stock_adjustments, field_name):
-                        query = query.order_by(getattr(Stock_adjustments, field_name).desc())
-                else:
-                    if hasattr(Stock_adjustments, sort):
-                        query = query.order_by(getattr(Stock_adjustments, sort))
-            else:
-                query = query.order_by(Stock_adjustments.id.desc())
-
-            result = await self.db.execute(query.offset(skip).limit(limit))
+            result = await self.db.execute(query, params)
             items = result.scalars().all()
 
             return {
@@ -103,6 +81,14 @@ class Stock_adjustmentsService:
             logger.error(f"Error fetching stock_adjustments list: {str(e)}")
             raise
 
+    async def get_changes(self, since: Optional[int], limit: int = 500, user_id: Optional[str] = None) -> Dict[str, Any]:
+        """Get stock_adjustmentss changed after version `since` (user can only see their own records)"""
+        try:
+            return await read_changes(self.db, Stock_adjustments, since, limit, user_id=user_id)
+        except Exception as e:
+            logger.error(f"Error fetching stock_adjustments changes: {str(e)}")
+            raise
+
     async def update(self, obj_id: int, update_data: Dict[str, Any], user_id: Optional[str] = None) -> Optional[Stock_adjustments]:
         """Update stock_adjustments (requires ownership)"""
         try:
@@ -116,7 +102,7 @@ class Stock_adjustmentsService:
 
             await self.db.commit()
             await self.db.refresh(obj)
-            logger.info(f"Updated stock_adjustments {obj_id}")
+            logger.info("Updated stock_adjustments %s", obj_id)
             return obj
         except Exception as e:
             await self.db.rollback()
@@ -132,7 +118,7 @@ class Stock_adjustmentsService:
                 return False
             await self.db.delete(obj)
             await self.db.commit()
-            logger.info(f"Deleted stock_adjustments {obj_id}")
+            logger.info("Deleted stock_adjustments %s", obj_id)
             return True
         except Exception as e:
             await self.db.rollback()
@@ -144,9 +130,8 @@ class Stock_adjustmentsService:
         try:
             if not hasattr(Stock_adjustments, field_name):
                 raise ValueError(f"Field {field_name} does not exist on Stock_adjustments")
-            result = await self.db.execute(
-                select(Stock_adjustments).where(getattr(Stock_adjustments, field_name) == field_value)
-            )
+            query, params = by_field_statement(Stock_adjustments, field_name, field_value)
+            result = await self.db.execute(query, params)
             return result.scalar_one_or_none()
         except Exception as e:
             logger.error(f"Error fetching stock_adjustments by {field_name}: {str(e)}")
@@ -159,13 +144,8 @@ class Stock_adjustmentsService:
         try:
             if not hasattr(Stock_adjustments, field_name):
                 raise ValueError(f"Field {field_name} does not exist on Stock_adjustments")
-            result = await self.db.execute(
-                select(Stock_adjustments)
-                .where(getattr(Stock_adjustments, field_name) == field_value)
-                .offset(skip)
-                .limit(limit)
-                .order_by(Stock_adjustments.id.desc())
-            )
+            query, params = by_field_statement(Stock_adjustments, field_name, field_value, skip=skip, limit=limit)
+            result = await self.db.execute(query, params)
             return result.scalars().all()
         except Exception as e:
             logger.error(f"Error fetching stock_adjustmentss by {field_name}: {str(e)}")
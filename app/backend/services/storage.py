@@ -1,5 +1,8 @@
+import asyncio
 import logging
-from typing import Literal, Optional, Union
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+from typing import AsyncIterator, Awaitable, Callable, Literal, Optional, Union
 from urllib.parse import urljoin
 
 import httpx
@@ -14,15 +17,160 @@ from schemas.storage import (
     FileUpDownRequest,
     FileUpDownResponse,
     ObjectInfo,
+    ObjectListRequest,
     ObjectListResponse,
     ObjectRequest,
-    OSSBaseModel,
+    PresignedUrlCacheStats,
     RenameRequest,
     RenameResponse,
 )
 
 logger = logging.getLogger(__name__)
 
+CacheKey = tuple[str, str]
+
+
+def _parse_expires_at(value: Optional[str]) -> Optional[datetime]:
+    """Parse the OSS `expires_at` value (ISO 8601 or epoch seconds) into an aware datetime."""
+    if not value:
+        return None
+    try:
+        if str(value).isdigit():
+            return datetime.fromtimestamp(int(value), tz=timezone.utc)
+        parsed = datetime.fromisoformat(str(value).replace("Z", "+00:00"))
+    except (ValueError, OverflowError):
+        return None
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed
+
+
+class PresignedUrlCache:
+    """Process-wide cache of presigned download URLs keyed by (bucket, object_key).
+
+    Entries are reused until `margin_seconds` before their `expires_at`, so a client
+    never receives a URL that is about to lapse. Concurrent misses for the same key
+    share a single upstream call.
+    """
+
+    def __init__(self, margin_seconds: int = 60, max_entries: int = 10000, enabled: bool = True):
+        self.enabled = enabled
+        self.margin = timedelta(seconds=max(margin_seconds, 0))
+        self.max_entries = max(max_entries, 1)
+        self._entries: "OrderedDict[CacheKey, tuple[FileUpDownResponse, datetime]]" = OrderedDict()
+        self._inflight: dict[CacheKey, asyncio.Future] = {}
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self.upstream_calls = 0
+
+    def get(self, bucket_name: str, object_key: str) -> Optional[FileUpDownResponse]:
+        key = (bucket_name, object_key)
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        response, reuse_until = entry
+        if datetime.now(timezone.utc) >= reuse_until:
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return response
+
+    def put(self, bucket_name: str, object_key: str, response: FileUpDownResponse) -> None:
+        expires_at = _parse_expires_at(response.expires_at)
+        if expires_at is None:
+            logger.debug("Not caching presigned URL for %s/%s: unparseable expires_at", bucket_name, object_key)
+            return
+        reuse_until = expires_at - self.margin
+        if reuse_until <= datetime.now(timezone.utc):
+            return
+        key = (bucket_name, object_key)
+        self._entries[key] = (response, reuse_until)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, bucket_name: str, object_key: str) -> None:
+        key = (bucket_name, object_key)
+        # Dropping the in-flight marker stops a pending fetch from repopulating a stale entry
+        self._inflight.pop(key, None)
+        if self._entries.pop(key, None) is not None:
+            self.invalidations += 1
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._inflight.clear()
+
+    async def get_or_fetch(
+        self,
+        bucket_name: str,
+        object_key: str,
+        fetch: Callable[[], Awaitable[FileUpDownResponse]],
+    ) -> FileUpDownResponse:
+        """Return a cached URL, or call `fetch` once for all concurrent callers of the same key."""
+        if not self.enabled:
+            self.misses += 1
+            self.upstream_calls += 1
+            return await fetch()
+
+        cached = self.get(bucket_name, object_key)
+        if cached is not None:
+            self.hits += 1
+            return cached
+
+        self.misses += 1
+        key = (bucket_name, object_key)
+        while (pending := self._inflight.get(key)) is not None:
+            try:
+                return await asyncio.shield(pending)
+            except asyncio.CancelledError:
+                if not pending.cancelled():
+                    raise  # This caller was cancelled
+                # The fetching caller was cancelled; take over the fetch (or wait for whoever did)
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            self.upstream_calls += 1
+            response = await fetch()
+        except Exception as e:
+            future.set_exception(e)
+            # Mark retrieved so waiter-less failures are not reported as unhandled
+            future.exception()
+            raise
+        else:
+            future.set_result(response)
+            if self._inflight.get(key) is future:
+                self.put(bucket_name, object_key, response)
+            return response
+        finally:
+            if not future.done():
+                # The fetch was cancelled (client disconnect, timeout); release the waiters
+                future.cancel()
+            if self._inflight.get(key) is future:
+                del self._inflight[key]
+
+    def stats(self) -> PresignedUrlCacheStats:
+        lookups = self.hits + self.misses
+        return PresignedUrlCacheStats(
+            enabled=self.enabled,
+            size=len(self._entries),
+            max_entries=self.max_entries,
+            margin_seconds=int(self.margin.total_seconds()),
+            hits=self.hits,
+            misses=self.misses,
+            invalidations=self.invalidations,
+            upstream_calls=self.upstream_calls,
+            hit_ratio=round(self.hits / lookups, 4) if lookups else 0.0,
+        )
+
+
+presigned_url_cache = PresignedUrlCache(
+    margin_seconds=settings.oss_url_cache_margin_seconds,
+    max_entries=settings.oss_url_cache_max_entries,
+    enabled=settings.oss_url_cache_enabled,
+)
+
 
 class StorageService:
     """Service for handling file upload and display with ObjectStorage service integration."""
@@ -64,13 +212,20 @@ class StorageService:
             logger.error(f"Failed to list buckets: {e}")
             raise
 
-    async def list_objects(self, request: OSSBaseModel) -> ObjectListResponse:
+    async def list_objects(
+        self, request: ObjectListRequest, client: Optional[httpx.AsyncClient] = None
+    ) -> ObjectListResponse:
         """
-        List objests from the bucket
+        List one page of objects from the bucket
         """
         endpoint = f"api/v1/infra/client/oss/buckets/{request.bucket_name}/objects"
+        params = {"max_keys": request.page_size}
+        if request.prefix:
+            params["prefix"] = request.prefix
+        if request.continuation_token:
+            params["continuation_token"] = request.continuation_token
         try:
-            result = await self._aget_oss_service(endpoint=endpoint, params={})
+            result = await self._aget_oss_service(endpoint=endpoint, params=params, client=client)
             list_objs = ObjectListResponse()
             for item in result["objects"]:
                 list_objs.objects.append(
@@ -82,11 +237,34 @@ class StorageService:
                         etag=item["etag"],
                     )
                 )
+            next_token = result.get("next_continuation_token") or result.get("next_marker") or ""
+            list_objs.next_continuation_token = next_token
+            list_objs.is_truncated = bool(result.get("is_truncated", bool(next_token))) and bool(next_token)
             return list_objs
         except Exception as e:
             logger.error(f"Failed to list bucket objects: {e}")
             raise
 
+    async def iter_objects(
+        self, request: ObjectListRequest, first_page: Optional[ObjectListResponse] = None
+    ) -> AsyncIterator[ObjectInfo]:
+        """
+        Yield every object matching the request, fetching one page at a time.
+
+        Only a single page is held in memory; pages are requested over one pooled connection.
+        """
+        page = first_page
+        async with httpx.AsyncClient(timeout=120.0) as client:
+            while True:
+                if page is None:
+                    page = await self.list_objects(request, client=client)
+                for obj in page.objects:
+                    yield obj
+                if not page.is_truncated:
+                    return
+                request = request.model_copy(update={"continuation_token": page.next_continuation_token})
+                page = None
+
     async def get_object_info(self, request: ObjectRequest) -> ObjectInfo:
         """
         Get object metadata from the bucket
@@ -115,6 +293,8 @@ class StorageService:
         }
         try:
             await self._apost_oss_service(endpoint, payload)
+            presigned_url_cache.invalidate(request.bucket_name, request.source_key)
+            presigned_url_cache.invalidate(request.bucket_name, request.target_key)
             return RenameResponse(success=True)
         except Exception as e:
             logger.error(f"Failed to rename object: {e}")
@@ -125,9 +305,10 @@ class StorageService:
         payload = {"object_keys": [request.object_key]}
         try:
             await self._adelete_oss_service(endpoint, payload)
+            presigned_url_cache.invalidate(request.bucket_name, request.object_key)
             return DeleteResponse(success=True)
         except Exception as e:
-            logger.error(f"Failed to rename object: {e}")
+            logger.error(f"Failed to delete object: {e}")
             raise
 
     async def create_upload_url(self, request: FileUpDownRequest) -> FileUpDownResponse:
@@ -150,7 +331,14 @@ class StorageService:
     async def create_download_url(self, request: FileUpDownRequest) -> FileUpDownResponse:
         """
         Create presigned URL for file download with access URL.
+
+        URLs are served from `presigned_url_cache` until shortly before they expire.
         """
+        return await presigned_url_cache.get_or_fetch(
+            request.bucket_name, request.object_key, lambda: self._fetch_download_url(request)
+        )
+
+    async def _fetch_download_url(self, request: FileUpDownRequest) -> FileUpDownResponse:
         endpoint = f"/api/v1/infra/client/oss/buckets/{request.bucket_name}/objects/download_url"
         content_type, _ = mimetypes.guess_type(str(request.object_key))
         if not content_type:
@@ -169,11 +357,13 @@ class StorageService:
             )
 
         except Exception as e:
-            logger.error(f"Failed to create upload URL: {e}")
+            logger.error(f"Failed to create download URL: {e}")
             raise
 
-    async def _aget_oss_service(self, endpoint: str, params: dict) -> dict:
-        return await self._arequest_oss_service("GET", endpoint, params=params)
+    async def _aget_oss_service(
+        self, endpoint: str, params: dict, client: Optional[httpx.AsyncClient] = None
+    ) -> dict:
+        return await self._arequest_oss_service("GET", endpoint, params=params, client=client)
 
     async def _apost_oss_service(self, endpoint: str, payload: dict) -> Union[dict, list]:
         return await self._arequest_oss_service("POST", endpoint, payload=payload)
@@ -187,29 +377,28 @@ class StorageService:
         endpoint: str,
         params: Optional[dict] = None,
         payload: Optional[dict] = None,
+        client: Optional[httpx.AsyncClient] = None,
     ) -> Union[dict, list]:
         """统一的 OSS 服务请求方法"""
         url = urljoin(settings.oss_service_url, endpoint)
 
         try:
-            async with httpx.AsyncClient(timeout=120.0) as client:
-                response = await client.request(
-                    method=method,
-                    url=url,
-                    headers=self.headers,
-                    params=params,
-                    json=payload,
-                )
-                response.raise_for_status()
-                result = response.json()
+            request_kwargs = {"method": method, "url": url, "headers": self.headers, "params": params, "json": payload}
+            if client is None:
+                async with httpx.AsyncClient(timeout=120.0) as own_client:
+                    response = await own_client.request(**request_kwargs)
+            else:
+                response = await client.request(**request_kwargs)
+            response.raise_for_status()
+            result = response.json()
 
-                if result.get("code") != 0:
-                    logger.warning(f"ObjectStorage service error: {result}")
-                    error_msg = result.get("error", "Unknown error")
-                    message = result.get("message", "")
-                    raise ValueError(f"ObjectStorage service error: {error_msg}. {message}")
+            if result.get("code") != 0:
+                logger.warning(f"ObjectStorage service error: {result}")
+                error_msg = result.get("error", "Unknown error")
+                message = result.get("message", "")
+                raise ValueError(f"ObjectStorage service error: {error_msg}. {message}")
 
-                return result.get("data", [])
+            return result.get("data", [])
         except httpx.HTTPStatusError as e:
             error_msg = f"ObjectStorage service HTTP error: {e.response.status_code} - {e.response.text}"
             logger.error(error_msg)
@@ -0,0 +1,125 @@
+"""
+Events for the live stream (`GET /api/v1/stream/events`).
+
+Events come from ORM flushes and are published when the transaction commits, so a
+rolled-back write is never announced:
+
+- `sale.created`: a new sale, to its owner.
+- `notification.created`: a new notification, to its recipient.
+- `product.low_stock`: an update that takes a product's quantity from above its
+  low_stock_threshold to at or below it, to every user (products are shared).
+
+Core bulk writes (upserts, imports, seeding) do not produce events.
+"""
+
+import logging
+from datetime import date, datetime
+from typing import Any, Callable, Dict, List, Optional
+
+from core.config import settings
+from core.events import Event, EventBus, MemoryEventBackend, PostgresEventBackend
+from sqlalchemy import event, inspect
+from sqlalchemy.engine import make_url
+from sqlalchemy.orm import Session
+
+logger = logging.getLogger(__name__)
+
+event_bus = EventBus(settings.stream_queue_size, settings.stream_max_subscribers)
+
+PENDING_EVENTS_KEY = "stream_pending_events"
+
+
+def _row_data(obj) -> Dict[str, Any]:
+    data = {}
+    for column in obj.__table__.columns:
+        value = getattr(obj, column.key)
+        data[column.key] = value.isoformat() if isinstance(value, (datetime, date)) else value
+    return data
+
+
+def _sale_events(obj, operation: str) -> Optional[Event]:
+    if operation == "insert":
+        return Event("sale.created", _row_data(obj), obj.user_id)
+    return None
+
+
+def _notification_events(obj, operation: str) -> Optional[Event]:
+    if operation == "insert":
+        return Event("notification.created", _row_data(obj), obj.user_id)
+    return None
+
+
+def _product_events(obj, operation: str) -> Optional[Event]:
+    if operation != "update":
+        return None
+    history = inspect(obj).attrs.quantity.history
+    if not history.deleted or obj.quantity is None or obj.low_stock_threshold is None:
+        return None
+    before = history.deleted[0]
+    if before is not None and before > obj.low_stock_threshold >= obj.quantity:
+        return Event("product.low_stock", {
+            "id": obj.id,
+            "name": obj.name,
+            "quantity": obj.quantity,
+            "low_stock_threshold": obj.low_stock_threshold,
+        })
+    return None
+
+
+EVENT_SOURCES: Dict[str, Callable[[Any, str], Optional[Event]]] = {
+    "sales": _sale_events,
+    "notifications": _notification_events,
+    "products": _product_events,
+}
+EVENT_TYPES = frozenset({"sale.created", "notification.created", "product.low_stock"})
+
+
+def _after_flush(session: Session, _flush_context) -> None:
+    # Attribute history still describes the flush that just ran
+    pending: List[Event] = []
+    for objects, operation in ((session.new, "insert"), (session.dirty, "update")):
+        for obj in objects:
+            source = EVENT_SOURCES.get(getattr(type(obj), "__tablename__", None))
+            if source is not None and (found := source(obj, operation)) is not None:
+                pending.append(found)
+    if pending:
+        session.info.setdefault(PENDING_EVENTS_KEY, []).extend(pending)
+
+
+def _after_commit(session: Session) -> None:
+    event_bus.publish(session.info.pop(PENDING_EVENTS_KEY, None))
+
+
+def _after_rollback(session: Session) -> None:
+    session.info.pop(PENDING_EVENTS_KEY, None)
+
+
+def install_event_hooks() -> None:
+    for name, hook in (("after_flush", _after_flush), ("after_commit", _after_commit),
+                       ("after_rollback", _after_rollback)):
+        if not event.contains(Session, name, hook):
+            event.listen(Session, name, hook)
+
+
+async def initialize_event_stream():
+    """Start the event bus and publish events from ORM writes."""
+    backend = None
+    if settings.stream_backend == "postgres":
+        url = make_url(settings.database_url)
+        if url.get_backend_name() != "postgresql":
+            logger.warning("STREAM_BACKEND=postgres needs a PostgreSQL database; events stay in-process")
+        else:
+            dsn = url.set(drivername="postgresql").render_as_string(hide_password=False)
+            backend = PostgresEventBackend(event_bus, dsn, settings.stream_channel)
+    elif settings.stream_backend != "memory":
+        logger.warning("Unknown STREAM_BACKEND %s; events stay in-process", settings.stream_backend)
+    try:
+        await event_bus.start(backend)
+    except Exception as e:
+        logger.error(f"Failed to start the {settings.stream_backend} event backend, events stay in-process: {e}")
+        await event_bus.start(MemoryEventBackend(event_bus))
+    install_event_hooks()
+
+
+async def close_event_stream():
+    await event_bus.stop()
@@ -1,9 +1,11 @@
 import logging
 from typing import Optional, Dict, Any, List
 
-from sqlalchemy import select, func
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from core.change_feed import read_changes
+from core.statement_cache import by_field_statement, by_id_statement, list_statements
+from core.upsert import bulk_upsert
 from models.suppliers import Suppliers
 
 logger = logging.getLogger(__name__)
@@ -25,13 +27,26 @@ class SuppliersService:
             self.db.add(obj)
             await self.db.commit()
             await self.db.refresh(obj)
-            logger.info(f"Created suppliers with id: {obj.id}")
+            logger.info("Created suppliers with id: %s", obj.id)
             return obj
         except Exception as e:
             await self.db.rollback()
             logger.error(f"Error creating suppliers: {str(e)}")
             raise
 
+    async def upsert_batch(self, items: List[Dict[str, Any]], user_id: str) -> int:
+        """Insert or update supplierss matched on the user's supplier_code in bulk; returns the number written"""
+        try:
+            rows = [{**item, 'user_id': user_id} for item in items]
+            count = await bulk_upsert(self.db, Suppliers.__table__, rows, ("user_id", "supplier_code"))
+            await self.db.commit()
+            logger.info("Upserted %s supplierss", count)
+            return count
+        except Exception as e:
+            await self.db.rollback()
+            logger.error(f"Error upserting supplierss: {str(e)}")
+            raise
+
     async def check_ownership(self, obj_id: int, user_id: str) -> bool:
         """Check if user owns this record"""
         try:
@@ -44,10 +59,8 @@ class SuppliersService:
     async def get_by_id(self, obj_id: int, user_id: Optional[str] = None) -> Optional[Suppliers]:
         """Get suppliers by ID (user can only see their own records)"""
         try:
-            query = select(Suppliers).where(Suppliers.id == obj_id)
-            if user_id:
-                query = query.where(Suppliers.user_id == user_id)
-            result = await self.db.execute(query)
+            query, params = by_id_statement(Suppliers, obj_id, user_id=user_id)
+            result = await self.db.execute(query, params)
             return result.scalar_one_or_none()
         except Exception as e:
             logger.error(f"Error fetching suppliers {obj_id}: {str(e)}")
@@ -63,34 +76,13 @@ class SuppliersService:
     ) -> Dict[str, Any]:
         """Get paginated list of supplierss (user can only see their own records)"""
         try:
-            query = select(Suppliers)
-            count_query = select(func.count(Suppliers.id))
-            
-            if user_id:
-                query = query.where(Suppliers.user_id == user_id)
-                count_query = count_query.where(Suppliers.user_id == user_id)
-            
-            if query_dict:
-                for field, value in query_dict.items():
-                    if hasattr(Suppliers, field):
-                        query = query.where(getattr(Suppliers, field) == value)
-                        count_query = count_query.where(getattr(Suppliers, field) == value)
-            
-            count_result = await self.db.execute(count_query)
+            query, count_query, params = list_statements(
+                Suppliers, skip, limit, user_id=user_id, query_dict=query_dict, sort=sort
+            )
+            count_result = await self.db.execute(count_query, params)
             total = count_result.scalar()
 
-            if sort:
-                if sort.startswith('-'):
-                    field_name = sort[1:]
-                    if hasattr(Suppliers, field_name):
-                        query = query.order_by(getattr(Suppliers, field_name).desc())
-                else:
-                    if hasattr(Suppliers, sort):
-                        query = query.order_by(getattr(Suppliers, sort))
-            else:
-                query = query.order_by(Suppliers.id.desc())
-
-            result = await self.db.execute(query.offset(skip).limit(limit))
+            result = await self.db.execute(query, params)
             items = result.scalars().all()
 
             return {
@@ -103,6 +95,14 @@ class SuppliersService:
             logger.error(f"Error fetching suppliers list: {str(e)}")
             raise
 
+    async def get_changes(self, since: Optional[int], limit: int = 500, user_id: Optional[str] = None) -> Dict[str, Any]:
+        """Get supplierss changed after version `since` (user can only see their own records)"""
+        try:
+            return await read_changes(self.db, Suppliers, since, limit, user_id=user_id)
+        except Exception as e:
+            logger.error(f"Error fetching suppliers changes: {str(e)}")
+            raise
+
     async def update(self, obj_id: int, update_data: Dict[str, Any], user_id: Optional[str] = None) -> Optional[Suppliers]:
         """Update suppliers (requires ownership)"""
         try:
@@ -116,7 +116,7 @@ class SuppliersService:
 
             await self.db.commit()
             await self.db.refresh(obj)
-            logger.info(f"Updated suppliers {obj_id}")
+            logger.info("Updated suppliers %s", obj_id)
             return obj
         except Exception as e:
             await self.db.rollback()
@@ -132,7 +132,7 @@ class SuppliersService:
                 return False
             await self.db.delete(obj)
             await self.db.commit()
-            logger.info(f"Deleted suppliers {obj_id}")
+            logger.info("Deleted suppliers %s", obj_id)
             return True
         except Exception as e:
             await self.db.rollback()
@@ -144,9 +144,8 @@ class SuppliersService:
         try:
             if not hasattr(Suppliers, field_name):
                 raise ValueError(f"Field {field_name} does not exist on Suppliers")
-            result = await self.db.execute(
-                select(Suppliers).where(getattr(Suppliers, field_name) == field_value)
-            )
+            query, params = by_field_statement(Suppliers, field_name, field_value)
+            result = await self.db.execute(query, params)
             return result.scalar_one_or_none()
         except Exception as e:
             logger.error(f"Error fetching suppliers by {field_name}: {str(e)}")
@@ -159,13 +158,8 @@ class SuppliersService:
         try:
             if not hasattr(Suppliers, field_name):
                 raise ValueError(f"Field {field_name} does not exist on Suppliers")
-            result = await self.db.execute(
-                select(Suppliers)
-                .where(getattr(Suppliers, field_name) == field_value)
-                .offset(skip)
-                .limit(limit)
-                .order_by(Suppliers.id.desc())
-            )
+            query, params = by_field_statement(Suppliers, field_name, field_value, skip=skip, limit=limit)
+            result = await self.db.execute(query, params)
             return result.scalars().all()
         except Exception as e:
             logger.error(f"Error fetching supplierss by {field_name}: {str(e)}")
@@ -1,9 +1,10 @@
 import logging
 from typing import Optional, Dict, Any, List
 
-from sqlalchemy import select, func
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from core.change_feed import read_changes
+from core.statement_cache import by_field_statement, by_id_statement, list_statements
 from models.tax_rates import Tax_rates
 
 logger = logging.getLogger(__name__)
@@ -23,7 +24,7 @@ class Tax_ratesService:
             self.db.add(obj)
             await self.db.commit()
             await self.db.refresh(obj)
-            logger.info(f"Created tax_rates with id: {obj.id}")
+            logger.info("Created tax_rates with id: %s", obj.id)
             return obj
         except Exception as e:
             await self.db.rollback()
@@ -33,8 +34,8 @@ class Tax_ratesService:
     async def get_by_id(self, obj_id: int) -> Optional[Tax_rates]:
         """Get tax_rates by ID"""
         try:
-            query = select(Tax_rates).where(Tax_rates.id == obj_id)
-            result = await self.db.execute(query)
+            query, params = by_id_statement(Tax_rates, obj_id)
+            result = await self.db.execute(query, params)
             return result.scalar_one_or_none()
         except Exception as e:
             logger.error(f"Error fetching tax_rates {obj_id}: {str(e)}")
@@ -49,30 +50,13 @@ class Tax_ratesService:
     ) -> Dict[str, Any]:
         """Get paginated list of tax_ratess"""
         try:
-            query = select(Tax_rates)
-            count_query = select(func.count(Tax_rates.id))
-            
-            if query_dict:
-                for field, value in query_dict.items():
-                    if hasattr(Tax_rates, field):
-                        query = query.where(getattr(Tax_rates, field) == value)
-                        count_query = count_query.where(getattr(Tax_rates, field) == value)
-            
-            count_result = await self.db.execute(count_query)
+            query, count_query, params = list_statements(
+                Tax_rates, skip, limit, query_dict=query_dict, sort=sort
+            )
+            count_result = await self.db.execute(count_query, params)
             total = count_result.scalar()
 
-            if sort:
-                if sort.startswith('-'):
-                    field_name = sort[1:]
-                    if hasattr(Tax_rates, field_name):
-                        query = query.order_by(getattr(Tax_rates, field_name).desc())
-                else:
-                    if hasattr(Tax_rates, sort):
-                        query = query.order_by(getattr(Tax_rates, sort))
-            else:
-                query = query.order_by(Tax_rates.id.desc())
-
-            result = await self.db.execute(query.offset(skip).limit(limit))
+            result = await self.db.execute(query, params)
             items = result.scalars().all()
 
             return {
@@ -85,6 +69,14 @@ class Tax_ratesService:
             logger.error(f"Error fetching tax_rates list: {str(e)}")
             raise
 
+    async def get_changes(self, since: Optional[int], limit: int = 500) -> Dict[str, Any]:
+        """Get tax_ratess changed after version `since`"""
+        try:
+            return await read_changes(self.db, Tax_rates, since, limit)
+        except Exception as e:
+            logger.error(f"Error fetching tax_rates changes: {str(e)}")
+            raise
+
     async def update(self, obj_id: int, update_data: Dict[str, Any]) -> Optional[Tax_rates]:
         """Update tax_rates"""
         try:
@@ -98,7 +90,7 @@ class Tax_ratesService:
 
             await self.db.commit()
             await self.db.refresh(obj)
-            logger.info(f"Updated tax_rates {obj_id}")
+            logger.info("Updated tax_rates %s", obj_id)
             return obj
         except Exception as e:
             await self.db.rollback()
@@ -114,7 +106,7 @@ class Tax_ratesService:
                 return False
             await self.db.delete(obj)
             await self.db.commit()
-            logger.info(f"Deleted tax_rates {obj_id}")
+            logger.info("Deleted tax_rates %s", obj_id)
             return True
         except Exception as e:
             await self.db.rollback()
@@ -126,9 +118,8 @@ class Tax_ratesService:
         try:
             if not hasattr(Tax_rates, field_name):
                 raise ValueError(f"Field {field_name} does not exist on Tax_rates")
-            result = await self.db.execute(
-                select(Tax_rates).where(getattr(Tax_rates, field_name) == field_value)
-            )
+            query, params = by_field_statement(Tax_rates, field_name, field_value)
+            result = await self.db.execute(query, params)
             return result.scalar_one_or_none()
         except Exception as e:
             logger.error(f"Error fetching tax_rates by {field_name}: {str(e)}")
@@ -141,13 +132,8 @@ class Tax_ratesService:
         try:
             if not hasattr(Tax_rates, field_name):
                 raise ValueError(f"Field {field_name} does not exist on Tax_rates")
-            result = await self.db.execute(
-                select(Tax_rates)
-                .where(getattr(Tax_rates, field_name) == field_value)
-                .offset(skip)
-                .limit(limit)
-                .order_by(Tax_rates.id.desc())
-            )
+            query, params = by_field_statement(Tax_rates, field_name, field_value, skip=skip, limit=limit)
+            result = await self.db.execute(query, params)
             return result.scalars().all()
         except Exception as e:
             logger.error(f"Error fetching tax_ratess by {field_name}: {str(e)}")
@@ -14,11 +14,11 @@ class UserService:
     async def get_user_profile(db: AsyncSession, user_id: str) -> Optional[User]:
         """Get user profile by user ID."""
         start_time = time.time()
-        logger.debug(f"[DB_OP] Starting get_user_profile - user_id: {user_id}")
+        logger.debug("[DB_OP] Starting get_user_profile - user_id: %s", user_id)
         result = await db.execute(select(User).where(User.id == user_id))
         user = result.scalar_one_or_none()
         logger.debug(
-            f"[DB_OP] Get user profile completed in {time.time() - start_time:.4f}s - found: {user is not None}"
+            "[DB_OP] Get user profile completed in %.4fs - found: %s", time.time() - start_time, user is not None
         )
         return user
 
@@ -26,10 +26,10 @@ class UserService:
     async def update_user_profile(db: AsyncSession, user_id: str, name: Optional[str] = None) -> Optional[User]:
         """Update user profile."""
         start_time = time.time()
-        logger.debug(f"[DB_OP] Starting update_user_profile - user_id: {user_id}")
+        logger.debug("[DB_OP] Starting update_user_profile - user_id: %s", user_id)
         result = await db.execute(select(User).where(User.id == user_id))
         user = result.scalar_one_or_none()
-        logger.debug(f"[DB_OP] User lookup completed in {time.time() - start_time:.4f}s - found: {user is not None}")
+        logger.debug("[DB_OP] User lookup completed in %.4fs - found: %s", time.time() - start_time, user is not None)
 
         if user and name is not None:
             start_time_update = time.time()
@@ -37,6 +37,6 @@ class UserService:
             user.name = name
             await db.commit()
             await db.refresh(user)
-            logger.debug(f"[DB_OP] User profile update completed in {time.time() - start_time_update:.4f}s")
+            logger.debug("[DB_OP] User profile update completed in %.4fs", time.time() - start_time_update)
 
         return user